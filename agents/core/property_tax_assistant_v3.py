@@ -18,6 +18,7 @@ T - Create Razorpay link via /payments/link
 from typing import Annotated, Any, Dict
 from typing_extensions import TypedDict
 import structlog
+import time
 from datetime import datetime
 
 from langchain_core.messages import AnyMessage, ToolMessage, AIMessage
@@ -27,6 +28,9 @@ from langgraph.graph import StateGraph, START, add_messages
 from langgraph.prebuilt import tools_condition, ToolNode
 from langgraph.checkpoint.memory import InMemorySaver
 from services.persistence.redis_conversation_store import get_conversation_store
+from services.persistence.conversation_events import get_conversation_event_log
+from services.persistence.message_writer import get_message_writer
+from config.settings import settings
 from langchain_core.prompts import ChatPromptTemplate
 
 # AI configuration and guardrails removed - Microsoft Forms registration doesn't need complex safety measures
@@ -46,6 +50,15 @@ from langchain_core.tools import tool
 # Import ticket management for complaints (workflow node I)  
 from agents.simplified.ticket_tools import create_support_ticket
 
+# Homestead cap check against the appraisal roll history
+from agents.simplified.homestead_cap_tools import check_homestead_cap_tool
+
+# Property lookup from a typed address
+from agents.simplified.property_search_tools import find_property_tool
+
+# Owner lookup by name (resolved across spellings)
+from agents.simplified.owner_search_tools import find_owner_tool
+
 # Import property document analysis tools (NO BOOKING TOOLS)
 from agents.simplified.property_document_tools import (
     analyze_property_document_tool
@@ -254,7 +267,16 @@ def create_property_tax_assistant():
         escalate_to_human_agent,
 
         # Property document analysis for building urgency (NO BOOKING)
-        analyze_property_document_tool
+        analyze_property_document_tool,
+
+        # Homestead 10% cap check for a parcel's assessment history
+        check_homestead_cap_tool,
+
+        # Address -> parcel lookup (feeds the parcel ID to other tools)
+        find_property_tool,
+
+        # Owner name -> resolved owner and number of properties owned
+        find_owner_tool
     ]
     
     # CONSULTATIVE property tax specialist assistant
@@ -398,6 +420,8 @@ MICROSOFT FORMS REGISTRATION RULES:
 2. **Customer needs education first** → Provide helpful information → When they want help, call form_context_tool
 3. **Form questions/objections** → Call form_context_tool → Address concerns and direct to registration
 4. **Technical issues or complaints** → create_support_ticket or escalate_to_human_agent
+5. **Homeowner thinks their assessment rose too much** → Get the parcel ID (find_property_by_address if they give an address) → call check_homestead_cap → If a year is over the cap, that is a strong reason to register for help
+6. **Customer owns several properties** → call find_property_owner with their name (or business name) → Confirm how many properties they own → Registration covers their whole portfolio
 
 🚨 CRITICAL: NO CONSULTATION BOOKING. ONLY Microsoft Forms registration. When customer says "yes" to help, call form_context_tool and send them to the form.
 
@@ -534,7 +558,9 @@ async def process_property_tax_message(message: str, session_id: str, customer_i
     # Get Redis conversation store
     try:
         conv_store = get_conversation_store()
-        redis_available = conv_store.health_check()
+        # The store fails over to its local fallback when Redis is degraded,
+        # so no per-turn ping is needed here
+        redis_available = True
     except Exception as e:
         logger.warning(f"Redis conversation store unavailable: {e}")
         redis_available = False
@@ -556,6 +582,15 @@ async def process_property_tax_message(message: str, session_id: str, customer_i
                 "error": "empty_message"
             }
         
+        # Every incoming message is a turn event too, including those answered without the LLM below
+        if settings.conversation_events_enabled:
+            await get_conversation_event_log().append(
+                session_id=session_id,
+                role="user",
+                customer_id=customer_id,
+                language=_detect_language(message)
+            )
+        
         # Load conversation history from Redis for context
         conversation_context = {}
         if redis_available:
@@ -632,6 +667,8 @@ Please process this information naturally and only ask for missing booking detai
         from langchain_core.messages import HumanMessage
         
         # Stream the conversation - this properly handles checkpointer state
+        turn_started = time.perf_counter()
+        usage = {}
         try:
             events = list(assistant.stream(
                 {"messages": [HumanMessage(content=message)]}, 
@@ -664,6 +701,7 @@ Please process this information naturally and only ask for missing booking detai
                 for msg in reversed(messages):
                     if hasattr(msg, 'content') and msg.content and not isinstance(msg, HM):
                         response_text = msg.content
+                        usage = getattr(msg, "usage_metadata", None) or {}
                         break
                 else:
                     # More contextual fallback based on message content
@@ -677,6 +715,7 @@ Please process this information naturally and only ask for missing booking detai
                 response_text = "I'm ready to assist you with our property tax services. How can I help you today?"
         else:
             response_text = "I apologize for the technical issue. Please let me know what property tax services you need assistance with."
+        latency_ms = int((time.perf_counter() - turn_started) * 1000)
         
         logger.info(
             "Property tax message processed successfully",
@@ -717,6 +756,19 @@ Please process this information naturally and only ask for missing booking detai
             assistant_response=response_text
         )
         
+        # Compact turn event for batch analytics consumers (one XADD)
+        if settings.conversation_events_enabled:
+            await get_conversation_event_log().append(
+                session_id=session_id,
+                role="assistant",
+                customer_id=customer_id,
+                latency_ms=latency_ms,
+                input_tokens=usage.get("input_tokens"),
+                output_tokens=usage.get("output_tokens"),
+                language=_detect_language(message),
+                stage=_detect_conversation_stage(message, response_text)
+            )
+        
         return {
             "text": response_text,
             "session_id": session_id,
@@ -876,24 +928,25 @@ async def _store_property_document_conversation(
 ) -> None:
     """Store property document confirmation in conversation history."""
     try:
-        from services.persistence.database import get_db_session
+        from services.persistence.database import unit_of_work
         from services.persistence.repositories import CustomerRepository, MessageHistoryRepository
         
-        async with get_db_session() as db_session:
+        async with unit_of_work() as db_session:
             customer_repo = CustomerRepository(db_session)
             message_repo = MessageHistoryRepository(db_session)
             
             # Get or create customer
-            customer_profile = await customer_repo.create_or_update(
+            profile_id = await customer_repo.upsert_interaction(
                 whatsapp_id=customer_id,
-                name=document_data.get("owner_name", "Unknown User")
+                defaults={"name": "Unknown User"},
+                name=document_data.get("owner_name")
             )
 
-            if customer_profile:
+            if profile_id:
                 # Store confirmation message
                 confirmation_text = f"Property document {action}: {', '.join(document_data.get('requested_assessments', []))}"
                 await message_repo.save_message(
-                    customer_id=customer_profile.id,
+                    customer_id=profile_id,
                     thread_id=f"conversation-{session_id}",
                     message_type="system",
                     message_text=confirmation_text,
@@ -913,40 +966,50 @@ async def _store_conversation_history(customer_id: str, thread_id: str, user_mes
         from sqlalchemy import select
         from datetime import datetime
         
-        from services.persistence.database import get_db_session
+        from services.persistence.database import unit_of_work
         
-        async with get_db_session() as session:
+        rows = []
+        # One transaction for the whole turn
+        async with unit_of_work() as session:
             # Use repository pattern for data operations
             customer_repo = CustomerRepository(session)
             message_repo = MessageHistoryRepository(session)
             
-            # Get or create customer profile
-            customer_profile = await customer_repo.create_or_update(
+            # Get or create customer profile (single upsert statement)
+            profile_id = await customer_repo.upsert_interaction(
                 whatsapp_id=customer_id,
-                name="Unknown User"
+                defaults={"name": "Unknown User"}
             )
             
-            if customer_profile:
-                # Store user message
-                await message_repo.save_message(
-                    customer_id=customer_profile.id,
-                    thread_id=thread_id,
-                    message_type="user",
-                    message_text=user_message,
-                    message_timestamp=datetime.now()
-                )
+            if profile_id:
+                # User message and assistant response go out in one insert
+                now = datetime.now()
+                rows = [
+                    {
+                        "customer_id": profile_id,
+                        "thread_id": thread_id,
+                        "message_type": "user",
+                        "message_text": user_message,
+                        "message_timestamp": now,
+                    },
+                    {
+                        "customer_id": profile_id,
+                        "thread_id": thread_id,
+                        "message_type": "assistant",
+                        "message_text": assistant_response,
+                        "message_timestamp": now,
+                    },
+                ]
                 
-                # Store assistant response
-                await message_repo.save_message(
-                    customer_id=customer_profile.id,
-                    thread_id=thread_id,
-                    message_type="assistant", 
-                    message_text=assistant_response,
-                    message_timestamp=datetime.now()
-                )
-                
-                logger.info(f"💾 Conversation stored in SQLite", 
-                           customer_id=customer_id, thread_id=thread_id)
+                if not settings.message_writer_enabled:
+                    await message_repo.save_messages(rows)
+        
+        if rows and settings.message_writer_enabled:
+            # Flushed in bulk by the background writer, outside this turn's transaction
+            await get_message_writer().write(rows)
+        
+        logger.info(f"💾 Conversation stored in SQLite", 
+                   customer_id=customer_id, thread_id=thread_id)
         
     except Exception as e:
         logger.error(f"Failed to store conversation history: {e}")
\ No newline at end of file
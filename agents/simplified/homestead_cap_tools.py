@@ -0,0 +1,96 @@
+"""
+Homestead cap tools for the property tax assistant.
+"""
+
+from typing import Dict, Any
+from langchain.tools import StructuredTool
+from pydantic import BaseModel, Field
+import structlog
+import asyncio
+
+logger = structlog.get_logger()
+
+
+class CheckHomesteadCapInput(BaseModel):
+    """Input for checking a parcel's homestead cap."""
+    parcel_id: str = Field(description="Appraisal district parcel/account ID of the property")
+
+
+async def check_homestead_cap_async(parcel_id: str) -> Dict[str, Any]:
+    """
+    Check a parcel's assessments against the Texas 10% homestead cap.
+
+    Args:
+        parcel_id: Appraisal district parcel ID
+
+    Returns:
+        Cap status for every assessed year, with any year assessed above its cap
+    """
+    try:
+        from services.persistence.database import get_database_manager
+        from services.property_data.homestead_cap import HomesteadCapEngine
+
+        history = await HomesteadCapEngine(await get_database_manager()).lookup(parcel_id.strip())
+        if history is None:
+            return {
+                "success": False,
+                "message": f"I couldn't find parcel {parcel_id} in our property records."
+            }
+
+        latest = history["years"][-1] if history["years"] else None
+        if history["violation_years"]:
+            message = (
+                f"Parcel {parcel_id} was assessed above its homestead cap in "
+                f"{', '.join(str(year) for year in history['violation_years'])}."
+            )
+        elif history["currently_capped"]:
+            message = (
+                f"Parcel {parcel_id} is under the homestead cap; its {latest['assessment_year']} "
+                f"assessment of ${latest['assessed_value']} is within the ${latest['cap_value']} cap."
+            )
+        else:
+            message = f"Parcel {parcel_id} is not currently under a homestead cap."
+
+        logger.info("🏠 Homestead cap checked", parcel_id=parcel_id, violations=len(history["violation_years"]))
+        return {
+            "success": True,
+            "parcel_id": history["parcel_id"],
+            "address": f"{history['street_address']}, {history['city']}",
+            "currently_capped": history["currently_capped"],
+            "violation_years": history["violation_years"],
+            "latest": latest,
+            "years": history["years"],
+            "message": message
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to check homestead cap: {e}")
+        return {
+            "success": False,
+            "message": "I couldn't check the homestead cap at this moment.",
+            "error": str(e)
+        }
+
+
+def check_homestead_cap(parcel_id: str) -> Dict[str, Any]:
+    """Sync wrapper for check_homestead_cap_async."""
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    return loop.run_until_complete(check_homestead_cap_async(parcel_id=parcel_id))
+
+
+# Create the tool
+check_homestead_cap_tool = StructuredTool.from_function(
+    func=check_homestead_cap,
+    coroutine=check_homestead_cap_async,
+    name="check_homestead_cap",
+    description=(
+        "Check whether a homestead's appraised value respects the Texas 10% annual cap. "
+        "Use when a homeowner asks if their assessment went up too much; needs the parcel ID."
+    ),
+    args_schema=CheckHomesteadCapInput
+)
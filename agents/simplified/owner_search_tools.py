@@ -0,0 +1,98 @@
+"""
+Property owner lookup tools for the property tax assistant.
+"""
+
+from typing import Dict, Any
+from langchain.tools import StructuredTool
+from pydantic import BaseModel, Field
+import structlog
+import asyncio
+
+logger = structlog.get_logger()
+
+
+class FindOwnerInput(BaseModel):
+    """Input for finding a property owner by name."""
+    name: str = Field(description="Owner name as the customer wrote it, e.g. 'John Smith' or 'Acme Holdings LLC'")
+    zip_code: str = Field(default=None, description="Mailing ZIP code if the customer gave it")
+
+
+async def find_property_owner_async(
+    name: str,
+    zip_code: str = None
+) -> Dict[str, Any]:
+    """
+    Find property owners matching a typed name.
+
+    Args:
+        name: Person or business name as typed by the customer
+        zip_code: Mailing ZIP code filter (optional)
+
+    Returns:
+        Best matching owners with each one's current portfolio (properties, assessed value, annual tax)
+    """
+    try:
+        from services.persistence.database import get_db_session
+        from services.persistence.repositories import PropertyOwnerRepository
+
+        async with get_db_session() as session:
+            owners = await PropertyOwnerRepository(session).search_by_name(name, zip_code=zip_code, limit=5)
+
+        if not owners:
+            return {
+                "success": True,
+                "owners": [],
+                "message": "I couldn't find that owner name in our property records. Could you check the spelling, or share the mailing ZIP code?"
+            }
+
+        best = owners[0]
+        logger.info("👥 Property owner lookup", matches=len(owners), properties=best["properties"])
+        return {
+            "success": True,
+            "owners": owners,
+            "message": (
+                f"Found {best['name']} ({best['mailing_city'] or 'mailing city unknown'}), "
+                f"owner of {best['properties']} propert{'y' if best['properties'] == 1 else 'ies'} on the roll "
+                f"(${best['total_assessed_value']:,.0f} assessed, ${best['total_annual_tax']:,.2f} annual tax)."
+                if len(owners) == 1 else
+                f"Found {len(owners)} possible owners; please confirm which one is you."
+            )
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to look up property owner: {e}")
+        return {
+            "success": False,
+            "message": "I couldn't search owner records at this moment.",
+            "error": str(e)
+        }
+
+
+def find_property_owner(
+    name: str,
+    zip_code: str = None
+) -> Dict[str, Any]:
+    """Sync wrapper for find_property_owner_async."""
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    return loop.run_until_complete(
+        find_property_owner_async(name=name, zip_code=zip_code)
+    )
+
+
+# Create the tool
+find_owner_tool = StructuredTool.from_function(
+    func=find_property_owner,
+    coroutine=find_property_owner_async,
+    name="find_property_owner",
+    description=(
+        "Look up a property owner (person or business) in the appraisal roll by name, even with typos "
+        "or LLC/Inc spelling variants. Returns the owner with how many properties they currently own "
+        "and their total assessed value and annual tax."
+    ),
+    args_schema=FindOwnerInput
+)
@@ -0,0 +1,103 @@
+"""
+Property lookup tools for the property tax assistant.
+"""
+
+from typing import Dict, Any
+from langchain.tools import StructuredTool
+from pydantic import BaseModel, Field
+import structlog
+import asyncio
+
+logger = structlog.get_logger()
+
+
+class FindPropertyInput(BaseModel):
+    """Input for finding a property by address."""
+    address: str = Field(description="Property address as the customer wrote it, e.g. '123 main st houston'")
+    zip_code: str = Field(default=None, description="ZIP code if the customer gave it")
+    county: str = Field(default=None, description="County if the customer gave it")
+
+
+async def find_property_by_address_async(
+    address: str,
+    zip_code: str = None,
+    county: str = None
+) -> Dict[str, Any]:
+    """
+    Find properties matching a typed address.
+
+    Args:
+        address: Address as typed by the customer
+        zip_code: ZIP code filter (optional)
+        county: County filter (optional)
+
+    Returns:
+        Best matching properties with their parcel IDs
+    """
+    try:
+        from services.persistence.database import get_db_session
+        from services.persistence.repositories import PropertyRepository
+
+        async with get_db_session() as session:
+            matches = await PropertyRepository(session).search_by_address(
+                address, zip_code=zip_code, county=county, limit=5
+            )
+
+        if not matches:
+            return {
+                "success": True,
+                "matches": [],
+                "message": "I couldn't find that address in our property records. Could you check the street number and name, or share the ZIP code?"
+            }
+
+        best = matches[0]
+        exact = best["match"] == "prefix" and (len(matches) == 1 or matches[1]["match"] != "prefix")
+        logger.info("🔎 Property address lookup", matches=len(matches), exact=exact)
+        return {
+            "success": True,
+            "matches": matches,
+            "exact_match": exact,
+            "message": (
+                f"Found {best['street_address']}, {best['city']} (parcel {best['parcel_id']})."
+                if exact else
+                f"Found {len(matches)} possible properties; please confirm which one is yours."
+            )
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to look up property address: {e}")
+        return {
+            "success": False,
+            "message": "I couldn't search property records at this moment.",
+            "error": str(e)
+        }
+
+
+def find_property_by_address(
+    address: str,
+    zip_code: str = None,
+    county: str = None
+) -> Dict[str, Any]:
+    """Sync wrapper for find_property_by_address_async."""
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    return loop.run_until_complete(
+        find_property_by_address_async(address=address, zip_code=zip_code, county=county)
+    )
+
+
+# Create the tool
+find_property_tool = StructuredTool.from_function(
+    func=find_property_by_address,
+    coroutine=find_property_by_address_async,
+    name="find_property_by_address",
+    description=(
+        "Look up a property in the appraisal roll from an address the customer typed, even with typos "
+        "or abbreviations. Returns matching parcels with parcel IDs for other property tools."
+    ),
+    args_schema=FindPropertyInput
+)
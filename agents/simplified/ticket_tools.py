@@ -53,7 +53,7 @@ async def create_support_ticket_async(
     try:
         from services.ticket_management.ticket_service import get_ticket_service
         from services.ticket_management.models import TicketCategory, TicketPriority
-        from services.persistence.database import get_db_session
+        from services.persistence.database import unit_of_work
         
         # Get ticket service
         ticket_service = await get_ticket_service()
@@ -66,8 +66,8 @@ async def create_support_ticket_async(
                 "timestamp": datetime.now().isoformat()
             }
         
-        # Create ticket in database
-        async with get_db_session() as session:
+        # Create ticket and its first message in one transaction
+        async with unit_of_work() as session:
             ticket = await ticket_service.create_ticket(
                 session=session,
                 instagram_id=instagram_id,
@@ -0,0 +1,59 @@
+"""
+FastAPI routes for conversation history.
+Cursor-paginated thread history for agent dashboards.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from services.persistence.database import get_db_session
+from services.persistence.repositories import MessageHistoryRepository
+
+router = APIRouter(
+    prefix="/api/conversations",
+    tags=["Conversation History"],
+    responses={400: {"description": "Invalid cursor, direction or field"}}
+)
+
+
+@router.get("/{customer_id}/threads/{thread_id}/messages")
+async def get_thread_messages(
+    customer_id: int,
+    thread_id: str,
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    direction: str = Query("older", pattern="^(older|newer)$", description="Page back (older) or forward (newer)"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. message_type,message_text"),
+    include_archived: bool = Query(False, description="Continue into archived months past the retention window"),
+) -> Dict[str, Any]:
+    """
+    Page through a thread's messages.
+
+    Without a cursor, ``older`` returns the newest page and ``newer`` the
+    oldest. Pass ``older_cursor`` / ``newer_cursor`` from the response to
+    continue in either direction; ``newer_cursor`` is always set, so it can
+    be polled for new messages (a short or empty page means caught up).
+    Archived months are only read when ``include_archived`` is set.
+    """
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        async with get_db_session() as session:
+            page = await MessageHistoryRepository(session).get_history_page(
+                customer_id=customer_id,
+                thread_id=thread_id,
+                limit=limit,
+                cursor=cursor,
+                direction=direction,
+                fields=field_list,
+                include_archived=include_archived,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for message in page["messages"]:
+        for key, value in message.items():
+            if hasattr(value, "isoformat"):
+                message[key] = value.isoformat()
+    page["count"] = len(page["messages"])
+    return page
@@ -0,0 +1,62 @@
+"""
+FastAPI routes for property data.
+Comparable properties and assessment-uniformity statistics for appeal evidence.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from services.persistence.database import PropertyType, get_database_manager, get_db_session
+from services.property_data.comps import DEFAULT_K, MAX_K, get_comps_index
+from services.property_data.ratio_study import MIN_GROUP_SIZE, RatioStudy
+
+router = APIRouter(
+    prefix="/api/properties",
+    tags=["Property Data"],
+    responses={404: {"description": "Property not found"}}
+)
+
+
+@router.get("/{property_id}/comps")
+async def get_property_comps(
+    property_id: int,
+    k: int = Query(DEFAULT_K, ge=1, le=MAX_K, description="Number of comparable properties"),
+) -> Dict[str, Any]:
+    """
+    Nearest comparable properties in the same county and property type.
+
+    Similarity is over square footage, year built, lot size, bedrooms and
+    bathrooms. Each comp carries its assessed value and value per sqft for
+    the county's latest assessment year. ``comps`` is empty until the
+    county's index has been built.
+    """
+    async with get_db_session() as session:
+        result = await get_comps_index().comps_for_property(session, property_id, k=k)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Property {property_id} not found")
+    return result
+
+
+@router.get("/ratio-study")
+async def get_ratio_study(
+    county: str,
+    year: int,
+    subdivision: Optional[str] = None,
+    property_type: Optional[PropertyType] = None,
+) -> Dict[str, Any]:
+    """
+    Assessment ratio statistics of a county, or of one subdivision and/or property type in it.
+
+    Median assessed-to-market ratio, COD and PRD with bootstrap confidence
+    intervals, served from the ratio-study cache (computed on first request
+    after an import).
+    """
+    study = RatioStudy(await get_database_manager())
+    result = await study.summary(county, year, subdivision, property_type.value if property_type else None)
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No ratio statistics for this group (needs at least {MIN_GROUP_SIZE} parcels with a market value)",
+        )
+    return result
@@ -23,12 +23,95 @@ class Settings:
     
     # Database Configuration
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///century_property_tax.db")
+
+    # Read replicas (comma-separated URLs); only @replica_read repository methods use them
+    database_replica_urls: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    db_replica_cooldown_seconds: float = float(os.getenv("DB_REPLICA_COOLDOWN_SECONDS", "30"))
+    db_replica_max_lag_seconds: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+    db_read_your_writes_seconds: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+    # Apply pending migrations at startup (single-process development only)
+    db_auto_migrate: bool = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"
+
+    # Database Engine Tuning
+    db_query_cache_size: int = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+    db_query_metrics_enabled: bool = os.getenv("DB_QUERY_METRICS_ENABLED", "true").lower() == "true"
+    db_slow_query_ms: float = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+    # Postgres
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    db_prepared_statements: bool = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() == "true"
+    db_statement_cache_size: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+    db_application_name: str = os.getenv("DB_APPLICATION_NAME", "centuryproptax")
+    # SQLite
+    db_sqlite_synchronous: str = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL")
+    db_sqlite_busy_timeout_ms: int = int(os.getenv("DB_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    db_sqlite_mmap_size: int = int(os.getenv("DB_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    db_sqlite_cache_size_kb: int = int(os.getenv("DB_SQLITE_CACHE_SIZE_KB", "65536"))
+    db_sqlite_single_writer: bool = os.getenv("DB_SQLITE_SINGLE_WRITER", "true").lower() == "true"
+
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    redis_socket_timeout: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+    redis_socket_connect_timeout: float = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2"))
+
+    # Redis Connection Pools (shared by all subsystems in a worker)
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+    redis_async_max_connections: int = int(os.getenv("REDIS_ASYNC_MAX_CONNECTIONS", "50"))
+    redis_pool_timeout: float = float(os.getenv("REDIS_POOL_TIMEOUT", "2"))
+    redis_health_check_interval: int = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+    redis_cluster_mode: bool = os.getenv("REDIS_CLUSTER_MODE", "false").lower() == "true"
+
+    # Redis Degradation Mode (circuit breaker + local fallback store)
+    redis_breaker_failure_rate: float = float(os.getenv("REDIS_BREAKER_FAILURE_RATE", "0.5"))
+    redis_breaker_minimum_calls: int = int(os.getenv("REDIS_BREAKER_MINIMUM_CALLS", "5"))
+    redis_breaker_consecutive_failures: int = int(os.getenv("REDIS_BREAKER_CONSECUTIVE_FAILURES", "3"))
+    redis_breaker_recovery_seconds: float = float(os.getenv("REDIS_BREAKER_RECOVERY_SECONDS", "10"))
+    redis_fallback_max_sessions: int = int(os.getenv("REDIS_FALLBACK_MAX_SESSIONS", "1000"))
+    redis_fallback_max_pending_writes: int = int(os.getenv("REDIS_FALLBACK_MAX_PENDING_WRITES", "10000"))
     
     # State Persistence Configuration
     state_key_prefix: str = os.getenv("STATE_KEY_PREFIX", "property_tax_conversation")
     state_persistence_ttl: int = int(os.getenv("STATE_PERSISTENCE_TTL", "86400"))  # 24 hours
 
+    # Conversation Near Cache (process-local read cache in front of Redis)
+    near_cache_enabled: bool = os.getenv("NEAR_CACHE_ENABLED", "false").lower() == "true"
+    near_cache_max_entries: int = int(os.getenv("NEAR_CACHE_MAX_ENTRIES", "2048"))
+    near_cache_ttl_seconds: float = float(os.getenv("NEAR_CACHE_TTL_SECONDS", "30"))
+
+    # Conversation Event Stream (Redis Streams, consumed by batch pipelines)
+    conversation_events_enabled: bool = os.getenv("CONVERSATION_EVENTS_ENABLED", "true").lower() == "true"
+    conversation_events_maxlen: int = int(os.getenv("CONVERSATION_EVENTS_MAXLEN", "100000"))
+    conversation_events_batch_size: int = int(os.getenv("CONVERSATION_EVENTS_BATCH_SIZE", "200"))
+
+    # Buffered MessageHistory writer (bulk inserts every N rows or M milliseconds)
+    message_writer_enabled: bool = os.getenv("MESSAGE_WRITER_ENABLED", "true").lower() == "true"
+    message_writer_max_rows: int = int(os.getenv("MESSAGE_WRITER_MAX_ROWS", "200"))
+    message_writer_max_delay_ms: int = int(os.getenv("MESSAGE_WRITER_MAX_DELAY_MS", "50"))
+    message_writer_max_retries: int = int(os.getenv("MESSAGE_WRITER_MAX_RETRIES", "10"))
+    message_writer_dead_letter_path: str = os.getenv("MESSAGE_WRITER_DEAD_LETTER_PATH", "data/message_dead_letter.jsonl")
+
+    # MessageHistory retention (expired months move to compressed archives on local disk)
+    message_retention_days: int = int(os.getenv("MESSAGE_RETENTION_DAYS", "180"))
+    message_archive_dir: str = os.getenv("MESSAGE_ARCHIVE_DIR", "data/message_archive")
+    message_archive_interval_hours: float = float(os.getenv("MESSAGE_ARCHIVE_INTERVAL_HOURS", "0"))  # 0 = run from cron
+
+    # Appraisal roll import (services.property_data.importer)
+    property_import_chunk_size: int = int(os.getenv("PROPERTY_IMPORT_CHUNK_SIZE", "5000"))
+    # Derived search indexes (comps trees), memory-mapped by the app
+    property_index_dir: str = os.getenv("PROPERTY_INDEX_DIR", "data/property_index")
+
+    # Batch appeal-opportunity scoring (services.property_data.appeal_scoring)
+    appeal_scoring_workers: int = int(os.getenv("APPEAL_SCORING_WORKERS", "0"))  # 0 = one per CPU
+
+    # Assessment ratio study (services.property_data.ratio_study)
+    ratio_study_bootstrap_samples: int = int(os.getenv("RATIO_STUDY_BOOTSTRAP_SAMPLES", "100"))
+
+    # Owner entity resolution (services.property_data.owner_resolution)
+    owner_resolution_workers: int = int(os.getenv("OWNER_RESOLUTION_WORKERS", "0"))  # 0 = one per CPU
+
     # Application Configuration
     debug: bool = os.getenv("DEBUG", "false").lower() == "true"
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
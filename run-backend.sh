@@ -85,6 +85,11 @@ else:
     print('✅ Environment variables configured')
 "
 
+# Apply database migrations
+print_status "Applying database migrations..."
+python -m services.persistence.schema upgrade
+print_success "Database schema up to date"
+
 # Initialize database and test components
 print_status "Initializing database and testing components..."
 python -c "
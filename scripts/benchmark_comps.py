@@ -0,0 +1,155 @@
+"""
+Build and query the comps index (services.property_data.comps) on synthetic parcels.
+
+Seeds a SQLite database with N parcels in two counties (mixed property types,
+some unknown features) and one assessment year. Then:
+
+1. builds every county / type tree and times it;
+2. queries random subjects, checks each result against a brute-force scan of
+   the same normalized features, and reports per-query latency;
+3. refreshes again (nothing may be rebuilt);
+4. revalues 1% of one county's residential parcels and refreshes. Only that
+   group may be rebuilt, and an already-open reader sees the new values.
+
+    python scripts/benchmark_comps.py
+    python scripts/benchmark_comps.py --parcels 1000000 --queries 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sqlalchemy import insert, select, update
+
+from services.persistence.database import DatabaseManager, Property, PropertyType, TaxAssessment
+from services.property_data.comps import FEATURES, CompsIndex, CompsIndexBuilder, _normalize, _raw_features
+
+COUNTIES = ["Harris", "Fort Bend"]
+TYPES = [PropertyType.RESIDENTIAL] * 8 + [PropertyType.COMMERCIAL, PropertyType.VACANT_LAND]
+YEAR = 2026
+
+
+def parcel(rng: random.Random, i: int) -> dict:
+    kind = rng.choice(TYPES)
+    land = kind == PropertyType.VACANT_LAND
+    sqft = None if land or rng.random() < 0.02 else int(rng.lognormvariate(7.6, 0.4))
+    return {
+        "id": i, "parcel_id": f"P{i}", "street_address": f"{i} MAIN ST", "city": "HOUSTON", "zip_code": "77002",
+        "county": COUNTIES[i % len(COUNTIES)], "property_type": kind, "is_active": True,
+        "square_footage": sqft,
+        "year_built": None if land else rng.randint(1940, 2025),
+        "lot_size": Decimal(f"{rng.lognormvariate(-1.5, 0.6):.4f}"),
+        "bedrooms": None if land or sqft is None else max(1, min(7, sqft // 600)),
+        "bathrooms": None if land or sqft is None else Decimal(f"{max(1, min(6, sqft // 800)) + rng.choice([0, 0.5]):.1f}"),
+    }
+
+
+async def seed(manager: DatabaseManager, count: int) -> None:
+    rng = random.Random(11)
+    async with manager.begin_write() as conn:
+        for start in range(1, count + 1, 20_000):
+            rows = [parcel(rng, i) for i in range(start, min(start + 20_000, count + 1))]
+            await conn.execute(insert(Property), rows)
+            await conn.execute(insert(TaxAssessment), [{
+                "property_id": row["id"], "assessment_year": YEAR,
+                "assessment_date": date(YEAR, 1, 1), "effective_date": date(YEAR, 1, 1),
+                "land_value": 0, "total_assessed_value": Decimal((row["square_footage"] or 500) * rng.randint(80, 220)),
+                "tax_rate": Decimal("2.1"), "base_tax_amount": 0, "final_tax_amount": 0, "due_dates": [],
+            } for row in rows])
+
+
+def brute_force(group, features: dict, k: int, exclude: int) -> list:
+    raw = _raw_features(np.array([[-1.0 if features[name] is None else float(features[name]) for name in FEATURES]]))
+    point = _normalize(raw, group.center, group.scale)[0]
+    diff = np.asarray(group.tree.points) - point
+    distances = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    distances[np.asarray(group.ids) == exclude] = np.inf
+    return np.sort(distances)[:k].tolist()
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'comps.db')}", replica_urls=[])
+        await manager.create_tables()
+        started = time.perf_counter()
+        await seed(manager, args.parcels)
+        print(f"seeded {args.parcels} parcels in {time.perf_counter() - started:.1f}s")
+
+        index = CompsIndex(os.path.join(tmpdir, "comps"))
+        builder = CompsIndexBuilder(manager, index)
+        for stats in await builder.refresh():
+            print(f"build {stats['county']}: {stats['rebuilt']} in {stats['elapsed_seconds']}s")
+
+        rng = random.Random(5)
+        latencies, mismatches = [], 0
+        async with manager.engine.connect() as conn:
+            for n in range(args.queries):
+                property_id = rng.randint(1, args.parcels)
+                started = time.perf_counter()
+                result = await index.comps_for_property(conn, property_id, k=args.k)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if n < 200:
+                    subject = result["subject"]
+                    group = index.group(subject["county"], subject["property_type"])
+                    expected = brute_force(group, subject, args.k, property_id)
+                    got = [comp["distance"] for comp in result["comps"]]
+                    if len(got) != len(expected) or not np.allclose(got, expected, atol=1e-3):
+                        mismatches += 1
+        latencies.sort()
+        print(f"{args.queries} comps_for_property queries (k={args.k}, incl. subject and address lookups): "
+              f"median {statistics.median(latencies):.2f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms")
+        print(f"brute-force check of 200 queries: {mismatches} mismatches")
+        print(f"sample comp: {result['comps'][0]}")
+
+        unchanged = await builder.refresh()
+        rebuilt_unchanged = sum(len(stats["rebuilt"]) for stats in unchanged)
+        print(f"unchanged refresh: {rebuilt_unchanged} groups rebuilt")
+
+        # SQLite CURRENT_TIMESTAMP has one-second resolution
+        await asyncio.sleep(1.1)
+        harris_residential = select(Property.id).where(
+            Property.county == "Harris", Property.property_type == PropertyType.RESIDENTIAL, Property.id % 100 == 0,
+        )
+        async with manager.begin_write() as conn:
+            await conn.execute(
+                update(TaxAssessment)
+                .where(TaxAssessment.property_id.in_(harris_residential))
+                .values(total_assessed_value=TaxAssessment.total_assessed_value * 2)
+            )
+        changed = await builder.refresh()
+        rebuilt = [(stats["county"], group["property_type"]) for stats in changed for group in stats["rebuilt"]]
+        print(f"after revaluing 1% of Harris residential: rebuilt {rebuilt}")
+        async with manager.engine.connect() as conn:
+            revalued = dict((await conn.execute(
+                select(TaxAssessment.property_id, TaxAssessment.total_assessed_value)
+                .where(TaxAssessment.property_id.in_(harris_residential))
+            )).all())
+        group = index.group("Harris", PropertyType.RESIDENTIAL)
+        ids = np.asarray(group.ids)
+        positions = np.flatnonzero(np.isin(ids, list(revalued)))
+        current = sum(float(group.values[p]) == float(revalued[int(ids[p])]) for p in positions)
+        print(f"open reader sees the new values of {current}/{len(revalued)} revalued parcels")
+
+        await manager.close()
+
+    ok = mismatches == 0 and rebuilt_unchanged == 0 and rebuilt == [("Harris", "residential")] and current == len(revalued)
+    print("\nComps index OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comps index build and query benchmark")
+    parser.add_argument("--parcels", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=10)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,154 @@
+"""
+Measure per-call CPU of the precompiled hot-path statements
+(services.persistence.statements) against building the same select() per call.
+
+For each lookup, runs N executions of the inline construct (the shape the
+repositories used before) and N of the module-level statement on the same
+SQLite file and session, and reports CPU time per call (process time, so
+waiting on the database is excluded).
+
+    python scripts/benchmark_hot_statements.py
+    python scripts/benchmark_hot_statements.py --calls 5000 --rounds 7
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import selectinload
+
+from config.settings import Settings
+from services.persistence.database import (
+    CustomerProfile, DatabaseManager, MessageHistory, PropertyAssessmentRequest, PropertyAssessmentService,
+)
+from services.persistence.statements import CUSTOMER_BY_WHATSAPP_ID, REQUEST_BY_REQUEST_ID, THREAD_HISTORY
+from services.ticket_management.models import SupportTicket
+from services.ticket_management.ticket_service import TICKET_BY_TICKET_ID
+
+
+class _BenchSettings(Settings):
+    db_query_metrics_enabled = False
+
+
+def inline_customer(i):
+    return select(CustomerProfile).where(CustomerProfile.whatsapp_id == f"wa-{i % 50}"), None
+
+
+def precompiled_customer(i):
+    return CUSTOMER_BY_WHATSAPP_ID, {"whatsapp_id": f"wa-{i % 50}"}
+
+
+def inline_request(i):
+    return (
+        select(PropertyAssessmentRequest)
+        .options(
+            selectinload(PropertyAssessmentRequest.customer),
+            selectinload(PropertyAssessmentRequest.service)
+        )
+        .where(PropertyAssessmentRequest.request_id == f"REQ-{i % 50}")
+    ), None
+
+
+def precompiled_request(i):
+    return REQUEST_BY_REQUEST_ID, {"request_id": f"REQ-{i % 50}"}
+
+
+def inline_history(i):
+    return (
+        select(MessageHistory)
+        .where(and_(MessageHistory.customer_id == i % 50 + 1, MessageHistory.thread_id == "thread"))
+        .order_by(MessageHistory.message_timestamp.desc(), MessageHistory.id.desc())
+        .limit(10)
+    ), None
+
+
+def precompiled_history(i):
+    return THREAD_HISTORY, {"customer_id": i % 50 + 1, "thread_id": "thread", "limit": 10}
+
+
+def inline_ticket(i):
+    return select(SupportTicket).where(SupportTicket.ticket_id == f"TKT-{i % 50}"), None
+
+
+def precompiled_ticket(i):
+    return TICKET_BY_TICKET_ID, {"ticket_id": f"TKT-{i % 50}"}
+
+
+LOOKUPS = [
+    ("get_by_whatsapp_id", inline_customer, precompiled_customer),
+    ("get_by_request_id", inline_request, precompiled_request),
+    ("get_conversation_history", inline_history, precompiled_history),
+    ("get_ticket", inline_ticket, precompiled_ticket),
+]
+
+
+async def seed(manager: DatabaseManager) -> None:
+    async with manager.get_session() as session:
+        service = PropertyAssessmentService(service_code="BENCH", name="Benchmark", category="assessment", fee=0)
+        session.add(service)
+        await session.flush()
+        for i in range(50):
+            customer = CustomerProfile(whatsapp_id=f"wa-{i}")
+            session.add(customer)
+            await session.flush()
+            session.add(PropertyAssessmentRequest(
+                request_id=f"REQ-{i}", customer_id=customer.id, service_id=service.id,
+                request_type="appeal", description="benchmark", total_amount=0,
+            ))
+            session.add(SupportTicket(
+                ticket_id=f"TKT-{i}", instagram_id=f"wa-{i}", subject="benchmark", description="benchmark",
+            ))
+            for n in range(20):
+                session.add(MessageHistory(
+                    customer_id=customer.id, thread_id="thread", message_type="user",
+                    message_text=f"message {n}", message_timestamp=datetime.now(timezone.utc),
+                ))
+        await session.commit()
+
+
+async def run(manager: DatabaseManager, build, calls: int) -> float:
+    async with manager.get_session() as session:
+        start = time.process_time()
+        for i in range(calls):
+            stmt, params = build(i)
+            result = await session.execute(stmt, params)
+            result.scalars().all()
+            # Keep the identity map from growing across calls
+            session.expunge_all()
+        return (time.process_time() - start) / calls * 1e6
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'bench.db')}", engine_settings=_BenchSettings)
+        await manager.create_tables()
+        await seed(manager)
+
+        print(f"calls per round: {args.calls}, rounds: {args.rounds} (CPU us per call, median)")
+        print(f"{'lookup':<26} {'inline':>9} {'precompiled':>12} {'saved':>9}")
+        for name, inline, precompiled in LOOKUPS:
+            await run(manager, inline, 200)
+            await run(manager, precompiled, 200)
+            inline_us, precompiled_us = [], []
+            for _ in range(args.rounds):
+                inline_us.append(await run(manager, inline, args.calls))
+                precompiled_us.append(await run(manager, precompiled, args.calls))
+            before, after = statistics.median(inline_us), statistics.median(precompiled_us)
+            print(f"{name:<26} {before:>9.1f} {after:>12.1f} {(before - after) / before * 100:>8.1f}%")
+
+        await manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompiled statement micro-benchmark")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,135 @@
+"""
+Benchmark MessageHistory insert paths.
+
+Compares per-row ``save_message`` (commit + refresh per row) with bulk
+``save_messages`` and the buffered background writer.
+
+    python scripts/benchmark_message_inserts.py
+    python scripts/benchmark_message_inserts.py --rows 20000 --database-url postgresql+asyncpg://...
+
+Without ``--database-url`` a throwaway SQLite file is used.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import delete
+
+from services.persistence import database
+from services.persistence.database import DatabaseManager, MessageHistory
+from services.persistence.message_writer import BufferedMessageWriter
+from services.persistence.repositories import CustomerRepository, MessageHistoryRepository
+
+
+def _rows(customer_id: int, count: int):
+    now = datetime.utcnow()
+    return [
+        {
+            "customer_id": customer_id,
+            "thread_id": f"conversation-bench-{i // 2}",
+            "message_type": "user" if i % 2 == 0 else "assistant",
+            "message_text": f"benchmark message {i} " + "x" * 200,
+            "message_timestamp": now,
+        }
+        for i in range(count)
+    ]
+
+
+async def _reset(manager: DatabaseManager) -> None:
+    async with manager.get_session() as session:
+        await session.execute(delete(MessageHistory))
+        await session.commit()
+
+
+async def bench_per_row(manager: DatabaseManager, customer_id: int, count: int) -> float:
+    start = time.perf_counter()
+    async with manager.get_session() as session:
+        repo = MessageHistoryRepository(session)
+        for row in _rows(customer_id, count):
+            await repo.save_message(**row)
+    return time.perf_counter() - start
+
+
+async def bench_bulk(manager: DatabaseManager, customer_id: int, count: int, batch_size: int) -> float:
+    rows = _rows(customer_id, count)
+    start = time.perf_counter()
+    async with manager.get_session() as session:
+        repo = MessageHistoryRepository(session)
+        for i in range(0, count, batch_size):
+            await repo.save_messages(rows[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+async def bench_buffered(customer_id: int, count: int, batch_size: int) -> float:
+    # Two rows per turn, as written by the assistant
+    rows = _rows(customer_id, count)
+    writer = BufferedMessageWriter(max_rows=batch_size, max_delay_ms=50)
+    writer.start()
+    start = time.perf_counter()
+    for i in range(0, count, 2):
+        await writer.write(rows[i:i + 2])
+        if i % batch_size == 0:
+            # Let the flush loop run, like turns interleaving with other requests
+            await asyncio.sleep(0)
+    await writer.stop()
+    return time.perf_counter() - start
+
+
+async def main(args: argparse.Namespace) -> None:
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    manager = DatabaseManager(database_url)
+    await manager.create_tables()
+    # The buffered writer resolves its sessions through the global manager
+    database.db_manager = manager
+
+    async with manager.get_session() as session:
+        customer = await CustomerRepository(session).create_or_update(whatsapp_id="benchmark-customer")
+        customer_id = customer.id
+
+    per_row_count = min(args.rows, args.per_row_rows)
+    results = []
+
+    await _reset(manager)
+    elapsed = await bench_per_row(manager, customer_id, per_row_count)
+    results.append(("save_message (per row)", per_row_count, elapsed))
+
+    await _reset(manager)
+    elapsed = await bench_bulk(manager, customer_id, args.rows, args.batch_size)
+    results.append((f"save_messages (batch {args.batch_size})", args.rows, elapsed))
+
+    await _reset(manager)
+    elapsed = await bench_buffered(customer_id, args.rows, args.batch_size)
+    results.append((f"BufferedMessageWriter ({args.batch_size} rows / 50ms)", args.rows, elapsed))
+
+    await _reset(manager)
+    await manager.close()
+    if tmpdir:
+        tmpdir.cleanup()
+
+    baseline = results[0][1] / results[0][2]
+    print(f"Database: {database_url.split('://')[0]}")
+    print(f"{'path':<45}{'rows':>8}{'seconds':>10}{'rows/s':>12}{'speedup':>10}")
+    for name, rows, elapsed in results:
+        rate = rows / elapsed
+        print(f"{name:<45}{rows:>8}{elapsed:>10.3f}{rate:>12.0f}{rate / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MessageHistory insert paths")
+    parser.add_argument("--database-url", help="Async SQLAlchemy URL (defaults to a temp SQLite file)")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows for the bulk paths")
+    parser.add_argument("--per-row-rows", type=int, default=1000, help="Rows for the per-row baseline")
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows per bulk insert")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+"""
+Measure the overhead of statement timing (services.persistence.query_metrics).
+
+Runs the same per-turn repository workload (customer upsert, message insert,
+history read, PK lookup) against two engines on the same SQLite file, one
+with query metrics attached and one without, alternating rounds to cancel
+out drift.
+
+    python scripts/benchmark_query_metrics.py
+    python scripts/benchmark_query_metrics.py --turns 2000 --rounds 7
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.settings import Settings
+from services.persistence.database import DatabaseManager
+from services.persistence.query_metrics import get_query_metrics
+from services.persistence.repositories import CustomerRepository, MessageHistoryRepository
+
+
+class _NoMetricsSettings(Settings):
+    db_query_metrics_enabled = False
+
+
+async def run_turns(manager: DatabaseManager, turns: int) -> float:
+    start = time.perf_counter()
+    async with manager.get_session() as session:
+        customers = CustomerRepository(session)
+        messages = MessageHistoryRepository(session)
+        for i in range(turns):
+            customer_id = await customers.upsert_interaction(f"bench-{i % 50}")
+            await messages.save_messages([{
+                "customer_id": customer_id,
+                "thread_id": f"conversation-bench-{i % 50}",
+                "message_type": "user",
+                "message_text": "benchmark",
+            }])
+            await messages.get_conversation_history(customer_id, f"conversation-bench-{i % 50}", limit=10)
+            await customers.get_by_id(customer_id)
+    return time.perf_counter() - start
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        instrumented = DatabaseManager(url)
+        plain = DatabaseManager(url, engine_settings=_NoMetricsSettings)
+        await instrumented.create_tables()
+
+        # Warm up both engines (connections, compiled statement caches)
+        await run_turns(instrumented, 50)
+        await run_turns(plain, 50)
+
+        with_metrics, without_metrics = [], []
+        for _ in range(args.rounds):
+            without_metrics.append(await run_turns(plain, args.turns))
+            with_metrics.append(await run_turns(instrumented, args.turns))
+
+        await instrumented.close()
+        await plain.close()
+
+    base = statistics.median(without_metrics)
+    timed = statistics.median(with_metrics)
+    statements = args.turns * 4
+    print(f"turns per round: {args.turns} ({statements} statements), rounds: {args.rounds}")
+    print(f"without metrics: {base:.3f}s median ({base / statements * 1e6:.1f}us/statement)")
+    print(f"with metrics:    {timed:.3f}s median ({timed / statements * 1e6:.1f}us/statement)")
+    print(f"overhead:        {(timed - base) / base * 100:+.2f}%")
+    print("top fingerprints:")
+    for row in get_query_metrics().top(limit=4):
+        print(f"  {row['operation']:<55} n={row['count']:<6} avg={row['avg_ms']:.3f}ms p95<={row['p95_ms']}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query metrics overhead benchmark")
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
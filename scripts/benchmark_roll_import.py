@@ -0,0 +1,136 @@
+"""
+Load a synthetic appraisal roll with services.property_data.importer.
+
+Writes a CSV roll of N parcels (appraisal-district style headers, about one
+owner per three parcels), then on a fresh SQLite database:
+
+1. loads it, interrupting after the first chunks and resuming from the checkpoint;
+2. loads a next-year copy in which 10% of values and 2% of owners changed;
+3. reloads that copy unchanged (nothing should be written).
+
+    python scripts/benchmark_roll_import.py
+    python scripts/benchmark_roll_import.py --parcels 1000000 --defer-indexes
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, select
+
+from services.persistence.database import DatabaseManager, Property, PropertyOwner, TaxAssessment, property_ownership
+from services.property_data.importer import RollImporter
+
+HEADERS = [
+    "PROP_ID", "SITUS_ADDRESS", "SITUS_CITY", "SITUS_ZIP", "STATE_CD", "LIVING_AREA", "LAND_ACRES",
+    "YR_BUILT", "BEDS", "BATHS", "LEGAL_DESC", "ABS_SUBDV", "EXEMPTIONS", "OWNER_ID", "PY_OWNER_NAME",
+    "PY_ADDR_LINE1", "PY_ADDR_CITY", "PY_ADDR_STATE", "PY_ADDR_ZIP", "DEED_DATE",
+    "LAND_VAL", "IMPRV_VAL", "ASSESSED_VAL", "MARKET_VAL", "TAX_RATE",
+]
+STREETS = ["MAIN ST", "OAK DR", "ELM AVE", "BAYOU BLVD", "CYPRESS CREEK PKWY", "WESTHEIMER RD"]
+CODES = ["A1", "A1", "A1", "A2", "B1", "C1", "F1", "D1"]
+
+
+def write_roll(path: str, parcels: int, seed: int, changed: float = 0.0, new_owners: float = 0.0) -> None:
+    rng = random.Random(seed)
+    change = random.Random(seed + 1)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        for i in range(parcels):
+            owner = i // 3
+            if new_owners and change.random() < new_owners:
+                owner = parcels + i
+            land = rng.randint(20_000, 200_000)
+            improvement = rng.randint(0, 600_000)
+            if changed and change.random() < changed:
+                improvement += 10_000
+            writer.writerow([
+                f"R{i:08d}", f"{rng.randint(100, 99999)} {rng.choice(STREETS)}", "HOUSTON", f"770{rng.randint(10, 99)}",
+                rng.choice(CODES), rng.randint(600, 6000), f"{rng.uniform(0.1, 2):.4f}", rng.randint(1950, 2024),
+                rng.randint(1, 6), f"{rng.randint(1, 8) / 2:.1f}", f"LT {i % 40} BLK {i % 7}", f"S{i % 500:04d}",
+                "HS" if i % 2 else "", owner, f"OWNER{owner} JOHN A" if owner % 5 else f"HOLDINGS {owner} LLC",
+                f"{owner} PO BOX", "HOUSTON", "TX", "77002", "2015-06-01",
+                land, improvement, land + improvement, land + improvement, "2.145000",
+            ])
+
+
+async def counts(manager: DatabaseManager) -> dict:
+    async with manager.engine.connect() as conn:
+        return {
+            "properties": await conn.scalar(select(func.count()).select_from(Property)),
+            "owners": await conn.scalar(select(func.count()).select_from(PropertyOwner)),
+            "links": await conn.scalar(select(func.count()).select_from(property_ownership)),
+            "current_links": await conn.scalar(
+                select(func.count()).select_from(property_ownership).where(property_ownership.c.end_date.is_(None))
+            ),
+            "assessments": await conn.scalar(select(func.count()).select_from(TaxAssessment)),
+        }
+
+
+def report(label: str, stats: dict) -> None:
+    print(f"\n{label}")
+    print(json.dumps(stats, indent=2))
+
+
+class _Interrupt(Exception):
+    pass
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        roll = os.path.join(tmpdir, "roll.csv")
+        next_roll = os.path.join(tmpdir, "roll_next.csv")
+        write_roll(roll, args.parcels, seed=1)
+        write_roll(next_roll, args.parcels, seed=1, changed=0.10, new_owners=0.02)
+
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'roll.db')}", replica_urls=[])
+        await manager.create_tables()
+
+        importer = RollImporter(manager, "Harris", 2025, chunk_size=args.chunk_size, defer_indexes=args.defer_indexes)
+
+        # Stop after two chunks, as a crash would, then resume
+        write_chunk = importer._write_chunk
+        calls = 0
+
+        async def crash_after_two(records):
+            nonlocal calls
+            calls += 1
+            if calls > 2:
+                raise _Interrupt()
+            await write_chunk(records)
+
+        importer._write_chunk = crash_after_two
+        try:
+            await importer.import_file(roll)
+        except _Interrupt:
+            pass
+        with open(f"{roll}.checkpoint") as f:
+            print(f"interrupted; checkpoint at record {json.load(f)['records']}")
+        importer._write_chunk = write_chunk
+        report("initial load (resumed)", await importer.import_file(roll))
+        print(json.dumps(await counts(manager)))
+
+        importer = RollImporter(manager, "Harris", 2026, chunk_size=args.chunk_size)
+        report("next year, 10% values / 2% owners changed", await importer.import_file(next_roll))
+        report("same file again", await importer.import_file(next_roll))
+        print(json.dumps(await counts(manager)))
+
+        print(f"\npeak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+        await manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Appraisal roll import benchmark")
+    parser.add_argument("--parcels", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--defer-indexes", action="store_true")
+    asyncio.run(main(parser.parse_args()))
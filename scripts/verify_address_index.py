@@ -0,0 +1,200 @@
+"""
+Check services.property_data.address_index against brute-force matching and time lookups.
+
+Seeds a SQLite database with N parcels on generated streets (suffixes,
+directionals, units) in several cities, zip codes and counties, builds the
+index and then:
+
+1. checks normalization of typed address variants;
+2. compares prefix lookups with a brute-force scan of the normalized keys
+   (the same keys in the same order, zip and county filters included);
+3. searches for sampled parcels the way customers type them (long suffix
+   names, lower case, unit spelled out, a typo in the street name, no city,
+   zip at the end) and reports how often the parcel is the top result and in
+   the top five, with lookup latency;
+4. runs ``PropertyRepository.search_by_address`` and the unchanged-roll refresh.
+
+    python scripts/verify_address_index.py
+    python scripts/verify_address_index.py --parcels 2000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sqlalchemy import insert
+
+from services.persistence.database import DatabaseManager, Property, PropertyType
+from services.persistence.repositories import PropertyRepository
+from services.property_data import address_index
+from services.property_data.address_index import AddressIndex, AddressIndexBuilder, normalize_address, split_query
+
+NAMES = [
+    "MAIN", "OAK", "ELM", "PINE", "CEDAR", "MAPLE", "WILLOW", "BAYOU", "MEMORIAL", "WESTHEIMER", "KIRBY",
+    "SHEPHERD", "MONTROSE", "HEIGHTS", "WASHINGTON", "LAMAR", "TRAVIS", "AUSTIN", "FANNIN", "SAN JACINTO",
+    "BRAZOS", "LOUISIANA", "MILAM", "BAGBY", "DUNLAVY", "HAZARD", "WOODHEAD", "MANDELL", "YOAKUM", "GRANT",
+]
+SUFFIXES = [("STREET", "ST"), ("AVENUE", "AVE"), ("DRIVE", "DR"), ("LANE", "LN"), ("BOULEVARD", "BLVD"),
+            ("COURT", "CT"), ("ROAD", "RD"), ("PARKWAY", "PKWY"), ("CIRCLE", "CIR"), ("TRAIL", "TRL")]
+DIRECTIONS = [("", ""), ("", ""), ("NORTH", "N"), ("SOUTH", "S"), ("EAST", "E"), ("WEST", "W")]
+PLACES = [("HOUSTON", "Harris", "770"), ("KATY", "Harris", "774"), ("SUGAR LAND", "Fort Bend", "774"),
+          ("RICHMOND", "Fort Bend", "774"), ("AUSTIN", "Travis", "787"), ("PFLUGERVILLE", "Travis", "786")]
+NORMALIZATION_CASES = [
+    ("123 Main Street", "123 MAIN ST"),
+    ("123 main st.", "123 MAIN ST"),
+    ("45 North Oak Boulevard, Apt 4B", "45 N OAK BLVD # 4B"),
+    ("45 N. Oak Blvd #4b", "45 N OAK BLVD # 4B"),
+    ("45 n oak blvd unit 4-B", "45 N OAK BLVD # 4 B"),
+    ("9 First Avenue Suite 200", "9 1ST AVE # 200"),
+    ("700 Louisiana St Apt # 12", "700 LOUISIANA ST # 12"),
+]
+
+
+def streets(rng: random.Random) -> list:
+    """(long form, directional, name, suffix) streets."""
+    return [
+        (direction, name, suffix)
+        for name in NAMES for direction in rng.sample(DIRECTIONS, 2) for suffix in rng.sample(SUFFIXES, 3)
+    ]
+
+
+async def seed(manager: DatabaseManager, count: int) -> list:
+    """Seeds parcels; returns (id, street long form, unit, city, zip, county) per parcel."""
+    rng = random.Random(48)
+    street_list = streets(rng)
+    parcels = []
+    async with manager.begin_write() as conn:
+        for start in range(1, count + 1, 20_000):
+            rows = []
+            for i in range(start, min(start + 20_000, count + 1)):
+                direction, name, suffix = rng.choice(street_list)
+                city, county, zip_prefix = rng.choice(PLACES)
+                number = rng.randint(1, 29999)
+                unit = str(rng.randint(1, 400)) if rng.random() < 0.15 else None
+                zip_code = f"{zip_prefix}{rng.randint(0, 40):02d}"
+                stored = " ".join(part for part in (str(number), direction[1], name, suffix[1]) if part)
+                if unit:
+                    stored += f" APT {unit}"
+                rows.append({
+                    "id": i, "parcel_id": f"A{i}", "street_address": stored, "city": city, "zip_code": zip_code,
+                    "county": county, "property_type": PropertyType.RESIDENTIAL, "is_active": True,
+                })
+                parcels.append((i, number, direction[0], name, suffix[0], unit, city, zip_code, county))
+            await conn.execute(insert(Property), rows)
+    return parcels
+
+
+def typo(rng: random.Random, word: str) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def typed_variants(rng: random.Random, parcel: tuple) -> dict:
+    _, number, direction, name, suffix, unit, city, zip_code, _ = parcel
+    street = " ".join(part for part in (str(number), direction, name, suffix) if part).lower()
+    unit_text = f" unit {unit}" if unit else ""
+    return {
+        "long form with city": f"{street}{unit_text}, {city.title()}",
+        "no city": f"{street}{unit_text}",
+        "zip at the end": f"{street}{unit_text} {city.lower()} tx {zip_code}",
+        "typo in street name": f"{street.replace(name.lower(), typo(rng, name.lower()))}{unit_text} {city.lower()}",
+    }
+
+
+def brute_prefix(keys: list, zips: np.ndarray, counties: np.ndarray, prefix: bytes,
+                 zip_code, county, limit: int) -> list:
+    rows = [i for i, key in enumerate(keys) if key.startswith(prefix)
+            and (not zip_code or zips[i] == zip_code) and (county is None or counties[i] == county)]
+    return rows[:limit]
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'addresses.db')}", replica_urls=[])
+        await manager.create_tables()
+        started = time.perf_counter()
+        parcels = await seed(manager, args.parcels)
+        print(f"seeded {args.parcels} parcels in {time.perf_counter() - started:.1f}s")
+
+        # 1. Normalization
+        normalized = [(text, normalize_address(text), want) for text, want in NORMALIZATION_CASES]
+        normalize_ok = all(got == want for _, got, want in normalized)
+        for text, got, want in normalized:
+            if got != want:
+                print(f"  normalize {text!r}: {got!r}, expected {want!r}")
+        normalize_ok = normalize_ok and split_query("12 Oak St Houston TX 77002-1234") == ("12 OAK ST HOUSTON", 77002)
+        print(f"normalization of {len(NORMALIZATION_CASES)} typed variants: {normalize_ok}")
+
+        index = AddressIndex(os.path.join(tmpdir, "index", "address"))
+        address_index._address_index = index
+        builder = AddressIndexBuilder(manager, index)
+        stats = await builder.refresh()
+        print(f"built index over {stats['parcels']} parcels ({stats['trigram_postings']} trigram postings) "
+              f"in {stats['elapsed_seconds']}s (load {stats['load_seconds']}s)")
+        version = index.load()
+
+        # 2. Prefix lookups against brute force
+        keys = [version.keys[i] for i in range(len(version))]
+        zips, counties = np.asarray(version.zips), np.asarray(version.counties)
+        rng = random.Random(5)
+        prefix_mismatches = 0
+        for _ in range(200):
+            key = rng.choice(keys)
+            prefix = key[:rng.randint(1, len(key))]
+            zip_code = int(zips[keys.index(key)]) if rng.random() < 0.3 else None
+            county = rng.randrange(len(version.meta["counties"])) if rng.random() < 0.3 else None
+            got = version.prefix_rows(prefix, zip_code, county, 25).tolist()
+            if got != brute_prefix(keys, zips, counties, prefix, zip_code, county, 25):
+                prefix_mismatches += 1
+        print(f"200 prefix lookups against a brute-force scan: {prefix_mismatches} mismatches")
+
+        # 3. Typed variants of sampled parcels
+        top1, top5, timings, filtered_ok = {}, {}, [], True
+        for parcel in rng.sample(parcels, min(args.samples, len(parcels))):
+            for kind, text in typed_variants(rng, parcel).items():
+                started = time.perf_counter()
+                results = index.search(text)
+                timings.append(time.perf_counter() - started)
+                ids = [result["property_id"] for result in results]
+                top1[kind] = top1.get(kind, 0) + (ids[:1] == [parcel[0]])
+                top5[kind] = top5.get(kind, 0) + (parcel[0] in ids[:5])
+            results = index.search(typed_variants(rng, parcel)["no city"], county=parcel[8], zip_code=parcel[7])
+            filtered_ok &= all(r["county"] == parcel[8] and r["zip_code"] == parcel[7] for r in results)
+            filtered_ok &= parcel[0] in [r["property_id"] for r in results]
+        samples = min(args.samples, len(parcels))
+        for kind in top1:
+            print(f"  {kind:22s} top-1 {top1[kind] / samples:6.1%}  top-5 {top5[kind] / samples:6.1%}")
+        timings = np.array(timings) * 1000
+        print(f"{len(timings)} searches: p50 {np.percentile(timings, 50):.2f} ms, p99 {np.percentile(timings, 99):.2f} ms, "
+              f"max {timings.max():.2f} ms; zip and county filters respected: {filtered_ok}")
+        recall_ok = all(top5[kind] / samples >= 0.95 for kind in top5) and top1["long form with city"] / samples >= 0.95
+
+        # 4. Repository method and an unchanged refresh
+        parcel = parcels[0]
+        async with manager.get_session() as session:
+            found = await PropertyRepository(session).search_by_address(typed_variants(rng, parcel)["zip at the end"])
+        again = await builder.refresh()
+        repository_ok = bool(found) and found[0]["parcel_id"] == f"A{parcel[0]}" and not again["rebuilt"]
+        print(f"repository search found {found[0]['parcel_id'] if found else None}; unchanged refresh skipped: "
+              f"{not again['rebuilt']}")
+        await manager.close()
+
+    ok = normalize_ok and prefix_mismatches == 0 and filtered_ok and recall_ok and repository_ok
+    print("\nAddress index OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Address index verification and timing")
+    parser.add_argument("--parcels", type=int, default=200_000)
+    parser.add_argument("--samples", type=int, default=500)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,232 @@
+"""
+Check services.property_data.appeal_scoring on a synthetic roll and time it.
+
+Seeds a SQLite database with N parcels spread over three counties, with two
+assessment years, individual and business owners (some mailing to the parcel
+itself), homestead codes and a few appeals. Then:
+
+1. runs a full scoring pass in the process pool (one worker per county);
+2. recomputes 200 sampled parcels one at a time (comps through
+   ``CompsIndex.nearest``, Python arithmetic) and compares them with the table;
+3. checks that ``county_rank`` follows the score in every county;
+4. revalues 100 parcels and opens an appeal on one more, then runs
+   incrementally: only those parcels may be re-scored, and the appealed one
+   must score 0.
+
+    python scripts/verify_appeal_scoring.py
+    python scripts/verify_appeal_scoring.py --parcels 1000000 --workers 3
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert, select, update
+
+from services.persistence.database import (
+    Appeal, AppealOpportunity, AppealReason, AppealStatus, DatabaseManager, Property, PropertyOwner,
+    PropertyType, TaxAssessment, property_ownership,
+)
+from services.property_data import appeal_scoring
+from services.property_data.comps import FEATURES, CompsIndex
+
+COUNTIES = ["Harris", "Fort Bend", "Travis"]
+TYPES = [PropertyType.RESIDENTIAL] * 8 + [PropertyType.COMMERCIAL, PropertyType.VACANT_LAND]
+YEAR = 2026
+
+
+def parcel(rng: random.Random, i: int) -> dict:
+    kind = rng.choice(TYPES)
+    sqft = None if kind == PropertyType.VACANT_LAND else int(rng.lognormvariate(7.6, 0.4))
+    codes = ["HS"] if rng.random() < 0.6 else []
+    return {
+        "id": i, "parcel_id": f"P{i}", "street_address": f"{i} OAK DR", "city": "HOUSTON", "zip_code": "77002",
+        "county": COUNTIES[i % len(COUNTIES)], "property_type": kind, "is_active": True,
+        "square_footage": sqft,
+        "year_built": rng.randint(1940, 2025) if sqft else None,
+        "lot_size": Decimal(f"{rng.lognormvariate(-1.5, 0.6):.4f}"),
+        "bedrooms": max(1, min(7, sqft // 600)) if sqft else None,
+        "bathrooms": Decimal(max(1, min(6, sqft // 800))) if sqft else None,
+        "exemption_details": {"codes": codes, "homestead": bool(codes)} if rng.random() < 0.95 else None,
+    }
+
+
+def assessment(property_id: int, year: int, value: int) -> dict:
+    return {
+        "property_id": property_id, "assessment_year": year,
+        "assessment_date": date(year, 1, 1), "effective_date": date(year, 1, 1),
+        "land_value": 0, "total_assessed_value": Decimal(value), "tax_rate": Decimal("2.1"),
+        "base_tax_amount": 0, "final_tax_amount": 0, "due_dates": [],
+    }
+
+
+async def seed(manager: DatabaseManager, count: int) -> None:
+    rng = random.Random(3)
+    async with manager.begin_write() as conn:
+        for start in range(1, count + 1, 20_000):
+            rows = [parcel(rng, i) for i in range(start, min(start + 20_000, count + 1))]
+            await conn.execute(insert(Property), rows)
+            previous, current = [], []
+            for row in rows:
+                value = (row["square_footage"] or 400) * rng.randint(90, 200)
+                previous.append(assessment(row["id"], YEAR - 1, value))
+                current.append(assessment(row["id"], YEAR, int(value * rng.uniform(0.95, 1.45))))
+            await conn.execute(insert(TaxAssessment), previous + current)
+            owners, links = [], []
+            for row in rows:
+                business = rng.random() < 0.15
+                owners.append({
+                    "id": row["id"], "first_name": "" if business else "JOHN", "last_name": f"OWNER {row['id']}",
+                    "business_type": "LLC" if business else None,
+                    "mailing_address": row["street_address"] if rng.random() < 0.7 else f"PO BOX {row['id']}",
+                })
+                links.append({"property_id": row["id"], "owner_id": row["id"], "start_date": date(2015, 1, 1)})
+            await conn.execute(insert(PropertyOwner), owners)
+            await conn.execute(insert(property_ownership), links)
+
+        assessments = dict((await conn.execute(
+            select(TaxAssessment.property_id, TaxAssessment.id).where(TaxAssessment.assessment_year == YEAR - 1)
+        )).all())
+        await conn.execute(insert(Appeal), [
+            appeal_row(f"A{i}", i, assessments[i], rng.choice([AppealStatus.APPROVED, AppealStatus.DENIED]))
+            for i in rng.sample(range(1, count + 1), count // 50)
+        ])
+
+
+def appeal_row(appeal_id: str, property_id: int, assessment_id: int, status: AppealStatus) -> dict:
+    return {
+        "appeal_id": appeal_id, "property_id": property_id, "assessment_id": assessment_id, "status": status,
+        "reason": AppealReason.OVERVALUATION, "reason_description": "", "submitted_by_name": "",
+        "relationship_to_property": "owner", "deadline_date": date(YEAR, 5, 15),
+        "current_assessed_value": 0, "requested_assessed_value": 0, "current_tax_amount": 0, "requested_tax_amount": 0,
+    }
+
+
+async def reference_score(conn, index: CompsIndex, property_id: int) -> float:
+    """One parcel's score, computed without the batch code paths."""
+    prop = (await conn.execute(select(Property.__table__).where(Property.id == property_id))).one()
+    values = dict((await conn.execute(
+        select(TaxAssessment.assessment_year, TaxAssessment.total_assessed_value)
+        .where(TaxAssessment.property_id == property_id)
+    )).all())
+    value, previous = float(values[YEAR]), float(values[YEAR - 1])
+    group = index.group(prop.county, prop.property_type)
+    comps = group.nearest({name: getattr(prop, name) for name in FEATURES}, 10, exclude=property_id)
+    per_sqft = [c["value_per_sqft"] for c in comps if c["value_per_sqft"] is not None]
+    if prop.square_footage and per_sqft:
+        ratio = value / prop.square_footage / statistics.median(per_sqft)
+    else:
+        ratio = value / statistics.median([c["assessed_value"] for c in comps])
+
+    owner = (await conn.execute(
+        select(PropertyOwner.__table__).join(property_ownership).where(property_ownership.c.property_id == property_id)
+    )).one()
+    missing_homestead = (
+        prop.property_type == PropertyType.RESIDENTIAL and owner.business_type is None
+        and owner.mailing_address == prop.street_address
+        and prop.exemption_details is not None and not prop.exemption_details["homestead"]
+    )
+    statuses = list((await conn.execute(select(Appeal.status).where(Appeal.property_id == property_id))).scalars())
+
+    def clip(x: float) -> float:
+        return min(max(x, 0.0), 1.0)
+
+    jump = clip(((value - previous) / previous - 0.05) / 0.25)
+    over = clip((ratio - 1.0) / 0.3)
+    score = 100 * (0.35 * jump + 0.40 * over + 0.25 * missing_homestead)
+    if AppealStatus.APPROVED in statuses:
+        score *= 1.15
+    elif AppealStatus.DENIED in statuses:
+        score *= 0.85
+    if AppealStatus.SUBMITTED in statuses:
+        score = 0.0
+    return round(min(score, 100.0), 2)
+
+
+async def ranks_consistent(conn) -> bool:
+    for county in COUNTIES:
+        rows = (await conn.execute(
+            select(AppealOpportunity.score, AppealOpportunity.county_rank)
+            .where(AppealOpportunity.county == county).order_by(AppealOpportunity.county_rank)
+        )).all()
+        ranks = [rank for _, rank in rows]
+        scores = [score for score, _ in rows]
+        if ranks != list(range(1, len(rows) + 1)) or scores != sorted(scores, reverse=True):
+            return False
+    return True
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'scoring.db')}"
+        manager = DatabaseManager(database_url, replica_urls=[])
+        await manager.create_tables()
+        started = time.perf_counter()
+        await seed(manager, args.parcels)
+        print(f"seeded {args.parcels} parcels in {time.perf_counter() - started:.1f}s")
+
+        index = CompsIndex(os.path.join(tmpdir, "comps"))
+        scorer = appeal_scoring.AppealScorer(manager, workers=args.workers, index=index)
+        full = await scorer.run(full=True)
+        print(f"full run: {full['parcels_scored']} parcels in {full['elapsed_seconds']}s ({full['by_county']})")
+
+        rng = random.Random(9)
+        mismatches = 0
+        async with manager.engine.connect() as conn:
+            stored = dict((await conn.execute(select(AppealOpportunity.property_id, AppealOpportunity.score))).all())
+            for property_id in rng.sample(range(1, args.parcels + 1), 200):
+                expected = await reference_score(conn, index, property_id)
+                if abs(stored[property_id] - expected) > 0.011:
+                    mismatches += 1
+                    if mismatches <= 5:
+                        print(f"  mismatch {property_id}: table {stored[property_id]}, reference {expected}")
+            ranked = await ranks_consistent(conn)
+        print(f"reference check of 200 parcels: {mismatches} mismatches; ranks consistent: {ranked}")
+
+        unchanged = await scorer.run()
+        print(f"incremental run, nothing changed: {unchanged['parcels_scored']} parcels re-scored")
+
+        revalued = rng.sample(range(1, args.parcels + 1), 100)
+        appealed = next(i for i in range(1, args.parcels + 1) if i not in revalued)
+        async with manager.begin_write() as conn:
+            await conn.execute(
+                update(TaxAssessment)
+                .where(TaxAssessment.property_id.in_(revalued), TaxAssessment.assessment_year == YEAR)
+                .values(total_assessed_value=TaxAssessment.total_assessed_value * Decimal("1.2"))
+            )
+            assessment_id = await conn.scalar(select(TaxAssessment.id).where(
+                TaxAssessment.property_id == appealed, TaxAssessment.assessment_year == YEAR,
+            ))
+            await conn.execute(insert(Appeal), [appeal_row("OPEN-1", appealed, assessment_id, AppealStatus.SUBMITTED)])
+        incremental = await scorer.run()
+        async with manager.engine.connect() as conn:
+            appealed_score = await conn.scalar(
+                select(AppealOpportunity.score).where(AppealOpportunity.property_id == appealed)
+            )
+            ranked_after = await ranks_consistent(conn)
+        print(f"incremental run after 100 revaluations + 1 appeal: {incremental['parcels_scored']} parcels re-scored "
+              f"in {incremental['elapsed_seconds']}s; appealed parcel scores {appealed_score}; ranks consistent: {ranked_after}")
+        await manager.close()
+
+    ok = (
+        mismatches == 0 and ranked and ranked_after and unchanged["parcels_scored"] == 0
+        and incremental["parcels_scored"] == 101 and appealed_score == 0
+    )
+    print("\nAppeal scoring OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Appeal-opportunity scoring verification and timing")
+    parser.add_argument("--parcels", type=int, default=150_000)
+    parser.add_argument("--workers", type=int, default=3)
+    sys.exit(asyncio.run(main(parser.parse_args())))
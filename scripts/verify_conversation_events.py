@@ -0,0 +1,237 @@
+"""
+Check the conversation event handlers in services.persistence.conversation_events.
+
+Consumers read the stream at least once: a batch whose ack is lost is
+delivered again. This checks that:
+
+1. SessionAnalyticsArchiver folds user and assistant events into UserAnalytics
+   on a SQLite database, weights average_response_time by the turns that
+   carry a latency (user events count as messages only), and a redelivered
+   batch, alone or mixed with new entries, changes nothing twice;
+2. old receipts are pruned;
+3. events of a customer whose profile is not written yet get no receipt and
+   are deferred (the consumer leaves them pending, acking the rest) until
+   the profile exists; events older than ``defer_seconds`` are dropped;
+4. AnalyticsRollup packs one script call per hourly bucket and counts
+   redelivered entries as duplicates. No Redis server is needed: the script
+   runs in a Python port of its Lua body over in-memory hashes.
+
+    python scripts/verify_conversation_events.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, select, update
+
+from services.persistence import database as database_module
+from services.persistence.conversation_events import (
+    AnalyticsRollup, ConversationEventConsumer, SessionAnalyticsArchiver,
+)
+from services.persistence.database import ConversationEventReceipt, CustomerProfile, DatabaseManager, UserAnalytics
+from services.persistence.redis_keys import RedisKeySchema
+
+
+def event(session_id: str, role: str, minute: int, **fields) -> dict:
+    ts = datetime(2026, 10, 19, 13, minute, tzinfo=timezone.utc).isoformat()
+    return {"session_id": session_id, "role": role, "customer_id": "wa-1", "ts": ts, **fields}
+
+
+async def analytics(manager: DatabaseManager, session_id: str):
+    async with manager.get_session() as session:
+        row = (await session.execute(
+            select(UserAnalytics).where(UserAnalytics.session_id == session_id)
+        )).scalar_one()
+        average = None if row.average_response_time is None else round(row.average_response_time, 3)
+        return row.total_messages_count, row.response_time_samples, average
+
+
+async def check_archiver() -> bool:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'events.db')}", replica_urls=[])
+        await manager.create_tables()
+        database_module.db_manager = manager
+        async with manager.get_session() as session:
+            session.add(CustomerProfile(whatsapp_id="wa-1"))
+            await session.commit()
+
+        archiver = SessionAnalyticsArchiver(prune_every=4)
+        first = [
+            ("1000-0", event("s1", "user", 0, language="en")),
+            ("1000-1", event("s1", "assistant", 1, latency_ms=2000)),
+            ("1001-0", event("s1", "user", 2)),
+            ("1001-1", event("s1", "assistant", 3, latency_ms=4000, stage="appeal")),
+        ]
+        await archiver(first)
+        after_first = await analytics(manager, "s1")
+        await archiver(first)  # redelivered after a lost ack
+        redelivered = await analytics(manager, "s1")
+
+        second = first[2:] + [
+            ("1002-0", event("s1", "user", 4)),
+            ("1002-1", event("s1", "assistant", 5, latency_ms=9000)),
+        ]
+        await archiver(second)
+        after_second = await analytics(manager, "s1")
+
+        ok = (
+            after_first == (4, 2, 3.0) and redelivered == after_first
+            and after_second == (6, 3, 5.0) and archiver.duplicates == 6
+        )
+        print(f"4 events: (messages, latency samples, average s) {after_first}; "
+              f"redelivered: {redelivered}; with 2 repeats and 2 new: {after_second} "
+              f"({archiver.duplicates} duplicates skipped): {ok}")
+
+        async with manager.begin_write() as conn:
+            await conn.execute(
+                update(ConversationEventReceipt.__table__)
+                .where(ConversationEventReceipt.entry_id.in_(["1000-0", "1000-1"]))
+                .values(applied_at=datetime.now(timezone.utc) - timedelta(days=30))
+            )
+        await archiver([("1003-0", event("s1", "user", 6))])  # fourth batch prunes
+        async with manager.engine.connect() as conn:
+            receipts = await conn.scalar(select(func.count()).select_from(ConversationEventReceipt.__table__))
+        pruned = receipts == 5
+        print(f"receipts older than {archiver.receipt_retention_days} days pruned: {pruned} ({receipts} kept)")
+
+        # First turn of a new customer: the user event is read before the profile is stored
+        now = datetime.now(timezone.utc)
+        fresh = [
+            ("2000-0", {**event("s2", "user", 0), "customer_id": "wa-2", "ts": now.isoformat()}),
+            ("2000-1", {**event("s1", "user", 7)}),
+        ]
+        stale = ("1500-0", {**event("s3", "user", 0), "customer_id": "wa-3",
+                            "ts": (now - timedelta(hours=2)).isoformat()})
+        log = MemoryEventLog([*fresh, stale])
+        consumer = ConversationEventConsumer(log, "archive", archiver)
+        acked = await consumer.run_once()
+        async with manager.engine.connect() as conn:
+            early_receipts = set(await conn.scalars(select(ConversationEventReceipt.entry_id).where(
+                ConversationEventReceipt.entry_id.in_(["2000-0", "1500-0"])
+            )))
+        s1_messages = (await analytics(manager, "s1"))[0]
+
+        async with manager.get_session() as session:
+            session.add(CustomerProfile(whatsapp_id="wa-2"))
+            await session.commit()
+        log.entries = [fresh[0]]  # claimed again once idle
+        acked_later = await consumer.run_once()
+        deferred_ok = (
+            acked == 2 and log.acked == ["2000-1", "1500-0", "2000-0"] and not early_receipts
+            and s1_messages == 8 and acked_later == 1 and (await analytics(manager, "s2"))[0] == 1
+            and archiver.deferred == 1 and archiver.abandoned == 1
+        )
+        print(f"new customer: {acked} of 3 acked, no receipt for the deferred event ({sorted(early_receipts)}); "
+              f"applied after the profile is stored ({acked_later} acked); event older than "
+              f"{archiver.defer_seconds}s dropped ({archiver.abandoned}): {deferred_ok}")
+        await manager.close()
+        database_module.db_manager = None
+    return ok and pruned and deferred_ok
+
+
+class MemoryEventLog:
+    """read_batch / ack over a fixed list of entries."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.acked = []
+
+    async def read_batch(self, group, consumer, count=100, block_ms=5000, claim_idle_ms=60000):
+        return list(self.entries)
+
+    async def ack(self, group, entry_ids):
+        self.acked += entry_ids
+        return len(entry_ids)
+
+
+class MemoryScriptRedis:
+    """register_script / pipeline over dicts of hashes; scripts run as the Python port of _ROLLUP_SCRIPT."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+        self.calls = 0
+
+    def register_script(self, script):
+        return _Script()
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    def rollup(self, key, args):
+        self.calls += 1
+        bucket = self.hashes.setdefault(key, {})
+        applied, i = 0, 1
+        while i < len(args):
+            fields = int(args[i + 1])
+            pairs = args[i + 2:i + 2 + 2 * fields]
+            if f"entry:{args[i]}" not in bucket:
+                bucket[f"entry:{args[i]}"] = 1
+                for field, amount in zip(pairs[::2], pairs[1::2]):
+                    bucket[field] = bucket.get(field, 0) + int(amount)
+                applied += 1
+            i += 2 + 2 * fields
+        self.ttls[key] = int(args[0])
+        return applied
+
+
+class _Script:
+    async def __call__(self, keys, args, client):
+        client.calls.append((keys, args))
+        return client
+
+
+class _Pipeline:
+    def __init__(self, client: MemoryScriptRedis):
+        self.client = client
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return [self.client.rollup(keys[0], args) for keys, args in self.calls]
+
+
+async def check_rollup() -> bool:
+    client = MemoryScriptRedis()
+    schema = RedisKeySchema("verify")
+    rollup = AnalyticsRollup(client, schema)
+
+    batch = [
+        ("1000-0", event("s1", "user", 0, language="en")),
+        ("1000-1", event("s1", "assistant", 1, latency_ms=2000, input_tokens=50)),
+        ("1001-0", {**event("s2", "assistant", 0, latency_ms=1000), "ts": "2026-10-19T14:05:00+00:00"}),
+    ]
+    await rollup(batch)
+    await rollup(batch[1:] + [("1002-0", event("s1", "user", 30))])
+    hour = client.hashes[schema.rollup("conversation_events", "2026-10-19T13")]
+    ok = (
+        client.calls == 4 and len(client.hashes) == 2
+        and hour["events"] == 3 and hour["role:user"] == 2 and hour["latency_ms_total"] == 2000
+        and hour["latency_samples"] == 1 and hour["input_tokens"] == 50
+        and rollup.applied == 4 and rollup.duplicates == 2
+    )
+    print(f"2 batches over 2 hourly buckets: {client.calls} script calls; 13:00 bucket "
+          f"{ {k: v for k, v in hour.items() if not k.startswith('entry:')} }; "
+          f"{rollup.applied} applied, {rollup.duplicates} duplicates: {ok}")
+    return ok
+
+
+async def main() -> int:
+    ok = await check_archiver()
+    ok &= await check_rollup()
+    print("\nConversation events OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
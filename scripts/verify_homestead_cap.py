@@ -0,0 +1,191 @@
+"""
+Check services.property_data.homestead_cap against the scalar reference and time it.
+
+Seeds a SQLite database with N parcels in two counties, each with up to twelve
+years of assessments: homestead years with gaps, missing years, missing
+market values, market values below the cap, and increases that stay under,
+land on and break the 10% cap. Then:
+
+1. runs ``compute_caps`` over the whole history and compares the cap, lawful
+   value, excess and violation flag of EVERY row with ``reference_caps`` on
+   that parcel's years (Decimal arithmetic);
+2. checks ``HomesteadCapEngine.report`` for one county-year against the
+   reference (counts, total excess, top violations in order);
+3. checks ``HomesteadCapEngine.lookup`` for a parcel with a violation and for
+   an unknown parcel.
+
+    python scripts/verify_homestead_cap.py
+    python scripts/verify_homestead_cap.py --parcels 500000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert
+
+from services.persistence.database import DatabaseManager, Property, PropertyType, TaxAssessment
+from services.property_data import homestead_cap
+
+COUNTIES = ["Harris", "Travis"]
+FIRST_YEAR, LAST_YEAR = 2015, 2026
+
+
+def history(rng: random.Random) -> list:
+    """One parcel's assessment rows (without property_id)."""
+    value = Decimal(f"{rng.lognormvariate(12.2, 0.5):.2f}")
+    homestead = rng.random() < 0.7
+    rows = []
+    for year in range(rng.randint(FIRST_YEAR, LAST_YEAR - 2), LAST_YEAR + 1):
+        if rng.random() < 0.05:
+            continue  # a year missing from the roll
+        if rng.random() < 0.08:
+            homestead = not homestead  # sale, move-in or a dropped exemption
+        step = rng.random()
+        if step < 0.15:
+            value = (value * Decimal("1.1")).quantize(Decimal("0.01"))  # exactly at the cap
+        elif step < 0.25:
+            value = (value * Decimal(f"{rng.uniform(1.12, 1.5):.4f}")).quantize(Decimal("0.01"))
+        else:
+            value = (value * Decimal(f"{rng.uniform(0.95, 1.09):.4f}")).quantize(Decimal("0.01"))
+        market = None if rng.random() < 0.05 else (value * Decimal(f"{rng.uniform(0.9, 1.3):.4f}")).quantize(Decimal("0.01"))
+        rows.append({
+            "assessment_year": year,
+            "total_assessed_value": value,
+            "market_value": market,
+            "exemptions_applied": {"codes": ["HS", "OV65"] if homestead and rng.random() < 0.2 else ["HS"]}
+            if homestead else ({"codes": ["AG"]} if rng.random() < 0.5 else None),
+        })
+    return rows
+
+
+async def seed(manager: DatabaseManager, count: int) -> dict:
+    """Seeds parcels and returns property_id -> rows in year order."""
+    rng = random.Random(46)
+    histories = {}
+    async with manager.begin_write() as conn:
+        for start in range(1, count + 1, 10_000):
+            properties, assessments = [], []
+            for i in range(start, min(start + 10_000, count + 1)):
+                properties.append({
+                    "id": i, "parcel_id": f"R{i:07d}", "street_address": f"{i} OAK DR", "city": "AUSTIN",
+                    "zip_code": "78701", "county": COUNTIES[i % len(COUNTIES)],
+                    "property_type": PropertyType.RESIDENTIAL, "is_active": True,
+                })
+                rows = history(rng)
+                histories[i] = rows
+                for row in rows:
+                    assessments.append({
+                        **row, "property_id": i, "assessment_date": date(row["assessment_year"], 1, 1),
+                        "effective_date": date(row["assessment_year"], 1, 1), "land_value": 0,
+                        "tax_rate": Decimal("2.1"), "base_tax_amount": 0, "final_tax_amount": 0, "due_dates": [],
+                    })
+            await conn.execute(insert(Property), properties)
+            await conn.execute(insert(TaxAssessment), assessments)
+    return histories
+
+
+def reference(histories: dict) -> dict:
+    """(property_id, year) -> reference row."""
+    expected = {}
+    for property_id, rows in histories.items():
+        inputs = [{
+            "assessment_year": row["assessment_year"],
+            "total_assessed_value": row["total_assessed_value"],
+            "market_value": row["market_value"],
+            "homestead": bool(row["exemptions_applied"] and "HS" in row["exemptions_applied"]["codes"]),
+        } for row in rows]
+        for result in homestead_cap.reference_caps(inputs):
+            expected[(property_id, result["assessment_year"])] = result
+    return expected
+
+
+def _cents(value) -> int:
+    return -1 if value is None else int(value * 100)
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'caps.db')}", replica_urls=[])
+        await manager.create_tables()
+        started = time.perf_counter()
+        histories = await seed(manager, args.parcels)
+        print(f"seeded {args.parcels} parcels in {time.perf_counter() - started:.1f}s")
+        expected = reference(histories)
+
+        # 1. Every row of the full history
+        async with manager.engine.connect() as conn:
+            started = time.perf_counter()
+            series = await homestead_cap.load_series(conn)
+            loaded = time.perf_counter()
+        caps = homestead_cap.compute_caps(series)
+        computed = time.perf_counter()
+        print(f"full history: {len(series)} rows, load {loaded - started:.2f}s, compute {computed - loaded:.3f}s")
+
+        mismatches = 0
+        for i in range(len(series)):
+            want = expected[(int(series.property_id[i]), int(series.year[i]))]
+            got = (int(caps["cap_value"][i]), int(caps["lawful_value"][i]), int(caps["excess"][i]), bool(caps["violation"][i]))
+            if got != (_cents(want["cap_value"]), _cents(want["lawful_value"]), _cents(want["excess"]), want["violation"]):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  mismatch property {series.property_id[i]} {series.year[i]}: {got} vs {want}")
+        rows_ok = len(series) == len(expected)
+        capped = int(caps["capped"].sum())
+        violations = int(caps["violation"].sum())
+        print(f"compared {len(series)} rows ({capped} capped, {violations} violations): "
+              f"{mismatches} mismatches; row count as expected: {rows_ok}")
+
+        # 2. County-year report
+        engine = homestead_cap.HomesteadCapEngine(manager)
+        county, year = COUNTIES[0], LAST_YEAR
+        report = await engine.report(county, year, limit=10)
+        in_county = [(pid, row) for (pid, y), row in expected.items()
+                     if y == year and COUNTIES[pid % len(COUNTIES)] == county]
+        flagged = sorted(((row["excess"], pid) for pid, row in in_county if row["violation"]), key=lambda t: -t[0])
+        top = [pid for _, pid in flagged[:10]]
+        report_ok = (
+            report["assessments"] == len(in_county)
+            and report["capped"] == sum(row["cap_value"] is not None for _, row in in_county)
+            and report["violations"] == len(flagged)
+            and Decimal(report["total_excess"]) == sum((excess for excess, _ in flagged), Decimal(0))
+            and [v["property_id"] for v in report["top_violations"]] == top
+            and all(v["parcel_id"] == f"R{v['property_id']:07d}" for v in report["top_violations"])
+        )
+        print(f"report {county} {year}: {report['violations']} violations, total excess ${report['total_excess']} "
+              f"(load {report['load_seconds']}s, compute {report['compute_seconds']}s): matches reference: {report_ok}")
+
+        # 3. Parcel lookup
+        pid = top[0] if top else next(iter(histories))
+        started = time.perf_counter()
+        parcel = await engine.lookup(f"R{pid:07d}")
+        elapsed = (time.perf_counter() - started) * 1000
+        want = [expected[(pid, row["assessment_year"])] for row in histories[pid]]
+        lookup_ok = (
+            parcel is not None and len(parcel["years"]) == len(want)
+            and parcel["violation_years"] == [row["assessment_year"] for row in want if row["violation"]]
+            and all(got["cap_value"] == (None if row["cap_value"] is None else str(row["cap_value"]))
+                    for got, row in zip(parcel["years"], want))
+            and await engine.lookup("NO-SUCH-PARCEL") is None
+        )
+        print(f"lookup R{pid:07d} in {elapsed:.1f} ms, violation years {parcel and parcel['violation_years']}: "
+              f"matches reference: {lookup_ok}")
+        await manager.close()
+
+    ok = mismatches == 0 and rows_ok and report_ok and lookup_ok
+    print("\nHomestead cap OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Homestead cap verification and timing")
+    parser.add_argument("--parcels", type=int, default=50_000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,175 @@
+"""
+Check failure handling in services.persistence.message_writer.BufferedMessageWriter.
+
+Writes MessageHistory rows to a throwaway SQLite database, with rows the
+database rejects (NULL message_text) and simulated outages (the insert
+raising OperationalError, as a dropped connection does), and checks that:
+
+1. a batch with bad rows writes every good row, in few transactions, and
+   dead-letters exactly the bad rows;
+2. a batch failing transiently is retried with its attempt count, while rows
+   buffered meanwhile wait, and is written once the database recovers;
+3. a batch out of retries is dead-lettered and later batches still go through;
+4. an outage while bad rows are being isolated retries only the rows not yet
+   written, so no row is written twice;
+5. rows still failing when the writer stops are dead-lettered, not lost.
+
+    python scripts/verify_message_writer.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+
+from services.persistence import database as database_module
+from services.persistence.database import CustomerProfile, DatabaseManager, MessageHistory
+from services.persistence.message_writer import BufferedMessageWriter
+
+
+def rows(customer_id: int, count: int, bad=()) -> list:
+    return [
+        {
+            "customer_id": customer_id,
+            "thread_id": "verify",
+            "message_type": "user",
+            "message_text": None if i in bad else f"message {i}",
+        }
+        for i in range(count)
+    ]
+
+
+class Outage:
+    """Wraps a writer's insert: fails transiently while ``down``, after ``after`` successful inserts."""
+
+    def __init__(self, writer: BufferedMessageWriter, after: int = 0):
+        self.insert = writer._insert
+        self.after = after
+        self.down = True
+        self.inserts = 0
+        writer._insert = self
+
+    async def __call__(self, batch):
+        if self.down and self.inserts >= self.after:
+            raise OperationalError("INSERT INTO message_history ...", {}, Exception("server closed the connection"))
+        self.inserts += 1
+        return await self.insert(batch)
+
+
+async def stored(manager: DatabaseManager) -> list:
+    async with manager.engine.connect() as conn:
+        return (await conn.scalars(select(MessageHistory.message_text).order_by(MessageHistory.id))).all()
+
+
+async def reset(manager: DatabaseManager, dead_letter_path: str) -> None:
+    async with manager.begin_write() as conn:
+        await conn.execute(delete(MessageHistory.__table__))
+    if os.path.exists(dead_letter_path):
+        os.remove(dead_letter_path)
+
+
+def dead_letters(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+async def main() -> int:
+    ok = True
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'writer.db')}", replica_urls=[])
+        await manager.create_tables()
+        database_module.db_manager = manager
+        async with manager.get_session() as session:
+            customer = CustomerProfile(whatsapp_id="wa-verify")
+            session.add(customer)
+            await session.commit()
+            customer_id = customer.id
+        path = os.path.join(tmpdir, "dead", "messages.jsonl")
+
+        # 1. Bad rows are isolated
+        writer = BufferedMessageWriter(dead_letter_path=path)
+        await writer.write(rows(customer_id, 200, bad={7, 8, 150}))
+        texts, rejected = await stored(manager), dead_letters(path)
+        isolated = (
+            len(texts) == 197 and None not in texts and texts == sorted(texts, key=lambda t: int(t.split()[1]))
+            and [int(r["row"]["customer_id"]) for r in rejected] == [customer_id] * 3
+            and writer.rejected_rows == 3 and writer.flushes + writer.failed_flushes < 40
+        )
+        print(f"200 rows, 3 rejected: {len(texts)} written in order, {len(rejected)} dead-lettered, "
+              f"{writer.flushes + writer.failed_flushes} transactions: {isolated}")
+        ok &= isolated
+
+        # 2. Transient failures are retried
+        await reset(manager, path)
+        writer = BufferedMessageWriter(max_retries=3, dead_letter_path=path)
+        outage = Outage(writer)
+        await writer.write(rows(customer_id, 50))
+        await writer.write(rows(customer_id, 10))
+        attempts = writer.get_stats()["retry_attempts"]
+        waiting = (writer.get_stats()["retrying_rows"], writer.get_stats()["buffered_rows"])
+        outage.down = False
+        await writer.flush()
+        retried = (
+            attempts == 2 and waiting == (50, 10) and len(await stored(manager)) == 60
+            and not dead_letters(path) and writer.get_stats()["retrying_rows"] == 0
+        )
+        print(f"outage: attempt {attempts}/3 with {waiting[0]} rows retrying, {waiting[1]} buffered; "
+              f"after recovery {len(await stored(manager))} written, none dead-lettered: {retried}")
+        ok &= retried
+
+        # 3. Retries are capped
+        await reset(manager, path)
+        writer = BufferedMessageWriter(max_retries=2, dead_letter_path=path)
+        outage = Outage(writer)
+        for _ in range(3):
+            await writer.write(rows(customer_id, 20))
+        abandoned = len(dead_letters(path))
+        outage.down = False
+        await writer.flush()
+        capped = abandoned == 20 and writer.dead_lettered_rows == 20 and len(await stored(manager)) == 40
+        print(f"permanent outage, 2 retries: {abandoned} rows dead-lettered after 3 attempts; "
+              f"{len(await stored(manager))} later rows written after recovery: {capped}")
+        ok &= capped
+
+        # 4. Outage while isolating bad rows
+        await reset(manager, path)
+        writer = BufferedMessageWriter(dead_letter_path=path)
+        outage = Outage(writer, after=4)
+        await writer.write(rows(customer_id, 64, bad={40, 41}))
+        before = len(await stored(manager))
+        outage.down = False
+        await writer.flush()
+        texts = await stored(manager)
+        resumed = 0 < before < 62 and len(texts) == 62 == len(set(texts)) and len(dead_letters(path)) == 2
+        print(f"outage during isolation after {before} rows: {len(texts)} rows written ({len(set(texts))} distinct), "
+              f"{len(dead_letters(path))} dead-lettered: {resumed}")
+        ok &= resumed
+
+        # 5. Stop while failing
+        await reset(manager, path)
+        writer = BufferedMessageWriter(dead_letter_path=path)
+        Outage(writer)
+        writer.start()
+        await writer.write(rows(customer_id, 5))
+        await writer.stop()
+        kept = len(dead_letters(path)) == 5 and writer.get_stats()["retrying_rows"] == 0
+        print(f"stopped during an outage: {len(dead_letters(path))} rows dead-lettered: {kept}")
+        ok &= kept
+
+        await manager.close()
+        database_module.db_manager = None
+
+    print("\nMessage writer OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
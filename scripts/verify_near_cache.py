@@ -0,0 +1,182 @@
+"""
+Check near cache coherence in services.persistence.near_cache and the Redis conversation store.
+
+Runs without a Redis server: the store talks to a small in-memory client
+that can be switched off to simulate an outage.
+
+1. a read that raced an invalidation of its own session is not cached, while
+   invalidations of other sessions (or of sessions pushed out of the
+   bounded invalidation log) do not block unrelated reads;
+2. with Redis down (breaker open), context, message and clear writes buffered
+   in the local fallback invalidate this worker's cached reads, so the next
+   read returns the buffered write instead of the pre-outage value;
+3. after recovery the buffered writes are replayed and reads match Redis.
+
+    python scripts/verify_near_cache.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import redis
+
+from services.persistence.circuit_breaker import CircuitBreaker, CircuitState, LocalFallbackStore
+from services.persistence.near_cache import _MISSING, NearCache
+from services.persistence.redis_conversation_store import RedisConversationStore
+from services.persistence.redis_keys import RedisKeySchema
+
+
+class _Listener:
+    def is_alive(self) -> bool:
+        return True
+
+    def stop(self) -> None:
+        pass
+
+
+class _PubSub:
+    def subscribe(self, **handlers) -> None:
+        pass
+
+    def run_in_thread(self, **kwargs) -> _Listener:
+        return _Listener()
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryRedis:
+    """The few redis-py calls the conversation store makes, kept in dicts; ``up = False`` fails them all."""
+
+    def __init__(self):
+        self.up = True
+        self.values = {}
+        self.lists = {}
+
+    def _check(self) -> None:
+        if not self.up:
+            raise redis.ConnectionError("simulated outage")
+
+    def ping(self) -> bool:
+        self._check()
+        return True
+
+    def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self._check()
+        self.values[key] = value
+
+    def lpush(self, key, value):
+        self._check()
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def lrange(self, key, start, end):
+        self._check()
+        return list(self.lists.get(key, [])[start:end + 1])
+
+    def delete(self, *keys):
+        self._check()
+        return sum((self.values.pop(key, None) is not None) + (self.lists.pop(key, None) is not None) for key in keys)
+
+    def expire(self, key, seconds):
+        self._check()
+
+    def publish(self, channel, message):
+        self._check()
+
+    def pubsub(self, **kwargs) -> _PubSub:
+        return _PubSub()
+
+    def pipeline(self, transaction=True) -> "_Pipeline":
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, client: MemoryRedis):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        self.client._check()
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+def check_epochs() -> bool:
+    cache = NearCache(max_entries=4, ttl_seconds=60)
+    epoch = cache.epoch()
+    cache.invalidate("b")
+    cache.set("a", "context", "A", epoch=epoch)
+    cache.set("b", "context", "stale B", epoch=epoch)
+    other_session_ok = cache.get("a", "context") == "A"
+    own_session_ok = cache.get("b", "context") is _MISSING
+
+    epoch = cache.epoch()
+    for session in ("c", "d", "e", "f", "g"):  # pushes "b" and "c" out of the invalidation log
+        cache.invalidate(session)
+    cache.set("c", "context", "stale C", epoch=epoch)
+    bounded_ok = cache.get("c", "context") is _MISSING and len(cache._invalidated_at) == 4
+
+    epoch = cache.epoch()
+    cache.clear()
+    cache.set("a", "context", "stale A", epoch=epoch)
+    clear_ok = cache.get("a", "context") is _MISSING
+
+    print(f"write to another session keeps a racing read cacheable: {other_session_ok}; "
+          f"own session rejects it: {own_session_ok}; pruned invalidation log still rejects: {bounded_ok}; "
+          f"full flush rejects: {clear_ok}")
+    return other_session_ok and own_session_ok and bounded_ok and clear_ok
+
+
+def check_degraded_writes() -> bool:
+    client = MemoryRedis()
+    store = RedisConversationStore(
+        "redis://unused", near_cache=NearCache(ttl_seconds=60), redis_client=client,
+        circuit_breaker=CircuitBreaker("verify", consecutive_failure_threshold=1, recovery_timeout=60),
+        fallback_store=LocalFallbackStore(), key_schema=RedisKeySchema(prefix="verify"),
+    )
+    store.save_context("s1", {"step": 1})
+    store.save_message("s1", "user", "hello")
+    before = (store.get_context("s1")["step"], [m["content"] for m in store.get_conversation_history("s1")])
+    cached = store.near_cache.get_stats()["entries"] == 2
+
+    client.up = False
+    store.breaker.record_failure(redis.ConnectionError("simulated outage"))
+    degraded = store.breaker.state == CircuitState.OPEN
+    store.save_context("s1", {"step": 2})
+    store.save_message("s1", "assistant", "hi there")
+    during = (store.get_context("s1")["step"], [m["content"] for m in store.get_conversation_history("s1")])
+    store.clear_conversation("s1")
+    after_clear = (store.get_context("s1"), store.get_conversation_history("s1"))
+    store.save_context("s1", {"step": 3})
+
+    client.up = True
+    store.breaker = CircuitBreaker("verify")
+    recovered = store.get_context("s1").get("step")
+    replayed = store.fallback.replayed_writes
+
+    ok = (
+        cached and degraded and before == (1, ["hello"]) and during == (2, ["hello", "hi there"])
+        and after_clear == ({}, []) and recovered == 3 and replayed == 4
+    )
+    print(f"before outage {before}; buffered during outage {during}; after local clear {after_clear}; "
+          f"after recovery step {recovered} ({replayed} writes replayed): {ok}")
+    return ok
+
+
+def main() -> int:
+    ok = check_epochs()
+    ok &= check_degraded_writes()
+    print("\nNear cache OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Check services.property_data.owner_portfolio against totals computed from scratch.
+
+Loads synthetic appraisal rolls (scripts/benchmark_roll_import.py) into a
+SQLite database with the importer, whose hook keeps owner totals current by
+deltas, and after each step compares every owner's stored
+total_properties_owned / total_assessed_value / total_annual_tax with a
+brute-force pass over open links and latest assessments:
+
+1. first load; a full rebuild afterwards must find nothing to write;
+2. next year's roll (10% of values and 2% of owners changed);
+3. a backfill of an older year (latest assessments unchanged, owners switch back);
+4. drift repair: corrupted owner totals and link contributions, then rebuild;
+5. re-pricing outside an import (tax engine run; rate stack units assigned,
+   rates adopted and changed, combos re-priced), kept current by the re-price hook;
+6. single-row portfolio lookups (own and resolved spellings, and the
+   repository method) timed against the on-demand join.
+
+    python scripts/verify_owner_portfolio.py
+    python scripts/verify_owner_portfolio.py --parcels 200000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sqlalchemy import and_, func, select, update
+
+from benchmark_roll_import import write_roll
+from services.persistence.database import (
+    DatabaseManager, Property, PropertyOwner, TaxAssessment, property_ownership,
+)
+from services.persistence.repositories import PropertyOwnerRepository
+from services.property_data import importer as importer_module
+from services.property_data.importer import RollImporter
+from services.property_data.owner_portfolio import OwnerPortfolio, portfolio, update_owner_portfolios
+from services.property_data.rate_stack import RateStack
+from services.property_data.tax_engine import TaxEngine
+
+ZERO = Decimal("0.00")
+_link = property_ownership.c
+_owner = PropertyOwner.__table__.c
+_assessment = TaxAssessment.__table__.c
+
+
+async def expected_totals(manager: DatabaseManager) -> dict:
+    """owner_id -> (properties, assessed value, annual tax) from open links and latest assessments."""
+    async with manager.engine.connect() as conn:
+        latest = {}
+        for property_id, year, value, tax in await conn.execute(select(
+            _assessment.property_id, _assessment.assessment_year,
+            _assessment.total_assessed_value, _assessment.final_tax_amount,
+        )):
+            if property_id not in latest or year > latest[property_id][0]:
+                latest[property_id] = (year, value, tax)
+        totals = defaultdict(lambda: [0, ZERO, ZERO])
+        for owner_id, property_id in await conn.execute(
+            select(_link.owner_id, _link.property_id).where(_link.end_date.is_(None))
+        ):
+            _, value, tax = latest.get(property_id, (None, ZERO, ZERO))
+            total = totals[owner_id]
+            total[0] += 1
+            total[1] += value
+            total[2] += tax
+    return {owner_id: tuple(total) for owner_id, total in totals.items()}
+
+
+async def mismatches(manager: DatabaseManager) -> int:
+    expected = await expected_totals(manager)
+    async with manager.engine.connect() as conn:
+        stored = (await conn.execute(select(
+            _owner.id, _owner.total_properties_owned, _owner.total_assessed_value, _owner.total_annual_tax,
+        ))).all()
+    return sum(tuple(row[1:]) != expected.get(row[0], (0, ZERO, ZERO)) for row in stored)
+
+
+async def check(manager: DatabaseManager, label: str) -> bool:
+    """Totals match brute force, and a rebuild has nothing to write."""
+    wrong = await mismatches(manager)
+    stats = await OwnerPortfolio(manager).rebuild()
+    print(f"{label}: {wrong} owners differ from brute force; rebuild wrote {stats['links_updated']} links, "
+          f"{stats['owners_updated']} owners in {stats['elapsed_seconds']}s")
+    return wrong == 0 and stats["links_updated"] == 0 and stats["owners_updated"] == 0
+
+
+async def repair(manager: DatabaseManager, label: str) -> bool:
+    """Totals are wrong, and a rebuild makes them match brute force."""
+    wrong = await mismatches(manager)
+    stats = await OwnerPortfolio(manager).rebuild()
+    left = await mismatches(manager)
+    print(f"{label}: {wrong} owners differ from brute force; rebuild wrote {stats['links_updated']} links, "
+          f"{stats['owners_updated']} owners in {stats['elapsed_seconds']}s; {left} differ afterwards")
+    return wrong > 0 and left == 0
+
+
+async def main(args: argparse.Namespace) -> int:
+    # Only the per-chunk hooks are under test; load hooks would build search indexes in the data directory
+    importer_module._load_hooks.clear()
+    hook_seconds = [0.0]
+    position = importer_module._import_hooks.index(update_owner_portfolios)
+
+    async def timed_hook(conn, batch):
+        started = time.perf_counter()
+        await update_owner_portfolios(conn, batch)
+        hook_seconds[0] += time.perf_counter() - started
+
+    importer_module._import_hooks[position] = timed_hook
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rolls = {year: os.path.join(tmpdir, f"roll_{year}.csv") for year in (2024, 2025, 2026)}
+        write_roll(rolls[2025], args.parcels, seed=1)
+        write_roll(rolls[2026], args.parcels, seed=1, changed=0.10, new_owners=0.02)
+        write_roll(rolls[2024], args.parcels, seed=2)
+
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'portfolio.db')}", replica_urls=[])
+        await manager.create_tables()
+        ok = True
+
+        # 1-3. Imports maintain the totals by deltas
+        for label, year in (("first load", 2025), ("next year", 2026), ("older-year backfill", 2024)):
+            hook_seconds[0] = 0.0
+            stats = await RollImporter(manager, "Harris", year, chunk_size=args.chunk_size).import_file(rolls[year])
+            print(f"{label} ({year}): {stats['elapsed_seconds']}s, of which the portfolio hook {hook_seconds[0]:.2f}s "
+                  f"({stats['links_added']} links added, {stats['links_ended']} ended)")
+            ok &= await check(manager, f"  after {label}")
+
+        # 4. Drift repair
+        rng = random.Random(50)
+        async with manager.engine.connect() as conn:
+            owner_ids = (await conn.scalars(select(_owner.id))).all()
+            link_ids = (await conn.scalars(select(_link.id).where(_link.end_date.is_(None)))).all()
+        async with manager.begin_write() as conn:
+            await conn.execute(
+                update(PropertyOwner.__table__).where(_owner.id.in_(rng.sample(owner_ids, 100)))
+                .values(total_properties_owned=_owner.total_properties_owned + 7, total_annual_tax=1)
+            )
+            await conn.execute(
+                update(property_ownership).where(_link.id.in_(rng.sample(link_ids, 100)))
+                .values(portfolio_assessed_value=None)
+            )
+        ok &= await repair(manager, "drift repair")
+        ok &= await check(manager, "  rebuild again")
+
+        # 5. Re-pricing outside an import
+        async with manager.begin_write() as conn:
+            await conn.execute(
+                update(TaxAssessment.__table__).where(_assessment.assessment_year == 2026).values(tax_rate=Decimal("2.3"))
+            )
+        stats = await TaxEngine(manager).run("Harris", 2026)
+        ok &= await check(manager, f"re-priced by the tax engine ({stats['updated']} assessments)")
+
+        stack = RateStack(manager)
+        await stack.load_units([
+            {"code": code, "name": code, "unit_type": unit_type}
+            for code, unit_type in (("CNTY", "county"), ("ISD1", "school_district"), ("ISD2", "school_district"))
+        ])
+        async with manager.engine.connect() as conn:
+            parcel_ids = (await conn.scalars(select(Property.parcel_id).order_by(Property.id))).all()
+        await stack.assign_units("Harris", {
+            parcel_id: ["CNTY", "ISD1" if i % 2 else "ISD2"] for i, parcel_id in enumerate(parcel_ids[::3])
+        })
+        stats = await stack.set_rates(2026, {"CNTY": "0.35", "ISD1": "1.10", "ISD2": "1.25"})
+        ok &= await check(manager, f"rate stack rates adopted ({stats['assessments_updated']} assessments)")
+        stats = await stack.set_rates(2026, {"ISD2": "1.05"})
+        ok &= await check(manager, f"  one unit's rate changed ({stats['assessments_updated']} assessments)")
+        await stack.assign_units("Harris", {parcel_id: ["CNTY", "ISD1"] for parcel_id in parcel_ids[1::3]})
+        ok &= await check(manager, "  more parcels assigned units")
+
+        # 6. Lookups
+        async with manager.engine.connect() as conn:
+            portfolio_owners = (await conn.scalars(
+                select(_owner.id).where(_owner.total_properties_owned > 1).order_by(_owner.id).limit(2)
+            )).all()
+        canonical, spelling = portfolio_owners
+        async with manager.begin_write() as conn:
+            await conn.execute(
+                update(PropertyOwner.__table__).where(_owner.id.in_(portfolio_owners)).values(resolved_owner_id=canonical)
+            )
+        expected = await expected_totals(manager)
+        async with manager.engine.connect() as conn:
+            own = await portfolio(conn, spelling)
+            merged = await portfolio(conn, spelling, resolved=True)
+        async with manager.get_session() as session:
+            from_repository = await PropertyOwnerRepository(session).get_portfolio(spelling)
+        want = [sum(values) for values in zip(expected[canonical], expected[spelling])]
+        lookups_ok = (
+            (own["total_properties_owned"], own["total_assessed_value"], own["total_annual_tax"]) == expected[spelling]
+            and merged["owner_id"] == canonical and merged["spellings"] == 2
+            and [merged["total_properties_owned"], merged["total_assessed_value"], merged["total_annual_tax"]] == want
+            and from_repository == merged
+        )
+        print(f"resolved portfolio of owners {canonical} + {spelling}: {merged['total_properties_owned']} properties, "
+              f"${merged['total_assessed_value']} assessed; matches brute force and repository: {lookups_ok}")
+        ok &= lookups_ok
+
+        latest = (
+            select(_assessment.property_id, func.max(_assessment.assessment_year).label("year"))
+            .group_by(_assessment.property_id).subquery()
+        )
+        on_demand = (
+            select(func.count(), func.sum(_assessment.total_assessed_value), func.sum(_assessment.final_tax_amount))
+            .select_from(property_ownership)
+            .join(latest, latest.c.property_id == _link.property_id)
+            .join(TaxAssessment.__table__, and_(
+                _assessment.property_id == latest.c.property_id, _assessment.assessment_year == latest.c.year,
+            ))
+        )
+        stored_times, join_times = [], []
+        async with manager.engine.connect() as conn:
+            for owner_id in rng.sample(owner_ids, 200):
+                started = time.perf_counter()
+                await portfolio(conn, owner_id)
+                stored_times.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                await conn.execute(on_demand.where(_link.owner_id == owner_id, _link.end_date.is_(None)))
+                join_times.append(time.perf_counter() - started)
+        print(f"200 owner lookups: stored totals p50 {np.percentile(stored_times, 50) * 1000:.2f} ms, "
+              f"on-demand join p50 {np.percentile(join_times, 50) * 1000:.2f} ms")
+        await manager.close()
+
+    print("\nOwner portfolio OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Owner portfolio totals verification and timing")
+    parser.add_argument("--parcels", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
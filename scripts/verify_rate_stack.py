@@ -0,0 +1,213 @@
+"""
+Check services.property_data.rate_stack against per-parcel Decimal arithmetic and time it.
+
+Seeds a SQLite database with N parcels in two counties, each in its county,
+a school district, usually a city and zero to two special districts, with a
+non-final assessment for the current year and a certified (final) one for
+the year before. Then:
+
+1. compiles both counties and checks the combos: one per distinct unit set,
+   every parcel pointing at the combo of exactly its units;
+2. adopts rates for every unit and checks EVERY current-year assessment:
+   its tax_rate is the sum of its units' rates and its taxes equal
+   ``reference_tax`` at that rate; final assessments are untouched;
+3. changes one special district's rate and checks that only the combos
+   containing it were recomputed and only their parcels re-priced;
+4. moves a few parcels into a new district and checks that only they were
+   reassigned, to a new combo, and re-priced.
+
+    python scripts/verify_rate_stack.py
+    python scripts/verify_rate_stack.py --parcels 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, insert, select
+
+from services.persistence.database import (
+    DatabaseManager, Property, PropertyType, TaxAssessment, TaxRateCombo, TaxUnit, property_tax_units,
+)
+from services.property_data.rate_stack import RateStack, combo_key
+from services.property_data.tax_engine import reference_tax
+
+COUNTIES = ["Harris", "Fort Bend"]
+YEAR = 2026
+ROLL_RATE = Decimal("2.000000")
+
+
+def units() -> list:
+    rows = [{"code": f"CNTY-{county}", "name": f"{county} County", "unit_type": "county", "county": county}
+            for county in COUNTIES]
+    rows += [{"code": f"ISD{i}", "name": f"ISD {i}", "unit_type": "school_district"} for i in range(12)]
+    rows += [{"code": f"CITY{i}", "name": f"City {i}", "unit_type": "city"} for i in range(20)]
+    rows += [{"code": f"MUD{i}", "name": f"MUD {i}", "unit_type": "special_district"} for i in range(60)]
+    return rows
+
+
+def membership(rng: random.Random, i: int) -> list:
+    region = rng.randrange(12)
+    codes = [f"CNTY-{COUNTIES[i % len(COUNTIES)]}", f"ISD{region}"]
+    if rng.random() < 0.8:
+        codes.append(f"CITY{region + rng.randrange(8)}")
+    # Special districts overlap within a region
+    codes += [f"MUD{region * 5 + rng.randrange(5)}" for _ in range(rng.choice([0, 0, 1, 1, 2]))]
+    return codes
+
+
+async def seed(manager: DatabaseManager, stack: RateStack, count: int) -> dict:
+    rng = random.Random(47)
+    await stack.load_units(units())
+    members = {}
+    async with manager.begin_write() as conn:
+        for start in range(1, count + 1, 20_000):
+            properties, assessments = [], []
+            for i in range(start, min(start + 20_000, count + 1)):
+                properties.append({
+                    "id": i, "parcel_id": f"P{i}", "street_address": f"{i} MAIN ST", "city": "HOUSTON",
+                    "zip_code": "77002", "county": COUNTIES[i % len(COUNTIES)],
+                    "property_type": PropertyType.RESIDENTIAL, "is_active": True,
+                })
+                if rng.random() < 0.97:  # a few parcels have no units on file
+                    members[f"P{i}"] = membership(rng, i)
+                value = Decimal(f"{rng.lognormvariate(12.3, 0.6):.2f}")
+                exemption = Decimal("100000.00") if rng.random() < 0.5 else Decimal(0)
+                special = {"items": [{"name": "Sidewalk", "amount": "75.00"}]} if rng.random() < 0.05 else None
+                for year, final in ((YEAR - 1, True), (YEAR, False)):
+                    base, final_tax = reference_tax(value, ROLL_RATE, "per_100", exemption, special)
+                    assessments.append({
+                        "property_id": i, "assessment_year": year, "assessment_date": date(year, 1, 1),
+                        "effective_date": date(year, 1, 1), "land_value": 0, "total_assessed_value": value,
+                        "total_exemption_amount": exemption, "tax_rate": ROLL_RATE, "tax_rate_type": "per_100",
+                        "base_tax_amount": base, "final_tax_amount": final_tax, "is_final": final, "due_dates": [],
+                        "special_assessments": special,
+                    })
+            await conn.execute(insert(Property), properties)
+            await conn.execute(insert(TaxAssessment), assessments)
+    return members
+
+
+def adopted_rates(rng: random.Random) -> dict:
+    return {row["code"]: Decimal(f"{rng.uniform(0.05, 1.2):.6f}") for row in units()}
+
+
+async def check_assessments(manager: DatabaseManager, members: dict, rates: dict) -> tuple:
+    """(mismatches, final rows touched) over every assessment."""
+    mismatches = touched = 0
+    async with manager.engine.connect() as conn:
+        rows = await conn.execute(
+            select(Property.parcel_id, TaxAssessment.is_final, TaxAssessment.total_assessed_value,
+                   TaxAssessment.tax_rate, TaxAssessment.tax_rate_type, TaxAssessment.total_exemption_amount,
+                   TaxAssessment.special_assessments, TaxAssessment.base_tax_amount, TaxAssessment.final_tax_amount)
+            .join(Property, Property.id == TaxAssessment.property_id)
+        )
+        for parcel_id, final, value, rate, rate_type, exemption, special, base, final_tax in rows:
+            codes = members.get(parcel_id)
+            expected_rate = sum((rates[code] for code in set(codes)), Decimal(0)) if codes and not final else ROLL_RATE
+            expected = reference_tax(value, expected_rate, "per_100", exemption, special)
+            if Decimal(rate) != expected_rate or (base, final_tax) != expected:
+                if final:
+                    touched += 1
+                else:
+                    mismatches += 1
+                    if mismatches <= 5:
+                        print(f"  mismatch {parcel_id}: rate {rate} taxes {base}/{final_tax}, "
+                              f"expected {expected_rate} {expected}")
+    return mismatches, touched
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'stacks.db')}", replica_urls=[])
+        await manager.create_tables()
+        stack = RateStack(manager)
+        started = time.perf_counter()
+        members = await seed(manager, stack, args.parcels)
+        print(f"seeded {args.parcels} parcels in {time.perf_counter() - started:.1f}s")
+
+        # 1. Compile
+        for county in COUNTIES:
+            county_members = {p: codes for p, codes in members.items() if int(p[1:]) % len(COUNTIES) == COUNTIES.index(county)}
+            stats = await stack.assign_units(county, county_members)
+            print(f"{county}: {stats['parcels_with_units']} parcels -> {stats['combos']} combos "
+                  f"in {stats['elapsed_seconds']}s")
+        async with manager.engine.connect() as conn:
+            unit_ids = dict((await conn.execute(select(TaxUnit.code, TaxUnit.id))).all())
+            combos = dict((await conn.execute(select(TaxRateCombo.id, TaxRateCombo.unit_key))).all())
+            assigned = dict((await conn.execute(select(Property.parcel_id, Property.tax_combo_id))).all())
+        distinct = {combo_key(unit_ids[code] for code in codes) for codes in members.values()}
+        compile_ok = set(combos.values()) == distinct and all(
+            (combos.get(assigned[p]) if assigned[p] else None)
+            == (combo_key(unit_ids[code] for code in members[p]) if p in members else None)
+            for p in assigned
+        )
+        print(f"combos: {len(combos)} for {len(members)} parcels; one per unit set, parcels on their own set: {compile_ok}")
+
+        # 2. Adopt rates
+        rng = random.Random(7)
+        rates = adopted_rates(rng)
+        stats = await stack.set_rates(YEAR, rates)
+        print(f"adopted {stats['units']} rates: {stats['repriced_combos']} combos, "
+              f"{stats['assessments_updated']} assessments re-priced in {stats['elapsed_seconds']}s")
+        mismatches, touched = await check_assessments(manager, members, rates)
+        price_ok = mismatches == 0 and touched == 0
+        print(f"every assessment against the unit-rate sum: {mismatches} mismatches, {touched} final rows touched")
+
+        started = time.perf_counter()
+        full = await stack.price(YEAR)
+        print(f"full re-price (gather x multiply): {full['priced']} assessments, {full['updated']} changed, "
+              f"{time.perf_counter() - started:.2f}s")
+        price_ok = price_ok and full["updated"] == 0 and full["repriced_combos"] == 0
+
+        # 3. One district's rate changes
+        mud = "MUD7"
+        rates[mud] += Decimal("0.031250")
+        containing = {key for key in combos.values() if str(unit_ids[mud]) in key.split("-")}
+        parcels_in = sum(1 for codes in members.values() if mud in codes)
+        stats = await stack.set_rates(YEAR, rates)
+        mismatches, touched = await check_assessments(manager, members, rates)
+        change_ok = (
+            stats["changed_units"] == 1 and stats["repriced_combos"] == len(containing)
+            and stats["assessments_updated"] == parcels_in and mismatches == 0 and touched == 0
+        )
+        print(f"{mud} rate change: {stats['repriced_combos']} of {len(combos)} combos and "
+              f"{stats['assessments_updated']} assessments re-priced in {stats['elapsed_seconds']}s "
+              f"(expected {len(containing)} and {parcels_in}): {change_ok}")
+
+        # 4. Parcels annexed into a new district
+        await stack.load_units([{"code": "MUD-NEW", "name": "MUD New", "unit_type": "special_district"}])
+        await stack.set_rates(YEAR, {"MUD-NEW": Decimal("0.500000")})
+        rates["MUD-NEW"] = Decimal("0.500000")
+        moved = {p: members[p] + ["MUD-NEW"] for p in list(members)[:25] if int(p[1:]) % 2 == 0}
+        members.update(moved)
+        stats = await stack.assign_units(COUNTIES[0], moved)
+        mismatches, touched = await check_assessments(manager, members, rates)
+        async with manager.engine.connect() as conn:
+            links = (await conn.execute(select(func.count()).select_from(property_tax_units))).scalar()
+        annex_ok = (
+            stats["reassigned"] == len(moved) and stats["assessments_updated"] == len(moved)
+            and stats["new_combos"] >= 1 and mismatches == 0 and touched == 0
+            and links == sum(len(set(codes)) for codes in members.values())
+        )
+        print(f"annexed {len(moved)} parcels: {stats['reassigned']} reassigned, {stats['new_combos']} new combos, "
+              f"{stats['assessments_updated']} re-priced: {annex_ok}")
+        await manager.close()
+
+    ok = compile_ok and price_ok and change_ok and annex_ok
+    print("\nRate stacks OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate stack verification and timing")
+    parser.add_argument("--parcels", type=int, default=100_000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
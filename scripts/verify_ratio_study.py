@@ -0,0 +1,223 @@
+"""
+Check services.property_data.ratio_study against plain Python statistics and time it.
+
+Seeds a SQLite database with N parcels in three counties, spread over
+subdivisions (some missing) and property types, with market values and
+assessed values at group-specific levels. Then:
+
+1. runs the full-roll study and compares the median ratio, COD, PRD and
+   mean ratios of EVERY cached group with ``statistics``-module arithmetic
+   on that group's ratios, and checks the group set (sizes, minimum size);
+2. checks bootstrap replicates: one replicate's (median, COD, PRD) per group
+   from the prefix-sum code equals the same statistics of the explicitly
+   expanded resample; every interval contains its point estimate;
+3. reads a group through ``RatioStudy.summary`` (a cache hit: nothing is
+   recomputed), then runs the import hook for one county and reads again (that
+   county alone is recomputed, to the same numbers).
+
+    python scripts/verify_ratio_study.py
+    python scripts/verify_ratio_study.py --parcels 1000000
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from services.persistence.database import DatabaseManager, Property, PropertyType, RatioStudySummary, TaxAssessment
+from services.property_data import ratio_study
+from services.property_data.importer import ImportBatch
+
+COUNTIES = ["Harris", "Fort Bend", "Travis"]
+TYPES = [PropertyType.RESIDENTIAL] * 6 + [PropertyType.COMMERCIAL, PropertyType.VACANT_LAND]
+YEAR = 2026
+
+
+async def seed(manager: DatabaseManager, count: int) -> None:
+    rng = random.Random(5)
+    subdivisions = [f"SUBDIVISION {i}" for i in range(max(count // 400, 3))] + ["TINY ESTATES"]
+    level = {name: rng.uniform(0.8, 1.05) for name in subdivisions}
+    async with manager.begin_write() as conn:
+        for start in range(1, count + 1, 20_000):
+            properties, assessments = [], []
+            for i in range(start, min(start + 20_000, count + 1)):
+                subdivision = None if rng.random() < 0.1 else rng.choice(subdivisions[:-1])
+                if i % 20_000 == 0:
+                    subdivision = "TINY ESTATES"  # below the minimum group size
+                properties.append({
+                    "id": i, "parcel_id": f"P{i}", "street_address": f"{i} ELM ST", "city": "HOUSTON",
+                    "zip_code": "77002", "county": COUNTIES[i % len(COUNTIES)], "property_type": rng.choice(TYPES),
+                    "subdivision": subdivision, "is_active": True,
+                })
+                market = round(rng.lognormvariate(12.3, 0.5), 2)
+                ratio = level[subdivision] if subdivision else 0.95
+                assessed = round(market * ratio * rng.lognormvariate(0, 0.12), 2)
+                assessments.append({
+                    "property_id": i, "assessment_year": YEAR, "assessment_date": date(YEAR, 1, 1),
+                    "effective_date": date(YEAR, 1, 1), "land_value": 0,
+                    "total_assessed_value": Decimal(f"{assessed:.2f}"),
+                    # A few parcels have no usable market value
+                    "market_value": None if rng.random() < 0.02 else Decimal(f"{market:.2f}"),
+                    "tax_rate": Decimal("2.1"), "base_tax_amount": 0, "final_tax_amount": 0, "due_dates": [],
+                })
+            await conn.execute(insert(Property), properties)
+            await conn.execute(insert(TaxAssessment), assessments)
+
+
+async def reference_groups(conn) -> dict:
+    """(county, subdivision, property_type) -> [(assessed, market)], '' meaning all."""
+    rows = await conn.execute(
+        select(Property.county, Property.subdivision, Property.property_type,
+               TaxAssessment.total_assessed_value, TaxAssessment.market_value)
+        .join(TaxAssessment, TaxAssessment.property_id == Property.id)
+        .where(TaxAssessment.assessment_year == YEAR, TaxAssessment.market_value > 0)
+    )
+    groups = defaultdict(list)
+    for county, subdivision, kind, assessed, market in rows:
+        pair = (float(assessed), float(market))
+        groups[(county, "", "")].append(pair)
+        groups[(county, "", kind.value)].append(pair)
+        if subdivision:
+            groups[(county, subdivision, "")].append(pair)
+            groups[(county, subdivision, kind.value)].append(pair)
+    return groups
+
+
+def reference_statistics(pairs: list) -> dict:
+    ratios = [assessed / market for assessed, market in pairs]
+    median = statistics.median(ratios)
+    mean = statistics.fmean(ratios)
+    weighted = sum(a for a, _ in pairs) / sum(m for _, m in pairs)
+    return {
+        "median_ratio": median,
+        "cod": 100 * statistics.fmean(abs(r - median) for r in ratios) / median,
+        "prd": mean / weighted,
+        "mean_ratio": mean,
+        "weighted_mean_ratio": weighted,
+    }
+
+
+def check_replicates(rng: np.random.Generator) -> int:
+    """Compare ``_Level.replicate`` with statistics of explicitly expanded resamples; returns mismatches."""
+    n = 5000
+    group = rng.integers(0, 40, n)
+    market = rng.lognormal(12, 0.5, n)
+    assessed = market * rng.lognormal(0, 0.2, n)
+    level = ratio_study._Level([("", str(g)) for g in range(40)], group, assessed / market, assessed, market)
+    mismatches = 0
+    for _ in range(5):
+        counts = rng.poisson(1.0, n)
+        got = level.replicate(counts)
+        for g in range(len(level.starts)):
+            rows = level.order[level.starts[g]:level.ends[g]]
+            weights = counts[rows]
+            ratios = np.sort(np.repeat(assessed[rows] / market[rows], weights))
+            if not len(ratios):
+                mismatches += not np.isnan(got[:, g]).all()
+                continue
+            median = ratios[(len(ratios) + 1) // 2 - 1]
+            expected = (
+                median,
+                100 * np.abs(ratios - median).mean() / median,
+                ratios.mean() / ((assessed[rows] * weights).sum() / (market[rows] * weights).sum()),
+            )
+            if not np.allclose(got[:, g], expected, rtol=1e-9):
+                mismatches += 1
+    return mismatches
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'ratios.db')}", replica_urls=[])
+        await manager.create_tables()
+        started = time.perf_counter()
+        await seed(manager, args.parcels)
+        print(f"seeded {args.parcels} parcels in {time.perf_counter() - started:.1f}s")
+
+        study = ratio_study.RatioStudy(manager, samples=args.samples)
+        stats = await study.run(YEAR)
+        print(f"full roll: {stats['parcels']} ratios, {stats['groups']} groups in {stats['elapsed_seconds']}s "
+              f"(load {stats['load_seconds']}s, compute {stats['compute_seconds']}s, {args.samples} replicates)")
+
+        async with manager.engine.connect() as conn:
+            expected = await reference_groups(conn)
+            cached = {
+                (row["county"], row["subdivision"], row["property_type"]): row
+                for row in (await conn.execute(select(RatioStudySummary.__table__))).mappings()
+            }
+        wanted = {key for key, pairs in expected.items()
+                  if len(pairs) >= ratio_study.MIN_GROUP_SIZE or key[1:] == ("", "")}
+        mismatches = 0
+        for key in wanted & set(cached):
+            row = cached[key]
+            reference = reference_statistics(expected[key])
+            if row["parcels"] != len(expected[key]) or any(
+                not math.isclose(row[name], value, rel_tol=1e-5) for name, value in reference.items()
+            ):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  mismatch {key}: {dict(row)} vs {reference}")
+        groups_ok = wanted == set(cached)
+        contained = all(
+            row["median_ratio_ci_low"] <= row["median_ratio"] <= row["median_ratio_ci_high"]
+            and row["cod_ci_low"] <= row["cod"] <= row["cod_ci_high"]
+            and row["prd_ci_low"] <= row["prd"] <= row["prd_ci_high"]
+            for row in cached.values() if row["parcels"] >= 200
+        )
+        print(f"point statistics of {len(wanted & set(cached))} groups: {mismatches} mismatches; "
+              f"group set as expected: {groups_ok}; intervals contain estimates: {contained}")
+
+        replicate_mismatches = check_replicates(np.random.default_rng(11))
+        print(f"bootstrap replicates against expanded resamples: {replicate_mismatches} mismatches")
+
+        key = next(key for key in sorted(wanted) if key[1] and key[2])
+        runs = []
+        study.run = _counting(study.run, runs)
+        hit = await study.summary(key[0], YEAR, key[1], key[2])
+        batch = ImportBatch(key[0], YEAR)
+        batch.assessment_changes = {1: None}
+        async with manager.begin_write() as conn:
+            await ratio_study.invalidate_ratio_study(conn, batch)
+            left = dict((await conn.execute(
+                select(RatioStudySummary.county, func.count()).group_by(RatioStudySummary.county)
+            )).all())
+        miss = await study.summary(key[0], YEAR, key[1], key[2])
+        cache_ok = (
+            hit is not None and runs == [(YEAR, key[0])] and key[0] not in left
+            and len(left) == len(COUNTIES) - 1
+            and {k: v for k, v in miss.items() if k != "computed_at"} == {k: v for k, v in hit.items() if k != "computed_at"}
+        )
+        print(f"cache: hit served without recompute, invalidation dropped only {key[0]}, "
+              f"miss recomputed it to identical numbers: {cache_ok}")
+        await manager.close()
+
+    ok = mismatches == 0 and groups_ok and contained and replicate_mismatches == 0 and cache_ok
+    print("\nRatio study OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+def _counting(run, calls: list):
+    async def counted(assessment_year, county=None):
+        calls.append((assessment_year, county))
+        return await run(assessment_year, county)
+    return counted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ratio study verification and timing")
+    parser.add_argument("--parcels", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=100)
+    sys.exit(asyncio.run(main(parser.parse_args())))
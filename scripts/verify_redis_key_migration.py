@@ -0,0 +1,156 @@
+"""
+Check services.persistence.redis_keys.RedisKeyMigrator and the legacy-key read fallbacks.
+
+Runs without a Redis server against a small in-memory client. Seeds v1
+keys next to keys that merely share a v1 prefix (v2 keys under a
+``state_key_prefix`` of "context", other applications' ``context:...:...``
+keys, a hash of the wrong type) and checks that:
+
+1. exactly the v1 keys move to the v2 layout, with TTLs, and nothing else is touched;
+2. ``TicketService.check_active_ticket`` finds a ticket under the v1 key
+   until the migration is marked complete, then reads only v2 keys.
+
+    python scripts/verify_redis_key_migration.py
+"""
+
+import asyncio
+import fnmatch
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.persistence.redis_keys import RedisKeyMigrator, RedisKeySchema
+from services.ticket_management.ticket_service import TicketService
+
+
+class MemoryRedis:
+    """The redis-py calls the migrator makes, over a dict of (type, value) and a dict of TTLs."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def type(self, key):
+        return self.data[key][0] if key in self.data else "none"
+
+    def scan_iter(self, match=None, count=None, _type=None):
+        return [
+            key for key, (kind, _) in list(self.data.items())
+            if fnmatch.fnmatchcase(key, match or "*") and (_type is None or kind == _type)
+        ]
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def get(self, key):
+        entry = self.data.get(key)
+        return entry[1] if entry and entry[0] == "string" else None
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = ("string", value)
+        return True
+
+    def lrange(self, key, start, end):
+        values = self.data.get(key, ("list", []))[1]
+        return list(values[start:] if end == -1 else values[start:end + 1])
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, ("list", []))[1].extend(values)
+
+    def smembers(self, key):
+        return set(self.data.get(key, ("set", set()))[1])
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, ("set", set()))[1].update(members)
+
+    def pttl(self, key):
+        return self.ttls.get(key, -1)
+
+    def pexpire(self, key, ttl_ms):
+        self.ttls[key] = ttl_ms
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds * 1000
+
+    def delete(self, *keys):
+        for key in keys:
+            self.ttls.pop(key, None)
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+class AsyncView:
+    """Async ``get`` over a MemoryRedis, as the ticket service's client."""
+
+    def __init__(self, client: MemoryRedis):
+        self.client = client
+
+    async def get(self, key):
+        return self.client.get(key)
+
+
+def check_migration() -> bool:
+    client = MemoryRedis()
+    schema = RedisKeySchema("context")  # the worst case: the namespace shares a v1 prefix
+    legacy = {
+        "conversation:1784": ("list", ["new", "old"]),
+        "context:1784": ("string", '{"step": 2}'),
+        "ticket_status:1784": ("string", '{"status": "open"}'),
+        "active_tickets": ("set", {"TKT-1"}),
+    }
+    untouched = {
+        schema.context("999"): ("string", '{"step": 9}'),
+        schema.conversation("999"): ("list", ["v2 message"]),
+        "context:reports:2026": ("string", "another application"),
+        "conversation:{1784}": ("list", ["hash tag, not a v1 id"]),
+        "context:555": ("hash", {"field": "wrong type"}),
+    }
+    for key, value in {**legacy, **untouched}.items():
+        client.data[key] = value
+    client.ttls["context:1784"] = 86_400_000
+
+    migrator = RedisKeyMigrator(client, schema)
+    completed = migrator.run()
+    moved = (
+        client.lrange(schema.conversation("1784"), 0, -1) == ["new", "old"]
+        and client.get(schema.context("1784")) == '{"step": 2}'
+        and client.get(schema.ticket_status("1784")) == '{"status": "open"}'
+        and client.smembers(schema.active_tickets()) == {"TKT-1"}
+        and client.ttls.get(schema.context("1784")) == 86_400_000
+        and not any(key in client.data for key in legacy)
+    )
+    kept = all(client.data.get(key) == value for key, value in untouched.items())
+    print(f"migration complete: {completed}; v1 keys moved with TTLs: {moved}; "
+          f"{len(untouched)} look-alike keys untouched: {kept} ({migrator.migrated} migrated)")
+    return completed and moved and kept
+
+
+async def check_ticket_fallback() -> bool:
+    client = MemoryRedis()
+    schema = RedisKeySchema("state")
+    client.set(schema.legacy_ticket_status("1784"), json.dumps({"ticket_id": "TKT-1", "status": "open"}))
+    service = TicketService()
+    service.keys = schema
+    service.redis_client = AsyncView(client)
+
+    before = await service.check_active_ticket("1784")
+    service.mark_legacy_migrated()
+    after = await service.check_active_ticket("1784")
+    ok = before is not None and before["ticket_id"] == "TKT-1" and after is None
+    print(f"active ticket under the v1 key found before migration: {before is not None}; "
+          f"ignored once migrated: {after is None}")
+    return ok
+
+
+def main() -> int:
+    ok = check_migration()
+    ok &= asyncio.run(check_ticket_fallback())
+    print("\nRedis key migration OK" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
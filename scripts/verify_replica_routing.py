@@ -0,0 +1,115 @@
+"""
+Check read-replica routing (services.persistence.replicas) against two SQLite files.
+
+The primary and the "replica" hold the same customer under different names,
+so every read shows which database served it. A third, unreachable replica
+URL checks that failed replicas drop out of rotation. Each scenario runs in
+its own task, i.e. its own request context.
+
+    python scripts/verify_replica_routing.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.persistence.database import CustomerProfile, DatabaseManager, unit_of_work
+import services.persistence.database as database
+from services.persistence.repositories import CustomerRepository
+
+WHATSAPP_ID = "wa-replica-check"
+failures = []
+
+
+def check(label: str, actual, expected) -> None:
+    ok = actual == expected
+    print(f"{'PASS' if ok else 'FAIL'}  {label}: {actual!r}" + ("" if ok else f" (expected {expected!r})"))
+    if not ok:
+        failures.append(label)
+
+
+async def seed(url: str, name: str) -> None:
+    manager = DatabaseManager(url, replica_urls=[])
+    await manager.create_tables()
+    async with manager.get_session() as session:
+        session.add(CustomerProfile(whatsapp_id=WHATSAPP_ID, name=name))
+        await session.commit()
+    await manager.close()
+
+
+async def read_name(manager: DatabaseManager) -> str:
+    async with manager.get_session() as session:
+        customer = await CustomerRepository(session).get_by_whatsapp_id(WHATSAPP_ID)
+        return customer.name if customer else None
+
+
+async def plain_read(manager: DatabaseManager) -> None:
+    check("declared read goes to the replica", await read_name(manager), "replica")
+
+
+async def read_after_write(manager: DatabaseManager) -> None:
+    async with manager.get_session() as session:
+        await CustomerRepository(session).upsert_interaction(WHATSAPP_ID)
+    check("read after own write stays on the primary", await read_name(manager), "primary")
+
+
+async def read_in_unit_of_work(manager: DatabaseManager) -> None:
+    async with unit_of_work() as session:
+        customer = await CustomerRepository(session).get_by_whatsapp_id(WHATSAPP_ID)
+        check("read inside unit_of_work goes to the primary", customer.name, "primary")
+
+
+async def nested_read(manager: DatabaseManager) -> None:
+    async with manager.get_session() as session:
+        customer = await CustomerRepository(session).update_property_info(WHATSAPP_ID, county="Harris")
+        check("lookup inside a write method goes to the primary", customer.name, "primary")
+
+
+async def undeclared_read(manager: DatabaseManager) -> None:
+    async with manager.get_session() as session:
+        result = await session.execute(
+            CustomerProfile.__table__.select().where(CustomerProfile.whatsapp_id == WHATSAPP_ID)
+        )
+        check("ad-hoc query outside repositories goes to the primary", result.first().name, "primary")
+
+
+async def main() -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        primary_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'primary.db')}"
+        replica_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'replica.db')}"
+        unreachable_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'missing', 'replica.db')}"
+        await seed(primary_url, "primary")
+        await seed(replica_url, "replica")
+
+        manager = DatabaseManager(primary_url, replica_urls=[unreachable_url, replica_url])
+        # unit_of_work() uses the global manager
+        database.db_manager = manager
+
+        # Round-robin starts at the unreachable replica: that read fails over
+        # nowhere (the lookup returns None) but takes the replica out of rotation
+        await asyncio.create_task(read_name(manager))
+        for scenario in (plain_read, plain_read, read_in_unit_of_work, nested_read, undeclared_read):
+            await asyncio.create_task(scenario(manager))
+        await asyncio.create_task(read_after_write(manager))
+        await asyncio.create_task(plain_read(manager))
+
+        replicas = {
+            ("unreachable" if "missing" in replica["name"] else "healthy"): replica
+            for replica in manager.get_pool_stats()["replicas"]
+        }
+        check("unreachable replica is out of rotation", replicas["unreachable"]["healthy"], False)
+        check("reads served by the healthy replica", replicas["healthy"]["reads"], 3)
+
+        health = await manager.health_check()
+        check("primary health check passes with a replica down", health, True)
+        await manager.close()
+
+    print(f"\n{'All routing checks passed' if not failures else f'{len(failures)} check(s) failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
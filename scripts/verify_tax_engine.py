@@ -0,0 +1,138 @@
+"""
+Check services.property_data.tax_engine against its scalar reference and time it.
+
+Seeds a SQLite database with N assessments in one county. Values are random
+but cover the edge cases: half-cent products, per_1000 rates, exemptions
+larger than the value, values near the Numeric(12, 2) limit (int64 overflow
+fallback), and special assessments in both JSON shapes. Then:
+
+1. runs the engine over the county-year and compares EVERY row with
+   ``reference_tax`` computed from the stored Decimals;
+2. runs it again (nothing may be written);
+3. changes the rate of 1% of rows and runs once more (only those are written).
+
+    python scripts/verify_tax_engine.py
+    python scripts/verify_tax_engine.py --assessments 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import insert, select, update
+
+from services.persistence.database import DatabaseManager, Property, PropertyType, TaxAssessment
+from services.property_data.tax_engine import TaxEngine, reference_tax
+
+COUNTY = "Harris"
+YEAR = 2026
+SPECIALS = [
+    None,
+    {"items": [{"name": "MUD 12", "rate": "0.4500"}, {"name": "Sidewalk", "amount": "120.00"}]},
+    {"items": [{"name": "ESD 7", "rate": "0.1000005"}]},
+    {"Weed abatement": 85, "Lien fee": "12.345"},
+]
+
+
+def assessment(rng: random.Random, property_id: int) -> dict:
+    kind = rng.random()
+    if kind < 0.001:
+        assessed = Decimal("9999999999.99") - rng.randint(0, 10**6)  # overflow fallback
+    else:
+        assessed = Decimal(rng.randint(0, 150_000_000)) / 100
+    rate = Decimal(rng.randint(0, 3_500_000)) / 1_000_000
+    exemption = Decimal(rng.choice([0, 0, 25_000, 100_000, rng.randint(0, 50_000_000) / 100]))
+    if kind > 0.999:
+        exemption = assessed + 1  # exemption larger than the value
+    return {
+        "property_id": property_id,
+        "assessment_year": YEAR,
+        "assessment_date": date(YEAR, 1, 1),
+        "effective_date": date(YEAR, 1, 1),
+        "land_value": assessed,
+        "total_assessed_value": assessed,
+        "tax_rate": rate,
+        "tax_rate_type": "per_1000" if rng.random() < 0.2 else "per_100",
+        "total_exemption_amount": Decimal(exemption).quantize(Decimal("0.01")),
+        "special_assessments": rng.choice(SPECIALS) if rng.random() < 0.1 else None,
+        "base_tax_amount": 0,
+        "final_tax_amount": 0,
+        "due_dates": [],
+    }
+
+
+async def seed(manager: DatabaseManager, count: int) -> None:
+    rng = random.Random(7)
+    async with manager.begin_write() as conn:
+        for start in range(0, count, 20_000):
+            ids = range(start + 1, min(start + 20_000, count) + 1)
+            await conn.execute(insert(Property), [
+                {"id": i, "parcel_id": f"P{i}", "street_address": "", "city": "", "zip_code": "",
+                 "county": COUNTY, "property_type": PropertyType.RESIDENTIAL}
+                for i in ids
+            ])
+            await conn.execute(insert(TaxAssessment), [assessment(rng, i) for i in ids])
+
+
+async def check_all(manager: DatabaseManager) -> int:
+    """Rows whose stored taxes differ from the reference."""
+    c = TaxAssessment.__table__.c
+    mismatches = 0
+    async with manager.engine.connect() as conn:
+        result = await conn.stream(select(
+            c.id, c.total_assessed_value, c.tax_rate, c.tax_rate_type, c.total_exemption_amount,
+            c.special_assessments, c.base_tax_amount, c.final_tax_amount,
+        ))
+        async for row in result:
+            if reference_tax(*row[1:6]) != (row[6], row[7]):
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"  mismatch id={row[0]}: stored {row[6]}/{row[7]}, reference {reference_tax(*row[1:6])}")
+    return mismatches
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = DatabaseManager(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'tax.db')}", replica_urls=[])
+        await manager.create_tables()
+        started = time.perf_counter()
+        await seed(manager, args.assessments)
+        print(f"seeded {args.assessments} assessments in {time.perf_counter() - started:.1f}s")
+
+        engine = TaxEngine(manager)
+        first = await engine.run(COUNTY, YEAR)
+        print(f"first run: {first}")
+        started = time.perf_counter()
+        mismatches = await check_all(manager)
+        print(f"reference check of every row: {mismatches} mismatches ({time.perf_counter() - started:.1f}s scalar)")
+
+        second = await engine.run(COUNTY, YEAR)
+        print(f"unchanged rerun: updated={second['updated']} in {second['elapsed_seconds']}s")
+
+        async with manager.begin_write() as conn:
+            await conn.execute(
+                update(TaxAssessment).where(TaxAssessment.id % 100 == 0).values(tax_rate=TaxAssessment.tax_rate + Decimal("0.01"))
+            )
+        third = await engine.run(COUNTY, YEAR)
+        print(f"after 1% rate change: updated={third['updated']} in {third['elapsed_seconds']}s")
+        mismatches += await check_all(manager)
+
+        await manager.close()
+
+    ok = mismatches == 0 and second["updated"] == 0 and third["updated"] <= args.assessments // 100
+    print("\nEngine matches the reference" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tax engine verification and timing")
+    parser.add_argument("--assessments", type=int, default=200_000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,293 @@
+"""
+Circuit breaker and local fallback store for Redis conversation storage.
+
+When Redis is slow or down the breaker opens after a failure-rate threshold
+is crossed, so calls fail over to an in-process bounded LRU store in
+microseconds instead of waiting out socket timeouts. Writes made while the
+breaker is open are journaled and replayed once Redis recovers.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.core.logging import get_logger
+
+logger = get_logger("redis_circuit_breaker")
+
+
+class CircuitState:
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_seconds: float = 30.0,
+        consecutive_failure_threshold: int = 3,
+        recovery_timeout: float = 10.0,
+        half_open_max_calls: int = 1,
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            name: Breaker name used in logs and status output
+            failure_rate_threshold: Failure ratio within the window that opens the breaker
+            minimum_calls: Calls required in the window before the rate is evaluated
+            window_seconds: Rolling window for the failure rate
+            consecutive_failure_threshold: Consecutive failures that open the breaker regardless of rate
+            recovery_timeout: Seconds to stay open before allowing a probe
+            half_open_max_calls: Concurrent probe calls allowed while half-open
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.consecutive_failure_threshold = consecutive_failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CircuitState.CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._lock = threading.Lock()
+
+        self.failure_count = 0
+        self.success_count = 0
+        self.rejected_count = 0
+        self.times_opened = 0
+        self.last_failure: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go to Redis."""
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_half_open(now)
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self) -> bool:
+        """Record a successful call. Returns True if this closed the breaker."""
+        now = time.monotonic()
+        with self._lock:
+            self.success_count += 1
+            self._consecutive_failures = 0
+            self._record(now, True)
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._transition(CircuitState.CLOSED)
+                self._outcomes.clear()
+                return True
+            return False
+
+    def record_failure(self, error: Optional[Exception] = None) -> None:
+        """Record a failed call and open the breaker if thresholds are crossed."""
+        now = time.monotonic()
+        with self._lock:
+            self.failure_count += 1
+            self._consecutive_failures += 1
+            self.last_failure = str(error) if error else None
+            self._record(now, False)
+
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._open(now)
+                return
+
+            if self._state == CircuitState.CLOSED and self._should_open():
+                self._open(now)
+
+    def _record(self, now: float, ok: bool) -> None:
+        self._outcomes.append((now, ok))
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _should_open(self) -> bool:
+        if self._consecutive_failures >= self.consecutive_failure_threshold:
+            return True
+        total = len(self._outcomes)
+        if total < self.minimum_calls:
+            return False
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return failures / total >= self.failure_rate_threshold
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self.times_opened += 1
+        self._transition(CircuitState.OPEN)
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._half_open_in_flight = 0
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _transition(self, new_state: str) -> None:
+        if new_state != self._state:
+            logger.warning(f"Circuit breaker '{self.name}': {self._state} -> {new_state}")
+            self._state = new_state
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get breaker status for health reporting."""
+        state = self.state
+        with self._lock:
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "name": self.name,
+                "state": state,
+                "failure_rate": round(failures / total, 4) if total else 0.0,
+                "window_calls": total,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_count": self.failure_count,
+                "success_count": self.success_count,
+                "rejected_count": self.rejected_count,
+                "times_opened": self.times_opened,
+                "seconds_until_probe": (
+                    max(0.0, round(self.recovery_timeout - (time.monotonic() - self._opened_at), 2))
+                    if state == CircuitState.OPEN else 0.0
+                ),
+                "last_failure": self.last_failure,
+            }
+
+
+class LocalFallbackStore:
+    """Bounded in-process LRU of session data plus a journal of writes to replay."""
+
+    def __init__(self, max_sessions: int = 1000, max_messages_per_session: int = 50, max_pending_writes: int = 10000):
+        """
+        Initialize fallback store.
+
+        Args:
+            max_sessions: Sessions kept before LRU eviction
+            max_messages_per_session: Messages kept per session (newest first)
+            max_pending_writes: Journal size; oldest writes are dropped beyond this
+        """
+        self.max_sessions = max_sessions
+        self.max_messages_per_session = max_messages_per_session
+        self.max_pending_writes = max_pending_writes
+
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: Deque[Tuple[str, str, Optional[str]]] = deque()
+        self._lock = threading.Lock()
+
+        self.dropped_writes = 0
+        self.replayed_writes = 0
+
+    def _session(self, session_id: str) -> Dict[str, Any]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = {"messages": deque(maxlen=self.max_messages_per_session), "context": None}
+            self._sessions[session_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return entry
+
+    # Mirroring of successful Redis reads so an outage serves last known state
+
+    def remember_messages(self, session_id: str, messages_json: List[str]) -> None:
+        with self._lock:
+            entry = self._session(session_id)
+            entry["messages"].clear()
+            entry["messages"].extend(messages_json)
+
+    def remember_context(self, session_id: str, context_json: Optional[str]) -> None:
+        with self._lock:
+            self._session(session_id)["context"] = context_json
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    # Writes made while the breaker is open
+
+    def push_message(self, session_id: str, message_json: str) -> None:
+        with self._lock:
+            self._session(session_id)["messages"].appendleft(message_json)
+            self._journal("message", session_id, message_json)
+
+    def set_context(self, session_id: str, context_json: str) -> None:
+        with self._lock:
+            self._session(session_id)["context"] = context_json
+            self._journal("context", session_id, context_json)
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._journal("clear", session_id, None)
+
+    def _journal(self, op: str, session_id: str, payload: Optional[str]) -> None:
+        if len(self._pending) >= self.max_pending_writes:
+            self._pending.popleft()
+            self.dropped_writes += 1
+        self._pending.append((op, session_id, payload))
+
+    # Reads
+
+    def get_messages(self, session_id: str, limit: int) -> List[str]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return []
+            return list(entry["messages"])[:limit]
+
+    def get_context(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry["context"] if entry else None
+
+    # Replay
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def drain_pending(self) -> List[Tuple[str, str, Optional[str]]]:
+        """Take all journaled writes (caller re-queues on failure)."""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+            return pending
+
+    def requeue(self, writes: List[Tuple[str, str, Optional[str]]]) -> None:
+        """Put writes back at the front of the journal after a failed replay."""
+        with self._lock:
+            for write in reversed(writes):
+                if len(self._pending) >= self.max_pending_writes:
+                    self.dropped_writes += 1
+                    continue
+                self._pending.appendleft(write)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "pending_writes": len(self._pending),
+            "dropped_writes": self.dropped_writes,
+            "replayed_writes": self.replayed_writes,
+        }
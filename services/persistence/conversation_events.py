@@ -0,0 +1,533 @@
+"""
+Conversation event log on Redis Streams.
+
+Every agent turn is appended to a capped stream as a compact event
+(session, role, latency, token counts, language, stage). The request path
+only pays for a single ``XADD``; analytics rollups and SQL archival run in
+consumer groups that read the stream in batches.
+
+Run a consumer::
+
+    python -m services.persistence.conversation_events rollup
+    python -m services.persistence.conversation_events archive
+    python -m services.persistence.conversation_events stats
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from redis.exceptions import ResponseError
+
+from src.core.logging import get_logger
+from services.persistence.circuit_breaker import CircuitBreaker
+from services.persistence.redis_keys import RedisKeySchema, get_key_schema
+
+logger = get_logger("conversation_events")
+
+STREAM_NAME = "conversation_events"
+
+# Integer fields are sent as strings by Redis and converted back on read
+_INT_FIELDS = ("latency_ms", "input_tokens", "output_tokens")
+
+EventBatch = List[Tuple[str, Dict[str, Any]]]
+
+
+def _decode_event(fields: Dict[str, str]) -> Dict[str, Any]:
+    event: Dict[str, Any] = dict(fields)
+    for name in _INT_FIELDS:
+        if name in event:
+            try:
+                event[name] = int(event[name])
+            except ValueError:
+                event.pop(name)
+    return event
+
+
+class ConversationEventLog:
+    """Append-only, length-capped stream of conversation turn events."""
+
+    def __init__(self, redis_client, stream_key: str, maxlen: int = 100000,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize event log.
+
+        Args:
+            redis_client: redis.asyncio client (decode_responses=True)
+            stream_key: Stream key
+            maxlen: Approximate number of events kept in the stream
+            circuit_breaker: Skips appends while Redis is failing
+        """
+        self.redis_client = redis_client
+        self.stream_key = stream_key
+        self.maxlen = maxlen
+        self.breaker = circuit_breaker or CircuitBreaker("conversation_events")
+        self.appended = 0
+        self.dropped = 0
+
+    async def append(
+        self,
+        session_id: str,
+        role: str,
+        customer_id: Optional[str] = None,
+        latency_ms: Optional[int] = None,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        language: Optional[str] = None,
+        stage: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Append one event. Never raises: analytics must not fail a turn.
+
+        Returns:
+            Stream entry id, or None if the event was dropped
+        """
+        if not self.breaker.allow_request():
+            self.dropped += 1
+            return None
+
+        fields = {
+            "session_id": session_id,
+            "role": role,
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
+        optional = {
+            "customer_id": customer_id,
+            "latency_ms": latency_ms,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "language": language,
+            "stage": stage,
+        }
+        fields.update({name: str(value) for name, value in optional.items() if value is not None})
+
+        try:
+            # Approximate trimming (~) lets Redis drop whole macro nodes, keeping XADD O(1)
+            entry_id = await self.redis_client.xadd(
+                self.stream_key, fields, maxlen=self.maxlen, approximate=True
+            )
+        except Exception as e:
+            self.breaker.record_failure(e)
+            self.dropped += 1
+            logger.warning(f"Failed to append conversation event: {e}")
+            return None
+
+        self.breaker.record_success()
+        self.appended += 1
+        return entry_id
+
+    async def ensure_group(self, group: str, start_id: str = "0") -> None:
+        """Create a consumer group (and the stream) if it does not exist yet."""
+        try:
+            await self.redis_client.xgroup_create(self.stream_key, group, id=start_id, mkstream=True)
+            logger.info(f"✅ Created consumer group '{group}' on {self.stream_key}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read_batch(self, group: str, consumer: str, count: int = 100,
+                         block_ms: int = 5000, claim_idle_ms: int = 60000) -> EventBatch:
+        """
+        Read the next batch for a consumer.
+
+        Entries left unacknowledged by a crashed consumer for longer than
+        ``claim_idle_ms`` are claimed first, so nothing is lost when a worker dies.
+        """
+        claimed = await self.redis_client.xautoclaim(
+            self.stream_key, group, consumer, min_idle_time=claim_idle_ms, start_id="0-0", count=count
+        )
+        entries = claimed[1] if claimed else []
+        if not entries:
+            response = await self.redis_client.xreadgroup(
+                group, consumer, {self.stream_key: ">"}, count=count, block=block_ms
+            )
+            entries = response[0][1] if response else []
+
+        # Entries trimmed away while pending come back with no fields
+        return [(entry_id, _decode_event(fields)) for entry_id, fields in entries if fields]
+
+    async def ack(self, group: str, entry_ids: List[str]) -> int:
+        if not entry_ids:
+            return 0
+        return await self.redis_client.xack(self.stream_key, group, *entry_ids)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "stream": self.stream_key,
+            "maxlen": self.maxlen,
+            "appended": self.appended,
+            "dropped": self.dropped,
+            "breaker": self.breaker.get_status(),
+        }
+        try:
+            stats["length"] = await self.redis_client.xlen(self.stream_key)
+            groups = await self.redis_client.xinfo_groups(self.stream_key)
+            stats["groups"] = [
+                {
+                    "name": group.get("name"),
+                    "consumers": group.get("consumers"),
+                    "pending": group.get("pending"),
+                    "lag": group.get("lag"),
+                }
+                for group in groups
+            ]
+        except ResponseError:
+            # Stream not created yet
+            stats["length"] = 0
+            stats["groups"] = []
+        except Exception as e:
+            stats["error"] = str(e)
+        return stats
+
+
+class ConversationEventConsumer:
+    """Reads a consumer group in batches and acknowledges what the handler processed."""
+
+    def __init__(
+        self,
+        event_log: ConversationEventLog,
+        group: str,
+        handler: Callable[[EventBatch], Awaitable[Optional[List[str]]]],
+        consumer_name: Optional[str] = None,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        claim_idle_ms: int = 60000,
+    ):
+        """
+        Initialize consumer.
+
+        Args:
+            event_log: Stream to consume
+            group: Consumer group name (one per downstream pipeline)
+            handler: Async callable processing a batch; raising leaves the batch pending,
+                returning entry ids leaves just those pending (retried once claimable)
+            consumer_name: Unique name within the group (defaults to host-pid)
+            batch_size: Maximum events per batch
+            block_ms: How long XREADGROUP waits for new events
+            claim_idle_ms: Idle time after which another consumer's pending events are claimed
+        """
+        self.event_log = event_log
+        self.group = group
+        self.handler = handler
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.processed = 0
+        self.failed_batches = 0
+        self.deferred = 0
+
+    async def run_once(self) -> int:
+        """Process one batch. Returns the number of events acknowledged."""
+        batch = await self.event_log.read_batch(
+            self.group, self.consumer_name, count=self.batch_size,
+            block_ms=self.block_ms, claim_idle_ms=self.claim_idle_ms
+        )
+        if not batch:
+            return 0
+
+        try:
+            deferred = set(await self.handler(batch) or ())
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"❌ Consumer '{self.group}' failed on batch of {len(batch)}: {e}")
+            return 0
+
+        self.deferred += len(deferred)
+        acked = await self.event_log.ack(self.group, [entry_id for entry_id, _ in batch if entry_id not in deferred])
+        self.processed += acked
+        return acked
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        """Consume until ``stop_event`` is set."""
+        await self.event_log.ensure_group(self.group)
+        logger.info(f"🚀 Consumer '{self.consumer_name}' started on group '{self.group}'")
+
+        while stop_event is None or not stop_event.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Consumer '{self.group}' read failed: {e}")
+                await asyncio.sleep(1)
+
+
+# Applies each entry's increments to an hourly bucket at most once: the entry id is
+# recorded in the same hash (field "entry:<id>") by the HSETNX that guards them.
+# KEYS[1] = bucket; ARGV = retention seconds, then per entry: id, field count, field, amount, ...
+_ROLLUP_SCRIPT = """
+local applied = 0
+local i = 2
+while i <= #ARGV do
+    local fields = tonumber(ARGV[i + 1])
+    if redis.call('HSETNX', KEYS[1], 'entry:' .. ARGV[i], 1) == 1 then
+        for j = i + 2, i + 1 + 2 * fields, 2 do
+            redis.call('HINCRBY', KEYS[1], ARGV[j], ARGV[j + 1])
+        end
+        applied = applied + 1
+    end
+    i = i + 2 + 2 * fields
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return applied
+"""
+
+
+class AnalyticsRollup:
+    """
+    Batch handler: rolls events up into hourly Redis hashes.
+
+    Idempotent per stream entry id, so a batch redelivered after a crash
+    between the increments and the ack is not counted twice.
+    """
+
+    def __init__(self, redis_client, key_schema: RedisKeySchema, retention_days: int = 90):
+        self.redis_client = redis_client
+        self.key_schema = key_schema
+        self.retention_seconds = retention_days * 86400
+        self._script = redis_client.register_script(_ROLLUP_SCRIPT)
+        self.applied = 0
+        self.duplicates = 0
+
+    def bucket_key(self, event: Dict[str, Any]) -> str:
+        ts = event.get("ts", "")
+        # ISO timestamp truncated to the hour: 2024-01-01T13
+        return self.key_schema.rollup(STREAM_NAME, ts[:13] or "unknown")
+
+    @staticmethod
+    def counters(event: Dict[str, Any]) -> Dict[str, int]:
+        counters = {"events": 1, f"role:{event.get('role', 'unknown')}": 1}
+        if event.get("stage"):
+            counters[f"stage:{event['stage']}"] = 1
+        if event.get("language"):
+            counters[f"language:{event['language']}"] = 1
+        if "latency_ms" in event:
+            counters["latency_ms_total"] = event["latency_ms"]
+            counters["latency_samples"] = 1
+        for name in ("input_tokens", "output_tokens"):
+            if event.get(name):
+                counters[name] = event[name]
+        return counters
+
+    async def __call__(self, batch: EventBatch) -> None:
+        buckets: Dict[str, List[Any]] = defaultdict(list)
+        for entry_id, event in batch:
+            counters = self.counters(event)
+            args = buckets[self.bucket_key(event)]
+            args += [entry_id, len(counters)]
+            for field, amount in counters.items():
+                args += [field, amount]
+
+        # One script call per hourly bucket, all in one round trip
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key, args in buckets.items():
+                await self._script(keys=[key], args=[self.retention_seconds, *args], client=pipe)
+            applied = sum(await pipe.execute())
+        self.applied += applied
+        self.duplicates += len(batch) - applied
+
+
+class SessionAnalyticsArchiver:
+    """
+    Batch handler: folds events into per-session UserAnalytics rows.
+
+    Applied entry ids are recorded in ``conversation_event_receipts`` in the
+    same transaction, so redelivered entries are skipped. Receipts are kept
+    for ``receipt_retention_days``, well past the consumer's claim timeout.
+
+    A new session's events can arrive before its customer profile is
+    written (the user event is appended before the turn is stored). Those
+    entries get no receipt and are returned as deferred, so they stay
+    pending and are retried; after ``defer_seconds`` they are given up.
+    """
+
+    def __init__(self, receipt_retention_days: int = 7, prune_every: int = 100, defer_seconds: int = 3600):
+        self.receipt_retention_days = receipt_retention_days
+        self.prune_every = prune_every
+        self.defer_seconds = defer_seconds
+        self.batches = 0
+        self.duplicates = 0
+        self.deferred = 0
+        self.abandoned = 0
+
+    async def __call__(self, batch: EventBatch) -> List[str]:
+        from datetime import timedelta
+        from sqlalchemy import delete, insert, select
+        from services.persistence.database import (
+            ConversationEventReceipt, CustomerProfile, UserAnalytics, get_db_session,
+        )
+
+        events_by_id = {entry_id: event for entry_id, event in batch if event.get("customer_id")}
+        self.batches += 1
+        if not events_by_id:
+            return []
+
+        async with get_db_session() as session:
+            applied = await session.execute(
+                select(ConversationEventReceipt.entry_id)
+                .where(ConversationEventReceipt.entry_id.in_(list(events_by_id)))
+            )
+            for entry_id in applied.scalars():
+                del events_by_id[entry_id]
+                self.duplicates += 1
+            if self.batches % self.prune_every == 0:
+                cutoff = datetime.now(timezone.utc) - timedelta(days=self.receipt_retention_days)
+                await session.execute(
+                    delete(ConversationEventReceipt).where(ConversationEventReceipt.applied_at < cutoff)
+                )
+            if not events_by_id:
+                return []
+
+            sessions: Dict[str, List[Tuple[str, Dict[str, Any]]]] = defaultdict(list)
+            for entry_id in sorted(events_by_id, key=_entry_order):
+                event = events_by_id[entry_id]
+                sessions[event["session_id"]].append((entry_id, event))
+
+            existing = await session.execute(
+                select(UserAnalytics).where(UserAnalytics.session_id.in_(list(sessions)))
+            )
+            rows = {row.session_id: row for row in existing.scalars()}
+            whatsapp_ids = {entries[0][1]["customer_id"] for session_id, entries in sessions.items()
+                            if session_id not in rows}
+            customers: Dict[str, int] = {}
+            if whatsapp_ids:
+                found = await session.execute(
+                    select(CustomerProfile.whatsapp_id, CustomerProfile.id)
+                    .where(CustomerProfile.whatsapp_id.in_(list(whatsapp_ids)))
+                )
+                customers = dict(found.all())
+
+            deferred: List[str] = []
+            receipts: List[Dict[str, str]] = []
+            for session_id, entries in sessions.items():
+                events = [event for _, event in entries]
+                row = rows.get(session_id)
+                if row is None:
+                    customer_id = customers.get(events[0]["customer_id"])
+                    if customer_id is None:
+                        deferred += self._defer(session_id, entries)
+                        continue
+                    row = UserAnalytics(
+                        customer_id=customer_id,
+                        session_id=session_id,
+                        journey_stage=events[0].get("stage") or "inquiry",
+                        total_messages_count=0,
+                        response_time_samples=0,
+                        errors_encountered=0,
+                        journey_started_at=datetime.fromisoformat(events[0]["ts"]),
+                    )
+                    session.add(row)
+                receipts += [{"entry_id": entry_id} for entry_id, _ in entries]
+
+                # User events carry no latency, so the average is weighted by its own sample count
+                latencies = [e["latency_ms"] / 1000 for e in events if "latency_ms" in e]
+                if latencies:
+                    samples = row.response_time_samples or 0
+                    prior_total = (row.average_response_time or 0.0) * samples
+                    row.average_response_time = (prior_total + sum(latencies)) / (samples + len(latencies))
+                    row.response_time_samples = samples + len(latencies)
+                row.total_messages_count = (row.total_messages_count or 0) + len(events)
+                last = events[-1]
+                if last.get("stage"):
+                    row.journey_stage = last["stage"]
+                if last.get("language"):
+                    row.language_used = last["language"]
+
+            if receipts:
+                # A concurrent consumer applying the same entries fails on the primary key and retries the batch
+                await session.execute(insert(ConversationEventReceipt), receipts)
+        return deferred
+
+    def _defer(self, session_id: str, entries: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Entries to leave pending until the session's customer exists; too old ones are dropped."""
+        now = datetime.now(timezone.utc)
+        waiting = [
+            entry_id for entry_id, event in entries
+            if (now - datetime.fromisoformat(event["ts"])).total_seconds() < self.defer_seconds
+        ]
+        if len(waiting) < len(entries):
+            self.abandoned += len(entries) - len(waiting)
+            logger.warning(
+                f"⚠️ Dropping {len(entries) - len(waiting)} events of session {session_id}: "
+                f"customer {entries[0][1]['customer_id']} not found after {self.defer_seconds}s"
+            )
+        self.deferred += len(waiting)
+        return waiting
+
+
+def _entry_order(entry_id: str) -> Tuple[int, int]:
+    """Stream ids ("<ms>-<seq>") in append order; claimed entries can arrive after newer ones."""
+    milliseconds, _, sequence = entry_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+# Global event log instance
+_event_log: Optional[ConversationEventLog] = None
+
+
+def get_conversation_event_log() -> ConversationEventLog:
+    """Get or create the process-wide conversation event log."""
+    global _event_log
+
+    if _event_log is None:
+        from config.settings import settings
+        from services.persistence.redis_manager import get_redis_manager
+        _event_log = ConversationEventLog(
+            get_redis_manager().get_async_client(),
+            get_key_schema().stream(STREAM_NAME),
+            maxlen=settings.conversation_events_maxlen,
+            circuit_breaker=CircuitBreaker(
+                "conversation_events",
+                failure_rate_threshold=settings.redis_breaker_failure_rate,
+                minimum_calls=settings.redis_breaker_minimum_calls,
+                consecutive_failure_threshold=settings.redis_breaker_consecutive_failures,
+                recovery_timeout=settings.redis_breaker_recovery_seconds
+            ),
+        )
+
+    return _event_log
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from config.settings import settings
+    from services.persistence.redis_manager import close_redis_manager, get_redis_manager
+
+    event_log = get_conversation_event_log()
+    try:
+        if args.command == "stats":
+            import json
+            print(json.dumps(await event_log.get_stats(), indent=2, default=str))
+            return
+
+        if args.command == "rollup":
+            handler = AnalyticsRollup(get_redis_manager().get_async_client(), get_key_schema())
+        else:
+            handler = SessionAnalyticsArchiver()
+
+        consumer = ConversationEventConsumer(
+            event_log,
+            group=args.group or args.command,
+            handler=handler,
+            batch_size=args.batch_size or settings.conversation_events_batch_size,
+        )
+        await consumer.run()
+    finally:
+        await close_redis_manager()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Conversation event stream consumers")
+    parser.add_argument("command", choices=["rollup", "archive", "stats"])
+    parser.add_argument("--group", help="Consumer group name (defaults to the command)")
+    parser.add_argument("--batch-size", type=int, help="Events per batch")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ SQLAlchemy async models for customer data, property assessments, and tax records
 """
 
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, date
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
@@ -15,12 +16,17 @@ from sqlalchemy import (
     Numeric, Date, JSON, ForeignKey, Index, UniqueConstraint, Float,
     Enum as SQLEnum, Table
 )
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
 )
-from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Session, relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
 from src.core.logging import get_logger
+from .replicas import (
+    REPLICA_SET_KEY, SESSION_WROTE_KEY, ReplicaSet, mark_write, recently_wrote, replica_reads_allowed,
+)
 
 logger = get_logger("database_manager")
 
@@ -345,8 +351,11 @@ class MessageHistory(Base):
     # Relationships
     customer: Mapped["CustomerProfile"] = relationship("CustomerProfile", back_populates="messages")
 
+    # On PostgreSQL the table is range-partitioned by month on message_timestamp
+    # (migration 0003); expired months are archived by services.persistence.message_archive
     __table_args__ = (
-        Index("idx_message_customer_thread", "customer_id", "thread_id"),
+        # Keyset pagination over a thread: (customer_id, thread_id) prefix, then (timestamp, id) order
+        Index("idx_message_thread_keyset", "customer_id", "thread_id", "message_timestamp", "id"),
         Index("idx_message_type_timestamp", "message_type", "message_timestamp"),
         Index("idx_message_intent", "intent", "created_at"),
         Index("idx_message_property_context", "property_parcel_mentioned", "assessment_year_mentioned"),
@@ -379,6 +388,7 @@ class UserAnalytics(Base):
     
     # Technical Metrics
     average_response_time: Mapped[Optional[float]] = mapped_column(Float)  # seconds
+    response_time_samples: Mapped[int] = mapped_column(Integer, default=0)  # turns averaged into average_response_time
     errors_encountered: Mapped[int] = mapped_column(Integer, default=0)
     language_used: Mapped[Optional[str]] = mapped_column(String(10))
     
@@ -397,6 +407,15 @@ class UserAnalytics(Base):
     )
 
 
+class ConversationEventReceipt(Base):
+    """Conversation stream entries already folded into UserAnalytics (services.persistence.conversation_events)."""
+    
+    __tablename__ = "conversation_event_receipts"
+    
+    entry_id: Mapped[str] = mapped_column(String(40), primary_key=True)  # Redis Stream entry id, e.g. 1700000000000-0
+    applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
 # Junction table for property ownership
 property_ownership = Table(
     'property_ownership',
@@ -409,6 +428,9 @@ property_ownership = Table(
     Column('start_date', Date, nullable=False),
     Column('end_date', Date),  # For tracking ownership changes
     Column('is_primary_residence', Boolean, default=False),
+    # What the link adds to its owner's portfolio totals (services.property_data.owner_portfolio); NULL = not counted
+    Column('portfolio_assessed_value', Numeric(12, 2)),
+    Column('portfolio_annual_tax', Numeric(10, 2)),
     Column('created_at', DateTime(timezone=True), server_default=func.now()),
     Column('updated_at', DateTime(timezone=True), server_default=func.now(), onupdate=func.now()),
     Index("idx_property_ownership_property", "property_id"),
@@ -454,6 +476,9 @@ class Property(Base):
     exemption_details: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
     special_assessments: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
 
+    # Combination of taxing units the parcel lies in (services.property_data.rate_stack)
+    tax_combo_id: Mapped[Optional[int]] = mapped_column(ForeignKey("tax_rate_combos.id"), index=True)
+
     # Audit fields
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -509,8 +534,16 @@ class PropertyOwner(Base):
     # Customer service integration
     instagram_id: Mapped[Optional[str]] = mapped_column(String(100), index=True)  # Link to CustomerProfile if they use chat
 
-    # Business Intelligence
-    total_properties_owned: Mapped[int] = mapped_column(Integer, default=1)
+    # Appraisal roll identity: the roll's owner id, or a hash of name + mailing address (services.property_data.importer)
+    source_key: Mapped[Optional[str]] = mapped_column(String(64), unique=True, index=True)
+    # Entity resolution: lowest owner id among the spellings of this owner (services.property_data.owner_resolution)
+    resolved_owner_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("property_owners.id", ondelete="SET NULL", name="fk_property_owners_resolved_owner_id")
+    )
+    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))  # NULL = (re)resolve on next run
+
+    # Business Intelligence (portfolio totals maintained by services.property_data.owner_portfolio)
+    total_properties_owned: Mapped[int] = mapped_column(Integer, default=0)
     total_assessed_value: Mapped[Decimal] = mapped_column(Numeric(15, 2), default=0)
     total_annual_tax: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=0)
     payment_history_score: Mapped[Optional[int]] = mapped_column(Integer)  # 1-100 payment reliability
@@ -531,6 +564,7 @@ class PropertyOwner(Base):
         Index("idx_owner_name", "last_name", "first_name"),
         Index("idx_owner_contact", "email", "phone"),
         Index("idx_owner_business", "business_name"),
+        Index("idx_owner_resolved", "resolved_owner_id"),
     )
 
 
@@ -596,6 +630,99 @@ class TaxAssessment(Base):
     )
 
 
+# Taxing units each parcel lies in
+property_tax_units = Table(
+    'property_tax_units',
+    Base.metadata,
+    Column('id', Integer, primary_key=True),
+    Column('property_id', Integer, ForeignKey('properties.id'), nullable=False),
+    Column('unit_id', Integer, ForeignKey('tax_units.id'), nullable=False),
+    Column('created_at', DateTime(timezone=True), server_default=func.now()),
+    Index("idx_property_tax_units_unit", "unit_id"),
+    UniqueConstraint("property_id", "unit_id", name="uq_property_tax_unit")
+)
+
+# Units of each distinct combination
+tax_rate_combo_units = Table(
+    'tax_rate_combo_units',
+    Base.metadata,
+    Column('combo_id', Integer, ForeignKey('tax_rate_combos.id'), primary_key=True),
+    Column('unit_id', Integer, ForeignKey('tax_units.id'), primary_key=True),
+    Index("idx_tax_rate_combo_units_unit", "unit_id"),
+)
+
+
+class TaxUnit(Base):
+    """Taxing unit levying on parcels: school district, county, city or special district."""
+
+    __tablename__ = "tax_units"
+
+    # Primary identification
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    code: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)  # appraisal district entity code
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    unit_type: Mapped[str] = mapped_column(String(50), nullable=False)  # school_district, county, city, special_district, ...
+    county: Mapped[Optional[str]] = mapped_column(String(100))
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    # Audit fields
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    rates: Mapped[List["TaxUnitRate"]] = relationship("TaxUnitRate", back_populates="unit")
+
+
+class TaxUnitRate(Base):
+    """A taxing unit's adopted rate for a tax year, per $100 of taxable value."""
+
+    __tablename__ = "tax_unit_rates"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    unit_id: Mapped[int] = mapped_column(ForeignKey("tax_units.id"), nullable=False)
+    tax_year: Mapped[int] = mapped_column(Integer, nullable=False)
+    rate: Mapped[Decimal] = mapped_column(Numeric(8, 6), nullable=False)
+
+    # Audit fields
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    unit: Mapped["TaxUnit"] = relationship("TaxUnit", back_populates="rates")
+
+    __table_args__ = (
+        UniqueConstraint("unit_id", "tax_year", name="uq_tax_unit_rate_year"),
+    )
+
+
+class TaxRateCombo(Base):
+    """A distinct set of taxing units shared by parcels (services.property_data.rate_stack)."""
+
+    __tablename__ = "tax_rate_combos"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    unit_key: Mapped[str] = mapped_column(String(500), unique=True, nullable=False)  # sorted unit ids, "-" separated
+    unit_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class TaxRateComboRate(Base):
+    """Combined rate of a unit combination for a tax year."""
+
+    __tablename__ = "tax_rate_combo_rates"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    combo_id: Mapped[int] = mapped_column(ForeignKey("tax_rate_combos.id"), nullable=False)
+    tax_year: Mapped[int] = mapped_column(Integer, nullable=False)
+    effective_rate: Mapped[Optional[Decimal]] = mapped_column(Numeric(8, 6))  # NULL until every unit has a rate
+    rated_units: Mapped[int] = mapped_column(Integer, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("combo_id", "tax_year", name="uq_tax_rate_combo_year"),
+    )
+
+
 class Appeal(Base):
     """Property tax assessment appeals."""
 
@@ -692,6 +819,77 @@ class AppealDocument(Base):
     )
 
 
+class AppealOpportunity(Base):
+    """Batch appeal-potential score per property (services.property_data.appeal_scoring)."""
+
+    __tablename__ = "appeal_opportunity"
+
+    # Primary identification
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    property_id: Mapped[int] = mapped_column(ForeignKey("properties.id"), unique=True, nullable=False)
+    county: Mapped[str] = mapped_column(String(100), nullable=False)
+    assessment_year: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Ranking (1 = strongest opportunity in the county)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    county_rank: Mapped[Optional[int]] = mapped_column(Integer)
+
+    # Score inputs
+    assessed_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(12, 2))
+    previous_assessed_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(12, 2))
+    value_change_pct: Mapped[Optional[float]] = mapped_column(Float)
+    comps_ratio: Mapped[Optional[float]] = mapped_column(Float)  # value per sqft / median of comps
+    comps_median_value_per_sqft: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2))
+    potential_reduction: Mapped[Optional[Decimal]] = mapped_column(Numeric(12, 2))
+    missing_homestead: Mapped[bool] = mapped_column(Boolean, default=False)
+    prior_appeals: Mapped[int] = mapped_column(Integer, default=0)
+    successful_appeals: Mapped[int] = mapped_column(Integer, default=0)
+    open_appeal: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    # Audit fields
+    inputs_as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)  # input watermark of the run
+    scored_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_appeal_opportunity_rank", "county", "county_rank"),
+    )
+
+
+class RatioStudySummary(Base):
+    """Cached assessment-ratio statistics per group (services.property_data.ratio_study)."""
+
+    __tablename__ = "ratio_study_summary"
+
+    # Group; an empty subdivision or property_type means all of them
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    county: Mapped[str] = mapped_column(String(100), nullable=False)
+    assessment_year: Mapped[int] = mapped_column(Integer, nullable=False)
+    subdivision: Mapped[str] = mapped_column(String(200), nullable=False, default="")
+    property_type: Mapped[str] = mapped_column(String(50), nullable=False, default="")
+
+    # Statistics (ratio = total_assessed_value / market_value); NULL below the minimum group size
+    parcels: Mapped[int] = mapped_column(Integer, nullable=False)
+    median_ratio: Mapped[Optional[float]] = mapped_column(Float)
+    median_ratio_ci_low: Mapped[Optional[float]] = mapped_column(Float)
+    median_ratio_ci_high: Mapped[Optional[float]] = mapped_column(Float)
+    cod: Mapped[Optional[float]] = mapped_column(Float)  # coefficient of dispersion, percent
+    cod_ci_low: Mapped[Optional[float]] = mapped_column(Float)
+    cod_ci_high: Mapped[Optional[float]] = mapped_column(Float)
+    prd: Mapped[Optional[float]] = mapped_column(Float)  # price-related differential
+    prd_ci_low: Mapped[Optional[float]] = mapped_column(Float)
+    prd_ci_high: Mapped[Optional[float]] = mapped_column(Float)
+    mean_ratio: Mapped[Optional[float]] = mapped_column(Float)
+    weighted_mean_ratio: Mapped[Optional[float]] = mapped_column(Float)
+    bootstrap_samples: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Audit fields
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("county", "assessment_year", "subdivision", "property_type", name="uq_ratio_study_group"),
+    )
+
+
 class Payment(Base):
     """Tax payments and payment history."""
 
@@ -818,37 +1016,204 @@ class TaxBill(Base):
     )
 
 
+# Async drivers for each backend; plain URLs such as ``sqlite:///app.db`` are
+# upgraded so the default configuration works with the async engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def normalize_database_url(database_url: str) -> str:
+    """Return the async-driver form of a database URL."""
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+
+class _PoolMetrics:
+    """Connection pool event counters."""
+    
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+    
+    def attach(self, sync_engine) -> None:
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "checkin", self._on_checkin)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+    
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+    
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+    
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+    
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+
+class RoutingSession(Session):
+    """Sends reads from ``@replica_read`` repository methods to a replica, everything else to the primary."""
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replicas = self.info.get(REPLICA_SET_KEY)
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self.info[SESSION_WROTE_KEY] = True
+            mark_write()
+        elif (
+            replicas is not None
+            and replica_reads_allowed()
+            and not self.info.get(UNIT_OF_WORK_KEY)
+            and not self.info.get(SESSION_WROTE_KEY)
+            and not recently_wrote(replicas.read_your_writes_seconds)
+        ):
+            replica = replicas.choose()
+            if replica is not None:
+                return replica.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
 class DatabaseManager:
     """Database manager for async operations."""
     
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, engine_settings=None, replica_urls: Optional[List[str]] = None):
         """
         Initialize database manager.
         
         Args:
-            database_url: SQLAlchemy database URL
+            database_url: SQLAlchemy database URL (sync URLs are mapped to their async driver)
+            engine_settings: Object with the ``db_*`` tuning attributes (defaults to ``Settings``)
+            replica_urls: Read replica URLs (defaults to ``DATABASE_REPLICA_URLS``)
         """
-        self.database_url = database_url
+        if engine_settings is None:
+            from config.settings import settings as engine_settings
+        
+        self.database_url = normalize_database_url(database_url)
         self.logger = logger
+        self.settings = engine_settings
+        self.backend = make_url(self.database_url).get_backend_name()
+        self.pool_metrics = _PoolMetrics()
+        # Serializes write transactions within this process (SQLite allows one writer)
+        self.write_lock: Optional[asyncio.Lock] = None
+        if self.backend == "sqlite" and engine_settings.db_sqlite_single_writer:
+            self.write_lock = asyncio.Lock()
         
         # Create async engine
-        self.engine: AsyncEngine = create_async_engine(
-            database_url,
-            echo=False,  # Set to True for SQL debugging
-            future=True,
-            pool_pre_ping=True,
-            pool_recycle=3600,  # Recycle connections after 1 hour
-        )
+        self.engine: AsyncEngine = self._create_engine(self.database_url)
+        self.pool_metrics.attach(self.engine.sync_engine)
+        
+        # Optional read replicas; sessions only route when there are any
+        if replica_urls is None:
+            replica_urls = [url.strip() for url in engine_settings.database_replica_urls.split(",") if url.strip()]
+        self.replicas: Optional[ReplicaSet] = None
+        if replica_urls:
+            self.replicas = ReplicaSet(
+                [self._create_engine(normalize_database_url(url)) for url in replica_urls],
+                cooldown_seconds=engine_settings.db_replica_cooldown_seconds,
+                max_lag_seconds=engine_settings.db_replica_max_lag_seconds,
+                read_your_writes_seconds=engine_settings.db_read_your_writes_seconds,
+            )
         
         # Create session factory
         self.SessionLocal = async_sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
             expire_on_commit=False,
+            **({"sync_session_class": RoutingSession, "info": {REPLICA_SET_KEY: self.replicas}} if self.replicas else {}),
+        )
+        
+        self.logger.info(
+            f"Database engine configured for {self.backend}",
+            replicas=len(self.replicas) if self.replicas else 0,
         )
+    
+    def _create_engine(self, database_url: str) -> AsyncEngine:
+        """Engine tuned for its backend (used for the primary and each replica)."""
+        backend = make_url(database_url).get_backend_name()
+        if backend == "sqlite":
+            engine_url, engine_options = self._sqlite_profile(database_url)
+        elif backend == "postgresql":
+            engine_url, engine_options = self._postgres_profile(database_url)
+        else:
+            engine_url, engine_options = database_url, {
+                "pool_pre_ping": True,
+                "pool_recycle": self.settings.db_pool_recycle,
+            }
+        
+        engine = create_async_engine(
+            engine_url,
+            echo=False,  # Set to True for SQL debugging
+            future=True,
+            query_cache_size=self.settings.db_query_cache_size,
+            **engine_options,
+        )
+        if self.settings.db_query_metrics_enabled:
+            from services.persistence.query_metrics import get_query_metrics
+            get_query_metrics().attach(engine.sync_engine)
+        if backend == "sqlite":
+            event.listen(engine.sync_engine, "connect", self._apply_sqlite_pragmas)
+        return engine
+    
+    def _sqlite_profile(self, database_url: str):
+        """Engine options for SQLite: one file, many readers, one writer."""
+        return database_url, {
+            # Local file: no network round trip to save, and stale connections cannot happen
+            "pool_pre_ping": False,
+            "connect_args": {"timeout": self.settings.db_sqlite_busy_timeout_ms / 1000},
+        }
+    
+    def _apply_sqlite_pragmas(self, dbapi_connection, connection_record):
+        """Per-connection pragmas; WAL lets readers proceed while a writer commits."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA synchronous={self.settings.db_sqlite_synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={int(self.settings.db_sqlite_busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA mmap_size={int(self.settings.db_sqlite_mmap_size)}")
+            cursor.execute(f"PRAGMA cache_size=-{int(self.settings.db_sqlite_cache_size_kb)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cursor.close()
+    
+    def _postgres_profile(self, database_url: str):
+        """Engine options for Postgres: sized pool, prepared statement caches."""
+        url = make_url(database_url)
+        connect_args = {
+            "server_settings": {"application_name": self.settings.db_application_name},
+        }
+        if self.settings.db_prepared_statements:
+            # Server-side prepared statements, cached per connection by asyncpg
+            # and by SQLAlchemy's asyncpg dialect
+            connect_args["statement_cache_size"] = self.settings.db_statement_cache_size
+            url = url.update_query_dict(
+                {"prepared_statement_cache_size": str(self.settings.db_statement_cache_size)}
+            )
+        else:
+            # Transaction-pooling proxies (pgbouncer) cannot keep prepared statements
+            connect_args["statement_cache_size"] = 0
+            url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+        
+        return url.render_as_string(hide_password=False), {
+            "pool_size": self.settings.db_pool_size,
+            "max_overflow": self.settings.db_max_overflow,
+            "pool_timeout": self.settings.db_pool_timeout,
+            "pool_recycle": self.settings.db_pool_recycle,
+            "pool_pre_ping": self.settings.db_pool_pre_ping,
+            "pool_use_lifo": True,
+            "connect_args": connect_args,
+        }
         
     async def create_tables(self):
-        """Create all database tables."""
+        """Create all database tables (scripts and throwaway databases; deployments use migrations)."""
         try:
             async with self.engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
@@ -864,9 +1229,43 @@ class DatabaseManager:
         self.logger.debug(f"Created session: {type(session)}")
         return session
     
+    @asynccontextmanager
+    async def begin_write(self):
+        """Connection in a write transaction, queued behind other writers on SQLite (bulk jobs)."""
+        if self.write_lock is None:
+            async with self.engine.begin() as conn:
+                yield conn
+            return
+        async with self.write_lock:
+            async with self.engine.begin() as conn:
+                yield conn
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get pool occupancy and connection event counters."""
+        pool = self.engine.pool
+        stats: Dict[str, Any] = {
+            "backend": self.backend,
+            "pool_class": type(pool).__name__,
+            "connects": self.pool_metrics.connects,
+            "checkouts": self.pool_metrics.checkouts,
+            "checkins": self.pool_metrics.checkins,
+            "invalidations": self.pool_metrics.invalidations,
+        }
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                stats[name] = method()
+        if self.write_lock is not None:
+            stats["writer_queue_locked"] = self.write_lock.locked()
+        if self.replicas is not None:
+            stats.update(self.replicas.get_stats())
+        return stats
+    
     async def close(self):
         """Close database connection."""
         await self.engine.dispose()
+        if self.replicas is not None:
+            await self.replicas.close()
         self.logger.info("Database connection closed")
     
     async def health_check(self) -> bool:
@@ -875,7 +1274,10 @@ class DatabaseManager:
             from sqlalchemy import text
             async with self.get_session() as session:
                 await session.execute(text("SELECT 1"))
-                return True
+            # Replica failures only take that replica out of rotation
+            if self.replicas is not None:
+                await self.replicas.check()
+            return True
         except Exception as e:
             self.logger.error(f"Database health check failed: {e}")
             return False
@@ -891,16 +1293,12 @@ async def get_database_manager() -> DatabaseManager:
     
     if db_manager is None:
         from config.settings import settings
+        # Schema is managed by migrations (services.persistence.schema), not created here
         db_manager = DatabaseManager(settings.database_url)
         
-        # Create tables if they don't exist
-        await db_manager.create_tables()
-        
     return db_manager
 
 
-from contextlib import asynccontextmanager
-
 @asynccontextmanager
 async def get_db_session():
     """Get database session as async context manager for tools."""
@@ -924,4 +1322,81 @@ async def get_db_session():
     finally:
         logger.debug("Closing session...")
         await session.close()
-        logger.debug("Session closed")
\ No newline at end of file
+        logger.debug("Session closed")
+
+# Unit of work
+#
+# Sessions opened by ``unit_of_work()`` are flagged in ``session.info``.
+# Repository writes inside such a session only flush; the scope commits once
+# on exit and then runs side effects (Redis cache updates, pub/sub) that must
+# not happen for a transaction that rolls back. Sessions from
+# ``get_db_session()`` or ``DatabaseManager.get_session()`` keep the original
+# commit-per-call behavior.
+
+UNIT_OF_WORK_KEY = "unit_of_work"
+AFTER_COMMIT_KEY = "after_commit"
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """Whether the session belongs to a ``unit_of_work()`` scope."""
+    return bool(session.info.get(UNIT_OF_WORK_KEY))
+
+
+async def save_changes(session: AsyncSession, *instances) -> None:
+    """Flush inside a unit of work, otherwise commit and refresh ``instances``."""
+    if in_unit_of_work(session):
+        await session.flush()
+        return
+    await session.commit()
+    for instance in instances:
+        await session.refresh(instance)
+
+
+async def discard_changes(session: AsyncSession) -> None:
+    """Roll back a failed write unless the enclosing unit of work owns the transaction."""
+    if not in_unit_of_work(session):
+        await session.rollback()
+
+
+async def after_commit(session: AsyncSession, callback) -> None:
+    """
+    Run ``callback`` (a coroutine function) once the data is committed.
+    
+    Inside a unit of work it is deferred until the scope commits; otherwise
+    the write has already been committed and it runs immediately.
+    """
+    if in_unit_of_work(session):
+        session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+    else:
+        await callback()
+
+
+@asynccontextmanager
+async def unit_of_work():
+    """Transaction scope for one turn or request: repositories flush, the scope commits once."""
+    manager = await get_database_manager()
+    session = manager.get_session()
+    session.info[UNIT_OF_WORK_KEY] = True
+    
+    # SQLite: queue behind other writers in this process instead of failing with "database is locked"
+    if manager.write_lock is not None:
+        await manager.write_lock.acquire()
+    
+    try:
+        yield session
+        await session.commit()
+    except Exception as e:
+        logger.error(f"Unit of work failed, rolling back: {e}")
+        await session.rollback()
+        raise
+    finally:
+        callbacks = session.info.pop(AFTER_COMMIT_KEY, [])
+        await session.close()
+        if manager.write_lock is not None:
+            manager.write_lock.release()
+    
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception as e:
+            logger.warning(f"After-commit callback failed: {e}")
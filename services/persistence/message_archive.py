@@ -0,0 +1,590 @@
+"""
+MessageHistory retention and archives.
+
+Only the last ``MESSAGE_RETENTION_DAYS`` of messages stay in the hot table.
+Older whole months are exported to gzip-compressed JSONL files under
+``MESSAGE_ARCHIVE_DIR`` and then removed:
+
+- PostgreSQL: ``message_history`` is range-partitioned by month (migration
+  0003). An expired month is exported, then its partition is detached and
+  dropped, so removal is a catalog operation and indexes never cover cold
+  months. Partitions for upcoming months are created ahead of time.
+- SQLite (development and tests): one rolling table, deliberately not
+  split into per-month tables. Expired months are exported, then deleted
+  in small batches under the single-writer lock.
+
+Each run writes a new segment file per month and records it in
+``manifest.json``; rows already archived are skipped, so a run interrupted
+between export and removal can simply be repeated. History reads include
+archives only when asked (``include_archived``).
+
+    python -m services.persistence.message_archive run [--retention-days 180]
+    python -m services.persistence.message_archive partitions
+    python -m services.persistence.message_archive list
+"""
+
+import argparse
+import asyncio
+import fcntl
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, select, text
+
+from src.core.logging import get_logger
+from .database import MessageHistory
+
+logger = get_logger("message_archive")
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".retention.lock"
+
+_PARTITION_NAME = re.compile(r"^message_history_p(\d{4})(\d{2})$")
+_DATETIME_COLUMNS = ("message_timestamp", "created_at")
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the (UTC) month containing ``value``."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def month_key(month: datetime) -> str:
+    return f"{month:%Y-%m}"
+
+
+def partition_name(month: datetime) -> str:
+    return f"message_history_p{month:%Y%m}"
+
+
+def partition_ddl(month: datetime) -> str:
+    """CREATE TABLE for a month's partition, in the form migration 0003 uses."""
+    return (
+        f"CREATE TABLE {partition_name(month)} PARTITION OF message_history "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def _position(timestamp: datetime, message_id: int) -> Tuple[datetime, int]:
+    """Comparable (timestamp, id); aware timestamps become naive UTC, as SQLite stores them."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp, message_id
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot archive value of type {type(value).__name__}")
+
+
+def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+    for column in _DATETIME_COLUMNS:
+        if row.get(column):
+            row[column] = datetime.fromisoformat(row[column])
+    if row.get("tax_amount_mentioned") is not None:
+        row["tax_amount_mentioned"] = Decimal(row["tax_amount_mentioned"])
+    return row
+
+
+class _SegmentWriter:
+    """Writes one archive segment to a temporary file, renamed into place on close."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self._file = gzip.open(self.tmp_path, "wt", encoding="utf-8")
+        self.rows = 0
+        self.min_id: Optional[int] = None
+        self.max_id: Optional[int] = None
+        self.first_timestamp: Optional[datetime] = None
+        self.last_timestamp: Optional[datetime] = None
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._file.write(json.dumps(row, default=_encode, separators=(",", ":")))
+            self._file.write("\n")
+            self.min_id = row["id"] if self.min_id is None else min(self.min_id, row["id"])
+            self.max_id = row["id"] if self.max_id is None else max(self.max_id, row["id"])
+            if self.first_timestamp is None:
+                self.first_timestamp = row["message_timestamp"]
+            self.last_timestamp = row["message_timestamp"]
+        self.rows += len(rows)
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """Finish the segment; returns its manifest entry, or None if no rows were written."""
+        self._file.close()
+        if not self.rows:
+            os.remove(self.tmp_path)
+            return None
+        with open(self.tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(self.tmp_path, self.path)
+        return {
+            "file": os.path.basename(self.path),
+            "rows": self.rows,
+            "bytes": os.path.getsize(self.path),
+            "min_id": self.min_id,
+            "max_id": self.max_id,
+            "first_timestamp": self.first_timestamp.isoformat(),
+            "last_timestamp": self.last_timestamp.isoformat(),
+            "archived_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def discard(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+class MessageArchive:
+    """Monthly gzip JSONL archives of MessageHistory rows, indexed by ``manifest.json``."""
+
+    def __init__(self, archive_dir: str, cache_size: int = 128):
+        """
+        Initialize archive.
+
+        Args:
+            archive_dir: Directory holding segment files and the manifest
+            cache_size: Number of (month, thread) row lists kept for repeated reads
+        """
+        self.archive_dir = archive_dir
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self._manifest_mtime: Optional[int] = None
+        self._thread_cache: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.archive_dir, MANIFEST_FILE)
+
+    def manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Archived months keyed by ``YYYY-MM``; reloaded when the file changes."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                with open(self.manifest_path, encoding="utf-8") as f:
+                    self._manifest = json.load(f).get("months", {})
+                self._manifest_mtime = mtime
+            return self._manifest
+
+    def open_segment(self, month: datetime) -> _SegmentWriter:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        segment = len(self.manifest().get(month_key(month), {}).get("segments", [])) + 1
+        path = os.path.join(self.archive_dir, f"message_history_{month_key(month)}_{segment:03d}.jsonl.gz")
+        return _SegmentWriter(path)
+
+    def add_segment(self, month: datetime, segment: Dict[str, Any]) -> None:
+        """Record a closed segment in the manifest (atomic replace)."""
+        months = {key: dict(entry) for key, entry in self.manifest().items()}
+        entry = months.setdefault(month_key(month), {"segments": [], "rows": 0})
+        entry["segments"] = entry["segments"] + [segment]
+        entry["rows"] += segment["rows"]
+        entry["max_id"] = max(entry.get("max_id") or 0, segment["max_id"])
+
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "months": months}, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def archived_max_id(self, month: datetime) -> Optional[int]:
+        return self.manifest().get(month_key(month), {}).get("max_id")
+
+    def iter_month(self, key: str) -> Iterator[Dict[str, Any]]:
+        for segment in self.manifest().get(key, {}).get("segments", []):
+            with gzip.open(os.path.join(self.archive_dir, segment["file"]), "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield _decode(json.loads(line))
+
+    def archived_ids(self, month: datetime) -> Set[int]:
+        return {row["id"] for row in self.iter_month(month_key(month))}
+
+    def _thread_rows(self, key: str, customer_id: int, thread_id: str) -> List[Dict[str, Any]]:
+        """One thread's rows in one archived month, in (timestamp, id) order."""
+        segments = tuple(s["file"] for s in self.manifest().get(key, {}).get("segments", []))
+        cache_key = (key, segments, customer_id, thread_id)
+        with self._lock:
+            rows = self._thread_cache.get(cache_key)
+            if rows is not None:
+                self._thread_cache.move_to_end(cache_key)
+                return rows
+
+        rows = [
+            row for row in self.iter_month(key)
+            if row["customer_id"] == customer_id and row["thread_id"] == thread_id
+        ]
+        rows.sort(key=lambda row: _position(row["message_timestamp"], row["id"]))
+        with self._lock:
+            self._thread_cache[cache_key] = rows
+            while len(self._thread_cache) > self.cache_size:
+                self._thread_cache.popitem(last=False)
+        return rows
+
+    def read_thread(
+        self,
+        customer_id: int,
+        thread_id: str,
+        limit: int,
+        direction: str = "older",
+        position: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Archived rows of a thread, nearest first.
+
+        Args:
+            customer_id: Customer profile id
+            thread_id: Conversation thread id
+            limit: Maximum rows to return
+            direction: "older" reads backwards from ``position``, "newer" forwards
+            position: Exclusive ``(message_timestamp, id)`` bound; None starts at
+                the newest ("older") or oldest ("newer") archived row
+
+        Returns:
+            Row dicts, newest first for "older" and oldest first for "newer"
+        """
+        bound = _position(*position) if position else None
+        keys = sorted(self.manifest())
+        if direction == "older":
+            keys.reverse()
+            if bound:
+                keys = [key for key in keys if key <= f"{bound[0]:%Y-%m}"]
+        elif bound:
+            keys = [key for key in keys if key >= f"{bound[0]:%Y-%m}"]
+
+        rows: List[Dict[str, Any]] = []
+        for key in keys:
+            thread_rows = self._thread_rows(key, customer_id, thread_id)
+            if direction == "older":
+                rows.extend(
+                    row for row in reversed(thread_rows)
+                    if bound is None or _position(row["message_timestamp"], row["id"]) < bound
+                )
+            else:
+                rows.extend(
+                    row for row in thread_rows
+                    if bound is None or _position(row["message_timestamp"], row["id"]) > bound
+                )
+            if len(rows) >= limit:
+                break
+        return [dict(row) for row in rows[:limit]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        months = self.manifest()
+        return {
+            "archive_dir": self.archive_dir,
+            "months": len(months),
+            "rows": sum(entry["rows"] for entry in months.values()),
+            "bytes": sum(s["bytes"] for entry in months.values() for s in entry["segments"]),
+            "oldest_month": min(months) if months else None,
+            "newest_month": max(months) if months else None,
+        }
+
+
+class MessageRetentionJob:
+    """Moves expired months of MessageHistory from the hot table into the archive."""
+
+    def __init__(
+        self,
+        manager,
+        archive: MessageArchive,
+        retention_days: int = 180,
+        batch_size: int = 1000,
+        months_ahead: int = 2,
+    ):
+        """
+        Initialize job.
+
+        Args:
+            manager: DatabaseManager owning the engine
+            archive: Destination archive
+            retention_days: Whole months older than this are archived
+            batch_size: Rows per fetch while exporting and per DELETE on SQLite
+            months_ahead: PostgreSQL partitions kept ready beyond the current month
+        """
+        self.manager = manager
+        self.archive = archive
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.months_ahead = months_ahead
+
+    @property
+    def is_postgres(self) -> bool:
+        return self.manager.engine.dialect.name == "postgresql"
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """First month that stays hot; every earlier month is entirely older than the retention."""
+        now = now or datetime.now(timezone.utc)
+        return month_start(now - timedelta(days=self.retention_days))
+
+    def _bound(self, value: datetime) -> datetime:
+        # SQLite stores naive UTC timestamps; comparing against an aware value would not match
+        return value if self.is_postgres else value.replace(tzinfo=None)
+
+    async def ensure_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """Create monthly partitions from the current month up to ``months_ahead`` (PostgreSQL)."""
+        if not self.is_postgres:
+            return []
+        created = []
+        month = month_start(now or datetime.now(timezone.utc))
+        for offset in range(self.months_ahead + 1):
+            lower = add_months(month, offset)
+            name = partition_name(lower)
+            try:
+                async with self.manager.engine.begin() as conn:
+                    exists = await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+                    if exists:
+                        continue
+                    await conn.execute(text(partition_ddl(lower)))
+                created.append(name)
+                logger.info(f"🗂️ Created message_history partition {name}")
+            except Exception as e:
+                # Typically rows for that month already sit in the default partition
+                logger.warning(f"⚠️ Could not create partition {name}: {e}")
+        return created
+
+    async def _expired_partitions(self, cutoff: datetime) -> List[Tuple[datetime, str]]:
+        async with self.manager.engine.connect() as conn:
+            result = await conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'message_history'::regclass"
+            ))
+            names = [row[0] for row in result]
+
+        expired = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if not match:
+                continue
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            if add_months(month, 1) <= cutoff:
+                expired.append((month, name))
+        return sorted(expired)
+
+    async def _expired_months(self, cutoff: datetime) -> List[datetime]:
+        async with self.manager.engine.connect() as conn:
+            oldest = await conn.scalar(
+                select(func.min(MessageHistory.message_timestamp))
+                .where(MessageHistory.message_timestamp < self._bound(cutoff))
+            )
+        if oldest is None:
+            return []
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        months = []
+        month = month_start(oldest)
+        while month < cutoff:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    def _month_filter(self, month: datetime):
+        column = MessageHistory.message_timestamp
+        return (column >= self._bound(month), column < self._bound(add_months(month, 1)))
+
+    async def export_month(self, month: datetime) -> int:
+        """Stream a month's hot rows not yet archived into a new segment; returns rows written."""
+        already_archived = self.archive.archived_ids(month) if self.archive.archived_max_id(month) else set()
+        stmt = (
+            select(MessageHistory.__table__)
+            .where(*self._month_filter(month))
+            .order_by(MessageHistory.message_timestamp, MessageHistory.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        writer = self.archive.open_segment(month)
+        try:
+            async with self.manager.engine.connect() as conn:
+                result = await conn.stream(stmt)
+                async for batch in result.partitions(self.batch_size):
+                    rows = [dict(row._mapping) for row in batch if row.id not in already_archived]
+                    if rows:
+                        await asyncio.to_thread(writer.write_rows, rows)
+            segment = await asyncio.to_thread(writer.close)
+        except BaseException:
+            writer.discard()
+            raise
+
+        if segment is None:
+            return 0
+        self.archive.add_segment(month, segment)
+        logger.info(f"📦 Archived {segment['rows']} messages from {month_key(month)} to {segment['file']}")
+        return segment["rows"]
+
+    async def _drop_partition(self, name: str, max_id: Optional[int]) -> bool:
+        async with self.manager.engine.begin() as conn:
+            # Rows that arrived after the export (or were never exported) keep the partition alive
+            unarchived = await conn.scalar(
+                text(f"SELECT count(*) FROM {name} WHERE id > :max_id"), {"max_id": max_id or 0}
+            )
+            if unarchived:
+                logger.warning(f"⚠️ Keeping partition {name}: {unarchived} rows not archived yet")
+                return False
+            await conn.execute(text(f"ALTER TABLE message_history DETACH PARTITION {name}"))
+            await conn.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"🗑️ Dropped message_history partition {name}")
+        return True
+
+    async def delete_month(self, month: datetime) -> int:
+        """Delete a month's archived rows from the hot table in batches."""
+        max_id = self.archive.archived_max_id(month)
+        if max_id is None:
+            return 0
+        batch_ids = (
+            select(MessageHistory.id)
+            .where(*self._month_filter(month), MessageHistory.id <= max_id)
+            .limit(self.batch_size)
+        )
+        deleted = 0
+        while True:
+            async with self.manager.begin_write() as conn:
+                result = await conn.execute(delete(MessageHistory).where(MessageHistory.id.in_(batch_ids)))
+            deleted += result.rowcount
+            if result.rowcount < self.batch_size:
+                return deleted
+
+    async def _analyze(self) -> None:
+        async with self.manager.begin_write() as conn:
+            await conn.execute(text("ANALYZE message_history"))
+
+    async def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Archive and remove every month older than the retention window."""
+        cutoff = self.cutoff(now)
+        summary: Dict[str, Any] = {
+            "cutoff": cutoff.isoformat(),
+            "archived_rows": 0,
+            "deleted_rows": 0,
+            "partitions_dropped": [],
+            "partitions_created": [],
+        }
+
+        if self.is_postgres:
+            summary["partitions_created"] = await self.ensure_partitions(now)
+            for month, name in await self._expired_partitions(cutoff):
+                summary["archived_rows"] += await self.export_month(month)
+                if await self._drop_partition(name, self.archive.archived_max_id(month)):
+                    summary["partitions_dropped"].append(name)
+
+        # SQLite's rolling table, or rows PostgreSQL routed to the default partition
+        for month in await self._expired_months(cutoff):
+            summary["archived_rows"] += await self.export_month(month)
+            summary["deleted_rows"] += await self.delete_month(month)
+
+        if summary["archived_rows"] or summary["deleted_rows"] or summary["partitions_dropped"]:
+            await self._analyze()
+
+        logger.info(
+            f"🧹 Message retention complete",
+            cutoff=summary["cutoff"],
+            archived_rows=summary["archived_rows"],
+            deleted_rows=summary["deleted_rows"],
+            partitions_dropped=len(summary["partitions_dropped"]),
+        )
+        return summary
+
+    async def run_exclusive(self, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """``run`` guarded by a lock file in the archive directory; None if another run holds it."""
+        os.makedirs(self.archive.archive_dir, exist_ok=True)
+        with open(os.path.join(self.archive.archive_dir, LOCK_FILE), "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info("⏭️ Message retention already running elsewhere, skipping")
+                return None
+            try:
+                return await self.run(now)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    async def run_forever(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                await self.run_exclusive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Message retention failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+
+# Global archive instance
+_message_archive: Optional[MessageArchive] = None
+
+
+def get_message_archive() -> MessageArchive:
+    """Get or create the message archive for ``MESSAGE_ARCHIVE_DIR``."""
+    global _message_archive
+
+    if _message_archive is None:
+        from config.settings import settings
+        _message_archive = MessageArchive(settings.message_archive_dir)
+
+    return _message_archive
+
+
+async def get_retention_job() -> MessageRetentionJob:
+    from config.settings import settings
+    from .database import get_database_manager
+
+    return MessageRetentionJob(
+        await get_database_manager(),
+        get_message_archive(),
+        retention_days=settings.message_retention_days,
+    )
+
+
+async def _main(args: argparse.Namespace) -> int:
+    if args.command == "list":
+        archive = get_message_archive()
+        for key, entry in sorted(archive.manifest().items()):
+            size = sum(s["bytes"] for s in entry["segments"])
+            print(f"{key}  rows={entry['rows']:<9} segments={len(entry['segments']):<3} bytes={size}")
+        print(json.dumps(archive.get_stats(), indent=2))
+        return 0
+
+    job = await get_retention_job()
+    if args.retention_days is not None:
+        job.retention_days = args.retention_days
+    try:
+        if args.command == "partitions":
+            created = await job.ensure_partitions()
+            print(f"Created partitions: {', '.join(created) or 'none'}")
+        else:
+            summary = await job.run_exclusive()
+            print(json.dumps(summary, indent=2) if summary else "Another retention run is in progress")
+    finally:
+        await job.manager.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="MessageHistory retention and archives")
+    parser.add_argument("command", choices=["run", "partitions", "list"])
+    parser.add_argument("--retention-days", type=int, help="Override MESSAGE_RETENTION_DAYS")
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Buffered MessageHistory writer.
+
+Turns enqueue rows instead of opening a transaction each; a background task
+flushes the buffer with one ``executemany`` whenever it reaches ``max_rows``
+or the oldest row has waited ``max_delay_ms``. Rows still buffered when a
+worker is killed without a graceful shutdown are lost, so the delay bounds
+the exposure window.
+
+A batch that fails on a transient error (lost connection, lock timeout) is
+retried with exponential backoff up to ``max_retries`` times. Any other
+error is blamed on the rows: the batch is bisected until the offending rows
+are isolated, the rest is written, and the rejected rows (like batches out
+of retries) are appended to a dead-letter JSONL file for replay.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from src.core.logging import get_logger
+
+logger = get_logger("message_writer")
+
+# Longest pause between retries of a failing batch
+MAX_BACKOFF_SECONDS = 30.0
+
+
+def is_transient(error: BaseException) -> bool:
+    """Errors worth retrying unchanged: the database, not the rows, was at fault."""
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError))
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+class BufferedMessageWriter:
+    """Coalesces MessageHistory inserts into periodic bulk flushes."""
+
+    def __init__(self, max_rows: int = 200, max_delay_ms: int = 50, max_buffered_rows: int = 20000,
+                 max_retries: int = 10, dead_letter_path: Optional[str] = None):
+        """
+        Initialize writer.
+
+        Args:
+            max_rows: Flush as soon as this many rows are buffered
+            max_delay_ms: Flush rows that have waited this long
+            max_buffered_rows: Oldest rows are dropped beyond this while the database is failing
+            max_retries: Transient failures of one batch before it is dead-lettered
+            dead_letter_path: JSONL file receiving rows that could not be written (None: log only)
+        """
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self.max_buffered_rows = max_buffered_rows
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path
+        self._buffer: List[Dict[str, Any]] = []
+        self._oldest: Optional[float] = None
+        # A batch that failed transiently is retried on its own, ahead of the buffer
+        self._failed: List[Dict[str, Any]] = []
+        self._failed_attempts = 0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._last_flush_failed = False
+        self.rows_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.rejected_rows = 0
+        self.dead_lettered_rows = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flush loop on the running event loop."""
+        if not self.running:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"🚀 Message writer started (max {self.max_rows} rows / {self.max_delay * 1000:.0f}ms)")
+
+    async def stop(self) -> None:
+        """Stop the loop and flush whatever is buffered."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._failed:
+            # Nothing will retry these once the process exits
+            self._dead_letter(self._failed, "writer stopped while the database was failing")
+            self._failed, self._failed_attempts = [], 0
+
+    async def write(self, messages: List[Dict[str, Any]]) -> None:
+        """Buffer rows (same keys as ``MessageHistoryRepository.save_message``)."""
+        if not messages:
+            return
+        if not self.running:
+            # No loop to flush later (scripts, shutdown): write through
+            self._append(messages)
+            await self.flush()
+            return
+
+        self._append(messages)
+        if len(self._buffer) >= self.max_rows:
+            self._wakeup.set()
+
+    def _append(self, messages: List[Dict[str, Any]]) -> None:
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        self._buffer.extend(messages)
+        overflow = len(self._buffer) - self.max_buffered_rows
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped_rows += overflow
+            logger.warning(f"⚠️ Message writer buffer full, dropped {overflow} oldest rows")
+
+    async def flush(self) -> int:
+        """Write the retried batch, then all buffered rows, one transaction each. Returns rows written."""
+        async with self._flush_lock:
+            written = 0
+            if self._failed:
+                batch, attempts = self._failed, self._failed_attempts
+                self._failed, self._failed_attempts = [], 0
+                written += await self._write(batch, attempts)
+                if self._failed:
+                    # Still failing: leave new rows buffered rather than pile them on
+                    return written
+            if self._buffer:
+                batch, self._buffer = self._buffer, []
+                self._oldest = None
+                written += await self._write(batch, 0)
+            if not self._failed and not self._buffer:
+                self._oldest = None
+            return written
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> int:
+        from services.persistence.database import unit_of_work
+        from services.persistence.repositories import MessageHistoryRepository
+
+        async with unit_of_work() as session:
+            return await MessageHistoryRepository(session).save_messages(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]], attempts: int) -> int:
+        try:
+            written = await self._insert(batch)
+        except Exception as e:
+            self.failed_flushes += 1
+            if is_transient(e):
+                self._retry(batch, attempts + 1, e)
+                return 0
+            logger.warning(f"⚠️ Message flush of {len(batch)} rows rejected, isolating bad rows: {e}")
+            written = await self._write_isolating(batch)
+        else:
+            self.flushes += 1
+
+        self._last_flush_failed = bool(self._failed)
+        self.rows_written += written
+        return written
+
+    async def _write_isolating(self, batch: List[Dict[str, Any]]) -> int:
+        """Bisect a rejected batch: halves that insert are kept, single rows that fail are dead-lettered."""
+        written = 0
+        # Stack of parts still to write, first part on top so rows keep their order
+        pending = [batch[len(batch) // 2:], batch[:len(batch) // 2]]
+        while pending:
+            part = pending.pop()
+            if not part:
+                continue
+            try:
+                written += await self._insert(part)
+                self.flushes += 1
+            except Exception as e:
+                self.failed_flushes += 1
+                if is_transient(e):
+                    # The database went away mid-way: retry everything not yet written
+                    remaining = part + [row for rest in reversed(pending) for row in rest]
+                    self._retry(remaining, 1, e)
+                    break
+                if len(part) == 1:
+                    self.rejected_rows += 1
+                    self._dead_letter(part, str(e))
+                else:
+                    middle = len(part) // 2
+                    pending += [part[middle:], part[:middle]]
+        return written
+
+    def _retry(self, batch: List[Dict[str, Any]], attempts: int, error: Exception) -> None:
+        if attempts > self.max_retries:
+            logger.error(f"❌ Message flush of {len(batch)} rows failed {attempts} times, giving up: {error}")
+            self._dead_letter(batch, str(error))
+            return
+        logger.error(
+            f"❌ Message flush of {len(batch)} rows failed, will retry "
+            f"({attempts}/{self.max_retries}): {error}"
+        )
+        self._failed, self._failed_attempts = batch, attempts
+        self._oldest = self._oldest or time.monotonic()
+
+    def _dead_letter(self, rows: List[Dict[str, Any]], reason: str) -> None:
+        self.dead_lettered_rows += len(rows)
+        if not self.dead_letter_path:
+            logger.error(f"❌ Dropped {len(rows)} message rows: {reason}")
+            return
+        failed_at = datetime.now(timezone.utc).isoformat()
+        try:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps({"failed_at": failed_at, "error": reason[:500], "row": row}, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"❌ Dropped {len(rows)} message rows, dead-letter file not writable: {e}")
+            return
+        logger.error(f"❌ Dead-lettered {len(rows)} message rows to {self.dead_letter_path}: {reason[:200]}")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            timeout = self.max_delay
+            if self._oldest is not None:
+                timeout = max(0.0, self._oldest + self.max_delay - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+            if len(self._buffer) >= self.max_rows or due:
+                await self.flush()
+                if self._last_flush_failed:
+                    # Back off instead of spinning on a failing database
+                    await asyncio.sleep(min(self.max_delay * 2 ** self._failed_attempts, MAX_BACKOFF_SECONDS))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "buffered_rows": len(self._buffer),
+            "retrying_rows": len(self._failed),
+            "retry_attempts": self._failed_attempts,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "avg_rows_per_flush": round(self.rows_written / self.flushes, 2) if self.flushes else 0.0,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows,
+            "rejected_rows": self.rejected_rows,
+            "dead_lettered_rows": self.dead_lettered_rows,
+        }
+
+
+# Global writer instance
+_message_writer: Optional[BufferedMessageWriter] = None
+
+
+def get_message_writer() -> BufferedMessageWriter:
+    """Get or create the process-wide message writer."""
+    global _message_writer
+
+    if _message_writer is None:
+        from config.settings import settings
+        _message_writer = BufferedMessageWriter(
+            max_rows=settings.message_writer_max_rows,
+            max_delay_ms=settings.message_writer_max_delay_ms,
+            max_retries=settings.message_writer_max_retries,
+            dead_letter_path=settings.message_writer_dead_letter_path,
+        )
+
+    return _message_writer
+
+
+async def close_message_writer() -> None:
+    """Shutdown hook: flush and stop the writer."""
+    global _message_writer
+
+    if _message_writer is not None:
+        await _message_writer.stop()
+        _message_writer = None
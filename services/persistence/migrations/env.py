@@ -0,0 +1,68 @@
+"""Alembic environment: runs migrations through the application's async engine settings."""
+
+import asyncio
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config.settings import settings
+from services.persistence.database import Base, normalize_database_url
+# Register ticket tables on the shared metadata
+import services.ticket_management.models  # noqa: F401
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    return config.attributes.get("database_url") or normalize_database_url(settings.database_url)
+
+
+def _include_object(obj, name, type_, reflected, compare_to) -> bool:
+    # Monthly message_history partitions are managed by services.persistence.message_archive
+    if type_ == "table" and reflected and compare_to is None and name.startswith("message_history_"):
+        return False
+    return True
+
+
+def _configure(connection=None, url=None) -> None:
+    context.configure(
+        connection=connection,
+        url=url,
+        target_metadata=target_metadata,
+        include_object=_include_object,
+        # SQLite cannot ALTER most things in place; batch mode rebuilds the table
+        render_as_batch=True,
+        compare_type=True,
+        literal_binds=url is not None,
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of executing it (``--sql``)."""
+    _configure(url=_database_url())
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_sync(connection) -> None:
+    _configure(connection=connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(_database_url(), poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(_run_sync)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    # Called from services.persistence.schema with an open sync connection
+    _run_sync(config.attributes["connection"])
+else:
+    asyncio.run(run_migrations_online())
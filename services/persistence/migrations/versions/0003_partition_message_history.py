@@ -0,0 +1,102 @@
+"""partition message history by month
+
+PostgreSQL only: rebuilds message_history as a table range-partitioned on
+message_timestamp with one partition per month plus a default partition, so
+the retention job can drop whole months. The primary key becomes
+(id, message_timestamp) because partition keys must be part of it. SQLite
+keeps the single rolling table.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created beyond the current one, so inserts never land in the default partition
+MONTHS_AHEAD = 2
+
+INDEXES = [
+    ('idx_message_thread_keyset', ['customer_id', 'thread_id', 'message_timestamp', 'id']),
+    ('idx_message_type_timestamp', ['message_type', 'message_timestamp']),
+    ('idx_message_intent', ['intent', 'created_at']),
+    ('idx_message_property_context', ['property_parcel_mentioned', 'assessment_year_mentioned']),
+    ('idx_message_service_type', ['service_type_discussed', 'created_at']),
+    ('ix_message_history_id', ['id']),
+    ('ix_message_history_intent', ['intent']),
+    ('ix_message_history_message_type', ['message_type']),
+    ('ix_message_history_property_parcel_mentioned', ['property_parcel_mentioned']),
+    ('ix_message_history_thread_id', ['thread_id']),
+]
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _swap_table(partitioned: bool) -> None:
+    """Copy message_history into a new table of the other kind and replace it."""
+    op.execute("ALTER TABLE message_history RENAME TO message_history_old")
+    op.execute("ALTER TABLE message_history_old RENAME CONSTRAINT message_history_pkey TO message_history_old_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute(
+        "CREATE TABLE message_history (LIKE message_history_old INCLUDING DEFAULTS)"
+        + (" PARTITION BY RANGE (message_timestamp)" if partitioned else "")
+    )
+    primary_key = "id, message_timestamp" if partitioned else "id"
+    op.execute(f"ALTER TABLE message_history ADD CONSTRAINT message_history_pkey PRIMARY KEY ({primary_key})")
+    op.execute(
+        "ALTER TABLE message_history ADD CONSTRAINT message_history_customer_id_fkey "
+        "FOREIGN KEY (customer_id) REFERENCES customer_profiles (id)"
+    )
+
+    if partitioned:
+        if op.get_context().as_sql:
+            # Offline (--sql): no data to inspect; older rows land in the default partition
+            oldest = None
+        else:
+            oldest = op.get_bind().execute(sa.text("SELECT min(message_timestamp) FROM message_history_old")).scalar()
+        now = datetime.now(timezone.utc)
+        month = (oldest or now).astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        last = _add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), MONTHS_AHEAD)
+        while month <= last:
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE message_history_p{month:%Y%m} PARTITION OF message_history "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+        op.execute("CREATE TABLE message_history_default PARTITION OF message_history DEFAULT")
+
+    op.execute("INSERT INTO message_history SELECT * FROM message_history_old")
+    # The serial sequence belongs to the old table and would be dropped with it
+    op.execute("ALTER SEQUENCE message_history_id_seq OWNED BY message_history.id")
+    op.execute("DROP TABLE message_history_old")
+
+    # Indexes on a partitioned parent cascade to every partition
+    for name, columns in INDEXES:
+        op.create_index(name, 'message_history', columns, unique=False)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _swap_table(partitioned=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _swap_table(partitioned=False)
@@ -0,0 +1,232 @@
+"""
+Process-local near cache for Redis conversation reads.
+
+Keeps raw Redis payloads for hot sessions in memory so repeated
+``get_context``/``get_conversation_history`` calls within and across turns
+skip the network. Coherence across gunicorn workers is maintained through a
+Redis pub/sub invalidation channel: every write publishes the session id and
+every worker drops its local entries for that session.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.core.logging import get_logger
+
+logger = get_logger("near_cache")
+
+_MISSING = object()
+
+
+class NearCache:
+    """Bounded LRU cache with per-entry TTL, grouped by session id."""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 30.0):
+        """
+        Initialize near cache.
+
+        Args:
+            max_entries: Maximum number of cached entries before LRU eviction
+            ttl_seconds: Maximum age of an entry before it is treated as a miss
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._sessions: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        # Logical clock ticked by every invalidation. A read that raced a write
+        # to its session never repopulates the cache with the pre-write value;
+        # writes to other sessions do not affect it.
+        self._clock = 0
+        self._invalidated_at: "OrderedDict[str, int]" = OrderedDict()
+        # Sessions beyond max_entries drop out of _invalidated_at; they count as invalidated at this tick
+        self._invalidation_floor = 0
+        self._cleared_at = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.remote_invalidations = 0
+        self.full_flushes = 0
+
+    def get(self, session_id: str, key: Hashable) -> Any:
+        """Return the cached value or ``_MISSING``."""
+        entry_key = (session_id, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                self._remove(entry_key)
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return value
+
+    def epoch(self) -> int:
+        """Snapshot to pass to ``set`` after the backing read completes."""
+        return self._clock
+
+    def set(self, session_id: str, key: Hashable, value: Any, epoch: Optional[int] = None) -> None:
+        """Store a value for a session unless the session was invalidated since ``epoch``."""
+        entry_key = (session_id, key)
+        with self._lock:
+            if epoch is not None and max(
+                self._cleared_at, self._invalidated_at.get(session_id, self._invalidation_floor)
+            ) > epoch:
+                return
+            self._entries[entry_key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(entry_key)
+            self._sessions.setdefault(session_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key, _ = self._entries.popitem(last=False)
+                self._forget(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, session_id: str, remote: bool = False) -> None:
+        """Drop every cached entry for a session."""
+        with self._lock:
+            self._clock += 1
+            self._invalidated_at[session_id] = self._clock
+            self._invalidated_at.move_to_end(session_id)
+            while len(self._invalidated_at) > self.max_entries:
+                _, self._invalidation_floor = self._invalidated_at.popitem(last=False)
+            keys = self._sessions.pop(session_id, None)
+            if keys:
+                for key in keys:
+                    self._entries.pop((session_id, key), None)
+            self.invalidations += 1
+            if remote:
+                self.remote_invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries (used when invalidations may have been missed)."""
+        with self._lock:
+            self._clock += 1
+            self._cleared_at = self._clock
+            self._invalidated_at.clear()
+            self._entries.clear()
+            self._sessions.clear()
+            self.full_flushes += 1
+
+    def _remove(self, entry_key: Tuple[str, Hashable]) -> None:
+        self._entries.pop(entry_key, None)
+        self._forget(entry_key)
+
+    def _forget(self, entry_key: Tuple[str, Hashable]) -> None:
+        session_id, key = entry_key
+        keys = self._sessions.get(session_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._sessions[session_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "remote_invalidations": self.remote_invalidations,
+            "full_flushes": self.full_flushes,
+        }
+
+
+class NearCacheInvalidator:
+    """Publishes and consumes session invalidations over Redis pub/sub."""
+
+    def __init__(self, redis_client, cache: NearCache, channel: str):
+        """
+        Initialize invalidator.
+
+        Args:
+            redis_client: Sync redis-py client used for publish and subscribe
+            cache: Local cache to invalidate
+            channel: Pub/sub channel shared by all workers
+        """
+        self.redis_client = redis_client
+        self.cache = cache
+        self.channel = channel
+        self.node_id = uuid.uuid4().hex[:12]
+        self._pubsub = None
+        self._thread = None
+
+    def start(self) -> bool:
+        """Start the background subscriber thread."""
+        if self._thread is not None:
+            return True
+        try:
+            self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.channel: self._on_message})
+            self._thread = self._pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._on_error,
+            )
+            # Anything cached before the subscription was live may be stale
+            self.cache.clear()
+            logger.info(f"✅ Near cache invalidation listener started on {self.channel}")
+            return True
+        except Exception as e:
+            logger.warning(f"Near cache invalidation listener unavailable: {e}")
+            self._pubsub = None
+            self._thread = None
+            return False
+
+    @property
+    def is_listening(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def publish(self, session_id: str) -> None:
+        """Invalidate a session locally and on every other worker."""
+        self.cache.invalidate(session_id)
+        try:
+            self.redis_client.publish(self.channel, f"{self.node_id}|{session_id}")
+        except Exception as e:
+            # Peers fall back to TTL expiry for this session
+            logger.warning(f"Failed to publish near cache invalidation: {e}")
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        data = message.get("data")
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", "replace")
+        if not isinstance(data, str):
+            return
+        node_id, _, session_id = data.partition("|")
+        if node_id == self.node_id or not session_id:
+            return
+        self.cache.invalidate(session_id, remote=True)
+
+    def _on_error(self, error: Exception, pubsub, thread) -> None:
+        # Invalidations may have been lost while disconnected
+        logger.warning(f"Near cache invalidation listener error, flushing cache: {error}")
+        self.cache.clear()
+
+    def stop(self) -> None:
+        """Stop the subscriber thread."""
+        if self._thread is not None:
+            try:
+                self._thread.stop()
+            except Exception:
+                pass
+            self._thread = None
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
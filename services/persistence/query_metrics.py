@@ -0,0 +1,231 @@
+"""
+Statement timing for SQLAlchemy engines.
+
+Engine event hooks time every statement and attribute it to the repository
+method that issued it (``CustomerRepository.upsert_interaction``). Timings
+aggregate into per-fingerprint histograms; statements slower than the
+threshold are logged with their parameters redacted.
+
+Repositories opt in with the ``@instrument_repository`` class decorator,
+which only sets context variables around each public coroutine method: the
+operation name, and whether the method was declared ``@replica_read``
+(services.persistence.replicas).
+"""
+
+import functools
+import inspect
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from src.core.logging import get_logger
+from .replicas import allow_replica_reads, reset_replica_reads
+
+logger = get_logger("query_metrics")
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current_operation: ContextVar[Optional[str]] = ContextVar("db_operation", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and multi-row VALUES differ only in placeholder count
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*\)")
+_NUMBER_LITERAL = re.compile(r"\b\d+\b")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """Normalize SQL so statements differing only in literals or list sizes share a key."""
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _NUMBER_LITERAL.sub("N", text)
+    text = _PLACEHOLDER_LIST.sub("(...)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> str:
+    """Describe bound parameters without their values."""
+    if executemany:
+        return f"<{len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(f"<{type(v).__name__}>" for v in parameters) + ")"
+    return "<redacted>"
+
+
+class _StatementStats:
+    __slots__ = ("fingerprint", "operation", "count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self, fingerprint: str, operation: Optional[str]):
+        self.fingerprint = fingerprint
+        self.operation = operation
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket containing the given fraction of samples."""
+        target = self.count * fraction
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return float(BUCKET_BOUNDS_MS[index]) if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "operation": self.operation,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "histogram": {
+                (f"le_{bound}ms" if i < len(BUCKET_BOUNDS_MS) else "gt_5000ms"): n
+                for i, (bound, n) in enumerate(zip(BUCKET_BOUNDS_MS + (None,), self.buckets))
+                if n
+            },
+        }
+
+
+class QueryMetrics:
+    """Per-fingerprint timing histograms fed by engine events."""
+
+    def __init__(self, slow_query_ms: float = 200.0, max_fingerprints: int = 2000):
+        """
+        Initialize metrics.
+
+        Args:
+            slow_query_ms: Statements slower than this are logged
+            max_fingerprints: Cap on distinct (fingerprint, operation) entries
+        """
+        self.slow_query_ms = slow_query_ms
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, Optional[str]], _StatementStats] = {}
+        # Raw statement text -> fingerprint; SQLAlchemy reuses compiled strings
+        self._fingerprints: Dict[str, str] = {}
+        self.statements = 0
+        self.slow_statements = 0
+        self.dropped_fingerprints = 0
+
+    def attach(self, sync_engine) -> None:
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_metrics_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_metrics_start", None)
+        if start is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.record(statement, elapsed_ms, parameters, executemany)
+
+    def record(self, statement: str, elapsed_ms: float, parameters: Any = None, executemany: bool = False) -> None:
+        operation = _current_operation.get()
+        fingerprint = self._fingerprints.get(statement)
+        if fingerprint is None:
+            fingerprint = fingerprint_statement(statement)
+            if len(self._fingerprints) < self.max_fingerprints * 4:
+                self._fingerprints[statement] = fingerprint
+
+        key = (fingerprint, operation)
+        with self._lock:
+            self.statements += 1
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    self.dropped_fingerprints += 1
+                    return
+                stats = self._stats[key] = _StatementStats(fingerprint, operation)
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            if elapsed_ms > stats.max_ms:
+                stats.max_ms = elapsed_ms
+            stats.buckets[bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+
+        if elapsed_ms >= self.slow_query_ms:
+            self.slow_statements += 1
+            logger.warning(
+                f"🐢 Slow query ({elapsed_ms:.1f}ms)",
+                operation=operation or "unattributed",
+                statement=fingerprint[:500],
+                parameters=redact_parameters(parameters, executemany) if parameters else None,
+            )
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """Slowest fingerprints, ordered by ``total_ms``, ``max_ms``, ``avg_ms`` or ``count``."""
+        with self._lock:
+            rows = [stats.to_dict() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row.get(order_by, 0), reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.statements = 0
+            self.slow_statements = 0
+            self.dropped_fingerprints = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "statements": self.statements,
+            "slow_statements": self.slow_statements,
+            "slow_query_ms": self.slow_query_ms,
+            "fingerprints": len(self._stats),
+            "dropped_fingerprints": self.dropped_fingerprints,
+        }
+
+
+def instrument_repository(cls):
+    """Class decorator: tag statements issued by public coroutine methods with ``Class.method``."""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _tagged(method, f"{cls.__name__}.{name}", getattr(method, "__replica_read__", False)))
+    return cls
+
+
+def _tagged(method, operation: str, replica_read: bool = False):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        # Outermost method wins, so helper calls stay attributed to (and routed like) the caller
+        if _current_operation.get() is not None:
+            return await method(*args, **kwargs)
+        token = _current_operation.set(operation)
+        replica_token = allow_replica_reads(replica_read)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            reset_replica_reads(replica_token)
+            _current_operation.reset(token)
+    return wrapper
+
+
+# Global metrics instance shared by all engines in the process
+_query_metrics: Optional[QueryMetrics] = None
+
+
+def get_query_metrics() -> QueryMetrics:
+    """Get or create the process-wide query metrics."""
+    global _query_metrics
+
+    if _query_metrics is None:
+        from config.settings import settings
+        _query_metrics = QueryMetrics(slow_query_ms=settings.db_slow_query_ms)
+
+    return _query_metrics
@@ -4,11 +4,15 @@ Replaces the complex LangGraph RedisSaver with a straightforward conversation pe
 """
 
 import json
+import threading
 import redis
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import structlog
 from src.core.logging import get_logger
+from services.persistence.near_cache import NearCache, NearCacheInvalidator, _MISSING
+from services.persistence.circuit_breaker import CircuitBreaker, CircuitState, LocalFallbackStore
+from services.persistence.redis_keys import RedisKeySchema, get_key_schema
 
 logger = get_logger("redis_conversation_store")
 
@@ -16,42 +20,150 @@ logger = get_logger("redis_conversation_store")
 class RedisConversationStore:
     """Simple Redis-based conversation storage using official redis-py."""
     
-    def __init__(self, redis_url: str, ttl_hours: int = 24):
+    def __init__(self, redis_url: str, ttl_hours: int = 24, near_cache: Optional[NearCache] = None,
+                 invalidation_channel: str = "near_cache:invalidate",
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 fallback_store: Optional[LocalFallbackStore] = None,
+                 socket_timeout: float = 5.0, socket_connect_timeout: float = 5.0,
+                 redis_client: Optional[redis.Redis] = None,
+                 key_schema: Optional[RedisKeySchema] = None):
         """
         Initialize Redis conversation store.
         
         Args:
             redis_url: Redis connection URL (e.g., "redis://localhost:6379/0")
             ttl_hours: Time to live for conversations in hours
+            near_cache: Optional process-local read cache for context/history
+            invalidation_channel: Pub/sub channel used to keep near caches coherent
+            circuit_breaker: Breaker guarding Redis calls (a default one is created if omitted)
+            fallback_store: Local store used while the breaker is open
+            socket_timeout: Redis socket timeout in seconds
+            socket_connect_timeout: Redis connect timeout in seconds
+            redis_client: Shared client to use instead of opening a dedicated connection
+            key_schema: Versioned key layout (defaults to the settings-derived schema)
         """
         self.ttl_hours = ttl_hours
         self.ttl_seconds = ttl_hours * 3600
         self.logger = logger
+        self.near_cache = near_cache
+        self._invalidator: Optional[NearCacheInvalidator] = None
+        self.breaker = circuit_breaker or CircuitBreaker("redis_conversation_store")
+        self.fallback = fallback_store or LocalFallbackStore()
+        self._replay_lock = threading.Lock()
+        self.keys = key_schema or get_key_schema()
+        # Until the v1 -> v2 key migration has finished, misses fall back to legacy keys
+        self.legacy_reads = True
         
-        try:
+        if redis_client is not None:
+            self.redis_client = redis_client
+        else:
             # Use official redis-py with decode_responses=True for easier handling
             self.redis_client = redis.from_url(
                 redis_url, 
                 decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5
+                socket_connect_timeout=socket_connect_timeout,
+                socket_timeout=socket_timeout
             )
-            
+        
+        try:
             # Test connection
             self.redis_client.ping()
+            self.breaker.record_success()
             self.logger.info(f"✅ Redis conversation store connected successfully (TTL: {ttl_hours}h)")
-            
         except Exception as e:
-            self.logger.error(f"❌ Failed to connect to Redis: {e}")
-            raise
+            # Start degraded instead of failing construction; the breaker probes for recovery
+            self.breaker.record_failure(e)
+            self.logger.error(f"❌ Failed to connect to Redis, starting in degraded mode: {e}")
+
+        if self.near_cache is not None:
+            self._invalidator = NearCacheInvalidator(self.redis_client, self.near_cache, invalidation_channel)
+            if self.breaker.state == CircuitState.CLOSED:
+                self._invalidator.start()
+
+    def _near_cache_active(self) -> bool:
+        """Serve from the near cache only while invalidations are being received."""
+        return self.near_cache is not None and self._invalidator is not None and self._invalidator.is_listening
+
+    def _invalidate_session(self, session_id: str) -> None:
+        """Drop cached reads for a session on every worker after a write."""
+        if self._invalidator is not None:
+            self._invalidator.publish(session_id)
+
+    def _invalidate_local(self, session_id: str) -> None:
+        """Drop this worker's cached reads for a session after a write buffered locally."""
+        # Redis is unreachable, so peers cannot be told; their entries expire by TTL
+        if self.near_cache is not None:
+            self.near_cache.invalidate(session_id)
+
+    def _redis_allowed(self) -> bool:
+        """
+        Check the breaker before a Redis call.
+
+        Buffered writes are replayed here, ahead of the caller's own command,
+        so list order in Redis matches the order the writes were made.
+        """
+        if not self.breaker.allow_request():
+            return False
+        if self.fallback.pending_count == 0:
+            return True
+        try:
+            self._replay_pending()
+            self._on_redis_success()
+            return True
+        except Exception as e:
+            self._on_redis_failure(e)
+            return False
+
+    def _on_redis_success(self) -> None:
+        if self.breaker.record_success():
+            self.logger.info("✅ Redis recovered, conversation store leaving degraded mode")
+            if self._invalidator is not None and not self._invalidator.is_listening:
+                self._invalidator.start()
+
+    def _on_redis_failure(self, error: Exception) -> None:
+        self.breaker.record_failure(error)
+
+    def _replay_pending(self) -> None:
+        """Write journaled fallback writes back to Redis in one pipeline."""
+        with self._replay_lock:
+            pending = self.fallback.drain_pending()
+            if not pending:
+                return
+            try:
+                pipeline = self.redis_client.pipeline(transaction=False)
+                for op, session_id, payload in pending:
+                    conversation_key = self._get_conversation_key(session_id)
+                    context_key = self._get_context_key(session_id)
+                    if op == "message":
+                        pipeline.lpush(conversation_key, payload)
+                        pipeline.expire(conversation_key, self.ttl_seconds)
+                    elif op == "context":
+                        pipeline.set(context_key, payload)
+                        pipeline.expire(context_key, self.ttl_seconds)
+                    elif op == "clear":
+                        pipeline.delete(conversation_key, context_key)
+                pipeline.execute()
+            except Exception:
+                self.fallback.requeue(pending)
+                raise
+
+            self.fallback.replayed_writes += len(pending)
+            for session_id in {session_id for _, session_id, _ in pending}:
+                self.fallback.forget(session_id)
+                self._invalidate_session(session_id)
+            self.logger.info(f"🔁 Replayed {len(pending)} buffered conversation writes to Redis")
     
     def _get_conversation_key(self, session_id: str) -> str:
         """Get Redis key for conversation."""
-        return f"conversation:{session_id}"
+        return self.keys.conversation(session_id)
     
     def _get_context_key(self, session_id: str) -> str:
         """Get Redis key for conversation context."""
-        return f"context:{session_id}"
+        return self.keys.context(session_id)
+    
+    def mark_legacy_migrated(self) -> None:
+        """Stop consulting v1 keys once the key migration has completed."""
+        self.legacy_reads = False
     
     def save_message(self, session_id: str, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """
@@ -64,7 +176,7 @@ class RedisConversationStore:
             metadata: Optional metadata (tool calls, etc.)
             
         Returns:
-            True if saved successfully
+            True if saved successfully (to Redis or the local fallback)
         """
         try:
             conversation_key = self._get_conversation_key(session_id)
@@ -75,19 +187,33 @@ class RedisConversationStore:
                 "content": content,
                 "metadata": metadata or {}
             }
-            
-            # Add message to conversation list and set TTL
-            pipeline = self.redis_client.pipeline()
-            pipeline.lpush(conversation_key, json.dumps(message))
-            pipeline.expire(conversation_key, self.ttl_seconds)
-            pipeline.execute()
-            
-            self.logger.debug(f"💾 Saved {role} message to {session_id}")
-            return True
-            
+            message_json = json.dumps(message)
         except Exception as e:
             self.logger.error(f"❌ Failed to save message: {e}")
             return False
+        
+        if self._redis_allowed():
+            try:
+                # Add message to conversation list and set TTL
+                pipeline = self.redis_client.pipeline()
+                pipeline.lpush(conversation_key, message_json)
+                pipeline.expire(conversation_key, self.ttl_seconds)
+                pipeline.execute()
+                self._on_redis_success()
+                self.fallback.forget(session_id)
+                self._invalidate_session(session_id)
+                
+                self.logger.debug(f"💾 Saved {role} message to {session_id}")
+                return True
+                
+            except Exception as e:
+                self._on_redis_failure(e)
+                self.logger.error(f"❌ Failed to save message: {e}")
+        
+        self.fallback.push_message(session_id, message_json)
+        self._invalidate_local(session_id)
+        self.logger.debug(f"💾 Buffered {role} message for {session_id} (Redis degraded)")
+        return True
     
     def get_conversation_history(self, session_id: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -100,26 +226,44 @@ class RedisConversationStore:
         Returns:
             List of messages in chronological order (oldest first)
         """
-        try:
-            conversation_key = self._get_conversation_key(session_id)
-            
-            # Get messages (they're stored newest first, so reverse them)
-            messages_json = self.redis_client.lrange(conversation_key, 0, limit - 1)
-            
-            messages = []
-            for msg_json in reversed(messages_json):  # Reverse to get chronological order
-                try:
-                    message = json.loads(msg_json)
-                    messages.append(message)
-                except json.JSONDecodeError:
-                    self.logger.warning(f"Failed to decode message: {msg_json}")
-            
-            self.logger.debug(f"📜 Retrieved {len(messages)} messages for {session_id}")
-            return messages
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to get conversation history: {e}")
-            return []
+        conversation_key = self._get_conversation_key(session_id)
+        cache_key = ("history", limit)
+        
+        messages_json = _MISSING
+        if self._near_cache_active():
+            messages_json = self.near_cache.get(session_id, cache_key)
+        
+        if messages_json is _MISSING and self._redis_allowed():
+            try:
+                epoch = self.near_cache.epoch() if self.near_cache is not None else None
+                # Get messages (they're stored newest first, so reverse them)
+                messages_json = self.redis_client.lrange(conversation_key, 0, limit - 1)
+                if not messages_json and self.legacy_reads:
+                    messages_json = self.redis_client.lrange(
+                        self.keys.legacy_conversation(session_id), 0, limit - 1
+                    )
+                self._on_redis_success()
+                self.fallback.remember_messages(session_id, messages_json)
+                if self._near_cache_active():
+                    self.near_cache.set(session_id, cache_key, tuple(messages_json), epoch=epoch)
+            except Exception as e:
+                self._on_redis_failure(e)
+                self.logger.error(f"❌ Failed to get conversation history: {e}")
+                messages_json = _MISSING
+        
+        if messages_json is _MISSING:
+            messages_json = self.fallback.get_messages(session_id, limit)
+        
+        messages = []
+        for msg_json in reversed(messages_json):  # Reverse to get chronological order
+            try:
+                message = json.loads(msg_json)
+                messages.append(message)
+            except json.JSONDecodeError:
+                self.logger.warning(f"Failed to decode message: {msg_json}")
+        
+        self.logger.debug(f"📜 Retrieved {len(messages)} messages for {session_id}")
+        return messages
     
     def save_context(self, session_id: str, context: Dict[str, Any]) -> bool:
         """
@@ -130,7 +274,7 @@ class RedisConversationStore:
             context: Context dictionary
             
         Returns:
-            True if saved successfully
+            True if saved successfully (to Redis or the local fallback)
         """
         try:
             context_key = self._get_context_key(session_id)
@@ -138,19 +282,33 @@ class RedisConversationStore:
                 "updated_at": datetime.now().isoformat(),
                 **context
             }
-            
-            # Save context and set TTL
-            pipeline = self.redis_client.pipeline()
-            pipeline.set(context_key, json.dumps(context_data))
-            pipeline.expire(context_key, self.ttl_seconds)
-            pipeline.execute()
-            
-            self.logger.debug(f"📋 Saved context for {session_id}")
-            return True
-            
+            context_json = json.dumps(context_data)
         except Exception as e:
             self.logger.error(f"❌ Failed to save context: {e}")
             return False
+        
+        if self._redis_allowed():
+            try:
+                # Save context and set TTL
+                pipeline = self.redis_client.pipeline()
+                pipeline.set(context_key, context_json)
+                pipeline.expire(context_key, self.ttl_seconds)
+                pipeline.execute()
+                self._on_redis_success()
+                self.fallback.forget(session_id)
+                self._invalidate_session(session_id)
+                
+                self.logger.debug(f"📋 Saved context for {session_id}")
+                return True
+                
+            except Exception as e:
+                self._on_redis_failure(e)
+                self.logger.error(f"❌ Failed to save context: {e}")
+        
+        self.fallback.set_context(session_id, context_json)
+        self._invalidate_local(session_id)
+        self.logger.debug(f"📋 Buffered context for {session_id} (Redis degraded)")
+        return True
     
     def get_context(self, session_id: str) -> Dict[str, Any]:
         """
@@ -162,10 +320,32 @@ class RedisConversationStore:
         Returns:
             Context dictionary (empty if not found)
         """
+        context_key = self._get_context_key(session_id)
+        
+        # Cached values are the raw JSON so callers always get a fresh dict
+        context_json = _MISSING
+        if self._near_cache_active():
+            context_json = self.near_cache.get(session_id, "context")
+        
+        if context_json is _MISSING and self._redis_allowed():
+            try:
+                epoch = self.near_cache.epoch() if self.near_cache is not None else None
+                context_json = self.redis_client.get(context_key)
+                if context_json is None and self.legacy_reads:
+                    context_json = self.redis_client.get(self.keys.legacy_context(session_id))
+                self._on_redis_success()
+                self.fallback.remember_context(session_id, context_json)
+                if self._near_cache_active():
+                    self.near_cache.set(session_id, "context", context_json, epoch=epoch)
+            except Exception as e:
+                self._on_redis_failure(e)
+                self.logger.error(f"❌ Failed to get context: {e}")
+                context_json = _MISSING
+        
+        if context_json is _MISSING:
+            context_json = self.fallback.get_context(session_id)
+        
         try:
-            context_key = self._get_context_key(session_id)
-            context_json = self.redis_client.get(context_key)
-            
             if context_json:
                 context = json.loads(context_json)
                 self.logger.debug(f"📋 Retrieved context for {session_id}")
@@ -186,34 +366,62 @@ class RedisConversationStore:
             session_id: Session identifier
             
         Returns:
-            True if cleared successfully
+            True if cleared successfully (in Redis or the local fallback)
         """
-        try:
-            conversation_key = self._get_conversation_key(session_id)
-            context_key = self._get_context_key(session_id)
-            
-            # Delete both keys
-            deleted = self.redis_client.delete(conversation_key, context_key)
-            
-            self.logger.info(f"🗑️ Cleared conversation for {session_id} (deleted {deleted} keys)")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to clear conversation: {e}")
-            return False
+        if self._redis_allowed():
+            try:
+                conversation_key = self._get_conversation_key(session_id)
+                context_key = self._get_context_key(session_id)
+                
+                # Delete both keys
+                deleted = self.redis_client.delete(conversation_key, context_key)
+                if self.legacy_reads:
+                    # Legacy keys hash to other slots, so delete them separately
+                    self.redis_client.delete(self.keys.legacy_conversation(session_id))
+                    self.redis_client.delete(self.keys.legacy_context(session_id))
+                self._on_redis_success()
+                self.fallback.forget(session_id)
+                self._invalidate_session(session_id)
+                
+                self.logger.info(f"🗑️ Cleared conversation for {session_id} (deleted {deleted} keys)")
+                return True
+                
+            except Exception as e:
+                self._on_redis_failure(e)
+                self.logger.error(f"❌ Failed to clear conversation: {e}")
+        
+        self.fallback.clear(session_id)
+        self._invalidate_local(session_id)
+        self.logger.info(f"🗑️ Cleared conversation for {session_id} locally (Redis degraded)")
+        return True
     
     def get_session_stats(self) -> Dict[str, Any]:
         """Get statistics about active sessions."""
         try:
-            # Get all conversation keys
-            conversation_keys = self.redis_client.keys("conversation:*")
-            context_keys = self.redis_client.keys("context:*")
+            if not self._redis_allowed():
+                raise ConnectionError(f"circuit breaker {self.breaker.state}")
+            try:
+                # SCAN instead of KEYS so stats never block Redis (and work across cluster nodes)
+                active_conversations = sum(
+                    1 for _ in self.redis_client.scan_iter(match=self.keys.conversation_pattern, count=1000)
+                )
+                stored_contexts = sum(
+                    1 for _ in self.redis_client.scan_iter(match=self.keys.context_pattern, count=1000)
+                )
+                self._on_redis_success()
+            except Exception as e:
+                self._on_redis_failure(e)
+                raise
             
             stats = {
-                "active_conversations": len(conversation_keys),
-                "stored_contexts": len(context_keys),
+                "active_conversations": active_conversations,
+                "stored_contexts": stored_contexts,
                 "ttl_hours": self.ttl_hours,
-                "redis_connected": True
+                "redis_connected": True,
+                "key_schema_version": self.keys.version,
+                "legacy_key_reads": self.legacy_reads,
+                "near_cache": self.get_near_cache_stats(),
+                "degradation": self.get_degradation_status()
             }
             
             return stats
@@ -225,15 +433,37 @@ class RedisConversationStore:
                 "stored_contexts": 0,
                 "ttl_hours": self.ttl_hours,
                 "redis_connected": False,
+                "degradation": self.get_degradation_status(),
                 "error": str(e)
             }
     
+    def get_near_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get near cache hit rate and invalidation counters (None when disabled)."""
+        if self.near_cache is None:
+            return None
+        return {
+            **self.near_cache.get_stats(),
+            "invalidation_listener": self._invalidator.is_listening if self._invalidator else False,
+        }
+    
+    def get_degradation_status(self) -> Dict[str, Any]:
+        """Get circuit breaker state and local fallback usage."""
+        return {
+            "degraded": self.breaker.state != CircuitState.CLOSED,
+            "circuit_breaker": self.breaker.get_status(),
+            "fallback_store": self.fallback.get_stats(),
+        }
+    
     def health_check(self) -> bool:
-        """Check if Redis connection is healthy."""
+        """Check if Redis connection is healthy (fails fast while the breaker is open)."""
+        if not self._redis_allowed():
+            return False
         try:
             self.redis_client.ping()
+            self._on_redis_success()
             return True
-        except Exception:
+        except Exception as e:
+            self._on_redis_failure(e)
             return False
 
 
@@ -245,13 +475,45 @@ def get_conversation_store(redis_url: str = None) -> RedisConversationStore:
     global _conversation_store
     
     if _conversation_store is None:
-        import os
-        redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        _conversation_store = RedisConversationStore(redis_url, ttl_hours=24)
+        from config.settings import settings
+        from services.persistence.redis_manager import get_redis_manager
+        key_schema = get_key_schema()
+        # An explicit URL gets a dedicated client; otherwise share the process-wide pool
+        redis_client = None if redis_url else get_redis_manager().get_sync_client()
+        redis_url = redis_url or settings.redis_url
+        near_cache = None
+        if settings.near_cache_enabled:
+            near_cache = NearCache(
+                max_entries=settings.near_cache_max_entries,
+                ttl_seconds=settings.near_cache_ttl_seconds
+            )
+        _conversation_store = RedisConversationStore(
+            redis_url,
+            ttl_hours=24,
+            near_cache=near_cache,
+            invalidation_channel=key_schema.channel("near_cache:invalidate"),
+            circuit_breaker=CircuitBreaker(
+                "redis_conversation_store",
+                failure_rate_threshold=settings.redis_breaker_failure_rate,
+                minimum_calls=settings.redis_breaker_minimum_calls,
+                consecutive_failure_threshold=settings.redis_breaker_consecutive_failures,
+                recovery_timeout=settings.redis_breaker_recovery_seconds
+            ),
+            fallback_store=LocalFallbackStore(
+                max_sessions=settings.redis_fallback_max_sessions,
+                max_pending_writes=settings.redis_fallback_max_pending_writes
+            ),
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_connect_timeout,
+            redis_client=redis_client,
+            key_schema=key_schema
+        )
     
     return _conversation_store
 
 def reset_conversation_store():
     """Reset global conversation store instance."""
     global _conversation_store
+    if _conversation_store is not None and _conversation_store._invalidator is not None:
+        _conversation_store._invalidator.stop()
     _conversation_store = None
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Versioned Redis key schema.
+
+All keys carry the ``Settings.state_key_prefix`` namespace and a schema
+version. Per-session keys wrap the session id in a hash tag so that every
+key belonging to one session lands on the same Redis Cluster slot, which
+keeps multi-key commands, pipelines and MULTI/EXEC transactions valid in
+cluster mode.
+
+Layout (v2)::
+
+    {prefix}:v2:{<session_id>}:conversation     list, newest message first
+    {prefix}:v2:{<session_id>}:context          JSON string
+    {prefix}:v2:{<instagram_id>}:ticket_status  JSON string
+    {prefix}:v2:active_tickets                  set of ticket ids
+    {prefix}:v2:processed_message:<message_id>  webhook dedup marker
+    {prefix}:v2:stream:<name>                   Redis Stream (event logs)
+    {prefix}:v2:rollup:<name>:<bucket>          analytics rollup hash
+
+The v1 layout (``conversation:<id>``, ``context:<id>``,
+``ticket_status:<id>``, ``active_tickets``) is moved over by
+``RedisKeyMigrator``.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from src.core.logging import get_logger
+
+logger = get_logger("redis_keys")
+
+KEY_SCHEMA_VERSION = 2
+
+
+class RedisKeySchema:
+    """Builds namespaced, cluster-safe Redis keys."""
+
+    def __init__(self, prefix: str, version: int = KEY_SCHEMA_VERSION):
+        """
+        Initialize key schema.
+
+        Args:
+            prefix: Namespace prefix (``Settings.state_key_prefix``)
+            version: Key layout version
+        """
+        self.prefix = prefix
+        self.version = version
+        self.namespace = f"{prefix}:v{version}"
+
+    @staticmethod
+    def _tag(identifier: str) -> str:
+        # Braces inside the id would end the hash tag early
+        return "{" + str(identifier).replace("{", "(").replace("}", ")") + "}"
+
+    def conversation(self, session_id: str) -> str:
+        return f"{self.namespace}:{self._tag(session_id)}:conversation"
+
+    def context(self, session_id: str) -> str:
+        return f"{self.namespace}:{self._tag(session_id)}:context"
+
+    def ticket_status(self, instagram_id: str) -> str:
+        return f"{self.namespace}:{self._tag(instagram_id)}:ticket_status"
+
+    def active_tickets(self) -> str:
+        return f"{self.namespace}:active_tickets"
+
+    def processed_message(self, message_id: str) -> str:
+        return f"{self.namespace}:processed_message:{message_id}"
+
+    def stream(self, name: str) -> str:
+        return f"{self.namespace}:stream:{name}"
+
+    def rollup(self, name: str, bucket: str) -> str:
+        return f"{self.namespace}:rollup:{name}:{bucket}"
+
+    def channel(self, name: str) -> str:
+        return f"{self.namespace}:{name}"
+
+    def meta(self, name: str) -> str:
+        return f"{self.namespace}:meta:{name}"
+
+    # Match patterns for SCAN
+
+    @property
+    def conversation_pattern(self) -> str:
+        return f"{self.namespace}:*:conversation"
+
+    @property
+    def context_pattern(self) -> str:
+        return f"{self.namespace}:*:context"
+
+    # Legacy (v1) layout
+
+    @staticmethod
+    def legacy_conversation(session_id: str) -> str:
+        return f"conversation:{session_id}"
+
+    @staticmethod
+    def legacy_context(session_id: str) -> str:
+        return f"context:{session_id}"
+
+    @staticmethod
+    def legacy_ticket_status(instagram_id: str) -> str:
+        return f"ticket_status:{instagram_id}"
+
+
+class RedisKeyMigrator:
+    """
+    Moves v1 keys to the v2 layout.
+
+    Runs in the background; a lock key makes sure only one worker migrates
+    and a marker key tells every worker when the legacy layout is gone.
+    Keys written under v2 before the migrator reaches them win: legacy
+    conversation entries are appended behind the newer ones, other legacy
+    values are dropped.
+    """
+
+    # v1 key prefix -> Redis type; a v1 key is exactly ``<prefix>:<id>`` with no further ':' or hash tag
+    LEGACY_TYPES = {"conversation": "list", "context": "string", "ticket_status": "string"}
+
+    def __init__(self, redis_client, schema: RedisKeySchema, batch_size: int = 500, lock_ttl: int = 600):
+        """
+        Initialize migrator.
+
+        Args:
+            redis_client: Sync redis-py client (decode_responses=True)
+            schema: Target key schema
+            batch_size: SCAN count hint
+            lock_ttl: Seconds before a crashed migrator's lock expires
+        """
+        self.redis_client = redis_client
+        self.schema = schema
+        self.batch_size = batch_size
+        self.lock_ttl = lock_ttl
+        self.migrated = 0
+        self.skipped = 0
+
+    @property
+    def marker_key(self) -> str:
+        return self.schema.meta("legacy_migrated")
+
+    @property
+    def lock_key(self) -> str:
+        return self.schema.meta("legacy_migration_lock")
+
+    def is_complete(self) -> bool:
+        try:
+            return bool(self.redis_client.exists(self.marker_key))
+        except Exception:
+            return False
+
+    def run(self) -> bool:
+        """Migrate all legacy keys. Returns False if another worker holds the lock."""
+        if self.is_complete():
+            return True
+        if not self.redis_client.set(self.lock_key, str(time.time()), nx=True, ex=self.lock_ttl):
+            return False
+
+        start = time.monotonic()
+        try:
+            for kind, key_type in self.LEGACY_TYPES.items():
+                # Other keys under these prefixes (v2 keys when state_key_prefix is one of them,
+                # other applications' keys) are never touched
+                for key in self.redis_client.scan_iter(match=f"{kind}:*", count=self.batch_size, _type=key_type):
+                    if self._target_key(key) is None:
+                        continue
+                    self._migrate_key(key)
+                    if self.migrated % self.batch_size == 0:
+                        # Keep the lock alive on long migrations
+                        self.redis_client.expire(self.lock_key, self.lock_ttl)
+            self._migrate_active_tickets()
+            self.redis_client.set(self.marker_key, str(int(time.time())))
+            logger.info(
+                f"✅ Redis key migration to v{self.schema.version} complete "
+                f"({self.migrated} migrated, {self.skipped} skipped, {time.monotonic() - start:.1f}s)"
+            )
+            return True
+        finally:
+            self.redis_client.delete(self.lock_key)
+
+    def _target_key(self, legacy_key: str) -> Optional[str]:
+        kind, _, identifier = legacy_key.partition(":")
+        if not identifier or ":" in identifier or "{" in identifier or "}" in identifier:
+            return None
+        if kind == "conversation":
+            return self.schema.conversation(identifier)
+        if kind == "context":
+            return self.schema.context(identifier)
+        if kind == "ticket_status":
+            return self.schema.ticket_status(identifier)
+        return None
+
+    def _migrate_key(self, legacy_key: str) -> None:
+        target = self._target_key(legacy_key)
+        if target is None:
+            self.skipped += 1
+            return
+
+        key_type = self.redis_client.type(legacy_key)
+        ttl_ms = self.redis_client.pttl(legacy_key)
+
+        # Source and target hash to different slots, so these are separate
+        # round trips rather than one transaction
+        if key_type == "list":
+            values = self.redis_client.lrange(legacy_key, 0, -1)
+            if values:
+                # Legacy entries are older than anything already under v2
+                self.redis_client.rpush(target, *values)
+        elif key_type == "string":
+            value = self.redis_client.get(legacy_key)
+            if value is not None:
+                self.redis_client.set(target, value, nx=True)
+        else:
+            self.skipped += 1
+            return
+
+        if ttl_ms and ttl_ms > 0:
+            self.redis_client.pexpire(target, ttl_ms)
+        self.redis_client.delete(legacy_key)
+        self.migrated += 1
+
+    def _migrate_active_tickets(self) -> None:
+        members = self.redis_client.smembers("active_tickets")
+        if members:
+            self.redis_client.sadd(self.schema.active_tickets(), *members)
+            self.migrated += 1
+        self.redis_client.delete("active_tickets")
+
+    async def run_until_complete(self, poll_seconds: float = 30.0) -> None:
+        """Background task: migrate, or wait for the worker that is migrating."""
+        while True:
+            try:
+                if await asyncio.to_thread(self.run):
+                    return
+            except Exception as e:
+                logger.error(f"❌ Redis key migration failed, will retry: {e}")
+            await asyncio.sleep(poll_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "schema_version": self.schema.version,
+            "complete": self.is_complete(),
+            "migrated": self.migrated,
+            "skipped": self.skipped,
+        }
+
+
+_key_schema: Optional[RedisKeySchema] = None
+
+
+def get_key_schema() -> RedisKeySchema:
+    """Get the process-wide key schema built from settings."""
+    global _key_schema
+
+    if _key_schema is None:
+        from config.settings import settings
+        _key_schema = RedisKeySchema(settings.state_key_prefix)
+
+    return _key_schema
@@ -0,0 +1,270 @@
+"""
+Unified Redis connection manager.
+
+Every subsystem that talks to Redis (conversation store, ticket service,
+webhook dedup cache) gets its clients from here so each worker holds one
+sized sync pool and one sized async pool instead of a pool per component.
+Pools are instrumented for utilization, checkout wait time and errors.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+from redis.cluster import RedisCluster
+from redis.asyncio.cluster import RedisCluster as AsyncRedisCluster
+
+from src.core.logging import get_logger
+
+logger = get_logger("redis_manager")
+
+
+class _PoolMetrics:
+    """Checkout counters shared by the sync and async pool wrappers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_out = set()
+        self.checkouts = 0
+        self.errors = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_in_use = 0
+
+    def checked_out(self, connection, wait_seconds: float) -> None:
+        with self._lock:
+            self._checked_out.add(id(connection))
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            if wait_seconds > self.max_wait_seconds:
+                self.max_wait_seconds = wait_seconds
+            in_use = len(self._checked_out)
+            if in_use > self.peak_in_use:
+                self.peak_in_use = in_use
+
+    def released(self, connection) -> None:
+        # Pools also release connections internally when a connect fails,
+        # so only count connections this wrapper handed out
+        with self._lock:
+            self._checked_out.discard(id(connection))
+
+    def failed(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self, max_connections: int) -> Dict[str, Any]:
+        with self._lock:
+            in_use = len(self._checked_out)
+            return {
+                "max_connections": max_connections,
+                "in_use": in_use,
+                "peak_in_use": self.peak_in_use,
+                "utilization": round(in_use / max_connections, 4) if max_connections else 0.0,
+                "checkouts": self.checkouts,
+                "errors": self.errors,
+                "avg_wait_ms": round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """Blocking sync pool that records checkout wait time and errors."""
+
+    def __init__(self, *args, **kwargs):
+        self.metrics = _PoolMetrics()
+        super().__init__(*args, **kwargs)
+
+    def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except Exception:
+            self.metrics.failed()
+            raise
+        self.metrics.checked_out(connection, time.perf_counter() - start)
+        return connection
+
+    def release(self, connection):
+        self.metrics.released(connection)
+        return super().release(connection)
+
+
+class InstrumentedAsyncConnectionPool(aioredis.BlockingConnectionPool):
+    """Blocking asyncio pool that records checkout wait time and errors."""
+
+    def __init__(self, *args, **kwargs):
+        self.metrics = _PoolMetrics()
+        super().__init__(*args, **kwargs)
+
+    async def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except Exception:
+            self.metrics.failed()
+            raise
+        self.metrics.checked_out(connection, time.perf_counter() - start)
+        return connection
+
+    async def release(self, connection):
+        self.metrics.released(connection)
+        return await super().release(connection)
+
+
+class RedisConnectionManager:
+    """Owns the per-process Redis pools and hands out clients."""
+
+    def __init__(
+        self,
+        redis_url: str,
+        max_connections: int = 20,
+        async_max_connections: int = 50,
+        pool_timeout: float = 2.0,
+        socket_timeout: float = 2.0,
+        socket_connect_timeout: float = 2.0,
+        health_check_interval: int = 30,
+        cluster_mode: bool = False,
+    ):
+        """
+        Initialize connection manager.
+
+        Args:
+            redis_url: Redis connection URL
+            max_connections: Size of the sync pool
+            async_max_connections: Size of the asyncio pool
+            pool_timeout: Seconds to wait for a free connection before erroring
+            socket_timeout: Redis socket timeout in seconds
+            socket_connect_timeout: Redis connect timeout in seconds
+            health_check_interval: Seconds between idle-connection health checks
+            cluster_mode: Connect to Redis Cluster (per-node pools managed by redis-py)
+        """
+        self.redis_url = redis_url
+        self.max_connections = max_connections
+        self.async_max_connections = async_max_connections
+        self.cluster_mode = cluster_mode
+        self._sync_pool = None
+        self._async_pool = None
+
+        connection_kwargs = dict(
+            decode_responses=True,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            health_check_interval=health_check_interval,
+        )
+
+        if cluster_mode:
+            # Keys are hash-tagged per session (see redis_keys), so pipelines
+            # and transactions stay on a single slot
+            self._sync_client = RedisCluster.from_url(
+                redis_url, max_connections=max_connections, **connection_kwargs
+            )
+            self._async_client = AsyncRedisCluster.from_url(
+                redis_url, max_connections=async_max_connections, **connection_kwargs
+            )
+            return
+
+        self._sync_pool = InstrumentedConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            **connection_kwargs,
+        )
+        self._async_pool = InstrumentedAsyncConnectionPool.from_url(
+            redis_url,
+            max_connections=async_max_connections,
+            timeout=pool_timeout,
+            **connection_kwargs,
+        )
+        self._sync_client = redis.Redis(connection_pool=self._sync_pool)
+        self._async_client = aioredis.Redis(connection_pool=self._async_pool)
+
+    def get_sync_client(self) -> redis.Redis:
+        """Get a sync client backed by the shared pool."""
+        return self._sync_client
+
+    def get_async_client(self) -> aioredis.Redis:
+        """Get an asyncio client backed by the shared pool."""
+        return self._async_client
+
+    async def ping(self) -> bool:
+        """Check connectivity through the async pool."""
+        try:
+            return bool(await self._async_client.ping())
+        except Exception as e:
+            logger.warning(f"Redis ping failed: {e}")
+            return False
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get utilization, wait time and error counters for both pools."""
+        if self.cluster_mode:
+            return {"mode": "cluster"}
+        return {
+            "sync": self._sync_pool.metrics.snapshot(self.max_connections),
+            "async": self._async_pool.metrics.snapshot(self.async_max_connections),
+        }
+
+    async def close(self) -> None:
+        """Disconnect both pools."""
+        try:
+            if self.cluster_mode:
+                await self._async_client.aclose()
+            else:
+                await self._async_pool.disconnect()
+        except Exception as e:
+            logger.warning(f"Error closing async Redis pool: {e}")
+        try:
+            if self.cluster_mode:
+                self._sync_client.close()
+            else:
+                self._sync_pool.disconnect()
+        except Exception as e:
+            logger.warning(f"Error closing sync Redis pool: {e}")
+        logger.info("Redis connection pools closed")
+
+
+# Global manager instance - created lazily or by the application startup hook
+_redis_manager: Optional[RedisConnectionManager] = None
+
+
+def get_redis_manager() -> RedisConnectionManager:
+    """Get or create the process-wide Redis connection manager."""
+    global _redis_manager
+
+    if _redis_manager is None:
+        from config.settings import settings
+        _redis_manager = RedisConnectionManager(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            async_max_connections=settings.redis_async_max_connections,
+            pool_timeout=settings.redis_pool_timeout,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_connect_timeout,
+            health_check_interval=settings.redis_health_check_interval,
+            cluster_mode=settings.redis_cluster_mode,
+        )
+
+    return _redis_manager
+
+
+async def init_redis_manager() -> RedisConnectionManager:
+    """Startup hook: create pools and verify connectivity."""
+    manager = get_redis_manager()
+    if await manager.ping():
+        logger.info(
+            f"✅ Redis connection manager ready "
+            f"(sync pool {manager.max_connections}, async pool {manager.async_max_connections})"
+        )
+    else:
+        logger.warning("⚠️ Redis unreachable at startup; clients will retry on use")
+    return manager
+
+
+async def close_redis_manager() -> None:
+    """Shutdown hook: release pooled connections."""
+    global _redis_manager
+
+    if _redis_manager is not None:
+        await _redis_manager.close()
+        _redis_manager = None
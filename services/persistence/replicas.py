@@ -0,0 +1,198 @@
+"""
+Read-replica routing.
+
+When ``DATABASE_REPLICA_URLS`` is set, ``DatabaseManager`` sessions route each
+statement through ``RoutingSession.get_bind()``:
+
+- flushes, INSERT/UPDATE/DELETE and everything inside ``unit_of_work`` go to
+  the primary;
+- reads issued by a repository method declared with ``@replica_read`` go to
+  a healthy replica, picked round-robin;
+- once the current request (asyncio task) has written, its reads stay on
+  the primary for ``DB_READ_YOUR_WRITES_SECONDS`` so replica lag cannot hide
+  its own writes.
+
+Only the outermost repository call decides: a replica-safe lookup called from
+inside a write method (read-modify-write) stays on the primary.
+
+A replica that fails to connect or drops a connection is skipped for
+``DB_REPLICA_COOLDOWN_SECONDS``; the statement that hit it still fails. Health checks also take out replicas that
+are unreachable or (PostgreSQL) lag more than ``DB_REPLICA_MAX_LAG_SECONDS``.
+"""
+
+import functools
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, text
+
+from src.core.logging import get_logger
+
+logger = get_logger("replicas")
+
+# Session.info key holding the manager's ReplicaSet
+REPLICA_SET_KEY = "replica_set"
+# Session.info flag: this session has written, so its reads must see the primary
+SESSION_WROTE_KEY = "wrote"
+
+_replica_reads_allowed: ContextVar[bool] = ContextVar("db_replica_reads_allowed", default=False)
+_last_write_at: ContextVar[Optional[float]] = ContextVar("db_last_write_at", default=None)
+
+# Replication delay: 0 while the replica has replayed everything it received
+_POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def replica_read(method):
+    """Declare a repository read that may be served by a replica (see ``instrument_repository``)."""
+    method.__replica_read__ = True
+    return method
+
+
+def replica_reads_allowed() -> bool:
+    return _replica_reads_allowed.get()
+
+
+def allow_replica_reads(allowed: bool):
+    """Set replica permission for the current context; returns a token for ``reset_replica_reads``."""
+    return _replica_reads_allowed.set(allowed)
+
+
+def reset_replica_reads(token) -> None:
+    _replica_reads_allowed.reset(token)
+
+
+def mark_write() -> None:
+    """Record that the current request wrote to the primary."""
+    _last_write_at.set(time.monotonic())
+
+
+def recently_wrote(window_seconds: float) -> bool:
+    last = _last_write_at.get()
+    return last is not None and time.monotonic() - last < window_seconds
+
+
+class Replica:
+    """One replica engine and its health state."""
+
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.sync_engine = engine.sync_engine
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def available(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "healthy": self.available(time.monotonic()),
+            "reads": self.reads,
+            "failures": self.failures,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """Round-robin, health-aware choice among read replicas."""
+
+    def __init__(
+        self,
+        engines: List[Any],
+        cooldown_seconds: float = 30.0,
+        max_lag_seconds: float = 10.0,
+        read_your_writes_seconds: float = 5.0,
+    ):
+        """
+        Initialize replica set.
+
+        Args:
+            engines: AsyncEngine per replica
+            cooldown_seconds: How long a failed replica is skipped
+            max_lag_seconds: Health checks take out replicas lagging more than this
+            read_your_writes_seconds: Reads stay on the primary this long after a write
+        """
+        self.replicas = [
+            Replica(engine.url.render_as_string(hide_password=True), engine)
+            for engine in engines
+        ]
+        self.cooldown_seconds = cooldown_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.primary_fallbacks = 0
+        self._next = itertools.count()
+
+        for replica in self.replicas:
+            event.listen(replica.sync_engine, "handle_error", functools.partial(self._on_error, replica))
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """Next available replica, or None if all are down (caller uses the primary)."""
+        now = time.monotonic()
+        count = len(self.replicas)
+        start = next(self._next)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if replica.available(now):
+                replica.reads += 1
+                return replica
+        self.primary_fallbacks += 1
+        return None
+
+    def mark_down(self, replica: Replica, reason: str) -> None:
+        replica.down_until = time.monotonic() + self.cooldown_seconds
+        replica.failures += 1
+        replica.last_error = reason
+        logger.warning(
+            f"⚠️ Read replica unavailable, skipping for {self.cooldown_seconds:.0f}s",
+            replica=replica.name,
+            reason=reason,
+        )
+
+    def _on_error(self, replica: Replica, context) -> None:
+        # Connection failures arrive without a Connection; drops are flagged as disconnects
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(replica, str(context.original_exception)[:200])
+
+    async def check(self) -> List[Dict[str, Any]]:
+        """Probe every replica, taking out unreachable or lagging ones and restoring recovered ones."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                    if replica.engine.dialect.name == "postgresql":
+                        replica.lag_seconds = float(await conn.scalar(_POSTGRES_LAG_SQL))
+            except Exception as e:
+                # Connection failures are already marked by the handle_error listener
+                if replica.available(time.monotonic()):
+                    self.mark_down(replica, str(e)[:200])
+                continue
+
+            if replica.lag_seconds is not None and replica.lag_seconds > self.max_lag_seconds:
+                self.mark_down(replica, f"replication lag {replica.lag_seconds:.1f}s")
+            elif not replica.available(time.monotonic()):
+                replica.down_until = 0.0
+                logger.info(f"✅ Read replica recovered", replica=replica.name)
+        return [replica.to_dict() for replica in self.replicas]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [replica.to_dict() for replica in self.replicas],
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+    async def close(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
@@ -1,29 +1,44 @@
 """
 Repository pattern for database operations.
 Provides clean interface for customer data, bookings, and test catalog operations.
+
+Write methods commit per call on plain sessions. Inside ``unit_of_work()``
+they only flush and the scope commits once.
 """
 
+import base64
+import json
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from decimal import Decimal
 
 import structlog
-from sqlalchemy import select, update, delete, and_, or_, func
+from sqlalchemy import select, insert, update, delete, and_, or_, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from .database import (
     CustomerProfile, PropertyAssessmentService, PropertyAssessmentRequest, MessageHistory,
-    Property, PropertyOwner, TaxAssessment, Appeal, Payment, TaxBill
+    Property, PropertyOwner, TaxAssessment, Appeal, Payment, TaxBill,
+    save_changes, discard_changes
 )
 from src.core.logging import get_logger
+from .query_metrics import instrument_repository
+from .replicas import replica_read
+from .statements import CUSTOMER_BY_WHATSAPP_ID, REQUEST_BY_REQUEST_ID, THREAD_HISTORY
 
 customer_logger = get_logger("customer_repository")
 service_logger = get_logger("property_assessment_service_repository")
 request_logger = get_logger("property_assessment_request_repository")
 message_logger = get_logger("message_history_repository")
+property_logger = get_logger("property_repository")
+owner_logger = get_logger("property_owner_repository")
 
 
+@instrument_repository
 class CustomerRepository:
     """Repository for customer profile operations."""
     
@@ -31,24 +46,32 @@ class CustomerRepository:
         self.session = session
         self.logger = customer_logger
     
-    async def get_by_whatsapp_id(self, whatsapp_id: str) -> Optional[CustomerProfile]:
-        """Get customer by WhatsApp ID."""
+    @replica_read
+    async def get_by_whatsapp_id(self, whatsapp_id: str, *loader_options) -> Optional[CustomerProfile]:
+        """
+        Get customer by WhatsApp ID.
+        
+        Relationships are not loaded unless requested, e.g.
+        ``get_by_whatsapp_id(wa_id, selectinload(CustomerProfile.assessment_requests))``.
+        """
         try:
-            result = await self.session.execute(
-                select(CustomerProfile)
-                .where(CustomerProfile.whatsapp_id == whatsapp_id)
-                .options(selectinload(CustomerProfile.assessment_requests))
-            )
+            if loader_options:
+                stmt = CUSTOMER_BY_WHATSAPP_ID.options(*loader_options)
+            else:
+                stmt = CUSTOMER_BY_WHATSAPP_ID
+            result = await self.session.execute(stmt, {"whatsapp_id": whatsapp_id})
             return result.scalar_one_or_none()
         except Exception as e:
             self.logger.error(f"Failed to get customer by WhatsApp ID: {e}")
             return None
 
     # Backwards compatibility method - will be removed
+    @replica_read
     async def get_by_instagram_id(self, instagram_id: str) -> Optional[CustomerProfile]:
         """Get customer by Instagram ID (legacy method for backwards compatibility)."""
         return await self.get_by_whatsapp_id(instagram_id)
     
+    @replica_read
     async def get_by_phone(self, phone: str) -> Optional[CustomerProfile]:
         """Get customer by phone number."""
         try:
@@ -80,8 +103,7 @@ class CustomerRepository:
                 existing.last_interaction = datetime.utcnow()
                 existing.conversation_count += 1
 
-                await self.session.commit()
-                await self.session.refresh(existing)
+                await save_changes(self.session, existing)
 
                 self.logger.info(f"Property tax customer updated: {whatsapp_id}")
                 return existing
@@ -96,17 +118,120 @@ class CustomerRepository:
                 )
 
                 self.session.add(new_customer)
-                await self.session.commit()
-                await self.session.refresh(new_customer)
+                await save_changes(self.session, new_customer)
 
                 self.logger.info(f"Property tax customer created: {whatsapp_id}")
                 return new_customer
 
         except Exception as e:
-            await self.session.rollback()
+            await discard_changes(self.session)
             self.logger.error(f"Failed to create/update customer: {e}")
             raise
 
+    async def upsert_interaction(
+        self,
+        whatsapp_id: str,
+        defaults: Optional[Dict[str, Any]] = None,
+        **profile_data
+    ) -> int:
+        """
+        Record a customer interaction in a single statement.
+        
+        ``INSERT ... ON CONFLICT (whatsapp_id) DO UPDATE`` creates the profile
+        or bumps ``conversation_count`` and ``last_interaction``, and returns
+        only the id (no SELECT, no refresh). Backends without ``ON CONFLICT``
+        support get a SELECT followed by an INSERT or UPDATE.
+        
+        Args:
+            whatsapp_id: Customer WhatsApp ID
+            defaults: Values used only when the profile is created
+            **profile_data: Values written on create and update (None values are ignored)
+        
+        Returns:
+            Customer profile id
+        """
+        updates = {key: value for key, value in profile_data.items() if value is not None}
+        now = datetime.utcnow()
+        
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            insert_fn = pg_insert
+        elif dialect == "sqlite":
+            insert_fn = sqlite_insert
+        else:
+            return await self._select_then_upsert(whatsapp_id, defaults, updates, now)
+        
+        stmt = insert_fn(CustomerProfile).values(
+            whatsapp_id=whatsapp_id,
+            last_interaction=now,
+            conversation_count=1,
+            **{**(defaults or {}), **updates}
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CustomerProfile.whatsapp_id],
+            set_={
+                "last_interaction": stmt.excluded.last_interaction,
+                "conversation_count": CustomerProfile.conversation_count + 1,
+                "updated_at": func.now(),
+                **{key: stmt.excluded[key] for key in updates},
+            }
+        ).returning(CustomerProfile.id)
+        
+        try:
+            result = await self.session.execute(stmt)
+            customer_id = result.scalar_one()
+            await save_changes(self.session)
+            return customer_id
+            
+        except Exception as e:
+            await discard_changes(self.session)
+            self.logger.error(f"Failed to upsert customer interaction: {e}")
+            raise
+
+    async def _select_then_upsert(
+        self,
+        whatsapp_id: str,
+        defaults: Optional[Dict[str, Any]],
+        updates: Dict[str, Any],
+        now: datetime
+    ) -> int:
+        """``upsert_interaction`` for backends without ``ON CONFLICT``: two statements instead of one."""
+        by_whatsapp_id = select(CustomerProfile.id).where(CustomerProfile.whatsapp_id == whatsapp_id)
+        try:
+            customer_id = await self.session.scalar(by_whatsapp_id)
+            if customer_id is None:
+                try:
+                    # Savepoint: losing a race with a concurrent insert must not roll back the caller's work
+                    async with self.session.begin_nested():
+                        result = await self.session.execute(insert(CustomerProfile).values(
+                            whatsapp_id=whatsapp_id,
+                            last_interaction=now,
+                            conversation_count=1,
+                            **{**(defaults or {}), **updates}
+                        ))
+                    await save_changes(self.session)
+                    return result.inserted_primary_key[0]
+                except IntegrityError:
+                    customer_id = await self.session.scalar(by_whatsapp_id)
+            
+            await self.session.execute(
+                update(CustomerProfile)
+                .where(CustomerProfile.id == customer_id)
+                .values(
+                    last_interaction=now,
+                    conversation_count=CustomerProfile.conversation_count + 1,
+                    updated_at=func.now(),
+                    **updates
+                )
+            )
+            await save_changes(self.session)
+            return customer_id
+            
+        except Exception as e:
+            await discard_changes(self.session)
+            self.logger.error(f"Failed to upsert customer interaction: {e}")
+            raise
+
     async def update_property_info(
         self,
         whatsapp_id: str,
@@ -137,17 +262,17 @@ class CustomerRepository:
             if county is not None:
                 customer.county = county
 
-            await self.session.commit()
-            await self.session.refresh(customer)
+            await save_changes(self.session, customer)
 
             self.logger.info(f"Property info updated for customer: {whatsapp_id}")
             return customer
 
         except Exception as e:
-            await self.session.rollback()
+            await discard_changes(self.session)
             self.logger.error(f"Failed to update property info: {e}")
             return None
     
+    @replica_read
     async def get_recent_customers(self, limit: int = 50) -> List[CustomerProfile]:
         """Get recently active customers."""
         try:
@@ -161,6 +286,7 @@ class CustomerRepository:
             self.logger.error(f"Failed to get recent customers: {e}")
             return []
     
+    @replica_read
     async def get_by_id(self, customer_id: int) -> Optional[CustomerProfile]:
         """Get customer by ID."""
         try:
@@ -170,6 +296,7 @@ class CustomerRepository:
             return None
 
 
+@instrument_repository
 class PropertyAssessmentServiceRepository:
     """Repository for property assessment service operations."""
 
@@ -177,6 +304,7 @@ class PropertyAssessmentServiceRepository:
         self.session = session
         self.logger = service_logger
 
+    @replica_read
     async def search_services(
         self,
         query: str,
@@ -219,6 +347,7 @@ class PropertyAssessmentServiceRepository:
             self.logger.error(f"Failed to search services: {e}")
             return []
 
+    @replica_read
     async def get_by_code(self, service_code: str) -> Optional[PropertyAssessmentService]:
         """Get service by service code."""
         try:
@@ -231,6 +360,7 @@ class PropertyAssessmentServiceRepository:
             self.logger.error(f"Failed to get service by code: {e}")
             return None
 
+    @replica_read
     async def get_by_category(self, category: str) -> List[PropertyAssessmentService]:
         """Get all services in a category."""
         try:
@@ -249,6 +379,7 @@ class PropertyAssessmentServiceRepository:
             self.logger.error(f"Failed to get services by category: {e}")
             return []
 
+    @replica_read
     async def get_applicable_for_property_type(
         self,
         property_type: str,
@@ -273,6 +404,7 @@ class PropertyAssessmentServiceRepository:
             return []
 
 
+@instrument_repository
 class PropertyAssessmentRequestRepository:
     """Repository for property assessment request operations."""
 
@@ -315,33 +447,27 @@ class PropertyAssessmentRequestRepository:
             )
 
             self.session.add(request)
-            await self.session.commit()
-            await self.session.refresh(request)
+            await save_changes(self.session, request)
 
             self.logger.info(f"Property assessment request created: {request_id}")
             return request
 
         except Exception as e:
-            await self.session.rollback()
+            await discard_changes(self.session)
             self.logger.error(f"Failed to create request: {e}")
             raise
 
+    @replica_read
     async def get_by_request_id(self, request_id: str) -> Optional[PropertyAssessmentRequest]:
         """Get request by request ID."""
         try:
-            result = await self.session.execute(
-                select(PropertyAssessmentRequest)
-                .options(
-                    selectinload(PropertyAssessmentRequest.customer),
-                    selectinload(PropertyAssessmentRequest.service)
-                )
-                .where(PropertyAssessmentRequest.request_id == request_id)
-            )
+            result = await self.session.execute(REQUEST_BY_REQUEST_ID, {"request_id": request_id})
             return result.scalar_one_or_none()
         except Exception as e:
             self.logger.error(f"Failed to get request: {e}")
             return None
 
+    @replica_read
     async def get_customer_requests(
         self,
         customer_id: int,
@@ -397,17 +523,17 @@ class PropertyAssessmentRequestRepository:
             if assigned_to is not None:
                 request.assigned_to = assigned_to
 
-            await self.session.commit()
-            await self.session.refresh(request)
+            await save_changes(self.session, request)
 
             self.logger.info(f"Request status updated: {request_id} -> {status}")
             return request
 
         except Exception as e:
-            await self.session.rollback()
+            await discard_changes(self.session)
             self.logger.error(f"Failed to update request status: {e}")
             return None
 
+    @replica_read
     async def get_all_requests(self, limit: int = 50) -> List[PropertyAssessmentRequest]:
         """Get all requests with optional limit."""
         try:
@@ -425,6 +551,7 @@ class PropertyAssessmentRequestRepository:
             self.logger.error(f"Failed to get all requests: {e}")
             return []
 
+    @replica_read
     async def get_requests_by_property(
         self,
         property_parcel_id: str,
@@ -448,6 +575,23 @@ class PropertyAssessmentRequestRepository:
             return []
 
 
+def encode_history_cursor(message_timestamp: datetime, message_id: int) -> str:
+    """Opaque keyset cursor for a message position."""
+    raw = json.dumps([message_timestamp.isoformat(), message_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from ``encode_history_cursor``; raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, message_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except Exception as e:
+        raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+
+
+@instrument_repository
 class MessageHistoryRepository:
     """Repository for message history operations."""
     
@@ -498,16 +642,49 @@ class MessageHistoryRepository:
             )
             
             self.session.add(message)
-            await self.session.commit()
-            await self.session.refresh(message)
+            await save_changes(self.session, message)
             
             return message
             
         except Exception as e:
-            await self.session.rollback()
+            await discard_changes(self.session)
             self.logger.error(f"Failed to save message: {e}")
             raise
     
+    async def save_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Bulk insert messages in a single executemany.
+        
+        Each dict takes the same keys as ``save_message``. Rows are not
+        refreshed or returned, so no SELECT follows the insert.
+        
+        Returns:
+            Number of rows inserted
+        """
+        if not messages:
+            return 0
+        
+        now = datetime.utcnow()
+        rows = [
+            {**message, "message_timestamp": message.get("message_timestamp") or now}
+            for message in messages
+        ]
+        # executemany needs the same columns in every row
+        batches: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in rows:
+            batches.setdefault(frozenset(row), []).append(row)
+        try:
+            for batch in batches.values():
+                await self.session.execute(insert(MessageHistory), batch)
+            await save_changes(self.session)
+            return len(rows)
+            
+        except Exception as e:
+            await discard_changes(self.session)
+            self.logger.error(f"Failed to save {len(rows)} messages: {e}")
+            raise
+    
+    @replica_read
     async def get_conversation_history(
         self,
         customer_id: int,
@@ -517,17 +694,293 @@ class MessageHistoryRepository:
         """Get conversation history for a customer and thread."""
         try:
             result = await self.session.execute(
-                select(MessageHistory)
-                .where(
-                    and_(
-                        MessageHistory.customer_id == customer_id,
-                        MessageHistory.thread_id == thread_id
-                    )
-                )
-                .order_by(MessageHistory.message_timestamp.desc())
-                .limit(limit)
+                THREAD_HISTORY, {"customer_id": customer_id, "thread_id": thread_id, "limit": limit}
             )
             return list(reversed(list(result.scalars().all())))  # Return chronological order
         except Exception as e:
             self.logger.error(f"Failed to get conversation history: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    # Columns that can be requested through field projection
+    HISTORY_FIELDS = frozenset(column.name for column in MessageHistory.__table__.columns)
+    
+    @replica_read
+    async def get_history_page(
+        self,
+        customer_id: int,
+        thread_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        direction: str = "older",
+        fields: Optional[Sequence[str]] = None,
+        include_archived: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Keyset-paginated thread history.
+        
+        Pages walk the ``idx_message_thread_keyset`` index from a ``(timestamp, id)``
+        cursor, so every page costs O(limit) regardless of depth.
+        
+        Args:
+            customer_id: Customer profile id
+            thread_id: Conversation thread id
+            limit: Page size
+            cursor: Position to page from (exclusive); omit for the newest ("older")
+                or oldest ("newer") page
+            direction: "older" pages back in time, "newer" pages forward
+            fields: Columns to return; ``id`` and ``message_timestamp`` are always included
+            include_archived: Continue into months moved to the message archive
+                (services.persistence.message_archive), which precede all hot rows
+        
+        Returns:
+            Dict with chronologically ordered ``messages`` plus ``older_cursor``
+            (None at the start of the thread) and ``newer_cursor``, always the
+            newest returned row (or the request cursor when a "newer" page is
+            empty) so clients can poll it for new messages
+        
+        Raises:
+            ValueError: Unknown direction or field, or malformed cursor
+        """
+        if direction not in ("older", "newer"):
+            raise ValueError(f"Invalid direction: {direction!r}")
+        
+        if fields:
+            unknown = set(fields) - self.HISTORY_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            names = ["id", "message_timestamp"] + [f for f in fields if f not in ("id", "message_timestamp")]
+        else:
+            names = [column.name for column in MessageHistory.__table__.columns]
+        columns = [MessageHistory.__table__.c[name] for name in names]
+        
+        position = decode_history_cursor(cursor) if cursor else None
+        archive = None
+        if include_archived:
+            from .message_archive import get_message_archive
+            archive = get_message_archive()
+        
+        # Rows are collected nearest-first; one extra row tells whether another page exists
+        rows: List[Dict[str, Any]] = []
+        if archive is not None and direction == "newer":
+            rows = archive.read_thread(customer_id, thread_id, limit + 1, "newer", position)
+            if rows:
+                position = (rows[-1]["message_timestamp"], rows[-1]["id"])
+        
+        if len(rows) <= limit:
+            order = (MessageHistory.message_timestamp, MessageHistory.id)
+            stmt = select(*columns).where(
+                MessageHistory.customer_id == customer_id,
+                MessageHistory.thread_id == thread_id
+            )
+            if position:
+                if direction == "older":
+                    stmt = stmt.where(tuple_(*order) < tuple_(*position))
+                else:
+                    stmt = stmt.where(tuple_(*order) > tuple_(*position))
+        
+            if direction == "older":
+                stmt = stmt.order_by(MessageHistory.message_timestamp.desc(), MessageHistory.id.desc())
+            else:
+                stmt = stmt.order_by(MessageHistory.message_timestamp.asc(), MessageHistory.id.asc())
+        
+            result = await self.session.execute(stmt.limit(limit + 1 - len(rows)))
+            rows.extend(dict(row._mapping) for row in result)
+        
+        if archive is not None and direction == "older" and len(rows) <= limit:
+            if rows:
+                position = (rows[-1]["message_timestamp"], rows[-1]["id"])
+            rows.extend(archive.read_thread(customer_id, thread_id, limit + 1 - len(rows), "older", position))
+        
+        if archive is not None:
+            rows = [{name: row.get(name) for name in names} for row in rows]
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if direction == "older":
+            rows.reverse()
+        
+        older_cursor = None
+        newer_cursor = cursor if direction == "newer" else None
+        if rows:
+            first = encode_history_cursor(rows[0]["message_timestamp"], rows[0]["id"])
+            if direction == "older":
+                older_cursor = first if has_more else None
+            else:
+                older_cursor = first if cursor else None
+            # Messages keep arriving, so there is always a newer position to poll from
+            newer_cursor = encode_history_cursor(rows[-1]["message_timestamp"], rows[-1]["id"])
+        
+        return {
+            "messages": rows,
+            "older_cursor": older_cursor,
+            "newer_cursor": newer_cursor,
+        }
+
+
+@instrument_repository
+class PropertyRepository:
+    """Repository for property lookups."""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.logger = property_logger
+    
+    @replica_read
+    async def get_by_parcel_id(self, parcel_id: str) -> Optional[Property]:
+        """Get property by appraisal district parcel ID."""
+        try:
+            result = await self.session.execute(select(Property).where(Property.parcel_id == parcel_id))
+            return result.scalar_one_or_none()
+        except Exception as e:
+            self.logger.error(f"Failed to get property by parcel ID: {e}")
+            return None
+    
+    @replica_read
+    async def search_by_address(
+        self,
+        query: str,
+        zip_code: Optional[str] = None,
+        county: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Find properties from a typed address (services.property_data.address_index).
+        
+        Args:
+            query: Address as typed, e.g. "123 main st houston"
+            zip_code: Only properties in this zip code
+            county: Only properties in this county
+            limit: Maximum results
+        
+        Returns:
+            Best matches first: parcel_id, street_address, city, zip_code, county,
+            property_type, score and match ("prefix" or "fuzzy")
+        """
+        from services.property_data.address_index import get_address_index
+        
+        matches = get_address_index().search(query, zip_code=zip_code, county=county, limit=limit)
+        if not matches:
+            return []
+        result = await self.session.execute(
+            select(
+                Property.id, Property.parcel_id, Property.street_address, Property.city,
+                Property.zip_code, Property.county, Property.property_type
+            ).where(Property.id.in_([match["property_id"] for match in matches]))
+        )
+        rows = {row.id: row for row in result}
+        
+        properties = []
+        for match in matches:
+            row = rows.get(match["property_id"])
+            if row is None:  # removed since the index was built
+                continue
+            properties.append({
+                "property_id": row.id,
+                "parcel_id": row.parcel_id,
+                "street_address": row.street_address,
+                "city": row.city,
+                "zip_code": row.zip_code,
+                "county": row.county,
+                "property_type": row.property_type.value if row.property_type else None,
+                "score": match["score"],
+                "match": match["match"],
+            })
+        return properties
+
+
+@instrument_repository
+class PropertyOwnerRepository:
+    """Repository for property owner lookups."""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.logger = owner_logger
+    
+    @replica_read
+    async def search_by_name(
+        self,
+        query: str,
+        zip_code: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Find owners from a typed name (services.property_data.owner_resolution).
+        
+        Every spelling of an owner counts as one resolved owner.
+        
+        Args:
+            query: Name as typed, e.g. "acme holdings llc" or "john smith"
+            zip_code: Only owners with this mailing zip code
+            limit: Maximum results
+        
+        Returns:
+            Best matches first: owner_id (the resolved owner), name, owner_type,
+            mailing_city, mailing_zip, spellings (owner records resolved to it),
+            properties, total_assessed_value and total_annual_tax (current
+            portfolio across those records), score and match
+        """
+        from services.property_data.owner_resolution import get_owner_index
+        
+        matches = get_owner_index().search(query, zip_code=zip_code, limit=limit)
+        if not matches:
+            return []
+        ids = [match["owner_id"] for match in matches]
+        result = await self.session.execute(select(PropertyOwner).where(PropertyOwner.id.in_(ids)))
+        owners = {owner.id: owner for owner in result.scalars()}
+        
+        # Portfolio totals are maintained per owner record (services.property_data.owner_portfolio)
+        resolved = func.coalesce(PropertyOwner.resolved_owner_id, PropertyOwner.id)
+        result = await self.session.execute(
+            select(
+                resolved,
+                func.count(),
+                func.sum(PropertyOwner.total_properties_owned),
+                func.sum(PropertyOwner.total_assessed_value),
+                func.sum(PropertyOwner.total_annual_tax),
+            )
+            .where(or_(
+                PropertyOwner.resolved_owner_id.in_(ids),
+                and_(PropertyOwner.resolved_owner_id.is_(None), PropertyOwner.id.in_(ids)),
+            ))
+            .group_by(resolved)
+        )
+        counts = {row[0]: tuple(row[1:]) for row in result}
+        
+        found = []
+        for match in matches:
+            owner = owners.get(match["owner_id"])
+            if owner is None:  # removed since the index was built
+                continue
+            spellings, properties, assessed_value, annual_tax = counts.get(owner.id, (1, 0, 0, 0))
+            found.append({
+                "owner_id": owner.id,
+                "name": owner.business_name or " ".join(filter(None, (owner.first_name, owner.last_name))),
+                "owner_type": "business" if owner.business_name else "individual",
+                "mailing_city": owner.mailing_city,
+                "mailing_zip": owner.mailing_zip,
+                "spellings": spellings,
+                "properties": properties,
+                "total_assessed_value": float(assessed_value or 0),
+                "total_annual_tax": float(annual_tax or 0),
+                "score": match["score"],
+                "match": match["match"],
+            })
+        return found
+    
+    @replica_read
+    async def get_portfolio(self, owner_id: int, resolved: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        An owner's current portfolio from the stored totals (services.property_data.owner_portfolio).
+        
+        Args:
+            owner_id: Owner record id
+            resolved: Sum over every spelling resolved to the same owner
+        
+        Returns:
+            owner_id, spellings, total_properties_owned, total_assessed_value
+            and total_annual_tax, or None for an unknown owner
+        """
+        from services.property_data.owner_portfolio import portfolio
+        
+        connection = await self.session.connection()
+        return await portfolio(connection, owner_id, resolved=resolved)
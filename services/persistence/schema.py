@@ -0,0 +1,185 @@
+"""
+Schema versioning.
+
+The schema is owned by alembic migrations in ``services/persistence/migrations``.
+Workers never create or alter tables: on startup they read the single row of
+``alembic_version`` and compare it with the head revision of the migration
+scripts, so boot time does not depend on the number of tables.
+
+Migrations are applied out of band::
+
+    python -m services.persistence.schema upgrade        # apply pending migrations
+    python -m services.persistence.schema current        # show database revision
+    python -m services.persistence.schema check          # exit 1 if not at head
+    python -m services.persistence.schema revision -m "add foo"   # autogenerate
+
+A database created by the old ``create_all`` startup path has tables but no
+``alembic_version``; ``upgrade`` stamps it at the baseline revision first.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from sqlalchemy import inspect, text
+
+from src.core.logging import get_logger
+
+logger = get_logger("schema")
+
+# First revision, matching the tables the pre-migration create_all produced
+BASELINE_REVISION = "0001"
+
+_ALEMBIC_INI = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini"))
+
+
+class SchemaVersionError(RuntimeError):
+    """Database schema is not at the revision this code expects."""
+
+
+def _alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(_ALEMBIC_INI)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def get_head_revision() -> Optional[str]:
+    """Head revision of the migration scripts (reads files only, no database access)."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+async def get_database_revision(engine) -> Optional[str]:
+    """Revision recorded in ``alembic_version``, or None if the table is missing."""
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return result.scalar_one_or_none()
+    except Exception:
+        return None
+
+
+async def verify_schema(engine) -> Dict[str, Any]:
+    """
+    Startup check: one query against ``alembic_version``.
+
+    Raises:
+        SchemaVersionError: Database is not at the head revision
+    """
+    head = get_head_revision()
+    current = await get_database_revision(engine)
+    status = {"current": current, "head": head, "up_to_date": current == head}
+
+    if current != head:
+        raise SchemaVersionError(
+            f"Database schema is at {current or 'no revision'}, code expects {head}. "
+            f"Run: python -m services.persistence.schema upgrade"
+        )
+    return status
+
+
+def _upgrade(connection, revision: str) -> None:
+    from alembic import command
+
+    config = _alembic_config(connection)
+    tables = set(inspect(connection).get_table_names())
+    if "alembic_version" not in tables and "customer_profiles" in tables:
+        # Created by create_all before migrations existed
+        logger.info(f"📌 Adopting existing schema at baseline revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+
+async def apply_migrations(engine, revision: str = "head") -> None:
+    """Upgrade using an existing engine (development: ``DB_AUTO_MIGRATE=true``)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade, revision)
+
+
+def _run(connection, action: str, **kwargs) -> None:
+    from alembic import command
+
+    config = _alembic_config(connection)
+    getattr(command, action)(config, **kwargs)
+
+
+async def _with_connection(fn, *args, **kwargs) -> None:
+    from config.settings import settings
+    from sqlalchemy import pool
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from services.persistence.database import normalize_database_url
+
+    engine = create_async_engine(normalize_database_url(settings.database_url), poolclass=pool.NullPool)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(fn, *args, **kwargs)
+    finally:
+        await engine.dispose()
+
+
+async def _check() -> int:
+    from config.settings import settings
+    from sqlalchemy import pool
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from services.persistence.database import normalize_database_url
+
+    engine = create_async_engine(normalize_database_url(settings.database_url), poolclass=pool.NullPool)
+    try:
+        status = await verify_schema(engine)
+        print(f"✅ Schema up to date at {status['head']}")
+        return 0
+    except SchemaVersionError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upgrade = subparsers.add_parser("upgrade", help="Apply migrations")
+    upgrade.add_argument("revision", nargs="?", default="head")
+    downgrade = subparsers.add_parser("downgrade", help="Revert migrations")
+    downgrade.add_argument("revision")
+    subparsers.add_parser("current", help="Show the database revision")
+    subparsers.add_parser("history", help="List migrations")
+    subparsers.add_parser("check", help="Exit 1 if the database is not at head")
+    stamp = subparsers.add_parser("stamp", help="Record a revision without running migrations")
+    stamp.add_argument("revision")
+    revision = subparsers.add_parser("revision", help="Autogenerate a new migration")
+    revision.add_argument("-m", "--message", required=True)
+    revision.add_argument("--rev-id", help="Revision id (e.g. 0002); random if omitted")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        return asyncio.run(_check())
+    if args.command == "history":
+        from alembic import command
+        command.history(_alembic_config())
+        return 0
+    if args.command == "upgrade":
+        asyncio.run(_with_connection(_upgrade, args.revision))
+    elif args.command == "downgrade":
+        asyncio.run(_with_connection(_run, "downgrade", revision=args.revision))
+    elif args.command == "current":
+        asyncio.run(_with_connection(_run, "current", verbose=True))
+    elif args.command == "stamp":
+        asyncio.run(_with_connection(_run, "stamp", revision=args.revision))
+    elif args.command == "revision":
+        asyncio.run(_with_connection(
+            _run, "revision", message=args.message, autogenerate=True, rev_id=args.rev_id
+        ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
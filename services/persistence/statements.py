@@ -0,0 +1,62 @@
+"""
+Precompiled hot-path statements.
+
+Lookups on the per-message path run the same query shape thousands of times
+a minute. Building ``select()`` per call costs construct time plus a cache
+key walk (roughly 50-150us of CPU each); the statements below are built
+once at import with bound parameters instead. SQLAlchemy memoizes the cache
+key on the statement object, so executing one goes straight to the engine's
+compiled-SQL cache.
+
+Execute with the named parameters::
+
+    await session.execute(CUSTOMER_BY_WHATSAPP_ID, {"whatsapp_id": wa_id})
+
+The hot-path set below is a stable API: names, parameters and result shapes
+only change together with every caller. Add a statement only when it is on
+the hot path and its shape is fixed; queries with optional filters stay
+inline in the repositories.
+
+    CUSTOMER_BY_WHATSAPP_ID  (whatsapp_id)                    CustomerRepository.get_by_whatsapp_id
+    REQUEST_BY_REQUEST_ID    (request_id)                     PropertyAssessmentRequestRepository.get_by_request_id
+    THREAD_HISTORY           (customer_id, thread_id, limit)  MessageHistoryRepository.get_conversation_history
+    TICKET_BY_TICKET_ID      (ticket_id)                      TicketService.get_ticket
+
+``TICKET_BY_TICKET_ID`` is defined in ``services.ticket_management.ticket_service``
+so that this module does not import the ticket package.
+"""
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import selectinload
+
+from .database import CustomerProfile, MessageHistory, PropertyAssessmentRequest
+
+CUSTOMER_BY_WHATSAPP_ID = (
+    select(CustomerProfile)
+    .where(CustomerProfile.whatsapp_id == bindparam("whatsapp_id"))
+)
+
+REQUEST_BY_REQUEST_ID = (
+    select(PropertyAssessmentRequest)
+    .options(
+        selectinload(PropertyAssessmentRequest.customer),
+        selectinload(PropertyAssessmentRequest.service)
+    )
+    .where(PropertyAssessmentRequest.request_id == bindparam("request_id"))
+)
+
+THREAD_HISTORY = (
+    select(MessageHistory)
+    .where(
+        MessageHistory.customer_id == bindparam("customer_id"),
+        MessageHistory.thread_id == bindparam("thread_id")
+    )
+    .order_by(MessageHistory.message_timestamp.desc(), MessageHistory.id.desc())
+    .limit(bindparam("limit"))
+)
+
+__all__ = [
+    "CUSTOMER_BY_WHATSAPP_ID",
+    "REQUEST_BY_REQUEST_ID",
+    "THREAD_HISTORY",
+]
@@ -0,0 +1,89 @@
+"""
+Appraisal roll data: bulk loading of county rolls into properties, owners
+and assessments, batch computations over them and search indexes built from
+them.
+"""
+
+from .address_index import (
+    AddressIndex,
+    AddressIndexBuilder,
+    get_address_index,
+    normalize_address,
+)
+from .appeal_scoring import (
+    AppealScorer,
+    top_opportunities,
+)
+from .comps import (
+    CompsIndex,
+    CompsIndexBuilder,
+    get_comps_index,
+)
+from .homestead_cap import (
+    HomesteadCapEngine,
+    compute_caps,
+    reference_caps,
+)
+from .importer import (
+    ImportBatch,
+    RollImporter,
+    RollLayout,
+    register_import_hook,
+    register_load_hook,
+    register_reprice_hook,
+)
+from .owner_portfolio import (
+    OwnerPortfolio,
+    reconcile_portfolios,
+)
+from .owner_resolution import (
+    OwnerIndex,
+    OwnerResolver,
+    get_owner_index,
+    normalize_owner_name,
+)
+from .rate_stack import (
+    RateStack,
+    price_assessments,
+)
+from .ratio_study import (
+    RatioStudy,
+)
+from .tax_engine import (
+    TaxEngine,
+    compute_taxes,
+    reference_tax,
+)
+
+__all__ = [
+    "AddressIndex",
+    "AddressIndexBuilder",
+    "get_address_index",
+    "normalize_address",
+    "AppealScorer",
+    "top_opportunities",
+    "CompsIndex",
+    "CompsIndexBuilder",
+    "get_comps_index",
+    "HomesteadCapEngine",
+    "compute_caps",
+    "reference_caps",
+    "ImportBatch",
+    "RollImporter",
+    "RollLayout",
+    "register_import_hook",
+    "register_load_hook",
+    "register_reprice_hook",
+    "OwnerPortfolio",
+    "reconcile_portfolios",
+    "OwnerIndex",
+    "OwnerResolver",
+    "get_owner_index",
+    "normalize_owner_name",
+    "RateStack",
+    "price_assessments",
+    "RatioStudy",
+    "TaxEngine",
+    "compute_taxes",
+    "reference_tax",
+]
@@ -0,0 +1,553 @@
+"""
+Address search over every active parcel: prefix and fuzzy (trigram) lookup.
+
+Addresses are normalized the way USPS Publication 28 writes them: upper case,
+punctuation dropped, street suffixes and directionals abbreviated (STREET ->
+ST, NORTH -> N) and secondary unit designators (APT, UNIT, SUITE, #) written
+as ``#`` so "apt 4b" and "Unit 4B" are the same address. A parcel's key is its
+normalized street address followed by its city: "123 MAIN ST HOUSTON".
+
+The index is built from the database into ``PROPERTY_INDEX_DIR`` and
+memory-mapped by readers:
+
+    <PROPERTY_INDEX_DIR>/address/
+        CURRENT                       name of the live version directory
+        <version>/meta.json           counties, source fingerprint
+        <version>/keys.npy            normalized keys, concatenated in sorted order (uint8)
+        <version>/offsets.npy         key boundaries (int64, n + 1)
+        <version>/heads.npy           first two characters -> first key (the trie's top levels)
+        <version>/ids.npy, zips.npy, counties.npy   property id, 5-digit zip, county code per key
+        <version>/trigram_offsets.npy, trigram_rows.npy   trigram -> keys containing it
+
+Prefix lookup is the trie walk: the first two characters select a node
+(``heads``), then binary search over the sorted keys below it finds the
+range of keys extending the query. Queries with no prefix match (typos,
+reordered or missing words) go to the trigram index: the query's rarest trigrams vote for keys, and the best
+candidates are ranked by trigram similarity (Dice). Results can be limited
+to a zip code or county. A zip code typed at the end of the query is used as
+the zip filter.
+
+``refresh`` rebuilds only when the active parcels changed (count and latest
+``updated_at``); the roll importer runs it after every import. A rebuild
+writes a new version directory and then swaps ``CURRENT``, as the comps
+index does.
+
+    python -m services.property_data.address_index refresh [--force]
+    python -m services.property_data.address_index search "123 main st houston" [--zip 77002] [--county Harris]
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+
+from src.core.logging import get_logger
+from services.persistence.database import Property
+from .importer import register_load_hook
+
+logger = get_logger("address_index")
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+LOAD_PARTITION_ROWS = 100_000
+BUILD_CHUNK_ROWS = 500_000
+ARRAY_FILES = ("keys", "offsets", "heads", "ids", "zips", "counties", "trigram_offsets", "trigram_rows")
+
+# Fuzzy search: postings read per query, candidates re-ranked, lowest similarity returned
+FUZZY_POSTINGS_BUDGET = 60_000
+FUZZY_CANDIDATES = 64
+MIN_SIMILARITY = 0.3
+HOUSE_NUMBER_BONUS = 0.1
+# Prefix matches rank above every fuzzy match
+PREFIX_SCORE = 1.0
+MAX_FUZZY_SCORE = 0.99
+
+# Key alphabet, in byte order so code order matches sorted key order
+ALPHABET = " #0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+RADIX = len(ALPHABET)
+TRIGRAMS = RADIX ** 3
+_CODES = np.zeros(256, dtype=np.int64)
+_CODES[np.frombuffer(ALPHABET.encode(), dtype=np.uint8)] = np.arange(RADIX)
+
+# USPS Publication 28, C1: street suffixes (and common spellings) -> standard abbreviation
+STREET_SUFFIXES = {
+    "ALLEY": "ALY", "ALLY": "ALY", "ANNEX": "ANX", "ARCADE": "ARC", "AVENUE": "AVE", "AV": "AVE", "AVEN": "AVE",
+    "AVENU": "AVE", "AVN": "AVE", "AVNUE": "AVE", "BAYOU": "BYU", "BEND": "BND", "BLUFF": "BLF",
+    "BOULEVARD": "BLVD", "BOUL": "BLVD", "BOULV": "BLVD", "BLV": "BLVD", "BRANCH": "BR", "BRIDGE": "BRG",
+    "BROOK": "BRK", "BYPASS": "BYP", "CANYON": "CYN", "CAUSEWAY": "CSWY", "CENTER": "CTR", "CENTRE": "CTR",
+    "CIRCLE": "CIR", "CIRC": "CIR", "CRCL": "CIR", "CLIFF": "CLF", "CLUB": "CLB", "COMMON": "CMN",
+    "CORNER": "COR", "COURSE": "CRSE", "COURT": "CT", "COVE": "CV", "CREEK": "CRK", "CRESCENT": "CRES",
+    "CREST": "CRST", "CROSSING": "XING", "CRSSNG": "XING", "DALE": "DL", "DRIVE": "DR", "DRIV": "DR",
+    "DRV": "DR", "ESTATE": "EST", "ESTATES": "ESTS", "EXPRESSWAY": "EXPY", "EXPRESS": "EXPY", "EXTENSION": "EXT",
+    "FALLS": "FLS", "FARM": "FRM", "FIELD": "FLD", "FIELDS": "FLDS", "FOREST": "FRST", "FORK": "FRK",
+    "FREEWAY": "FWY", "FRWY": "FWY", "GARDEN": "GDN", "GARDENS": "GDNS", "GATEWAY": "GTWY", "GLEN": "GLN",
+    "GREEN": "GRN", "GROVE": "GRV", "HARBOR": "HBR", "HAVEN": "HVN", "HEIGHTS": "HTS", "HIGHWAY": "HWY",
+    "HIGHWY": "HWY", "HIWAY": "HWY", "HILL": "HL", "HILLS": "HLS", "HOLLOW": "HOLW", "ISLAND": "IS",
+    "JUNCTION": "JCT", "KNOLL": "KNL", "LAKE": "LK", "LAKES": "LKS", "LANDING": "LNDG", "LANE": "LN",
+    "LOOP": "LOOP", "MANOR": "MNR", "MEADOW": "MDW", "MEADOWS": "MDWS", "MILL": "ML", "MOUNT": "MT",
+    "MOUNTAIN": "MTN", "ORCHARD": "ORCH", "OVAL": "OVAL", "PARKWAY": "PKWY", "PARKWY": "PKWY", "PKY": "PKWY",
+    "PASS": "PASS", "PATH": "PATH", "PIKE": "PIKE", "PINES": "PNES", "PLACE": "PL", "PLAINS": "PLNS",
+    "PLAZA": "PLZ", "POINT": "PT", "PORT": "PRT", "PRAIRIE": "PR", "RANCH": "RNCH", "RIDGE": "RDG",
+    "RIVER": "RIV", "ROAD": "RD", "ROUTE": "RTE", "RUN": "RUN", "SHORE": "SHR", "SHORES": "SHRS",
+    "SPRING": "SPG", "SPRINGS": "SPGS", "SQUARE": "SQ", "STATION": "STA", "STREAM": "STRM", "STREET": "ST",
+    "STR": "ST", "STRT": "ST", "SUMMIT": "SMT", "TERRACE": "TER", "TRACE": "TRCE", "TRAIL": "TRL",
+    "TRAILS": "TRL", "TURNPIKE": "TPKE", "VALLEY": "VLY", "VIEW": "VW", "VILLAGE": "VLG", "VISTA": "VIS",
+    "WALK": "WALK", "WAY": "WAY", "WELLS": "WLS", "WOODS": "WDS",
+}
+DIRECTIONALS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+}
+# USPS Publication 28, C2: designators of numbered units, all written as "#"
+UNIT_DESIGNATORS = {"#", "APT", "APARTMENT", "UNIT", "STE", "SUITE", "NUM", "NUMBER"}
+# Other secondary designators -> standard abbreviation
+SECONDARY_DESIGNATORS = {
+    "BUILDING": "BLDG", "BASEMENT": "BSMT", "DEPARTMENT": "DEPT", "FLOOR": "FL", "OFFICE": "OFC",
+    "PENTHOUSE": "PH", "ROOM": "RM", "SPACE": "SPC", "TRAILER": "TRLR",
+}
+ORDINALS = {
+    "FIRST": "1ST", "SECOND": "2ND", "THIRD": "3RD", "FOURTH": "4TH", "FIFTH": "5TH",
+    "SIXTH": "6TH", "SEVENTH": "7TH", "EIGHTH": "8TH", "NINTH": "9TH", "TENTH": "10TH",
+}
+STATES = {"TX", "TEXAS"}
+_WORDS = {**STREET_SUFFIXES, **DIRECTIONALS, **SECONDARY_DESIGNATORS, **ORDINALS}
+
+_NOT_KEY = re.compile(r"[^A-Z0-9#]+")
+_ZIP = re.compile(r"^(\d{5})(?:\d{4})?$")
+
+
+def normalize_address(text: Optional[str]) -> str:
+    """USPS-style normalized form of an address (or address fragment)."""
+    tokens = _NOT_KEY.sub(" ", (text or "").upper().replace("#", " # ")).split()
+    words = []
+    for token in tokens:
+        if token in UNIT_DESIGNATORS:
+            if words and words[-1] == "#":
+                continue
+            token = "#"
+        words.append(_WORDS.get(token, token))
+    return " ".join(words)
+
+
+def split_query(query: str) -> Tuple[str, Optional[int]]:
+    """Normalized query without a trailing state and zip code, and that zip code."""
+    words = normalize_address(query).split()
+    zip_code = None
+    if len(words) > 2 and len(words[-1]) == 4 and words[-1].isdigit() and _ZIP.match(words[-2]):
+        words.pop()  # ZIP+4 typed with a hyphen
+    if words:
+        match = _ZIP.match(words[-1])
+        if match and len(words) > 1:
+            zip_code = int(match.group(1))
+            words.pop()
+    if len(words) > 1 and words[-1] in STATES:
+        words.pop()
+    return " ".join(words), zip_code
+
+
+def zip5(value: Any) -> int:
+    """First five digits of a zip code as an int (0 when missing)."""
+    digits = re.sub(r"\D", "", str(value or ""))[:5]
+    return int(digits) if len(digits) == 5 else 0
+
+
+def _codes(key: bytes) -> np.ndarray:
+    return _CODES[np.frombuffer(key, dtype=np.uint8)]
+
+
+def trigrams(key: bytes) -> np.ndarray:
+    """Distinct trigram codes of a key, padded with two leading spaces and one trailing."""
+    codes = _codes(b"  " + key + b" ")
+    return np.unique(codes[:-2] * RADIX * RADIX + codes[1:-1] * RADIX + codes[2:])
+
+
+def _trigram_set(key: bytes) -> set:
+    """The trigrams of ``trigrams`` as byte strings (cheaper for a single key)."""
+    padded = b"  " + key + b" "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _SortedKeys:
+    """The sorted keys as a sequence of bytes, for ``bisect``."""
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        # Memoryviews of the maps: indexing them costs far less than indexing np.memmap
+        self.blob = memoryview(blob)
+        self.offsets = memoryview(offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+
+class AddressIndexVersion:
+    """One loaded (memory-mapped) version of the index."""
+
+    __slots__ = ("meta", "keys", "heads", "ids", "zips", "counties", "trigram_offsets", "trigram_rows", "county_codes")
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAY_FILES}
+        self.keys = _SortedKeys(arrays["keys"], arrays["offsets"])
+        # The trie heads are small and read on every lookup
+        self.heads = np.array(arrays["heads"])
+        self.trigram_offsets = arrays["trigram_offsets"]
+        self.ids = arrays["ids"]
+        self.zips = arrays["zips"]
+        self.counties = arrays["counties"]
+        self.trigram_rows = arrays["trigram_rows"]
+        self.county_codes = {name.upper(): code for code, name in enumerate(self.meta["counties"])}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _allowed(self, rows: np.ndarray, zip_code: Optional[int], county: Optional[int]) -> np.ndarray:
+        """Mask of the rows passing the zip and county filters."""
+        keep = np.ones(len(rows), dtype=bool)
+        if zip_code:
+            keep &= self.zips[rows] == zip_code
+        if county is not None:
+            keep &= self.counties[rows] == county
+        return keep
+
+    def prefix_rows(self, key: bytes, zip_code: Optional[int], county: Optional[int], limit: int) -> np.ndarray:
+        """Rows of keys starting with ``key`` (in key order, at most ``limit``)."""
+        codes = _codes(key[:2].ljust(2))
+        node = int(codes[0]) * RADIX + int(codes[1])
+        if len(key) >= 2:
+            lo, hi = int(self.heads[node]), int(self.heads[node + 1])
+        else:
+            lo, hi = int(self.heads[node]), int(self.heads[node + RADIX])
+        lo = bisect.bisect_left(self.keys, key, lo, hi)
+        hi = bisect.bisect_left(self.keys, key + b"\xff", lo, hi)
+        if not zip_code and county is None:
+            return np.arange(lo, min(hi, lo + limit))
+        found = []
+        for start in range(lo, hi, BUILD_CHUNK_ROWS):
+            rows = np.arange(start, min(hi, start + BUILD_CHUNK_ROWS))
+            found.append(rows[self._allowed(rows, zip_code, county)])
+            if sum(len(rows) for rows in found) >= limit:
+                break
+        return np.concatenate(found)[:limit] if found else np.empty(0, dtype=np.int64)
+
+    def fuzzy_rows(self, key: bytes, zip_code: Optional[int], county: Optional[int],
+                   limit: int) -> List[Tuple[float, int]]:
+        """(similarity, row) of the keys most similar to ``key``, best first."""
+        wanted = trigrams(key)
+        starts, ends = self.trigram_offsets[wanted], self.trigram_offsets[wanted + 1]
+        # Rarest trigrams first, within the postings budget (at least one trigram)
+        order = np.argsort(ends - starts, kind="stable")
+        budget = np.cumsum((ends - starts)[order])
+        used = order[:max(1, int(np.searchsorted(budget, FUZZY_POSTINGS_BUDGET, side="right")))]
+        postings = [self.trigram_rows[starts[i]:ends[i]] for i in used.tolist() if ends[i] > starts[i]]
+        if not postings:
+            return []
+        rows, votes = np.unique(np.concatenate(postings), return_counts=True)
+        rows = rows.astype(np.int64)
+        if zip_code or county is not None:
+            keep = self._allowed(rows, zip_code, county)
+            rows, votes = rows[keep], votes[keep]
+        if len(rows) > FUZZY_CANDIDATES:
+            top = np.argpartition(-votes, FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]
+            rows = rows[top]
+
+        wanted_set = _trigram_set(key)
+        number = key.split(b" ", 1)[0] if key[:1].isdigit() else None
+        scored = []
+        for row in rows.tolist():
+            candidate = self.keys[row]
+            theirs = _trigram_set(candidate)
+            score = 2 * len(wanted_set & theirs) / (len(wanted_set) + len(theirs))
+            if number and candidate.split(b" ", 1)[0] == number:
+                score += HOUSE_NUMBER_BONUS
+            if score >= MIN_SIMILARITY:
+                scored.append((min(score, MAX_FUZZY_SCORE), row))
+        scored.sort(key=lambda item: (-item[0], self.keys[item[1]]))
+        return scored[:limit]
+
+    def result(self, row: int, score: float, match: str) -> Dict[str, Any]:
+        zip_code = int(self.zips[row])
+        return {
+            "property_id": int(self.ids[row]),
+            "address": self.keys[row].decode(),
+            "zip_code": f"{zip_code:05d}" if zip_code else None,
+            "county": self.meta["counties"][int(self.counties[row])],
+            "score": round(score, 3),
+            "match": match,
+        }
+
+
+class AddressIndex:
+    """Reader for the address index under ``index_dir`` (reloads when it is rebuilt)."""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._loaded: Optional[Tuple[str, AddressIndexVersion]] = None
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.index_dir, "CURRENT"), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self) -> Optional[AddressIndexVersion]:
+        """The live version, memory-mapped on first use, or None if it has not been built."""
+        version = self.current_version()
+        if self._loaded and self._loaded[0] == version:
+            return self._loaded[1]
+        if version is None:
+            self._loaded = None
+            return None
+        try:
+            loaded = AddressIndexVersion(os.path.join(self.index_dir, version))
+        except FileNotFoundError:
+            # Replaced between reading CURRENT and opening the files
+            return self._loaded[1] if self._loaded else None
+        self._loaded = (version, loaded)
+        return loaded
+
+    def search(
+        self,
+        query: str,
+        zip_code: Optional[str] = None,
+        county: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Parcels matching a typed address, best first.
+
+        Args:
+            query: Address as typed, e.g. "123 main street houston tx 77002"
+            zip_code: Only parcels in this zip (default: a zip typed at the end of the query)
+            county: Only parcels in this county
+
+        Returns:
+            Dicts with property_id, normalized address, zip_code, county, score
+            (1.0 for prefix matches, trigram similarity below that) and match
+            ("prefix" or "fuzzy"); empty if the index has not been built
+        """
+        index = self.load()
+        key, typed_zip = split_query(query)
+        if index is None or not key:
+            return []
+        limit = max(1, min(limit, MAX_LIMIT))
+        zip_filter = zip5(zip_code) or typed_zip
+        county_filter = None
+        if county:
+            county_filter = index.county_codes.get(county.strip().upper())
+            if county_filter is None:
+                return []
+
+        encoded = key.encode()
+        rows = index.prefix_rows(encoded, zip_filter, county_filter, limit)
+        if len(rows):
+            return [index.result(row, PREFIX_SCORE, "prefix") for row in rows.tolist()]
+        return [index.result(row, score, "fuzzy") for score, row in index.fuzzy_rows(encoded, zip_filter, county_filter, limit)]
+
+
+def _build_arrays(keys: List[bytes], ids: np.ndarray, zips: np.ndarray, counties: np.ndarray) -> Dict[str, np.ndarray]:
+    """Index arrays of unsorted keys and their per-key columns."""
+    order = np.argsort(np.array(keys, dtype=f"S{max(map(len, keys), default=1)}"), kind="stable")
+    keys = [keys[i] for i in order.tolist()]
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    blob = np.frombuffer(b"".join(keys), dtype=np.uint8)
+
+    # Trie heads: first key of every two-character prefix
+    first = np.array([_codes(key[:2].ljust(2)) for key in keys], dtype=np.int64).reshape(-1, 2)
+    heads = np.searchsorted(first[:, 0] * RADIX + first[:, 1], np.arange(RADIX * RADIX + 1))
+
+    # Trigram postings, counted first, then filled chunk by chunk in row order
+    counts = np.zeros(TRIGRAMS, dtype=np.int64)
+    chunks = []
+    for start in range(0, len(keys), BUILD_CHUNK_ROWS):
+        chunk = keys[start:start + BUILD_CHUNK_ROWS]
+        padded = [b"  " + key + b" " for key in chunk]
+        codes = _codes(b"".join(padded))
+        ends = np.cumsum([len(key) for key in padded])
+        # Trigram i starts at position i; the last two positions of each key start none
+        valid = np.ones(len(codes), dtype=bool)
+        valid[ends - 1] = False
+        valid[ends - 2] = False
+        positions = np.flatnonzero(valid[:-2]) if len(codes) > 2 else np.empty(0, dtype=np.int64)
+        grams = codes[positions] * RADIX * RADIX + codes[positions + 1] * RADIX + codes[positions + 2]
+        rows = start + np.searchsorted(ends, positions, side="right")
+        pairs = np.unique(grams * len(keys) + rows)
+        grams, rows = pairs // len(keys), pairs % len(keys)
+        counts += np.bincount(grams, minlength=TRIGRAMS)
+        chunks.append((grams, rows))
+    trigram_offsets = np.zeros(TRIGRAMS + 1, dtype=np.int64)
+    np.cumsum(counts, out=trigram_offsets[1:])
+    trigram_rows = np.empty(int(trigram_offsets[-1]), dtype=np.uint32)
+    cursor = trigram_offsets[:-1].copy()
+    for grams, rows in chunks:
+        # Sorted by trigram then row: the rank within each trigram run places it
+        run_start = np.searchsorted(grams, grams, side="left")
+        trigram_rows[cursor[grams] + np.arange(len(grams)) - run_start] = rows
+        cursor += np.bincount(grams, minlength=TRIGRAMS)
+
+    return {
+        "keys": blob,
+        "offsets": offsets,
+        "heads": heads.astype(np.int64),
+        "ids": ids[order],
+        "zips": zips[order],
+        "counties": counties[order],
+        "trigram_offsets": trigram_offsets,
+        "trigram_rows": trigram_rows,
+    }
+
+
+class AddressIndexBuilder:
+    """Builds the address index from the active parcels."""
+
+    def __init__(self, manager, index: Optional[AddressIndex] = None):
+        self.manager = manager
+        self.index = index or get_address_index()
+
+    async def fingerprint(self, conn) -> List[Any]:
+        row = (await conn.execute(
+            select(func.count(Property.id), func.max(Property.updated_at)).where(Property.is_active.is_(True))
+        )).one()
+        return [row[0], str(row[1])]
+
+    async def _load(self, conn) -> Tuple[List[bytes], np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        result = await conn.stream(
+            select(Property.id, Property.street_address, Property.city, Property.zip_code, Property.county)
+            .where(Property.is_active.is_(True))
+        )
+        keys: List[bytes] = []
+        ids: List[int] = []
+        zips: List[int] = []
+        county_names: List[str] = []
+        async for partition in result.partitions(LOAD_PARTITION_ROWS):
+            for property_id, street, city, zip_code, county in partition:
+                keys.append(normalize_address(f"{street} {city or ''}").encode())
+                ids.append(property_id)
+                zips.append(zip5(zip_code))
+                county_names.append(county)
+        counties = sorted(set(county_names))
+        codes = {name: code for code, name in enumerate(counties)}
+        return (
+            keys,
+            np.array(ids, dtype=np.int64),
+            np.array(zips, dtype=np.uint32),
+            np.array([codes[name] for name in county_names], dtype=np.uint16),
+            counties,
+        )
+
+    def _write(self, arrays: Dict[str, np.ndarray], counties: List[str], fingerprint: List[Any]) -> None:
+        version = f"{time.time_ns():x}"
+        path = os.path.join(self.index.index_dir, version)
+        os.makedirs(path)
+        for name in ARRAY_FILES:
+            np.save(os.path.join(path, f"{name}.npy"), arrays[name])
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "count": len(arrays["ids"]),
+                "counties": counties,
+                "fingerprint": fingerprint,
+                "built_at": datetime.now().isoformat(),
+            }, f)
+
+        pointer = os.path.join(self.index.index_dir, "CURRENT")
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+        # Open maps of older versions stay valid after their files are unlinked
+        for name in os.listdir(self.index.index_dir):
+            if name not in (version, "CURRENT") and not name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(self.index.index_dir, name), ignore_errors=True)
+
+    async def refresh(self, force: bool = False) -> Dict[str, Any]:
+        """Rebuild the index if the active parcels changed (always with ``force``)."""
+        started = time.perf_counter()
+        async with self.manager.engine.connect() as conn:
+            fingerprint = await self.fingerprint(conn)
+            current = self.index.load()
+            if not force and current is not None and current.meta.get("fingerprint") == fingerprint:
+                return {"rebuilt": False, "parcels": len(current), "elapsed_seconds": round(time.perf_counter() - started, 2)}
+            keys, ids, zips, counties, county_names = await self._load(conn)
+        loaded = time.perf_counter()
+
+        arrays = await asyncio.to_thread(_build_arrays, keys, ids, zips, counties)
+        await asyncio.to_thread(self._write, arrays, county_names, fingerprint)
+        stats = {
+            "rebuilt": True,
+            "parcels": len(keys),
+            "trigram_postings": len(arrays["trigram_rows"]),
+            "load_seconds": round(loaded - started, 2),
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+        }
+        logger.info("🔎 Address index rebuilt", **stats)
+        return stats
+
+
+_address_index: Optional[AddressIndex] = None
+
+
+def get_address_index() -> AddressIndex:
+    """Get the process-wide address index reader."""
+    global _address_index
+    if _address_index is None:
+        from config.settings import settings
+        _address_index = AddressIndex(os.path.join(settings.property_index_dir, "address"))
+    return _address_index
+
+
+@register_load_hook
+async def refresh_address_index_after_import(manager, county: str, assessment_year: int, stats: Dict[str, Any]) -> None:
+    """Rebuild the address index when the import changed the active parcels."""
+    await AddressIndexBuilder(manager).refresh()
+
+
+async def _main(args: argparse.Namespace) -> int:
+    if args.command == "search":
+        started = time.perf_counter()
+        results = get_address_index().search(args.query or "", args.zip, args.county, args.limit)
+        print(json.dumps({"results": results, "query_ms": round((time.perf_counter() - started) * 1000, 2)}, indent=2))
+        return 0 if results else 1
+
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        print(json.dumps(await AddressIndexBuilder(manager).refresh(force=args.force), indent=2))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Address search index")
+    parser.add_argument("command", choices=["refresh", "search"])
+    parser.add_argument("query", nargs="?", help="Address as typed (search)")
+    parser.add_argument("--zip")
+    parser.add_argument("--county")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the parcels are unchanged")
+    args = parser.parse_args(argv)
+    if args.command == "search" and not args.query:
+        parser.error("search needs a query")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,515 @@
+"""
+Batch appeal-opportunity scoring.
+
+Scores every active parcel for appeal potential. The ranked result is kept in
+``appeal_opportunity``: one row per property, where ``county_rank`` 1 is the
+strongest case in its county. The score (0-100) combines three signals,
+weighted by ``SCORE_WEIGHTS``:
+
+- value jump: the year-over-year increase of ``total_assessed_value``. It
+  counts from ``JUMP_FLOOR`` and saturates at ``JUMP_SATURATION``;
+- comps ratio: the parcel's value per sqft against the median of its k
+  comparable properties (services.property_data.comps). Parcels without
+  square footage compare their value with the comps' median value;
+- missing homestead: a residential parcel whose individual owner's mailing
+  address is the parcel itself, but whose ``exemption_details`` has no
+  homestead.
+
+Appeal history then adjusts the score. Earlier successful appeals raise it;
+denials with no success lower it. A parcel with an open appeal for the
+current year scores 0, because it is already being worked.
+
+Counties are scored in a process pool, one county per task. Workers read the
+database and the memory-mapped comps trees and return arrays. The parent
+writes the rows and re-ranks each county with one UPDATE.
+
+An incremental run (the default) re-scores only some parcels: those not
+scored yet, and those whose property, current or previous assessment,
+ownership links or appeals have an ``updated_at`` newer than the watermark
+stored with their score (``inputs_as_of``: the newest ``updated_at`` across
+those tables when the scoring run started). ``--full``
+re-scores everything, which also picks up changes in the comps' own values;
+run it after each annual roll.
+
+    python -m services.property_data.appeal_scoring run [--county Harris] [--full] [--workers 8]
+    python -m services.property_data.appeal_scoring top --county Harris [--limit 50]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Float, String, and_, case, cast, delete, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.core.logging import get_logger
+from services.persistence.database import (
+    Appeal, AppealOpportunity, AppealStatus, Property, PropertyOwner, PropertyType, TaxAssessment,
+    property_ownership,
+)
+from .comps import DEFAULT_K, CompsIndex, CompsIndexBuilder, get_comps_index, latest_assessment_year
+
+logger = get_logger("appeal_scoring")
+
+# Value jump and comps ratio: no credit at the floor, full credit at saturation
+JUMP_FLOOR = 0.05
+JUMP_SATURATION = 0.30
+RATIO_FLOOR = 1.0
+RATIO_SATURATION = 1.30
+SCORE_WEIGHTS = {"value_jump": 0.35, "comps_ratio": 0.40, "missing_homestead": 0.25}
+SUCCESS_FACTOR = 1.15
+DENIAL_FACTOR = 0.85
+
+SUCCESS_STATUSES = (AppealStatus.APPROVED, AppealStatus.PARTIALLY_APPROVED)
+FINAL_STATUSES = SUCCESS_STATUSES + (AppealStatus.DENIED, AppealStatus.WITHDRAWN)
+
+LOAD_PARTITION_ROWS = 100_000
+WATERMARK_POLL_SECONDS = 0.2
+WATERMARK_WAIT_POLLS = 10
+WRITE_BATCH_ROWS = 5000
+CENTS = Decimal("0.01")
+
+PROPERTY_TYPES = list(PropertyType)
+
+_property = Property.__table__.c
+_owner = PropertyOwner.__table__.c
+_ownership = property_ownership.c
+_appeal = Appeal.__table__.c
+_opportunity = AppealOpportunity.__table__.c
+_current = TaxAssessment.__table__.alias("current_assessment")
+_previous = TaxAssessment.__table__.alias("previous_assessment")
+
+# Owner-occupied: a current individual owner mails to the parcel's own street address
+_OWNER_OCCUPIED = exists().where(
+    _ownership.property_id == _property.id,
+    _ownership.end_date.is_(None),
+    _owner.id == _ownership.owner_id,
+    _owner.business_type.is_(None),
+    func.length(_property.street_address) > 0,
+    func.upper(func.substr(_owner.mailing_address, 1, func.length(_property.street_address)))
+    == func.upper(_property.street_address),
+)
+# The JSON type stores Python None as a JSON 'null' rather than SQL NULL
+_EXEMPTIONS_KNOWN = and_(
+    _property.exemption_details.isnot(None), cast(_property.exemption_details, String) != "null",
+)
+
+# Numeric columns only (NULL = -1), so rows load as one float matrix
+_INPUT_COLUMNS = (
+    cast(_property.id, Float),
+    case(*[(_property.property_type == kind, i) for i, kind in enumerate(PROPERTY_TYPES)], else_=-1),
+    cast(func.coalesce(_property.square_footage, -1), Float),
+    cast(func.coalesce(_current.c.total_assessed_value, -1), Float),
+    cast(func.coalesce(_previous.c.total_assessed_value, -1), Float),
+    case((_EXEMPTIONS_KNOWN, 1), else_=0),
+    case((_property.exemption_details["homestead"].as_boolean(), 1), else_=0),
+    case((_OWNER_OCCUPIED, 1), else_=0),
+)
+ID, TYPE, SQFT, VALUE, PREVIOUS, EXEMPTIONS_KNOWN, HOMESTEAD, OWNER_OCCUPIED = range(len(_INPUT_COLUMNS))
+
+
+def _parcels(assessment_year: int):
+    return Property.__table__.outerjoin(
+        _current, and_(_current.c.property_id == _property.id, _current.c.assessment_year == assessment_year),
+    ).outerjoin(
+        _previous, and_(_previous.c.property_id == _property.id, _previous.c.assessment_year == assessment_year - 1),
+    )
+
+
+async def load_inputs(conn, county: str, assessment_year: int) -> np.ndarray:
+    """One row per active parcel of the county (columns as ``_INPUT_COLUMNS``), ordered by id."""
+    result = await conn.stream(
+        select(*_INPUT_COLUMNS)
+        .select_from(_parcels(assessment_year))
+        .where(_property.county == county, _property.is_active.is_(True))
+        .order_by(_property.id)
+    )
+    width = len(_INPUT_COLUMNS)
+    parts = []
+    async for partition in result.partitions(LOAD_PARTITION_ROWS):
+        values = itertools.chain.from_iterable(partition)
+        parts.append(np.fromiter(values, dtype=np.float64, count=len(partition) * width).reshape(-1, width))
+    return np.concatenate(parts) if parts else np.empty((0, width))
+
+
+async def input_watermark(conn):
+    """The newest ``updated_at`` across the tables scores are computed from."""
+    stamps = [
+        await conn.scalar(select(func.max(column)))
+        for column in (_property.updated_at, TaxAssessment.__table__.c.updated_at, _ownership.updated_at, _appeal.updated_at)
+    ]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+async def changed_parcels(conn, county: str, assessment_year: int) -> np.ndarray:
+    """Ids of parcels never scored for this year, or with inputs newer than the watermark they were scored at."""
+    as_of = _opportunity.inputs_as_of
+    result = await conn.execute(
+        select(_property.id)
+        .select_from(
+            _parcels(assessment_year).outerjoin(AppealOpportunity.__table__, _opportunity.property_id == _property.id)
+        )
+        .where(
+            _property.county == county,
+            _property.is_active.is_(True),
+            or_(
+                _opportunity.id.is_(None),
+                _opportunity.inputs_as_of.is_(None),
+                _opportunity.assessment_year != assessment_year,
+                _property.updated_at > as_of,
+                _current.c.updated_at > as_of,
+                _previous.c.updated_at > as_of,
+                exists().where(_ownership.property_id == _property.id, _ownership.updated_at > as_of),
+                exists().where(_appeal.property_id == _property.id, _appeal.updated_at > as_of),
+            ),
+        )
+    )
+    return np.fromiter(result.scalars(), dtype=np.int64)
+
+
+async def appeal_history(conn, county: str, assessment_year: int) -> Dict[int, tuple]:
+    """property_id -> (appeals, successful, denied, open for this year) for parcels with appeals."""
+    appealed = TaxAssessment.__table__.c
+    rows = await conn.execute(
+        select(
+            _appeal.property_id,
+            func.count(_appeal.id),
+            func.sum(case((_appeal.status.in_(SUCCESS_STATUSES), 1), else_=0)),
+            func.sum(case((_appeal.status == AppealStatus.DENIED, 1), else_=0)),
+            # An open appeal whose assessment is gone counts as current
+            func.max(case((and_(
+                _appeal.status.notin_(FINAL_STATUSES),
+                or_(appealed.assessment_year == assessment_year, appealed.id.is_(None)),
+            ), 1), else_=0)),
+        )
+        .select_from(
+            Appeal.__table__
+            .join(Property.__table__, _property.id == _appeal.property_id)
+            .outerjoin(TaxAssessment.__table__, appealed.id == _appeal.assessment_id)
+        )
+        .where(_property.county == county)
+        .group_by(_appeal.property_id)
+    )
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def compute_scores(
+    value: np.ndarray,
+    previous: np.ndarray,
+    comps_ratio: np.ndarray,
+    missing_homestead: np.ndarray,
+    successful: np.ndarray,
+    denied: np.ndarray,
+    open_appeal: np.ndarray,
+) -> np.ndarray:
+    """Scores (0-100) from the per-parcel inputs; NaN inputs contribute nothing."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(previous > 0, (value - previous) / previous, np.nan)
+    jump = np.clip((change - JUMP_FLOOR) / (JUMP_SATURATION - JUMP_FLOOR), 0, 1)
+    over = np.clip((comps_ratio - RATIO_FLOOR) / (RATIO_SATURATION - RATIO_FLOOR), 0, 1)
+    score = 100 * (
+        SCORE_WEIGHTS["value_jump"] * np.nan_to_num(jump)
+        + SCORE_WEIGHTS["comps_ratio"] * np.nan_to_num(over)
+        + SCORE_WEIGHTS["missing_homestead"] * missing_homestead
+    )
+    score *= np.where(successful > 0, SUCCESS_FACTOR, np.where(denied > 0, DENIAL_FACTOR, 1.0))
+    score = np.minimum(score, 100.0)
+    score[open_appeal] = 0.0
+    return np.round(score, 2)
+
+
+async def score_county(manager, index: CompsIndex, county: str, full: bool = False,
+                       k: int = DEFAULT_K) -> Optional[Dict[str, Any]]:
+    """Score the county's parcels (the changed ones unless ``full``); returns column arrays."""
+    async with manager.engine.connect() as conn:
+        assessment_year = await latest_assessment_year(conn, county)
+        if assessment_year is None:
+            return None
+        inputs = await load_inputs(conn, county, assessment_year)
+        if not full:
+            inputs = inputs[np.isin(inputs[:, ID], await changed_parcels(conn, county, assessment_year))]
+        history = await appeal_history(conn, county, assessment_year) if len(inputs) else {}
+
+    ids = inputs[:, ID].astype(np.int64)
+    value = np.where(inputs[:, VALUE] < 0, np.nan, inputs[:, VALUE])
+    previous = np.where(inputs[:, PREVIOUS] < 0, np.nan, inputs[:, PREVIOUS])
+    sqft = np.where(inputs[:, SQFT] > 0, inputs[:, SQFT], np.nan)
+
+    median_per_sqft = np.full(len(ids), np.nan)
+    median_value = np.full(len(ids), np.nan)
+    for code in np.unique(inputs[:, TYPE]).astype(int).tolist():
+        group = index.group(county, PROPERTY_TYPES[code]) if code >= 0 else None
+        if group is None:
+            continue
+        rows = np.flatnonzero(inputs[:, TYPE] == code)
+        median_per_sqft[rows], median_value[rows] = group.comps_medians(ids[rows], k)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_sqft = ~np.isnan(sqft) & ~np.isnan(median_per_sqft)
+        comps_ratio = np.where(by_sqft, value / sqft / median_per_sqft, value / median_value)
+        comps_ratio[~np.isfinite(comps_ratio)] = np.nan
+        potential_reduction = np.maximum(value - np.where(by_sqft, median_per_sqft * sqft, median_value), 0)
+        value_change = np.where(previous > 0, (value - previous) / previous, np.nan)
+
+    appeals = np.zeros((len(ids), 4), dtype=np.int64)
+    for i, property_id in enumerate(ids.tolist()):
+        if property_id in history:
+            appeals[i] = history[property_id]
+    missing_homestead = (
+        (inputs[:, TYPE] == PROPERTY_TYPES.index(PropertyType.RESIDENTIAL))
+        & (inputs[:, OWNER_OCCUPIED] == 1) & (inputs[:, EXEMPTIONS_KNOWN] == 1) & (inputs[:, HOMESTEAD] == 0)
+    )
+    open_appeal = appeals[:, 3] > 0
+
+    return {
+        "county": county,
+        "assessment_year": assessment_year,
+        "full": full,
+        "property_id": ids,
+        "score": compute_scores(value, previous, comps_ratio, missing_homestead, appeals[:, 1], appeals[:, 2], open_appeal),
+        "assessed_value": value,
+        "previous_assessed_value": previous,
+        "value_change_pct": value_change,
+        "comps_ratio": comps_ratio,
+        "comps_median_value_per_sqft": median_per_sqft,
+        "potential_reduction": potential_reduction,
+        "missing_homestead": missing_homestead,
+        "prior_appeals": appeals[:, 0],
+        "successful_appeals": appeals[:, 1],
+        "open_appeal": open_appeal,
+    }
+
+
+def _score_county_process(database_url: str, index_dir: str, county: str, full: bool, k: int) -> Optional[Dict[str, Any]]:
+    """Process-pool entry point: score one county with the worker's own engine."""
+    from services.persistence.database import DatabaseManager
+
+    async def run():
+        manager = DatabaseManager(database_url)
+        try:
+            return await score_county(manager, CompsIndex(index_dir), county, full=full, k=k)
+        finally:
+            await manager.close()
+
+    return asyncio.run(run())
+
+
+def _float(value: float, digits: int = 4) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def _money(value: float) -> Optional[Decimal]:
+    return None if np.isnan(value) else Decimal(repr(round(float(value), 2))).quantize(CENTS)
+
+
+class AppealScorer:
+    """Scores counties in a process pool and maintains the ranked ``appeal_opportunity`` table."""
+
+    def __init__(self, manager, workers: Optional[int] = None, k: int = DEFAULT_K, index: Optional[CompsIndex] = None):
+        """
+        Initialize scorer.
+
+        Args:
+            manager: DatabaseManager holding the parcels and the opportunity table
+            workers: Worker processes (defaults to ``APPEAL_SCORING_WORKERS``; 0 = one per CPU, 1 = in-process)
+            k: Comparable properties per parcel
+            index: Comps index (defaults to the process-wide one)
+        """
+        if workers is None:
+            from config.settings import settings
+            workers = settings.appeal_scoring_workers
+        if manager.backend not in ("sqlite", "postgresql"):
+            raise ValueError(f"Appeal scoring supports SQLite and PostgreSQL, not {manager.backend}")
+        self.manager = manager
+        self.workers = workers or os.cpu_count() or 1
+        self.k = k
+        self.index = index or get_comps_index()
+        self._insert = postgresql_insert if manager.backend == "postgresql" else sqlite_insert
+
+    async def counties(self) -> List[str]:
+        async with self.manager.engine.connect() as conn:
+            return list(await conn.scalars(
+                select(_property.county).where(_property.is_active.is_(True)).distinct().order_by(_property.county)
+            ))
+
+    async def _write(self, result: Dict[str, Any], inputs_as_of) -> int:
+        """Upsert a county's scored rows, drop rows of parcels no longer active in it and re-rank the county."""
+        county = result["county"]
+        columns = [name for name in result if name not in ("county", "assessment_year", "full")]
+        arrays = {name: result[name].tolist() for name in columns}
+        stmt = self._insert(AppealOpportunity.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["property_id"],
+            set_={
+                **{name: stmt.excluded[name] for name in columns + ["county", "assessment_year", "inputs_as_of"]
+                   if name != "property_id"},
+                "scored_at": func.now(),
+            },
+        )
+
+        rows = []
+        for i in range(len(arrays["property_id"])):
+            rows.append({
+                "property_id": arrays["property_id"][i],
+                "county": county,
+                "assessment_year": result["assessment_year"],
+                "score": arrays["score"][i],
+                "assessed_value": _money(arrays["assessed_value"][i]),
+                "previous_assessed_value": _money(arrays["previous_assessed_value"][i]),
+                "value_change_pct": _float(arrays["value_change_pct"][i]),
+                "comps_ratio": _float(arrays["comps_ratio"][i]),
+                "comps_median_value_per_sqft": _money(arrays["comps_median_value_per_sqft"][i]),
+                "potential_reduction": _money(arrays["potential_reduction"][i]),
+                "missing_homestead": arrays["missing_homestead"][i],
+                "prior_appeals": arrays["prior_appeals"][i],
+                "successful_appeals": arrays["successful_appeals"][i],
+                "open_appeal": arrays["open_appeal"][i],
+                "inputs_as_of": inputs_as_of,
+            })
+
+        async with self.manager.begin_write() as conn:
+            for start in range(0, len(rows), WRITE_BATCH_ROWS):
+                await conn.execute(stmt, rows[start:start + WRITE_BATCH_ROWS])
+            await conn.execute(delete(AppealOpportunity.__table__).where(
+                _opportunity.county == county,
+                _opportunity.property_id.notin_(
+                    select(_property.id).where(_property.county == county, _property.is_active.is_(True))
+                ),
+            ))
+            await conn.execute(self._rank_statement(county))
+        return len(rows)
+
+    @staticmethod
+    def _rank_statement(county: str):
+        ranked = (
+            select(
+                _opportunity.id,
+                func.row_number().over(order_by=(_opportunity.score.desc(), _opportunity.property_id)).label("position"),
+            )
+            .where(_opportunity.county == county)
+            .subquery()
+        )
+        return (
+            update(AppealOpportunity.__table__)
+            .where(_opportunity.id == ranked.c.id, _opportunity.county_rank.is_distinct_from(ranked.c.position))
+            .values(county_rank=ranked.c.position)
+        )
+
+    async def run(self, counties: Optional[List[str]] = None, full: bool = False) -> Dict[str, Any]:
+        """
+        Score counties (all with active parcels by default).
+
+        Comps trees are refreshed first, since scoring reads them. Counties are
+        written as their workers finish.
+        """
+        started = time.perf_counter()
+        counties = counties or await self.counties()
+        builder = CompsIndexBuilder(self.manager, self.index)
+        for county in counties:
+            await builder.refresh_county(county)
+
+        async with self.manager.engine.connect() as conn:
+            inputs_as_of = await input_watermark(conn)
+            # Changes stamped later than the watermark are picked up by the next run. SQLite stamps
+            # whole seconds, so wait until the clock has left the watermark's second: any change
+            # made during this run is then strictly newer.
+            for _ in range(WATERMARK_WAIT_POLLS):
+                if inputs_as_of is None or await conn.scalar(select(func.now())) > inputs_as_of:
+                    break
+                await conn.rollback()  # now() is the transaction's start time on PostgreSQL
+                await asyncio.sleep(WATERMARK_POLL_SECONDS)
+
+        scored: Dict[str, int] = {}
+        if self.workers <= 1 or len(counties) == 1:
+            for county in counties:
+                result = await score_county(self.manager, self.index, county, full=full, k=self.k)
+                if result is not None:
+                    scored[county] = await self._write(result, inputs_as_of)
+        else:
+            loop = asyncio.get_running_loop()
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(counties)), mp_context=context) as pool:
+                tasks = [
+                    loop.run_in_executor(
+                        pool, _score_county_process,
+                        self.manager.database_url, self.index.index_dir, county, full, self.k,
+                    )
+                    for county in counties
+                ]
+                for task in asyncio.as_completed(tasks):
+                    result = await task
+                    if result is not None:
+                        scored[result["county"]] = await self._write(result, inputs_as_of)
+
+        stats = {
+            "counties": len(counties),
+            "full": full,
+            "parcels_scored": sum(scored.values()),
+            "by_county": scored,
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+        }
+        logger.info(f"🎯 Appeal opportunities scored: {stats['parcels_scored']} parcels", **stats)
+        return stats
+
+
+async def top_opportunities(session, county: str, limit: int = 50) -> List[Dict[str, Any]]:
+    """The county's highest-ranked opportunities with parcel and address."""
+    rows = await session.execute(
+        select(
+            AppealOpportunity.__table__,
+            _property.parcel_id, _property.street_address, _property.city,
+        )
+        .join(Property.__table__, _property.id == _opportunity.property_id)
+        .where(_opportunity.county == county)
+        .order_by(_opportunity.county_rank)
+        .limit(limit)
+    )
+    return [dict(row) for row in rows.mappings()]
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        if args.command == "top":
+            if not args.county:
+                print("top needs --county")
+                return 2
+            async with manager.engine.connect() as conn:
+                for row in await top_opportunities(conn, args.county, args.limit):
+                    print(json.dumps(row, default=str))
+            return 0
+
+        scorer = AppealScorer(manager, workers=args.workers, k=args.k)
+        stats = await scorer.run([args.county] if args.county else None, full=args.full)
+        print(json.dumps(stats, indent=2))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score parcels for appeal opportunity")
+    parser.add_argument("command", choices=["run", "top"])
+    parser.add_argument("--county", help="One county (default: all)")
+    parser.add_argument("--full", action="store_true", help="Re-score every parcel, not only changed ones")
+    parser.add_argument("--workers", type=int, help="Override APPEAL_SCORING_WORKERS")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="Comparable properties per parcel")
+    parser.add_argument("--limit", type=int, default=50, help="Rows to show (top)")
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,512 @@
+"""
+Comparable-property (comps) search for appeal evidence.
+
+One KD-tree per county and property type, over the normalized features of
+every active parcel (``FEATURES``). Trees are built from the database into
+``PROPERTY_INDEX_DIR`` and memory-mapped by readers. A query reads a few
+leaves of one tree instead of scanning ``properties``:
+
+    <PROPERTY_INDEX_DIR>/comps/<county>/<property_type>/
+        CURRENT                    name of the live version directory
+        <version>/meta.json        scaling, source fingerprint, assessment year
+        <version>/points.npy       normalized features (float32, tree order)
+        <version>/raw.npy          raw features (float32, tree order, NaN = unknown)
+        <version>/ids.npy          property ids (int64, tree order)
+        <version>/values.npy       total_assessed_value of the assessment year (NaN = none)
+        <version>/nodes.npy, lower.npy, upper.npy   tree nodes and bounding boxes
+
+Square footage and lot size are compared on a log scale. Every feature is
+divided by its spread within the group (interquartile range) and weighted by
+``FEATURE_WEIGHTS``. Unknown values take the group median.
+
+Each group stores a fingerprint of its source rows: counts and latest
+``updated_at`` of the parcels and of their assessments. ``refresh`` rebuilds
+only the groups whose fingerprint changed, and the roll importer runs it for
+the loaded county after every import. A rebuild writes a new version
+directory and then swaps ``CURRENT``. Readers therefore never see a partial
+tree, and maps of the previous version stay valid.
+
+    python -m services.property_data.comps refresh [--county Harris] [--force]
+    python -m services.property_data.comps query 12345 [-k 10]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, and_, cast, func, select
+
+from src.core.logging import get_logger
+from services.persistence.database import Property, PropertyType, TaxAssessment
+from .importer import register_load_hook
+from .kdtree import KDTree
+
+logger = get_logger("comps_index")
+
+FEATURES = ("square_footage", "year_built", "lot_size", "bedrooms", "bathrooms")
+FEATURE_WEIGHTS = {"square_footage": 2.0, "year_built": 1.0, "lot_size": 1.0, "bedrooms": 0.5, "bathrooms": 0.5}
+LOG_FEATURES = ("square_footage", "lot_size")
+# Zero is a real bedroom / bathroom count but not a real size or year
+POSITIVE_FEATURES = ("square_footage", "year_built", "lot_size")
+DEFAULT_K = 10
+MAX_K = 100
+LOAD_PARTITION_ROWS = 100_000
+ARRAY_FILES = ("points", "raw", "ids", "values", "nodes", "lower", "upper")
+
+_LOG_COLUMNS = [FEATURES.index(name) for name in LOG_FEATURES]
+_POSITIVE_COLUMNS = [FEATURES.index(name) for name in POSITIVE_FEATURES]
+_WEIGHTS = np.array([FEATURE_WEIGHTS[name] for name in FEATURES], dtype=np.float64)
+
+_property = Property.__table__.c
+_assessment = TaxAssessment.__table__.c
+
+# NULL becomes -1 so rows load as one float matrix; negative values are read back as unknown
+_LOAD_COLUMNS = (
+    cast(_property.id, Float),
+    *(cast(func.coalesce(_property[name], -1), Float) for name in FEATURES),
+    cast(func.coalesce(_assessment.total_assessed_value, -1), Float),
+)
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "_"
+
+
+def _property_type(value: Any) -> PropertyType:
+    return value if isinstance(value, PropertyType) else PropertyType(value)
+
+
+def _raw_features(rows: np.ndarray) -> np.ndarray:
+    """Feature matrix with unknown (NULL, negative, non-positive size/year) values as NaN."""
+    raw = rows.astype(np.float64, copy=True)
+    raw[raw < 0] = np.nan
+    positive = raw[:, _POSITIVE_COLUMNS]
+    positive[positive <= 0] = np.nan
+    raw[:, _POSITIVE_COLUMNS] = positive
+    return raw
+
+
+def _scaling(raw: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(center, scale) of the log-transformed features of a group."""
+    x = _transform(raw)
+    center = np.zeros(len(FEATURES))
+    scale = np.ones(len(FEATURES))
+    for column in range(len(FEATURES)):
+        known = x[:, column][~np.isnan(x[:, column])]
+        if not len(known):
+            continue
+        q25, center[column], q75 = np.percentile(known, [25, 50, 75])
+        spread = (q75 - q25) / 1.349 or known.std()  # IQR of a normal distribution is 1.349 sigma
+        scale[column] = spread if spread > 0 else 1.0
+    return center, scale
+
+
+def _transform(raw: np.ndarray) -> np.ndarray:
+    x = np.array(raw, dtype=np.float64, ndmin=2)
+    x[:, _LOG_COLUMNS] = np.log1p(x[:, _LOG_COLUMNS])
+    return x
+
+
+def _normalize(raw: np.ndarray, center: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    points = (_transform(raw) - center) / scale * _WEIGHTS
+    return np.nan_to_num(points, nan=0.0).astype(np.float32)
+
+
+def _number(value: Any) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+
+async def latest_assessment_year(conn, county: str) -> Optional[int]:
+    """The county's most recent assessment year (the year comps values are taken from)."""
+    return await conn.scalar(
+        select(func.max(_assessment.assessment_year))
+        .select_from(TaxAssessment.__table__.join(Property.__table__, _property.id == _assessment.property_id))
+        .where(_property.county == county)
+    )
+
+
+class CompsGroup:
+    """One loaded (memory-mapped) county / property type tree."""
+
+    __slots__ = ("meta", "tree", "ids", "raw", "values", "center", "scale")
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAY_FILES}
+        self.tree = KDTree(arrays["points"], arrays["nodes"], arrays["lower"], arrays["upper"])
+        self.ids = arrays["ids"]
+        self.raw = arrays["raw"]
+        self.values = arrays["values"]
+        self.center = np.array(self.meta["center"])
+        self.scale = np.array(self.meta["scale"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nearest(self, features: Dict[str, Any], k: int, exclude: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Top-k comps for a feature dict (missing features count as the group median)."""
+        raw = _raw_features(np.array([[
+            -1.0 if features.get(name) is None else float(features[name]) for name in FEATURES
+        ]]))
+        point = _normalize(raw, self.center, self.scale)[0]
+        distances, positions = self.tree.query(point, k + (exclude is not None))
+
+        comps = []
+        for distance, position in zip(distances.tolist(), positions.tolist()):
+            property_id = int(self.ids[position])
+            if property_id == exclude:
+                continue
+            raw_row = self.raw[position]
+            value = float(self.values[position])
+            square_footage = raw_row[0]
+            comp = {"property_id": property_id, "distance": round(distance, 4)}
+            comp.update({name: _number(raw_row[i]) for i, name in enumerate(FEATURES)})
+            comp["assessed_value"] = _number(value)
+            comp["value_per_sqft"] = (
+                round(value / float(square_footage), 2)
+                if not np.isnan(value) and not np.isnan(square_footage) else None
+            )
+            comps.append(comp)
+        return comps[:k]
+
+    def comps_medians(self, property_ids: np.ndarray, k: int = DEFAULT_K) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Median value per sqft and median assessed value of each indexed property's k comps.
+
+        Batch counterpart of ``nearest`` that queries from the stored points.
+        Properties not in the tree get NaN.
+        """
+        ids = np.asarray(self.ids)
+        by_id = np.argsort(ids)
+        found = np.searchsorted(ids, property_ids, sorter=by_id)
+        found = np.minimum(found, len(ids) - 1) if len(ids) else found
+        values = np.asarray(self.values, dtype=np.float64)
+        per_sqft = values / np.asarray(self.raw[:, 0], dtype=np.float64)
+
+        median_per_sqft = np.full(len(property_ids), np.nan)
+        median_value = np.full(len(property_ids), np.nan)
+        if not len(ids):
+            return median_per_sqft, median_value
+        positions = by_id[found]
+        indexed = ids[positions] == property_ids
+        _, neighbours = self.tree.neighbours(positions[indexed], k)
+        missing = neighbours < 0
+        neighbours = np.where(missing, 0, neighbours)
+        comp_per_sqft = np.where(missing, np.nan, per_sqft[neighbours])
+        comp_value = np.where(missing, np.nan, values[neighbours])
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows stay NaN
+            median_per_sqft[indexed] = np.nanmedian(comp_per_sqft, axis=1)
+            median_value[indexed] = np.nanmedian(comp_value, axis=1)
+        return median_per_sqft, median_value
+
+
+class CompsIndex:
+    """Reader for the comps trees under ``index_dir`` (reloads a group when it is rebuilt)."""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._groups: Dict[Tuple[str, PropertyType], Tuple[str, CompsGroup]] = {}
+
+    def group_dir(self, county: str, property_type: PropertyType) -> str:
+        return os.path.join(self.index_dir, _slug(county), _property_type(property_type).value)
+
+    def current_version(self, county: str, property_type: PropertyType) -> Optional[str]:
+        try:
+            with open(os.path.join(self.group_dir(county, property_type), "CURRENT"), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def group(self, county: str, property_type: PropertyType) -> Optional[CompsGroup]:
+        """The live tree of a group, or None if it has not been built."""
+        key = (county, _property_type(property_type))
+        version = self.current_version(*key)
+        cached = self._groups.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        if version is None:
+            self._groups.pop(key, None)
+            return None
+        try:
+            group = CompsGroup(os.path.join(self.group_dir(*key), version))
+        except FileNotFoundError:
+            # Replaced between reading CURRENT and opening the files
+            return cached[1] if cached else None
+        self._groups[key] = (version, group)
+        return group
+
+    def query(
+        self,
+        county: str,
+        property_type: PropertyType,
+        features: Dict[str, Any],
+        k: int = DEFAULT_K,
+        exclude: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top-k comps for ``features`` in a county / type (empty if no tree is built)."""
+        group = self.group(county, property_type)
+        if group is None:
+            return []
+        return group.nearest(features, max(1, min(k, MAX_K)), exclude=exclude)
+
+    async def comps_for_property(self, session, property_id: int, k: int = DEFAULT_K) -> Optional[Dict[str, Any]]:
+        """
+        Comps for a stored property, with their parcel and address.
+
+        Args:
+            session: AsyncSession or AsyncConnection
+            property_id: Subject property
+            k: Number of comps
+
+        Returns:
+            Subject, comps and their median value per sqft, or None if the property does not exist
+        """
+        subject = (await session.execute(
+            select(
+                _property.id, _property.parcel_id, _property.street_address, _property.county,
+                _property.property_type, *(_property[name] for name in FEATURES),
+            ).where(_property.id == property_id)
+        )).mappings().first()
+        if subject is None:
+            return None
+        group = self.group(subject["county"], subject["property_type"])
+        features = {name: subject[name] for name in FEATURES}
+        comps = group.nearest(features, max(1, min(k, MAX_K)), exclude=property_id) if group else []
+
+        if comps:
+            details = {
+                row.id: row for row in await session.execute(
+                    select(_property.id, _property.parcel_id, _property.street_address, _property.city)
+                    .where(_property.id.in_([comp["property_id"] for comp in comps]))
+                )
+            }
+            for comp in comps:
+                row = details.get(comp["property_id"])
+                if row:
+                    comp.update(parcel_id=row.parcel_id, street_address=row.street_address, city=row.city)
+
+        per_sqft = [comp["value_per_sqft"] for comp in comps if comp["value_per_sqft"] is not None]
+        return {
+            "subject": {
+                "property_id": subject["id"],
+                "parcel_id": subject["parcel_id"],
+                "street_address": subject["street_address"],
+                "county": subject["county"],
+                "property_type": _property_type(subject["property_type"]).value,
+                **{name: None if features[name] is None else float(features[name]) for name in FEATURES},
+            },
+            "assessment_year": group.meta["assessment_year"] if group else None,
+            "index_built_at": group.meta["built_at"] if group else None,
+            "comps": comps,
+            "median_value_per_sqft": round(float(np.median(per_sqft)), 2) if per_sqft else None,
+        }
+
+
+class CompsIndexBuilder:
+    """Builds comps trees from the database into a CompsIndex directory."""
+
+    def __init__(self, manager, index: Optional[CompsIndex] = None):
+        self.manager = manager
+        self.index = index or get_comps_index()
+
+    @staticmethod
+    def _source(assessment_year: Optional[int]):
+        return Property.__table__.outerjoin(
+            TaxAssessment.__table__,
+            and_(_assessment.property_id == _property.id, _assessment.assessment_year == assessment_year),
+        )
+
+    async def fingerprints(self, conn, county: str, assessment_year: Optional[int]) -> Dict[PropertyType, List[Any]]:
+        """Per property type: parcel count and latest update, assessment count and latest update, year."""
+        rows = await conn.execute(
+            select(
+                _property.property_type,
+                func.count(_property.id),
+                func.max(_property.updated_at),
+                func.count(_assessment.id),
+                func.max(_assessment.updated_at),
+            )
+            .select_from(self._source(assessment_year))
+            .where(_property.county == county, _property.is_active.is_(True))
+            .group_by(_property.property_type)
+        )
+        return {
+            _property_type(row[0]): [row[1], str(row[2]), row[3], str(row[4]), assessment_year]
+            for row in rows
+        }
+
+    async def _load_group(self, conn, county: str, property_type: PropertyType,
+                          assessment_year: Optional[int]) -> np.ndarray:
+        result = await conn.stream(
+            select(*_LOAD_COLUMNS)
+            .select_from(self._source(assessment_year))
+            .where(_property.county == county, _property.property_type == property_type, _property.is_active.is_(True))
+            .order_by(_property.id)
+        )
+        width = len(_LOAD_COLUMNS)
+        parts = []
+        async for partition in result.partitions(LOAD_PARTITION_ROWS):
+            values = itertools.chain.from_iterable(partition)
+            parts.append(np.fromiter(values, dtype=np.float64, count=len(partition) * width).reshape(-1, width))
+        return np.concatenate(parts) if parts else np.empty((0, width))
+
+    def _write_group(self, county: str, property_type: PropertyType, rows: np.ndarray,
+                     fingerprint: List[Any], assessment_year: Optional[int]) -> None:
+        group_dir = self.index.group_dir(county, property_type)
+        version = f"{time.time_ns():x}"
+        path = os.path.join(group_dir, version)
+        os.makedirs(path)
+
+        raw = _raw_features(rows[:, 1:1 + len(FEATURES)])
+        center, scale = _scaling(raw)
+        tree, order = KDTree.build(_normalize(raw, center, scale))
+        values = rows[:, -1]
+        arrays = dict(tree.arrays())
+        arrays["raw"] = raw[order].astype(np.float32)
+        arrays["ids"] = rows[order, 0].astype(np.int64)
+        arrays["values"] = np.where(values < 0, np.nan, values)[order]
+        for name in ARRAY_FILES:
+            np.save(os.path.join(path, f"{name}.npy"), arrays[name])
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "county": county,
+                "property_type": property_type.value,
+                "count": len(rows),
+                "features": list(FEATURES),
+                "weights": [FEATURE_WEIGHTS[name] for name in FEATURES],
+                "center": center.tolist(),
+                "scale": scale.tolist(),
+                "assessment_year": assessment_year,
+                "fingerprint": fingerprint,
+                "built_at": datetime.now().isoformat(),
+            }, f)
+
+        pointer = os.path.join(group_dir, "CURRENT")
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+        # Open maps of older versions stay valid after their files are unlinked
+        for name in os.listdir(group_dir):
+            if name not in (version, "CURRENT") and not name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(group_dir, name), ignore_errors=True)
+
+    def _stored_fingerprint(self, county: str, property_type: PropertyType) -> Optional[List[Any]]:
+        group = self.index.group(county, property_type)
+        return group.meta.get("fingerprint") if group else None
+
+    def _drop_group(self, county: str, property_type: PropertyType) -> None:
+        shutil.rmtree(self.index.group_dir(county, property_type), ignore_errors=True)
+
+    async def refresh_county(self, county: str, force: bool = False) -> Dict[str, Any]:
+        """Rebuild the county's groups whose source rows changed (all of them with ``force``)."""
+        started = time.perf_counter()
+        rebuilt, unchanged, dropped = [], [], []
+        async with self.manager.engine.connect() as conn:
+            assessment_year = await latest_assessment_year(conn, county)
+            fingerprints = await self.fingerprints(conn, county, assessment_year)
+            for property_type in PropertyType:
+                fingerprint = fingerprints.get(property_type)
+                if fingerprint is None:
+                    if self.index.current_version(county, property_type):
+                        self._drop_group(county, property_type)
+                        dropped.append(property_type.value)
+                    continue
+                if not force and self._stored_fingerprint(county, property_type) == fingerprint:
+                    unchanged.append(property_type.value)
+                    continue
+                rows = await self._load_group(conn, county, property_type, assessment_year)
+                await asyncio.to_thread(self._write_group, county, property_type, rows, fingerprint, assessment_year)
+                rebuilt.append({"property_type": property_type.value, "parcels": len(rows)})
+
+        stats = {
+            "county": county,
+            "assessment_year": assessment_year,
+            "rebuilt": rebuilt,
+            "unchanged": unchanged,
+            "dropped": dropped,
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+        }
+        if rebuilt or dropped:
+            logger.info(f"🏘️ Comps index refreshed for {county}", **stats)
+        return stats
+
+    async def refresh(self, county: Optional[str] = None, force: bool = False) -> List[Dict[str, Any]]:
+        """Refresh one county, or every county with active parcels."""
+        if county:
+            counties = [county]
+        else:
+            async with self.manager.engine.connect() as conn:
+                counties = list(await conn.scalars(
+                    select(_property.county).where(_property.is_active.is_(True)).distinct().order_by(_property.county)
+                ))
+        return [await self.refresh_county(name, force=force) for name in counties]
+
+
+_comps_index: Optional[CompsIndex] = None
+
+
+def get_comps_index() -> CompsIndex:
+    """Get the process-wide comps index reader."""
+    global _comps_index
+    if _comps_index is None:
+        from config.settings import settings
+        _comps_index = CompsIndex(os.path.join(settings.property_index_dir, "comps"))
+    return _comps_index
+
+
+@register_load_hook
+async def refresh_comps_after_import(manager, county: str, assessment_year: int, stats: Dict[str, Any]) -> None:
+    """Rebuild the imported county's comps trees whose parcels or values changed."""
+    await CompsIndexBuilder(manager).refresh_county(county)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        if args.command == "refresh":
+            for stats in await CompsIndexBuilder(manager).refresh(args.county, force=args.force):
+                print(json.dumps(stats))
+            return 0
+
+        if args.property_id is None:
+            print("query needs a property id")
+            return 2
+        async with manager.engine.connect() as conn:
+            started = time.perf_counter()
+            result = await get_comps_index().comps_for_property(conn, args.property_id, k=args.k)
+        if result is None:
+            print(f"Property {args.property_id} not found")
+            return 1
+        result["query_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        print(json.dumps(result, indent=2, default=str))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Comparable-property index")
+    parser.add_argument("command", choices=["refresh", "query"])
+    parser.add_argument("property_id", nargs="?", type=int, help="Subject property (query)")
+    parser.add_argument("--county", help="Refresh one county (default: all)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the source rows are unchanged")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="Number of comps (query)")
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Texas homestead appraisal cap (Tax Code 23.23) over TaxAssessment history.
+
+A homestead's appraised value may not exceed the lesser of its market value
+and 110% of the preceding year's appraised value. The cap applies in a year
+when the parcel was a homestead both that year and the year before (the
+first homestead year is appraised at market). A break in the homestead, or a
+missing year, ends the cap; the next qualifying year starts a new one.
+
+The chain runs on lawful values. A year's lawful appraised value is the
+assessed value, held to market and to the cap, and the next year's cap is
+110% of that. A year assessed above its cap is a violation, and the excess
+is the amount over the cap. The roll has no new-improvement value, which
+the statute adds to the cap, so a flagged parcel that was enlarged needs a
+look before it is argued.
+
+Each property's years are loaded as one contiguous run of int64 arrays
+(cents), sorted by (property, year). The recurrence is evaluated in
+vectorized passes, one per position in the series: pass k updates the k-th
+year of every property at once, so decades of history take a few dozen
+array operations. Results match ``reference_caps`` (one property at a time,
+Decimal arithmetic) cent for cent.
+
+Homestead status per year is the ``HS`` code in ``exemptions_applied``, as
+the roll importer writes it.
+
+    python -m services.property_data.homestead_cap report --county Harris --year 2026 [--csv violations.csv]
+    python -m services.property_data.homestead_cap lookup R000123
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import sys
+import time
+from decimal import ROUND_FLOOR, Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import BigInteger, String, case, cast, func, select
+
+from src.core.logging import get_logger
+from services.persistence.database import Property, TaxAssessment
+
+logger = get_logger("homestead_cap")
+
+CAP_NUMERATOR, CAP_DENOMINATOR = 11, 10  # 110% of the preceding year
+HOMESTEAD_CODE = "HS"
+# Assessed values this far (cents) over the cap are not flagged, absorbing rounding
+VIOLATION_TOLERANCE_CENTS = 100
+LOAD_PARTITION_ROWS = 100_000
+NO_VALUE = -1
+
+_assessment = TaxAssessment.__table__.c
+_property = Property.__table__.c
+
+_LOAD_COLUMNS = (
+    _assessment.property_id,
+    _assessment.assessment_year,
+    cast(func.round(_assessment.total_assessed_value * 100), BigInteger),
+    cast(func.round(func.coalesce(_assessment.market_value, NO_VALUE / 100) * 100), BigInteger),
+    case((cast(_assessment.exemptions_applied, String).like(f'%"{HOMESTEAD_CODE}"%'), 1), else_=0),
+)
+
+
+class CapSeries:
+    """Assessment history as contiguous arrays sorted by (property_id, year); amounts in cents."""
+
+    __slots__ = ("property_id", "year", "assessed", "market", "homestead")
+
+    def __init__(self, matrix: np.ndarray):
+        self.property_id = matrix[:, 0]
+        self.year = matrix[:, 1]
+        self.assessed = matrix[:, 2]
+        self.market = matrix[:, 3]
+        self.homestead = matrix[:, 4].astype(bool)
+
+    def __len__(self) -> int:
+        return len(self.property_id)
+
+
+async def load_series(conn, *conditions, by_county: bool = False) -> CapSeries:
+    """
+    Assessments matching ``conditions`` as a ``CapSeries``.
+
+    Set ``by_county`` when a condition filters on ``properties`` columns.
+    """
+    source = TaxAssessment.__table__
+    if by_county:
+        source = source.join(Property.__table__, _property.id == _assessment.property_id)
+    result = await conn.stream(
+        select(*_LOAD_COLUMNS).select_from(source).where(*conditions)
+        .order_by(_assessment.property_id, _assessment.assessment_year)
+    )
+    width = len(_LOAD_COLUMNS)
+    parts = []
+    async for partition in result.partitions(LOAD_PARTITION_ROWS):
+        values = itertools.chain.from_iterable(partition)
+        parts.append(np.fromiter(values, dtype=np.int64, count=len(partition) * width).reshape(-1, width))
+    return CapSeries(np.concatenate(parts) if parts else np.empty((0, width), dtype=np.int64))
+
+
+def compute_caps(series: CapSeries) -> Dict[str, np.ndarray]:
+    """
+    Cap, lawful value and violation of every row.
+
+    Returns arrays aligned with ``series``: ``capped`` (the row is under the
+    cap), ``cap_value`` (110% of the preceding lawful value; -1 when not
+    capped), ``lawful_value``, ``excess`` (cents over the cap) and ``violation``.
+    """
+    n = len(series)
+    follows = np.zeros(n, dtype=bool)
+    if n > 1:
+        # The row continues its property's homestead from the immediately preceding year
+        follows[1:] = (
+            (series.property_id[1:] == series.property_id[:-1])
+            & (series.year[1:] == series.year[:-1] + 1)
+            & series.homestead[1:] & series.homestead[:-1]
+        )
+    market = np.where(series.market >= 0, series.market, series.assessed)
+    lawful = np.minimum(series.assessed, market)
+    cap_value = np.full(n, NO_VALUE, dtype=np.int64)
+
+    # A row's position in its property's series; pass k settles position k of every property
+    first = np.ones(n, dtype=bool)
+    first[1:] = series.property_id[1:] != series.property_id[:-1]
+    starts = np.flatnonzero(first)
+    position = np.arange(n) - np.repeat(starts, np.diff(np.append(starts, n)))
+    by_position = np.argsort(position, kind="stable")
+    bounds = np.searchsorted(position[by_position], np.arange(position.max() + 2 if n else 1))
+    for k in range(1, len(bounds) - 1):
+        rows = by_position[bounds[k]:bounds[k + 1]]
+        rows = rows[follows[rows]]
+        if not len(rows):
+            continue
+        cap = lawful[rows - 1] * CAP_NUMERATOR // CAP_DENOMINATOR
+        cap_value[rows] = cap
+        lawful[rows] = np.minimum(lawful[rows], cap)
+
+    capped = cap_value >= 0
+    excess = np.where(capped, np.maximum(series.assessed - cap_value, 0), 0)
+    return {
+        "capped": capped,
+        "cap_value": cap_value,
+        "lawful_value": lawful,
+        "excess": excess,
+        "violation": excess > VIOLATION_TOLERANCE_CENTS,
+    }
+
+
+def reference_caps(history: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Scalar cap chain of one property's assessments (dicts with assessment_year,
+    total_assessed_value, market_value, homestead), in year order.
+
+    This is the definition the vectorized engine must reproduce.
+    """
+    results = []
+    previous = None
+    for row in history:
+        assessed = Decimal(row["total_assessed_value"])
+        market = Decimal(row["market_value"]) if row["market_value"] is not None else assessed
+        lawful = min(assessed, market)
+        cap = None
+        if (previous is not None and previous["homestead"] and row["homestead"]
+                and row["assessment_year"] == previous["assessment_year"] + 1):
+            cap = (previous["lawful_value"] * CAP_NUMERATOR / CAP_DENOMINATOR).quantize(
+                Decimal("0.01"), rounding=ROUND_FLOOR
+            )
+            lawful = min(lawful, cap)
+        excess = max(assessed - cap, Decimal(0)) if cap is not None else Decimal(0)
+        results.append({
+            "assessment_year": row["assessment_year"],
+            "cap_value": cap,
+            "lawful_value": lawful,
+            "excess": excess,
+            "violation": excess * 100 > VIOLATION_TOLERANCE_CENTS,
+        })
+        previous = {"homestead": row["homestead"], "assessment_year": row["assessment_year"], "lawful_value": lawful}
+    return results
+
+
+def _dollars(cents: int) -> Optional[str]:
+    return None if cents < 0 else str(Decimal(int(cents)).scaleb(-2))
+
+
+class HomesteadCapEngine:
+    """Batch cap reports per county-year and cap history per parcel."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def report(self, county: str, assessment_year: int, limit: Optional[int] = 100) -> Dict[str, Any]:
+        """
+        Cap status of the county's assessments for a year.
+
+        ``violations`` lists the largest excesses first (``limit`` rows; None for all).
+        """
+        started = time.perf_counter()
+        async with self.manager.engine.connect() as conn:
+            series = await load_series(
+                conn, _property.county == county, _assessment.assessment_year <= assessment_year, by_county=True,
+            )
+            loaded = time.perf_counter()
+            caps = compute_caps(series)
+            computed = time.perf_counter()
+
+            year = series.year == assessment_year
+            flagged = np.flatnonzero(year & caps["violation"])
+            flagged = flagged[np.argsort(-caps["excess"][flagged], kind="stable")][:limit]
+            parcels = dict((await conn.execute(
+                select(_property.id, _property.parcel_id).where(_property.id.in_(series.property_id[flagged].tolist()))
+            )).all()) if len(flagged) else {}
+
+        violations = [
+            {
+                "property_id": int(series.property_id[i]),
+                "parcel_id": parcels.get(int(series.property_id[i])),
+                "assessed_value": _dollars(series.assessed[i]),
+                "cap_value": _dollars(caps["cap_value"][i]),
+                "excess": _dollars(caps["excess"][i]),
+            }
+            for i in flagged.tolist()
+        ]
+        stats = {
+            "county": county,
+            "assessment_year": assessment_year,
+            "assessments": int(year.sum()),
+            "homesteads": int((year & series.homestead).sum()),
+            "capped": int((year & caps["capped"]).sum()),
+            "violations": int((year & caps["violation"]).sum()),
+            "total_excess": _dollars(int(caps["excess"][year & caps["violation"]].sum())),
+            "history_rows": len(series),
+            "load_seconds": round(loaded - started, 3),
+            "compute_seconds": round(computed - loaded, 3),
+        }
+        logger.info(f"🏠 Homestead cap report for {county} {assessment_year}: {stats['violations']} violations", **stats)
+        return {**stats, "top_violations": violations}
+
+    async def lookup(self, parcel_id: str) -> Optional[Dict[str, Any]]:
+        """One parcel's cap status for every assessed year, or None for an unknown parcel."""
+        async with self.manager.engine.connect() as conn:
+            prop = (await conn.execute(
+                select(_property.id, _property.parcel_id, _property.street_address, _property.city, _property.county)
+                .where(_property.parcel_id == parcel_id)
+            )).first()
+            if prop is None:
+                return None
+            series = await load_series(conn, _assessment.property_id == prop.id)
+        return cap_history(prop._asdict(), series)
+
+
+def cap_history(prop: Dict[str, Any], series: CapSeries) -> Dict[str, Any]:
+    """A parcel's year rows and summary from its ``CapSeries``."""
+    caps = compute_caps(series)
+    years = [
+        {
+            "assessment_year": int(series.year[i]),
+            "homestead": bool(series.homestead[i]),
+            "assessed_value": _dollars(series.assessed[i]),
+            "market_value": _dollars(series.market[i]),
+            "cap_value": _dollars(caps["cap_value"][i]),
+            "lawful_value": _dollars(caps["lawful_value"][i]),
+            "excess": _dollars(caps["excess"][i]),
+            "violation": bool(caps["violation"][i]),
+        }
+        for i in range(len(series))
+    ]
+    latest = years[-1] if years else None
+    return {
+        **prop,
+        "years": years,
+        "currently_capped": bool(latest and latest["cap_value"] is not None),
+        "violation_years": [row["assessment_year"] for row in years if row["violation"]],
+    }
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        engine = HomesteadCapEngine(manager)
+        if args.command == "lookup":
+            result = await engine.lookup(args.parcel_id)
+            print(json.dumps(result, indent=2, default=str))
+            return 0 if result is not None else 1
+
+        if not args.county or not args.year:
+            print("report needs --county and --year")
+            return 2
+        report = await engine.report(args.county, args.year, limit=None if args.csv else args.limit)
+        if args.csv:
+            with open(args.csv, "w", newline="") as handle:
+                writer = csv.DictWriter(handle, fieldnames=["property_id", "parcel_id", "assessed_value", "cap_value", "excess"])
+                writer.writeheader()
+                writer.writerows(report["top_violations"])
+            report["top_violations"] = report["top_violations"][:args.limit]
+        print(json.dumps(report, indent=2))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Texas homestead appraisal cap checks")
+    parser.add_argument("command", choices=["report", "lookup"])
+    parser.add_argument("parcel_id", nargs="?", help="Parcel (lookup)")
+    parser.add_argument("--county")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--limit", type=int, default=20, help="Violations to print (report)")
+    parser.add_argument("--csv", help="Write every violation of the year to this CSV (report)")
+    args = parser.parse_args(argv)
+    if args.command == "lookup" and not args.parcel_id:
+        parser.error("lookup needs a parcel_id")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
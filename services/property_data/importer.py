@@ -0,0 +1,1102 @@
+"""
+Streaming appraisal roll importer.
+
+Loads a county appraisal export (CSV or fixed-width, optionally gzipped) into
+``properties``, ``property_owners``, ``property_ownership`` and
+``tax_assessments`` without going through the ORM:
+
+- records are read lazily and processed in chunks of ``PROPERTY_IMPORT_CHUNK_SIZE``,
+  so memory stays bounded by one chunk whatever the roll size;
+- each chunk reads the rows it already has (one indexed ``IN`` query per
+  table) and writes only new or changed rows, with one bulk upsert per table
+  (``executemany``; on PostgreSQL, large sets are ``COPY``-ed into a staging
+  table first). Properties upsert on ``parcel_id``, owners on ``source_key``
+  and assessments on ``(property_id, assessment_year)``;
+- every chunk commits on its own and records its position in a checkpoint
+  file, so an interrupted load resumes where it stopped (``--restart`` starts
+  over). Replaying a chunk is harmless: all writes are upserts;
+- ``--defer-indexes`` drops the secondary (non-unique) indexes of the four
+  tables for the load and rebuilds them once at the end.
+
+Columns are taken from a layout: canonical field names (``FIELDS``) mapped to
+CSV headers or fixed-width positions. Without a layout file, CSV headers are
+matched by name or common appraisal-district alias (``prop_id``, ``situs_address``,
+``state_cd``, ...)::
+
+    {"format": "csv", "delimiter": ",", "columns": {"parcel_id": "PROP_ID", "owner_name": "PY_OWNER"}}
+    {"format": "fixed", "encoding": "latin-1", "fields": {"parcel_id": [0, 12], "owner_name": [12, 82]}}
+
+Fixed-width positions are 0-based, end exclusive. Taxes of new and revalued
+assessments are computed in the same transaction by the tax engine's hook
+(services.property_data.tax_engine).
+
+Other subsystems register ``register_import_hook`` callbacks, which run inside
+each chunk's transaction with an ``ImportBatch`` describing what changed, and
+``register_load_hook`` callbacks, which run once a whole file has loaded.
+``register_reprice_hook`` callbacks run when taxes are re-priced outside an
+import (``tax_engine run``, ``rate_stack price``/``set-rates``/``compile``).
+
+    python -m services.property_data.importer load roll.csv --county Harris --year 2026
+    python -m services.property_data.importer load roll.txt.gz --county Travis --year 2026 --layout travis.json --defer-indexes
+    python -m services.property_data.importer indexes
+"""
+
+import argparse
+import asyncio
+import csv
+import functools
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Table, bindparam, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.core.logging import get_logger
+from services.persistence.database import (
+    OwnershipType, Property, PropertyOwner, PropertyType, TaxAssessment, property_ownership,
+)
+
+logger = get_logger("roll_importer")
+
+# Canonical record fields a layout can map
+FIELDS = (
+    # Parcel
+    "parcel_id", "street_address", "city", "zip_code", "property_type",
+    "square_footage", "lot_size", "year_built", "bedrooms", "bathrooms",
+    "legal_description", "subdivision", "block", "lot", "exemptions",
+    # Owner
+    "owner_key", "owner_name", "owner_first_name", "owner_last_name", "owner_business_name",
+    "mailing_address", "mailing_city", "mailing_state", "mailing_zip", "ownership_start_date",
+    # Assessment
+    "land_value", "improvement_value", "total_assessed_value", "market_value",
+    "tax_rate", "tax_rate_type", "total_exemption_amount",
+)
+
+# Header names used by appraisal district exports (normalized: lower case, "_" separated)
+HEADER_ALIASES = {
+    "parcel_id": ("prop_id", "property_id", "account", "account_number", "acct", "parcel", "parcel_number", "geo_id", "apn"),
+    "street_address": ("situs_address", "situs", "property_address", "site_address", "address"),
+    "city": ("situs_city", "property_city"),
+    "zip_code": ("situs_zip", "property_zip", "zip"),
+    "property_type": ("state_cd", "state_code", "ptad_code", "prop_type_cd", "property_use"),
+    "square_footage": ("living_area", "sqft", "building_sqft", "imprv_sqft", "living_sqft"),
+    "lot_size": ("land_acres", "acres", "legal_acreage"),
+    "year_built": ("yr_built", "actual_year_built", "effective_year_built"),
+    "bedrooms": ("beds", "bedroom_count"),
+    "bathrooms": ("baths", "bathroom_count"),
+    "legal_description": ("legal_desc", "legal"),
+    "subdivision": ("abs_subdv", "abs_subdv_cd", "subdivision_name", "neighborhood"),
+    "exemptions": ("exemption_codes", "exemption", "exempt_codes", "exemption_cd"),
+    "owner_key": ("owner_id", "py_owner_id", "owner_number", "owner_acct"),
+    "owner_name": ("owner", "py_owner_name", "owner_nm"),
+    "mailing_address": ("mail_address", "mailing_addr", "addr_line1", "py_addr_line1"),
+    "mailing_city": ("mail_city", "addr_city", "py_addr_city"),
+    "mailing_state": ("mail_state", "addr_state", "py_addr_state"),
+    "mailing_zip": ("mail_zip", "addr_zip", "py_addr_zip"),
+    "ownership_start_date": ("deed_date", "deed_dt", "sale_date"),
+    "land_value": ("land_val", "land_market_value"),
+    "improvement_value": ("imprv_val", "improvement_val", "imprv_value", "improvement_market_value"),
+    "total_assessed_value": ("assessed_val", "assessed_value", "appraised_val", "appraised_value"),
+    "market_value": ("market_val", "market"),
+    "total_exemption_amount": ("exemption_amt", "exempt_amount", "exemption_amount"),
+}
+
+# Texas PTAD state property category codes (first letter, or letter + digit)
+STATE_CODE_TYPES = {
+    "A": PropertyType.RESIDENTIAL,      # single-family
+    "B": PropertyType.RESIDENTIAL,      # multifamily
+    "C": PropertyType.VACANT_LAND,      # vacant lots
+    "D": PropertyType.AGRICULTURAL,     # qualified ag land, farm improvements
+    "E": PropertyType.RESIDENTIAL,      # rural land, non-qualified
+    "F1": PropertyType.COMMERCIAL,
+    "F2": PropertyType.INDUSTRIAL,
+    "G": PropertyType.INDUSTRIAL,       # oil, gas, minerals
+    "J": PropertyType.INDUSTRIAL,       # utilities
+    "L1": PropertyType.COMMERCIAL,      # commercial personal property
+    "L2": PropertyType.INDUSTRIAL,      # industrial personal property
+    "M": PropertyType.RESIDENTIAL,      # mobile homes
+    "O": PropertyType.RESIDENTIAL,      # residential inventory
+}
+
+# Owner name tokens that mark an entity rather than a person
+BUSINESS_TYPES = {
+    "LLC": "LLC", "L.L.C.": "LLC", "INC": "Corp", "INC.": "Corp", "CORP": "Corp", "CORPORATION": "Corp",
+    "CO": "Corp", "COMPANY": "Corp", "LP": "LP", "L.P.": "LP", "LTD": "LP", "PARTNERSHIP": "LP",
+    "LLP": "LP", "TRUST": "Trust", "TR": "Trust", "TRUSTEE": "Trust", "TRUSTEES": "Trust",
+    "ESTATE": "Estate", "BANK": "Corp", "CHURCH": "Nonprofit", "MINISTRIES": "Nonprofit",
+    "ASSOCIATION": "Association", "ASSN": "Association", "HOA": "Association",
+    "ISD": "Government", "CITY": "Government", "COUNTY": "Government", "STATE": "Government",
+}
+OWNERSHIP_TYPES = {
+    "LLC": OwnershipType.LLC,
+    "Corp": OwnershipType.CORPORATION,
+    "Trust": OwnershipType.TRUST,
+}
+NAME_SUFFIXES = {"JR", "SR", "II", "III", "IV", "V"}
+
+# Exemption codes for fully exempt parcels (EX, EX-XV, EX366, ...)
+TOTAL_EXEMPTION_PREFIX = "EX"
+
+DEFERRED_INDEX_TABLES = (Property.__table__, PropertyOwner.__table__, property_ownership, TaxAssessment.__table__)
+# Secondary indexes the importer's own lookups need
+LOADER_INDEXES = {"idx_property_ownership_property"}
+
+# Below this many rows a plain executemany is faster than COPY + staging table
+COPY_THRESHOLD = 1000
+# Rejected records logged individually per load
+MAX_LOGGED_REJECTS = 20
+
+CENTS = Decimal("0.01")
+LOT_SIZE_EXP = Decimal("0.0001")
+BATHROOM_EXP = Decimal("0.1")
+TAX_RATE_EXP = Decimal("0.000001")
+
+_non_word = re.compile(r"[^a-z0-9]+")
+_exemption_separators = re.compile(r"[\s,;|]+")
+_property_types = {member.value.upper(): member for member in PropertyType}
+
+
+def normalize_header(name: str) -> str:
+    return _non_word.sub("_", name.strip().lower()).strip("_")
+
+
+def _text(value: Optional[str], length: Optional[int] = None) -> Optional[str]:
+    if not value:
+        return None
+    value = value.strip()
+    if "  " in value:
+        value = " ".join(value.split())
+    if not value:
+        return None
+    return value[:length] if length else value
+
+
+def _decimal(value: Optional[str], exp: Decimal) -> Optional[Decimal]:
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return Decimal(value.replace("$", "").replace(",", "")).quantize(exp)
+    except InvalidOperation:
+        raise ValueError(f"not a number: {value!r}")
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    number = _decimal(value, Decimal(1))
+    return int(number) if number is not None else None
+
+
+@functools.lru_cache(maxsize=8192)
+def _date(value: Optional[str]) -> Optional[date]:
+    """Deed dates are often blank or malformed in rolls; those are ignored."""
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%Y%m%d", "%m/%d/%y"):
+        try:
+            return datetime.strptime(value[:10], fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def property_type_for(code: Optional[str]) -> PropertyType:
+    """PropertyType for a type name or Texas state code; unknown codes count as residential."""
+    code = (_text(code) or "").upper()
+    return _property_types.get(code) or STATE_CODE_TYPES.get(code[:2]) or STATE_CODE_TYPES.get(code[:1]) or PropertyType.RESIDENTIAL
+
+
+def parse_exemptions(value: Optional[str]) -> List[str]:
+    """Exemption codes from a list like ``"HS, OV65"`` or ``"HS OV65"``."""
+    return [code for code in _exemption_separators.split((value or "").upper()) if code]
+
+
+def parse_owner_name(name: str) -> Dict[str, Optional[str]]:
+    """
+    Split a roll owner name into PropertyOwner name fields.
+
+    Entities (LLC, trust, church, ...) keep the whole name as ``business_name``;
+    people are parsed as ``LAST FIRST [MIDDLE] [SUFFIX]`` or ``LAST, FIRST ...``.
+    """
+    return dict(_parse_owner_name(name))
+
+
+# Owners recur across their parcels, so parsed names are cached
+@functools.lru_cache(maxsize=65536)
+def _parse_owner_name(name: str) -> Dict[str, Optional[str]]:
+    name = " ".join(name.split()).upper()
+    tokens = name.replace(",", " , ").split()
+    for token in tokens:
+        business_type = BUSINESS_TYPES.get(token)
+        if business_type:
+            return {
+                "first_name": "",
+                "last_name": name[:100],
+                "middle_initial": None,
+                "suffix": None,
+                "business_name": name[:200],
+                "business_type": business_type,
+            }
+
+    if "," in tokens:
+        split = tokens.index(",")
+        last, given = tokens[:split], [t for t in tokens[split + 1:] if t != ","]
+    else:
+        last, given = tokens[:1], tokens[1:]
+    suffix = None
+    if given and given[-1].rstrip(".") in NAME_SUFFIXES:
+        suffix = given.pop().rstrip(".")
+    middle = None
+    if len(given) > 1 and len(given[-1].rstrip(".")) == 1:
+        middle = given.pop().rstrip(".")
+    return {
+        "first_name": " ".join(given)[:100],
+        "last_name": " ".join(last)[:100],
+        "middle_initial": middle,
+        "suffix": suffix,
+        "business_name": None,
+        "business_type": None,
+    }
+
+
+def owner_source_key(county: str, owner_key: Optional[str], name: str, mailing_address: Optional[str],
+                     mailing_zip: Optional[str]) -> str:
+    """
+    Stable owner identity: the roll's owner id within its county, otherwise
+    the normalized name and mailing address (the same across counties).
+    """
+    if owner_key:
+        basis = f"id|{county.upper()}|{owner_key}"
+    else:
+        basis = f"name|{normalize_header(name)}|{normalize_header(mailing_address or '')}|{(mailing_zip or '')[:5]}"
+    return hashlib.sha1(basis.encode()).hexdigest()
+
+
+class RollLayout:
+    """Where each canonical field sits in a CSV or fixed-width export."""
+
+    def __init__(
+        self,
+        fmt: str = "csv",
+        columns: Optional[Dict[str, str]] = None,
+        fields: Optional[Dict[str, List[int]]] = None,
+        delimiter: str = ",",
+        encoding: str = "utf-8-sig",
+        header_lines: int = 0,
+    ):
+        """
+        Initialize layout.
+
+        Args:
+            fmt: "csv" or "fixed"
+            columns: CSV: canonical field -> header (unmapped fields match by name or alias)
+            fields: Fixed-width: canonical field -> [start, end) character positions
+            delimiter: CSV delimiter
+            encoding: Text encoding of the export
+            header_lines: Fixed-width: leading lines to skip
+        """
+        if fmt not in ("csv", "fixed"):
+            raise ValueError(f"Unknown roll format: {fmt!r}")
+        if fmt == "fixed" and not fields:
+            raise ValueError("Fixed-width layouts need field positions")
+        unknown = set(columns or {}) | set(fields or {})
+        unknown -= set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown layout fields: {', '.join(sorted(unknown))}")
+
+        self.format = fmt
+        self.columns = dict(columns or {})
+        self.fields = {name: (int(start), int(end)) for name, (start, end) in (fields or {}).items()}
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.header_lines = header_lines
+
+    @classmethod
+    def from_file(cls, path: str) -> "RollLayout":
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(
+            fmt=spec.get("format", "csv"),
+            columns=spec.get("columns"),
+            fields=spec.get("fields"),
+            delimiter=spec.get("delimiter", ","),
+            encoding=spec.get("encoding", "utf-8-sig"),
+            header_lines=spec.get("header_lines", 0),
+        )
+
+    def _open(self, path: str):
+        if path.endswith(".gz"):
+            return gzip.open(path, "rt", encoding=self.encoding, errors="replace", newline="")
+        return open(path, encoding=self.encoding, errors="replace", newline="")
+
+    def resolve_headers(self, headers: List[str]) -> Dict[str, str]:
+        """Canonical field -> CSV header."""
+        by_normalized = {normalize_header(header): header for header in headers}
+        mapping = {}
+        for field in FIELDS:
+            if field in self.columns:
+                if self.columns[field] not in headers:
+                    raise ValueError(f"Layout column {self.columns[field]!r} ({field}) not in the file header")
+                mapping[field] = self.columns[field]
+                continue
+            for candidate in (field,) + HEADER_ALIASES.get(field, ()):
+                if candidate in by_normalized:
+                    mapping[field] = by_normalized[candidate]
+                    break
+        if "parcel_id" not in mapping:
+            raise ValueError("No parcel id column found; map parcel_id in a layout file")
+        return mapping
+
+    def records(self, path: str) -> Iterator[Dict[str, str]]:
+        """Yield one ``{field: raw text}`` dict per record, reading the file lazily."""
+        with self._open(path) as f:
+            if self.format == "csv":
+                reader = csv.reader(f, delimiter=self.delimiter)
+                headers = next(reader, None)
+                if headers is None:
+                    return
+                mapping = self.resolve_headers(headers)
+                positions = [(field, headers.index(header)) for field, header in mapping.items()]
+                width = len(headers)
+                for row in reader:
+                    if not row:
+                        continue
+                    if len(row) < width:
+                        row = row + [""] * (width - len(row))
+                    yield {field: row[index] for field, index in positions}
+            else:
+                for line in itertools.islice(f, self.header_lines, None):
+                    if not line.strip():
+                        continue
+                    yield {field: line[start:end] for field, (start, end) in self.fields.items()}
+
+
+class ImportBatch:
+    """What one committed chunk changed, passed to import hooks."""
+
+    __slots__ = (
+        "county", "assessment_year", "property_ids", "new_property_ids", "changed_property_ids",
+        "owner_ids", "new_owner_ids", "changed_owner_ids", "links_added", "links_ended", "assessment_changes",
+    )
+
+    def __init__(self, county: str, assessment_year: int):
+        self.county = county
+        self.assessment_year = assessment_year
+        # Every property in the chunk, and those inserted / with changed parcel data
+        self.property_ids: List[int] = []
+        self.new_property_ids: List[int] = []
+        self.changed_property_ids: List[int] = []
+        # Every owner in the chunk, and those inserted / with a changed name or mailing address
+        self.owner_ids: List[int] = []
+        self.new_owner_ids: List[int] = []
+        self.changed_owner_ids: List[int] = []
+        # (property_id, owner_id) ownership links opened and closed
+        self.links_added: List[Tuple[int, int]] = []
+        self.links_ended: List[Tuple[int, int]] = []
+        # property_id -> previous assessment values (None for a new assessment)
+        self.assessment_changes: Dict[int, Optional[Dict[str, Any]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.new_property_ids or self.changed_property_ids or self.new_owner_ids or self.changed_owner_ids
+            or self.links_added or self.links_ended or self.assessment_changes
+        )
+
+
+ImportHook = Callable[[Any, ImportBatch], Awaitable[None]]
+_import_hooks: List[ImportHook] = []
+
+
+def register_import_hook(hook: ImportHook) -> ImportHook:
+    """
+    Run ``hook(conn, batch)`` for every chunk that changed something.
+
+    Hooks run inside the chunk's transaction on its ``AsyncConnection``; a
+    chunk replayed after a crash calls them again, so they must be idempotent.
+    Usable as a decorator.
+    """
+    if hook not in _import_hooks:
+        _import_hooks.append(hook)
+    return hook
+
+
+LoadHook = Callable[[Any, str, int, Dict[str, Any]], Awaitable[None]]
+_load_hooks: List[LoadHook] = []
+
+
+def register_load_hook(hook: LoadHook) -> LoadHook:
+    """
+    Run ``hook(manager, county, assessment_year, stats)`` after each completed file load.
+
+    For derived data that is rebuilt per county rather than per chunk. The
+    load is already committed: a failing hook is logged and does not fail it.
+    Usable as a decorator.
+    """
+    if hook not in _load_hooks:
+        _load_hooks.append(hook)
+    return hook
+
+
+RepriceHook = Callable[[Any, List[int]], Awaitable[None]]
+_reprice_hooks: List[RepriceHook] = []
+
+
+def register_reprice_hook(hook: RepriceHook) -> RepriceHook:
+    """
+    Run ``hook(conn, property_ids)`` when assessment taxes are re-priced outside an import.
+
+    Called by the tax engine and rate stack in the transaction that wrote the
+    new taxes, with the parcels whose assessments changed; imports use
+    ``register_import_hook`` instead. Usable as a decorator.
+    """
+    if hook not in _reprice_hooks:
+        _reprice_hooks.append(hook)
+    return hook
+
+
+async def assessments_repriced(conn, assessment_ids: List[int]) -> None:
+    """Run the re-price hooks for the parcels of these assessments, on the caller's transaction."""
+    if not _reprice_hooks or not assessment_ids:
+        return
+    property_ids: set = set()
+    for start in range(0, len(assessment_ids), 1000):
+        property_ids.update((await conn.execute(
+            select(TaxAssessment.__table__.c.property_id)
+            .where(TaxAssessment.__table__.c.id.in_(assessment_ids[start:start + 1000]))
+        )).scalars())
+    for hook in _reprice_hooks:
+        await hook(conn, sorted(property_ids))
+
+
+def _copy_value(value: Any) -> Any:
+    # Staging columns keep the table's types: enums are stored by name, JSON as text
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+class RollImporter:
+    """Chunked, resumable loader for one county's appraisal roll."""
+
+    def __init__(
+        self,
+        manager,
+        county: str,
+        assessment_year: int,
+        state: str = "TX",
+        chunk_size: Optional[int] = None,
+        defer_indexes: bool = False,
+    ):
+        """
+        Initialize importer.
+
+        Args:
+            manager: DatabaseManager to load into
+            county: County of every parcel in the roll
+            assessment_year: Tax year of the roll's values
+            state: State of the parcels
+            chunk_size: Records per transaction (defaults to ``PROPERTY_IMPORT_CHUNK_SIZE``)
+            defer_indexes: Drop secondary indexes during the load and rebuild them after
+        """
+        if chunk_size is None:
+            from config.settings import settings
+            chunk_size = settings.property_import_chunk_size
+        if manager.backend not in ("sqlite", "postgresql"):
+            raise ValueError(f"Roll import supports SQLite and PostgreSQL, not {manager.backend}")
+
+        self.manager = manager
+        self.county = county
+        self.assessment_year = assessment_year
+        self.state = state
+        self.chunk_size = max(1, chunk_size)
+        self.defer_indexes = defer_indexes
+        self.is_postgres = manager.backend == "postgresql"
+        self._insert = postgresql_insert if self.is_postgres else sqlite_insert
+        self._statements: Dict[Tuple, Any] = {}
+        self.stats: Dict[str, Any] = {}
+
+    def _reset_stats(self) -> None:
+        self.stats = {
+            "records_read": 0,
+            "records_rejected": 0,
+            "properties_inserted": 0,
+            "properties_updated": 0,
+            "owners_inserted": 0,
+            "owners_updated": 0,
+            "links_added": 0,
+            "links_ended": 0,
+            "assessments_inserted": 0,
+            "assessments_updated": 0,
+            "chunks": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Records -> rows
+
+    def _parse(self, record: Dict[str, str]) -> Dict[str, Any]:
+        """One record as property / owner / assessment rows (raises ValueError on bad values)."""
+        parcel_id = _text(record.get("parcel_id"), 50)
+        if not parcel_id:
+            raise ValueError("missing parcel id")
+
+        prop: Dict[str, Any] = {
+            "parcel_id": parcel_id,
+            "street_address": _text(record.get("street_address"), 500) or "",
+            "city": _text(record.get("city"), 100) or "",
+            "state": self.state,
+            "zip_code": (_text(record.get("zip_code")) or "")[:10],
+            "county": self.county,
+            "property_type": property_type_for(record.get("property_type")),
+        }
+        # Only columns the roll carries are written, so other sources' values survive
+        for field, convert in (
+            ("square_footage", _int),
+            ("lot_size", lambda v: _decimal(v, LOT_SIZE_EXP)),
+            ("year_built", _int),
+            ("bedrooms", _int),
+            ("bathrooms", lambda v: _decimal(v, BATHROOM_EXP)),
+            ("legal_description", _text),
+            ("subdivision", lambda v: _text(v, 200)),
+            ("block", lambda v: _text(v, 50)),
+            ("lot", lambda v: _text(v, 50)),
+        ):
+            if field in record:
+                prop[field] = convert(record[field])
+
+        codes = None
+        if "exemptions" in record:
+            codes = parse_exemptions(record["exemptions"])
+            prop["exemption_details"] = {"codes": codes, "homestead": "HS" in codes}
+            prop["is_tax_exempt"] = any(code.startswith(TOTAL_EXEMPTION_PREFIX) for code in codes)
+
+        owner = None
+        owner_name = _text(record.get("owner_name"))
+        if not owner_name and (record.get("owner_last_name") or record.get("owner_business_name")):
+            owner_name = " ".join(filter(None, (
+                _text(record.get("owner_business_name")),
+                _text(record.get("owner_last_name")),
+                _text(record.get("owner_first_name")),
+            )))
+        if owner_name:
+            owner = parse_owner_name(owner_name)
+            if _text(record.get("owner_last_name")) and not owner["business_name"]:
+                owner["last_name"] = _text(record["owner_last_name"], 100).upper()
+                owner["first_name"] = (_text(record.get("owner_first_name"), 100) or "").upper()
+            owner.update({
+                "mailing_address": _text(record.get("mailing_address"), 500),
+                "mailing_city": _text(record.get("mailing_city"), 100),
+                "mailing_state": _text(record.get("mailing_state"), 50),
+                "mailing_zip": (_text(record.get("mailing_zip")) or "")[:10] or None,
+            })
+            owner["source_key"] = owner_source_key(
+                self.county, _text(record.get("owner_key")), owner_name,
+                owner["mailing_address"], owner["mailing_zip"],
+            )
+
+        assessment = None
+        land = _decimal(record.get("land_value"), CENTS)
+        improvement = _decimal(record.get("improvement_value"), CENTS)
+        assessed = _decimal(record.get("total_assessed_value"), CENTS)
+        market = _decimal(record.get("market_value"), CENTS)
+        if any(value is not None for value in (land, improvement, assessed, market)):
+            if assessed is None:
+                assessed = (land or 0) + (improvement or 0) or (market or Decimal("0.00"))
+            assessment = {
+                "land_value": land if land is not None else Decimal("0.00"),
+                "improvement_value": improvement if improvement is not None else Decimal("0.00"),
+                "total_assessed_value": assessed,
+                "market_value": market,
+                "tax_rate": _decimal(record.get("tax_rate"), TAX_RATE_EXP) or Decimal("0.000000"),
+                "tax_rate_type": _text(record.get("tax_rate_type"), 20) or "per_100",
+                "total_exemption_amount": _decimal(record.get("total_exemption_amount"), CENTS) or Decimal("0.00"),
+            }
+            if codes is not None:
+                assessment["exemptions_applied"] = {"codes": codes}
+
+        return {
+            "property": prop,
+            "owner": owner,
+            "assessment": assessment,
+            "start_date": _date(record.get("ownership_start_date")) or date(self.assessment_year, 1, 1),
+            "homestead": bool(codes and "HS" in codes),
+        }
+
+    def _assessment_insert_values(self) -> Dict[str, Any]:
+        """Columns set only when an assessment is created (Texas: due Jan 31, protest by May 15)."""
+        year = self.assessment_year
+        return {
+            "assessment_year": year,
+            "assessment_date": date(year, 1, 1),
+            "effective_date": date(year, 1, 1),
+            "base_tax_amount": Decimal("0.00"),
+            "final_tax_amount": Decimal("0.00"),
+            "installments": 1,
+            "due_dates": [f"{year + 1}-01-31"],
+            "appeal_deadline": date(year, 5, 15),
+        }
+
+    # ------------------------------------------------------------------
+    # Bulk writes
+
+    def _upsert_statement(self, table: Table, conflict: Tuple[str, ...], update_columns: Tuple[str, ...]):
+        key = (table.name, conflict, update_columns)
+        stmt = self._statements.get(key)
+        if stmt is None:
+            stmt = self._insert(table)
+            if update_columns:
+                set_ = {name: stmt.excluded[name] for name in update_columns}
+                set_["updated_at"] = func.now()
+                stmt = stmt.on_conflict_do_update(index_elements=list(conflict), set_=set_)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict))
+            self._statements[key] = stmt
+        return stmt
+
+    async def _upsert(self, conn, table: Table, rows: List[Dict[str, Any]], conflict: Tuple[str, ...],
+                      update_columns: Tuple[str, ...]) -> None:
+        if not rows:
+            return
+        if self.is_postgres and len(rows) >= COPY_THRESHOLD:
+            await self._copy_upsert(conn, table, rows, conflict, update_columns)
+        else:
+            await conn.execute(self._upsert_statement(table, conflict, update_columns), rows)
+
+    async def _copy_upsert(self, conn, table: Table, rows: List[Dict[str, Any]], conflict: Tuple[str, ...],
+                           update_columns: Tuple[str, ...]) -> None:
+        """PostgreSQL: COPY rows into a transaction-scoped staging table, then one INSERT ... SELECT."""
+        # COPY skips SQLAlchemy's Python-side column defaults, so fill them in here
+        defaults = {
+            column.name: column.default.arg
+            for column in table.columns
+            if column.name not in rows[0] and column.default is not None and column.default.is_scalar
+        }
+        columns = list(rows[0]) + list(defaults)
+        column_list = ", ".join(columns)
+        staging = f"import_{table.name}"
+
+        # The SELECTs before this already opened the transaction, so the table lives until commit
+        await conn.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {table.name} WITH NO DATA"
+        ))
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            staging,
+            records=[tuple(_copy_value(row.get(name, defaults.get(name))) for name in columns) for row in rows],
+            columns=columns,
+        )
+        if update_columns:
+            action = "DO UPDATE SET " + ", ".join(
+                [f"{name} = EXCLUDED.{name}" for name in update_columns] + ["updated_at = now()"]
+            )
+        else:
+            action = "DO NOTHING"
+        await conn.execute(text(
+            f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({', '.join(conflict)}) {action}"
+        ))
+        await conn.execute(text(f"TRUNCATE {staging}"))
+
+    async def _sync(
+        self,
+        conn,
+        table: Table,
+        key: str,
+        rows: Dict[Any, Dict[str, Any]],
+        conflict: Tuple[str, ...],
+        scope: Optional[Dict[str, Any]] = None,
+        insert_values: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[Any, int], List[Any], Dict[Any, Dict[str, Any]]]:
+        """
+        Write the rows (keyed by ``key``) that are new or differ from the table.
+
+        Returns:
+            (key -> id for every row, keys inserted, key -> previous values of updated rows)
+        """
+        if not rows:
+            return {}, [], {}
+        compare = tuple(next(iter(rows.values())))
+        scope = scope or {}
+        c = table.c
+        stmt = select(c.id, *[c[name] for name in compare]).where(c[key].in_(list(rows)))
+        for name, value in scope.items():
+            stmt = stmt.where(c[name] == value)
+
+        ids: Dict[Any, int] = {}
+        changed: Dict[Any, Dict[str, Any]] = {}
+        for existing in (await conn.execute(stmt)).mappings():
+            row_key = existing[key]
+            ids[row_key] = existing["id"]
+            row = rows[row_key]
+            if any(existing[name] != row[name] for name in compare):
+                changed[row_key] = {name: existing[name] for name in compare}
+
+        inserted = [row_key for row_key in rows if row_key not in ids]
+        update_columns = tuple(name for name in compare if name not in conflict)
+        writes = [{**rows[row_key], **(insert_values or {})} for row_key in inserted]
+        # Updates carry the same columns as inserts so both fit one executemany
+        writes += [{**rows[row_key], **(insert_values or {})} for row_key in changed]
+        await self._upsert(conn, table, writes, conflict, update_columns)
+
+        if inserted:
+            stmt = select(c.id, c[key]).where(c[key].in_(inserted))
+            for name, value in scope.items():
+                stmt = stmt.where(c[name] == value)
+            for row_id, row_key in await conn.execute(stmt):
+                ids[row_key] = row_id
+        return ids, inserted, changed
+
+    async def _sync_ownership(self, conn, links: Dict[int, Tuple[int, date, Dict[str, Any]]], batch: ImportBatch) -> None:
+        """Open a link to each parcel's roll owner and close links to previous owners."""
+        if not links:
+            return
+        po = property_ownership.c
+        current: Dict[int, Dict[int, int]] = defaultdict(dict)
+        result = await conn.execute(
+            select(po.id, po.property_id, po.owner_id)
+            .where(po.property_id.in_(list(links)), po.end_date.is_(None))
+        )
+        for link_id, property_id, owner_id in result:
+            current[property_id][owner_id] = link_id
+
+        added, ended = [], []
+        for property_id, (owner_id, start_date, link) in links.items():
+            owners = current.get(property_id, {})
+            if owner_id not in owners:
+                added.append({"property_id": property_id, "owner_id": owner_id, "start_date": start_date, **link})
+                batch.links_added.append((property_id, owner_id))
+            for previous_owner, link_id in owners.items():
+                if previous_owner != owner_id:
+                    ended.append({"link_id": link_id, "ended": start_date})
+                    batch.links_ended.append((property_id, previous_owner))
+
+        await self._upsert(conn, property_ownership, added, ("property_id", "owner_id", "start_date"), ())
+        if ended:
+            await conn.execute(
+                update(property_ownership)
+                .where(po.id == bindparam("link_id"))
+                .values(end_date=bindparam("ended"), updated_at=func.now()),
+                ended,
+            )
+        self.stats["links_added"] += len(added)
+        self.stats["links_ended"] += len(ended)
+
+    async def _write_chunk(self, records: List[Tuple[int, Dict[str, str]]]) -> None:
+        parsed: Dict[str, Dict[str, Any]] = {}
+        for number, record in records:
+            try:
+                entry = self._parse(record)
+            except ValueError as e:
+                self.stats["records_rejected"] += 1
+                if self.stats["records_rejected"] <= MAX_LOGGED_REJECTS:
+                    logger.warning(f"⚠️ Skipping roll record {number}: {e}")
+                continue
+            # A parcel listed twice keeps its last record
+            parsed[entry["property"]["parcel_id"]] = entry
+        if not parsed:
+            return
+
+        batch = ImportBatch(self.county, self.assessment_year)
+        async with self.manager.begin_write() as conn:
+            property_ids, inserted, changed = await self._sync(
+                conn, Property.__table__, "parcel_id",
+                {parcel_id: entry["property"] for parcel_id, entry in parsed.items()},
+                ("parcel_id",),
+                insert_values={"is_active": True},
+            )
+            batch.property_ids = list(property_ids.values())
+            batch.new_property_ids = [property_ids[key] for key in inserted]
+            batch.changed_property_ids = [property_ids[key] for key in changed]
+            self.stats["properties_inserted"] += len(inserted)
+            self.stats["properties_updated"] += len(changed)
+
+            owners = {entry["owner"]["source_key"]: entry["owner"] for entry in parsed.values() if entry["owner"]}
+            owner_ids, inserted, changed = await self._sync(
+                conn, PropertyOwner.__table__, "source_key", owners, ("source_key",),
+            )
+            batch.owner_ids = list(owner_ids.values())
+            batch.new_owner_ids = [owner_ids[key] for key in inserted]
+            batch.changed_owner_ids = [owner_ids[key] for key in changed]
+            self.stats["owners_inserted"] += len(inserted)
+            self.stats["owners_updated"] += len(changed)
+
+            links = {}
+            for parcel_id, entry in parsed.items():
+                if entry["owner"]:
+                    business_type = entry["owner"]["business_type"]
+                    links[property_ids[parcel_id]] = (owner_ids[entry["owner"]["source_key"]], entry["start_date"], {
+                        "ownership_percentage": Decimal("100.00"),
+                        "ownership_type": OWNERSHIP_TYPES.get(business_type) or (
+                            OwnershipType.JOINT if "&" in entry["owner"]["first_name"] else OwnershipType.SOLE
+                        ),
+                        "is_primary_residence": entry["homestead"],
+                    })
+            await self._sync_ownership(conn, links, batch)
+
+            assessments = {
+                property_ids[parcel_id]: entry["assessment"]
+                for parcel_id, entry in parsed.items() if entry["assessment"]
+            }
+            _, inserted, changed = await self._sync(
+                conn, TaxAssessment.__table__, "property_id",
+                {property_id: {"property_id": property_id, **row} for property_id, row in assessments.items()},
+                ("property_id", "assessment_year"),
+                scope={"assessment_year": self.assessment_year},
+                insert_values=self._assessment_insert_values(),
+            )
+            batch.assessment_changes = {property_id: None for property_id in inserted}
+            batch.assessment_changes.update(changed)
+            self.stats["assessments_inserted"] += len(inserted)
+            self.stats["assessments_updated"] += len(changed)
+
+            if batch:
+                for hook in _import_hooks:
+                    await hook(conn, batch)
+
+    # ------------------------------------------------------------------
+    # Secondary indexes
+
+    @staticmethod
+    def deferrable_indexes():
+        return [
+            index
+            for table in DEFERRED_INDEX_TABLES
+            for index in sorted(table.indexes, key=lambda i: i.name)
+            if not index.unique and index.name not in LOADER_INDEXES
+        ]
+
+    async def drop_secondary_indexes(self) -> int:
+        indexes = self.deferrable_indexes()
+        async with self.manager.begin_write() as conn:
+            for index in indexes:
+                await conn.run_sync(lambda sync_conn, index=index: index.drop(sync_conn, checkfirst=True))
+        logger.info(f"🗑️ Dropped {len(indexes)} secondary indexes for the roll import")
+        return len(indexes)
+
+    async def create_secondary_indexes(self) -> int:
+        """Create any missing secondary index (also recovers from a load that was killed)."""
+        indexes = self.deferrable_indexes()
+        started = time.perf_counter()
+        async with self.manager.begin_write() as conn:
+            for index in indexes:
+                await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+        logger.info(f"🏗️ Secondary indexes ready in {time.perf_counter() - started:.1f}s", indexes=len(indexes))
+        return len(indexes)
+
+    async def _analyze(self) -> None:
+        async with self.manager.begin_write() as conn:
+            for table in DEFERRED_INDEX_TABLES:
+                await conn.execute(text(f"ANALYZE {table.name}"))
+
+    # ------------------------------------------------------------------
+    # Loading
+
+    async def import_records(
+        self,
+        records: Iterable[Dict[str, str]],
+        skip: int = 0,
+        on_chunk: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Load ``{field: raw text}`` records (see ``FIELDS``), one transaction per chunk.
+
+        Args:
+            records: Records in roll order
+            skip: Records already loaded (resuming)
+            on_chunk: Called with the number of records consumed after each committed chunk
+
+        Returns:
+            Load statistics
+        """
+        self._reset_stats()
+        started = time.perf_counter()
+        numbered = enumerate(itertools.islice(records, skip, None), start=skip + 1)
+        consumed = skip
+        while True:
+            chunk = list(itertools.islice(numbered, self.chunk_size))
+            if not chunk:
+                break
+            await self._write_chunk(chunk)
+            consumed += len(chunk)
+            self.stats["records_read"] += len(chunk)
+            self.stats["chunks"] += 1
+            if on_chunk:
+                on_chunk(consumed)
+            if self.stats["chunks"] % 20 == 0:
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"📥 Roll import progress: {consumed} records",
+                    county=self.county,
+                    records_per_second=round(self.stats["records_read"] / elapsed),
+                )
+
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed_seconds"] = round(elapsed, 2)
+        self.stats["records_per_second"] = round(self.stats["records_read"] / elapsed) if elapsed else 0
+        return self.stats
+
+    async def import_file(
+        self,
+        path: str,
+        layout: Optional[RollLayout] = None,
+        checkpoint_path: Optional[str] = None,
+        restart: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Load a roll file, resuming from its checkpoint if a previous load stopped.
+
+        Args:
+            path: CSV or fixed-width file (``.gz`` is decompressed on the fly)
+            layout: Column layout (defaults to CSV with header matching)
+            checkpoint_path: Progress file (defaults to ``<path>.checkpoint``)
+            restart: Ignore an existing checkpoint
+
+        Returns:
+            Load statistics
+        """
+        layout = layout or RollLayout()
+        checkpoint = _Checkpoint(checkpoint_path or f"{path}.checkpoint", path, self.county, self.assessment_year)
+        skip = 0 if restart else checkpoint.load()
+        if skip:
+            logger.info(f"⏩ Resuming roll import after record {skip}", source=path)
+
+        if self.defer_indexes:
+            await self.drop_secondary_indexes()
+        try:
+            stats = await self.import_records(layout.records(path), skip=skip, on_chunk=checkpoint.save)
+        finally:
+            if self.defer_indexes:
+                await self.create_secondary_indexes()
+        await self._analyze()
+        checkpoint.clear()
+
+        stats["resumed_from"] = skip
+        logger.info(
+            f"✅ Roll import finished: {stats['records_read']} records in {stats['elapsed_seconds']}s",
+            county=self.county,
+            year=self.assessment_year,
+            rejected=stats["records_rejected"],
+        )
+        for hook in _load_hooks:
+            try:
+                await hook(self.manager, self.county, self.assessment_year, stats)
+            except Exception as e:
+                logger.error(f"❌ Post-import hook {hook.__qualname__} failed: {e}", county=self.county)
+        return stats
+
+
+class _Checkpoint:
+    """Records consumed from one roll file, tied to the file's size and mtime."""
+
+    def __init__(self, path: str, source: str, county: str, assessment_year: int):
+        self.path = path
+        source_stat = os.stat(source)
+        self.identity = {
+            "source": os.path.abspath(source),
+            "size": source_stat.st_size,
+            "mtime": source_stat.st_mtime,
+            "county": county,
+            "assessment_year": assessment_year,
+        }
+
+    def load(self) -> int:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            logger.warning(f"⚠️ Unreadable import checkpoint ignored: {self.path}")
+            return 0
+        if {key: state.get(key) for key in self.identity} != self.identity:
+            logger.warning(f"⚠️ Import checkpoint is for a different file or run, starting over: {self.path}")
+            return 0
+        return int(state.get("records", 0))
+
+    def save(self, records: int) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({**self.identity, "records": records, "saved_at": datetime.now().isoformat()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        if args.command == "indexes":
+            importer = RollImporter(manager, county="", assessment_year=0, chunk_size=1)
+            await importer.create_secondary_indexes()
+            return 0
+
+        if not (args.source and args.county and args.year):
+            print("load needs a source file, --county and --year")
+            return 2
+        if args.layout:
+            layout = RollLayout.from_file(args.layout)
+        else:
+            layout = RollLayout(delimiter=args.delimiter, encoding=args.encoding)
+        importer = RollImporter(
+            manager,
+            county=args.county,
+            assessment_year=args.year,
+            state=args.state,
+            chunk_size=args.chunk_size,
+            defer_indexes=args.defer_indexes,
+        )
+        stats = await importer.import_file(args.source, layout, checkpoint_path=args.checkpoint, restart=args.restart)
+        print(json.dumps(stats, indent=2))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load a county appraisal roll")
+    parser.add_argument("command", choices=["load", "indexes"],
+                        help="load a roll, or recreate secondary indexes after an interrupted --defer-indexes load")
+    parser.add_argument("source", nargs="?", help="CSV or fixed-width roll file (.gz allowed)")
+    parser.add_argument("--county", help="County of the roll's parcels")
+    parser.add_argument("--year", type=int, help="Assessment year of the roll's values")
+    parser.add_argument("--state", default="TX")
+    parser.add_argument("--layout", help="JSON layout file (see module docstring)")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter without --layout (fixed-width rolls need one)")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--chunk-size", type=int, help="Override PROPERTY_IMPORT_CHUNK_SIZE")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <source>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Drop secondary indexes during the load (initial loads, maintenance windows)")
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Static KD-tree over float32 points, stored as flat arrays.
+
+Built once with median splits on each node's widest dimension and queried
+best-first using per-node bounding boxes. Points are reordered so that every
+node covers a contiguous slice of the point array: a leaf scan reads one
+sequential block, which is what makes memory-mapped trees cheap to query.
+"""
+
+import heapq
+from typing import Dict, Tuple
+
+import numpy as np
+
+DEFAULT_LEAF_SIZE = 64
+# Candidate points compared with one leaf's queries per matrix product
+SCAN_CHUNK = 20_000
+# Leaves scanned first to bound a leaf's k-th neighbour distances
+NEAR_LEAVES = 8
+
+# Columns of the ``nodes`` array; LEFT is -1 for leaves
+START, END, LEFT, RIGHT = range(4)
+
+
+class KDTree:
+    """Nodes, bounding boxes and points (in tree order) of a built tree."""
+
+    __slots__ = ("points", "nodes", "lower", "upper", "_node_list")
+
+    def __init__(self, points: np.ndarray, nodes: np.ndarray, lower: np.ndarray, upper: np.ndarray):
+        self.points = points
+        self.nodes = nodes
+        self.lower = lower
+        self.upper = upper
+        # Traversal reads one node at a time; Python ints beat numpy scalar indexing there
+        self._node_list = nodes.tolist()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @classmethod
+    def build(cls, points: np.ndarray, leaf_size: int = DEFAULT_LEAF_SIZE) -> Tuple["KDTree", np.ndarray]:
+        """
+        Build a tree over ``points`` (n x d).
+
+        Returns:
+            (tree, order) where ``tree.points == points[order]``
+        """
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        n, d = points.shape
+        order = np.arange(n, dtype=np.int64)
+        nodes, lower, upper = [], [], []
+
+        def add(start: int, end: int) -> int:
+            nodes.append([start, end, -1, -1])
+            lower.append(None)
+            upper.append(None)
+            return len(nodes) - 1
+
+        stack = [add(0, n)] if n else []
+        while stack:
+            node = stack.pop()
+            start, end = nodes[node][START], nodes[node][END]
+            block = points[order[start:end]]
+            lower[node] = block.min(axis=0)
+            upper[node] = block.max(axis=0)
+            if end - start <= leaf_size:
+                continue
+            spread = upper[node] - lower[node]
+            dim = int(np.argmax(spread))
+            if spread[dim] <= 0:
+                continue  # all points identical
+            mid = (start + end) // 2
+            part = np.argpartition(block[:, dim], mid - start)
+            order[start:end] = order[start:end][part]
+            left, right = add(start, mid), add(mid, end)
+            nodes[node][LEFT], nodes[node][RIGHT] = left, right
+            stack.extend((right, left))
+
+        tree = cls(
+            points[order],
+            np.array(nodes, dtype=np.int64).reshape(-1, 4),
+            np.array(lower, dtype=np.float32).reshape(-1, d),
+            np.array(upper, dtype=np.float32).reshape(-1, d),
+        )
+        return tree, order
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"points": self.points, "nodes": self.nodes, "lower": self.lower, "upper": self.upper}
+
+    def query(self, point: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The ``k`` nearest points to ``point`` (Euclidean).
+
+        Returns:
+            (distances, positions in tree order), nearest first
+        """
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        q = np.asarray(point, dtype=np.float32)
+        best_d = np.full(k, np.inf, dtype=np.float32)
+        best_i = np.full(k, -1, dtype=np.int64)
+        worst = np.inf
+        nodes = self._node_list
+        heap = [(0.0, 0)]
+
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if bound >= worst:
+                break
+            start, end, left, right = nodes[node]
+            if left < 0:
+                diff = self.points[start:end] - q
+                dist = np.einsum("ij,ij->i", diff, diff)
+                cand_d = np.concatenate((best_d, dist))
+                cand_i = np.concatenate((best_i, np.arange(start, end, dtype=np.int64)))
+                keep = np.argpartition(cand_d, k - 1)[:k]
+                best_d, best_i = cand_d[keep], cand_i[keep]
+                worst = float(best_d.max())
+                continue
+            children = (left, right)
+            # Squared distance from q to each child's bounding box
+            gap = np.maximum(self.lower[children, :] - q, 0) + np.maximum(q - self.upper[children, :], 0)
+            for child, child_bound in zip(children, np.einsum("ij,ij->i", gap, gap).tolist()):
+                if child_bound < worst:
+                    heapq.heappush(heap, (child_bound, child))
+
+        ranked = np.argsort(best_d, kind="stable")
+        ranked = ranked[best_i[ranked] >= 0]
+        return np.sqrt(best_d[ranked]), best_i[ranked]
+
+    def neighbours(self, positions: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The ``k`` nearest other points of the points at ``positions`` (tree order).
+
+        Batch form of ``query`` for points already in the tree, one leaf at a
+        time. The leaves closest to leaf L give each of its points q an upper
+        bound r(q) on its k-th distance. Every point of L is at least
+        box-distance(L, M) away from any point of leaf M, so only leaves
+        within r(q) of some q can hold a neighbour. Their points are compared
+        with all of L's points in matrix products and kept where they are
+        within r(q); only those survivors are ranked.
+
+        Returns:
+            (distances, positions), each ``len(positions) x k``, nearest
+            first; padded with inf / -1 when the tree has fewer than k + 1 points
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        distances = np.full((len(positions), k), np.inf, dtype=np.float32)
+        found = np.full((len(positions), k), -1, dtype=np.int64)
+        if not len(positions) or k <= 0:
+            return distances, found
+
+        leaves = np.flatnonzero(self.nodes[:, LEFT] < 0)
+        leaves = leaves[np.argsort(self.nodes[leaves, START])]
+        starts = self.nodes[leaves, START]
+        ends = self.nodes[leaves, END]
+        lower = np.asarray(self.lower[leaves])
+        upper = np.asarray(self.upper[leaves])
+        take = min(k + 1, len(self.points))
+
+        leaf_of = np.searchsorted(starts, positions, side="right") - 1
+        by_leaf = np.argsort(leaf_of, kind="stable")
+        bounds = np.flatnonzero(np.diff(leaf_of[by_leaf], prepend=-1, append=len(leaves)))
+        for first, last in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            rows = by_leaf[first:last]
+            leaf = leaf_of[rows[0]]
+            own = positions[rows]
+            q = np.asarray(self.points[own], dtype=np.float64)
+            gap = np.maximum(lower - upper[leaf], 0) + np.maximum(lower[leaf] - upper, 0)
+            box = np.einsum("ij,ij->i", gap, gap)
+
+            near = np.argpartition(box, min(NEAR_LEAVES, len(box) - 1))[:NEAR_LEAVES]
+            if (ends[near] - starts[near]).sum() < take:
+                near = np.argpartition(box, min(take, len(box) - 1))[:take]
+            near_d = self._squared(q, _members(near, starts, ends))
+            # Float32 ranking below may differ from these float64 sums in the last bits
+            reach = np.partition(near_d, take - 1, axis=1)[:, take - 1] * (1 + 1e-5) + 1e-9
+
+            # Leaves some query point of L could reach, by point-to-box distance
+            scan = np.flatnonzero(box <= reach.max())
+            gap = np.maximum(lower[scan][None, :, :] - q[:, None, :], 0) + np.maximum(q[:, None, :] - upper[scan][None, :, :], 0)
+            needed = (np.einsum("ijk,ijk->ij", gap, gap) <= reach[:, None]).any(axis=0)
+            candidates = _members(scan[needed], starts, ends)
+
+            query_row, column = [], []
+            for chunk in range(0, len(candidates), SCAN_CHUNK):
+                hit_row, hit_column = np.nonzero(self._squared(q, candidates[chunk:chunk + SCAN_CHUNK]) <= reach[:, None])
+                query_row.append(hit_row)
+                column.append(hit_column + chunk)
+            query_row, column = np.concatenate(query_row), np.concatenate(column)
+            other = candidates[column]
+            keep = other != own[query_row]
+            query_row, other = query_row[keep], other[keep]
+            # Exact distances the way ``query`` computes them, so both rank alike
+            diff = self.points[other] - self.points[own[query_row]]
+            exact = np.einsum("ij,ij->i", diff, diff)
+            ranked = np.lexsort((other, exact, query_row))
+            query_row, other, exact = query_row[ranked], other[ranked], exact[ranked]
+            rank = np.arange(len(query_row)) - np.searchsorted(query_row, query_row)
+            keep = rank < k
+            distances[rows[query_row[keep]], rank[keep]] = np.sqrt(exact[keep])
+            found[rows[query_row[keep]], rank[keep]] = other[keep]
+        return distances, found
+
+    def _squared(self, q: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Squared distances (float64) from each query to each candidate position, as one matrix product."""
+        points = np.asarray(self.points[candidates], dtype=np.float64)
+        squared = (q * q).sum(axis=1)[:, None] + (points * points).sum(axis=1)[None, :] - 2 * q @ points.T
+        return np.maximum(squared, 0)
+
+
+def _members(leaves: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Positions of the points of ``leaves``: their start..end ranges concatenated."""
+    sizes = ends[leaves] - starts[leaves]
+    return np.arange(sizes.sum()) + np.repeat(starts[leaves] - np.cumsum(sizes) + sizes, sizes)
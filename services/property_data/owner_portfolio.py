@@ -0,0 +1,323 @@
+"""
+Owner portfolio totals kept current by deltas.
+
+``PropertyOwner.total_properties_owned``, ``total_assessed_value`` and
+``total_annual_tax`` cover an owner's current parcels (open
+``property_ownership`` links), each at its latest assessment
+(``total_assessed_value`` and ``final_tax_amount``). Ownership percentages are
+not applied: a co-owned parcel counts in full for each owner.
+
+Every link records what it adds to its owner's totals
+(``portfolio_assessed_value`` / ``portfolio_annual_tax``; NULL = not counted),
+so the totals never have to be re-summed:
+
+- ``reconcile_portfolios(conn, property_ids)`` re-reads the links of the
+  given parcels and their latest assessments. An open link adds
+  ``new - counted`` to its owner (and one property if it was not counted
+  yet); a closed link that is still counted takes its contribution back. Links already up to date write
+  nothing, so running it twice is harmless;
+- the roll importer runs it for each chunk's parcels whose links or
+  assessments changed, in the chunk's transaction, after the tax engine and
+  rate stack hooks have priced the chunk. Re-pricing outside an import
+  (``tax_engine run``, ``rate_stack price``/``set-rates``/``compile``) runs
+  it for the re-priced parcels through a re-price hook, in its transaction;
+- ``rebuild`` recomputes every link and every owner in three set-based
+  statements in one transaction, writing only rows whose values differ. Run
+  it once after migrating and to repair drift.
+
+A portfolio question is then a primary-key read (``portfolio``), or a sum over
+an owner's resolved spellings (services.property_data.owner_resolution).
+
+    python -m services.property_data.owner_portfolio rebuild
+    python -m services.property_data.owner_portfolio show 1234 --resolved
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, bindparam, case, exists, func, or_, select, update
+
+from src.core.logging import get_logger
+from services.persistence.database import PropertyOwner, TaxAssessment, property_ownership
+# Their import hooks price a chunk's assessments; ours has to read the priced values, so it registers after them
+from . import rate_stack, tax_engine  # noqa: F401
+from .importer import ImportBatch, register_import_hook, register_reprice_hook
+
+logger = get_logger("owner_portfolio")
+
+# Parcel ids per IN list, and owner rows per UPDATE executemany
+KEY_BATCH = 1000
+WRITE_BATCH_ROWS = 5000
+
+ZERO = Decimal("0.00")
+
+_owner = PropertyOwner.__table__.c
+_assessment = TaxAssessment.__table__.c
+_link = property_ownership.c
+
+# Sums round to the cent, so SQLite (Numeric stored as REAL) gives the delta and rebuild paths equal totals.
+# Derived totals are not an edit of the owner or link record (the owner name index fingerprints updated_at).
+_ADD_TO_TOTALS = (
+    update(PropertyOwner.__table__)
+    .where(_owner.id == bindparam("owner_id"))
+    .values(
+        total_properties_owned=func.coalesce(_owner.total_properties_owned, 0) + bindparam("properties"),
+        total_assessed_value=func.round(func.coalesce(_owner.total_assessed_value, 0) + bindparam("assessed_value"), 2),
+        total_annual_tax=func.round(func.coalesce(_owner.total_annual_tax, 0) + bindparam("annual_tax"), 2),
+        updated_at=_owner.updated_at,
+    )
+)
+_SET_COUNTED = (
+    update(property_ownership)
+    .where(_link.id == bindparam("link_id"))
+    .values(
+        portfolio_assessed_value=bindparam("assessed_value"),
+        portfolio_annual_tax=bindparam("annual_tax"),
+        updated_at=_link.updated_at,
+    )
+)
+
+
+def _latest_assessments(*conditions):
+    """(property_id, total_assessed_value, final_tax_amount) of each parcel's latest assessment year."""
+    latest = (
+        select(_assessment.property_id, func.max(_assessment.assessment_year).label("assessment_year"))
+        .where(*conditions)
+        .group_by(_assessment.property_id)
+        .subquery()
+    )
+    return select(_assessment.property_id, _assessment.total_assessed_value, _assessment.final_tax_amount).join(
+        latest,
+        and_(_assessment.property_id == latest.c.property_id, _assessment.assessment_year == latest.c.assessment_year),
+    )
+
+
+def _chunks(values: List[int], size: int = KEY_BATCH) -> Iterable[List[int]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+async def reconcile_portfolios(conn, property_ids: Iterable[int]) -> Dict[str, int]:
+    """
+    Bring the links of these parcels, and their owners' totals, up to date.
+
+    Runs on the caller's connection and transaction; returns the number of
+    links and owners written.
+    """
+    property_ids = sorted(set(property_ids))
+    # owner_id -> [properties, assessed value, annual tax] to add
+    deltas: Dict[int, List[Any]] = defaultdict(lambda: [0, ZERO, ZERO])
+    counted: List[Dict[str, Any]] = []
+    for chunk in _chunks(property_ids):
+        latest = {
+            property_id: (value or ZERO, tax or ZERO)
+            for property_id, value, tax in await conn.execute(_latest_assessments(_assessment.property_id.in_(chunk)))
+        }
+        links = await conn.execute(
+            select(
+                _link.id, _link.property_id, _link.owner_id, _link.end_date,
+                _link.portfolio_assessed_value, _link.portfolio_annual_tax,
+            )
+            .where(_link.property_id.in_(chunk), or_(_link.end_date.is_(None), _link.portfolio_assessed_value.isnot(None)))
+        )
+        for link_id, property_id, owner_id, end_date, value, tax in links:
+            new_value, new_tax = latest.get(property_id, (ZERO, ZERO)) if end_date is None else (None, None)
+            if value == new_value and tax == new_tax:
+                continue
+            delta = deltas[owner_id]
+            delta[0] += (new_value is not None) - (value is not None)
+            delta[1] += (new_value or ZERO) - (value or ZERO)
+            delta[2] += (new_tax or ZERO) - (tax or ZERO)
+            counted.append({"link_id": link_id, "assessed_value": new_value, "annual_tax": new_tax})
+
+    for start in range(0, len(counted), WRITE_BATCH_ROWS):
+        await conn.execute(_SET_COUNTED, counted[start:start + WRITE_BATCH_ROWS])
+    # Owner order keeps concurrent writers from locking the same rows in opposite orders
+    totals = [
+        {"owner_id": owner_id, "properties": delta[0], "assessed_value": delta[1], "annual_tax": delta[2]}
+        for owner_id, delta in sorted(deltas.items()) if delta[0] or delta[1] or delta[2]
+    ]
+    for start in range(0, len(totals), WRITE_BATCH_ROWS):
+        await conn.execute(_ADD_TO_TOTALS, totals[start:start + WRITE_BATCH_ROWS])
+    return {"links": len(counted), "owners": len(totals)}
+
+
+async def rebuild_totals(conn) -> Dict[str, int]:
+    """Recompute every link's contribution and every owner's totals from scratch (set-based)."""
+    latest = _latest_assessments().subquery()
+    contribution = (
+        select(
+            _link.id.label("link_id"),
+            case((_link.end_date.is_(None), func.coalesce(latest.c.total_assessed_value, 0))).label("assessed_value"),
+            case((_link.end_date.is_(None), func.coalesce(latest.c.final_tax_amount, 0))).label("annual_tax"),
+        )
+        .select_from(property_ownership.outerjoin(latest, latest.c.property_id == _link.property_id))
+        .subquery()
+    )
+    links = await conn.execute(
+        update(property_ownership)
+        .where(
+            _link.id == contribution.c.link_id,
+            or_(
+                _link.portfolio_assessed_value.is_distinct_from(contribution.c.assessed_value),
+                _link.portfolio_annual_tax.is_distinct_from(contribution.c.annual_tax),
+            ),
+        )
+        .values(
+            portfolio_assessed_value=contribution.c.assessed_value,
+            portfolio_annual_tax=contribution.c.annual_tax,
+            updated_at=_link.updated_at,
+        )
+    )
+
+    totals = (
+        select(
+            _link.owner_id,
+            func.count().label("properties"),
+            func.round(func.sum(_link.portfolio_assessed_value), 2).label("assessed_value"),
+            func.round(func.sum(_link.portfolio_annual_tax), 2).label("annual_tax"),
+        )
+        .where(_link.portfolio_assessed_value.isnot(None))
+        .group_by(_link.owner_id)
+        .subquery()
+    )
+    owners = await conn.execute(
+        update(PropertyOwner.__table__)
+        .where(
+            _owner.id == totals.c.owner_id,
+            or_(
+                _owner.total_properties_owned.is_distinct_from(totals.c.properties),
+                _owner.total_assessed_value.is_distinct_from(totals.c.assessed_value),
+                _owner.total_annual_tax.is_distinct_from(totals.c.annual_tax),
+            ),
+        )
+        .values(
+            total_properties_owned=totals.c.properties,
+            total_assessed_value=totals.c.assessed_value,
+            total_annual_tax=totals.c.annual_tax,
+            updated_at=_owner.updated_at,
+        )
+    )
+    emptied = await conn.execute(
+        update(PropertyOwner.__table__)
+        .where(
+            ~exists().where(_link.owner_id == _owner.id, _link.portfolio_assessed_value.isnot(None)),
+            or_(
+                _owner.total_properties_owned.is_distinct_from(0),
+                _owner.total_assessed_value.is_distinct_from(0),
+                _owner.total_annual_tax.is_distinct_from(0),
+            ),
+        )
+        .values(total_properties_owned=0, total_assessed_value=0, total_annual_tax=0, updated_at=_owner.updated_at)
+    )
+    return {"links": links.rowcount, "owners": owners.rowcount + emptied.rowcount}
+
+
+async def portfolio(conn, owner_id: int, resolved: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    An owner's portfolio totals; with ``resolved``, summed over every spelling resolved to the same owner.
+
+    Returns None for an unknown owner.
+    """
+    row = (await conn.execute(
+        select(_owner.id, _owner.resolved_owner_id, _owner.total_properties_owned,
+               _owner.total_assessed_value, _owner.total_annual_tax)
+        .where(_owner.id == owner_id)
+    )).first()
+    if row is None:
+        return None
+    if not resolved:
+        return {
+            "owner_id": row.id, "spellings": 1, "total_properties_owned": row.total_properties_owned,
+            "total_assessed_value": row.total_assessed_value, "total_annual_tax": row.total_annual_tax,
+        }
+
+    canonical = row.resolved_owner_id or row.id
+    spellings, properties, value, tax = (await conn.execute(
+        select(
+            func.count(), func.sum(_owner.total_properties_owned),
+            func.sum(_owner.total_assessed_value), func.sum(_owner.total_annual_tax),
+        )
+        .where(or_(_owner.resolved_owner_id == canonical, _owner.id == canonical))
+    )).one()
+    return {
+        "owner_id": canonical, "spellings": spellings, "total_properties_owned": properties or 0,
+        "total_assessed_value": value or ZERO, "total_annual_tax": tax or ZERO,
+    }
+
+
+class OwnerPortfolio:
+    """Runs a full rebuild of the owner portfolio totals."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Recompute all links and owners in one transaction; only differing rows are written."""
+        started = time.perf_counter()
+        async with self.manager.begin_write() as conn:
+            written = await rebuild_totals(conn)
+        stats = {
+            "links_updated": written["links"],
+            "owners_updated": written["owners"],
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"💼 Rebuilt owner portfolio totals: {written['owners']} owners changed", **stats)
+        return stats
+
+    async def portfolio(self, owner_id: int, resolved: bool = False) -> Optional[Dict[str, Any]]:
+        async with self.manager.engine.connect() as conn:
+            return await portfolio(conn, owner_id, resolved)
+
+
+@register_import_hook
+async def update_owner_portfolios(conn, batch: ImportBatch) -> None:
+    """Apply the chunk's ownership and assessment changes to owner totals in its transaction."""
+    property_ids = set(batch.assessment_changes)
+    property_ids.update(property_id for property_id, _ in batch.links_added)
+    property_ids.update(property_id for property_id, _ in batch.links_ended)
+    if property_ids:
+        await reconcile_portfolios(conn, property_ids)
+
+
+@register_reprice_hook
+async def update_repriced_portfolios(conn, property_ids: List[int]) -> None:
+    """Apply taxes re-priced outside an import to owner totals in the re-pricing transaction."""
+    await reconcile_portfolios(conn, property_ids)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        portfolios = OwnerPortfolio(manager)
+        if args.command == "rebuild":
+            print(json.dumps(await portfolios.rebuild(), indent=2))
+            return 0
+        row = await portfolios.portfolio(args.owner_id, resolved=args.resolved)
+        print(json.dumps(row, indent=2, default=str))
+        return 0 if row is not None else 1
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Owner portfolio totals")
+    parser.add_argument("command", choices=["rebuild", "show"])
+    parser.add_argument("owner_id", type=int, nargs="?", help="Owner (show)")
+    parser.add_argument("--resolved", action="store_true", help="Sum over the owner's resolved spellings (show)")
+    args = parser.parse_args(argv)
+    if args.command == "show" and args.owner_id is None:
+        parser.error("show needs an owner id")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
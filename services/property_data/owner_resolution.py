@@ -0,0 +1,748 @@
+"""
+Owner entity resolution and owner name search.
+
+The roll importer keeps one ``property_owners`` row per roll owner id (or
+name + mailing address), so the same person or company appears under several
+spellings across parcels and counties: "ACME HOLDINGS, L.L.C.", "Acme
+Holdings LLC", "ACME HOLDNGS LLC". Resolution groups those rows and stores
+the group's lowest owner id as ``resolved_owner_id`` on every member; an
+owner with no other spelling resolves to itself.
+
+1. Names are normalized: ASCII upper case, punctuation dropped, "&" written
+   AND, entity designators written one way (L.L.C. -> LLC, INCORPORATED ->
+   INC, TRUSTEE -> TRUST) and filler words (THE, ET AL, ET UX) dropped.
+2. Blocking: owners are candidates for each other when they are of the same
+   kind (person or entity), have the same 5-digit mailing zip and share a
+   name token. Within a block, owners are sorted by name and each one is
+   compared only with the next ``BLOCK_WINDOW``. This bounds the pairs of a
+   large block, such as a common surname in a dense zip.
+3. Pairs are scored with vectorized kernels:
+   - People use Jaro-Winkler on the last name and the first name. A bare
+     initial matches its name. Middle initials and suffixes must not
+     conflict.
+   - Entities use trigram Dice on the name without its designators, from
+     1024-bit trigram signatures (AND + popcount). The designators must be
+     compatible: LLC and INC are different companies, and a missing
+     designator matches either. The threshold is lower for entities with
+     the same mailing address.
+4. Matches are clustered with union-find (union by lowest row, full path
+   compression), run as vectorized hook-and-compress rounds.
+
+Clusters never cross zip codes, so ranges of zips are independent tasks.
+They run in a process pool (``OWNER_RESOLUTION_WORKERS``). Workers read
+their owners and return the rows whose resolved id changed; the parent
+writes them.
+
+An incremental run (the default) re-resolves only some zips: those of
+owners with ``resolved_at`` NULL (new owners, and owners the importer
+changed), and the zips of those owners' previous clusters. ``--full``
+re-resolves every zip.
+
+Each run ends by refreshing the owner name index under
+``PROPERTY_INDEX_DIR/owners``. The index maps every spelling of every owner
+to its resolved id; people are indexed as both "LAST FIRST" and "FIRST
+LAST". It uses the address index's layout and lookups: a prefix search
+first, then a trigram search.
+
+    python -m services.property_data.owner_resolution run [--full] [--workers 8]
+    python -m services.property_data.owner_resolution search "acme holdings llc" [--zip 77002]
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, func, or_, select, update
+
+from src.core.logging import get_logger
+from services.persistence.database import PropertyOwner
+from .address_index import (
+    BUILD_CHUNK_ROWS, LOAD_PARTITION_ROWS, PREFIX_SCORE, RADIX,
+    AddressIndex, AddressIndexBuilder, _build_arrays, _codes, normalize_address, zip5,
+)
+from .importer import NAME_SUFFIXES, ImportBatch, register_import_hook, register_load_hook
+
+logger = get_logger("owner_resolution")
+
+# Pairs per block: each owner against the next BLOCK_WINDOW owners of the block in name order
+BLOCK_WINDOW = 32
+# Owners per task (tasks are ranges of whole zips); at least one task per worker
+TASK_OWNERS = 200_000
+PAIR_CHUNK = 200_000
+WRITE_BATCH_ROWS = 5000
+# Values per IN (...) list
+KEY_BATCH = 1000
+
+# People: Jaro-Winkler over the first NAME_WIDTH characters
+NAME_WIDTH = 16
+LAST_NAME_SIMILARITY = 0.93
+FIRST_NAME_SIMILARITY = 0.88
+# Entities: trigram Dice of the names without designators
+SIGNATURE_BITS = 1024
+ENTITY_SIMILARITY = 0.85
+SAME_ADDRESS_ENTITY_SIMILARITY = 0.75
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Index keys read per result: an owner has several spellings
+SEARCH_OVERFETCH = 4
+
+PERSON, ENTITY = 0, 1
+
+# Entity designators -> the one spelling used in keys
+DESIGNATORS = {
+    "LLC": "LLC", "LC": "LLC", "PLLC": "PLLC", "INC": "INC", "INCORPORATED": "INC", "CORP": "CORP",
+    "CORPORATION": "CORP", "CO": "CO", "COMPANY": "CO", "LP": "LP", "LTD": "LTD", "LIMITED": "LTD",
+    "LLP": "LLP", "PARTNERSHIP": "PARTNERSHIP", "PTNSHP": "PARTNERSHIP", "TRUST": "TRUST", "TR": "TRUST",
+    "TRS": "TRUST", "TRUSTEE": "TRUST", "TRUSTEES": "TRUST", "ESTATE": "ESTATE", "EST": "ESTATE",
+    "ASSOCIATION": "ASSN", "ASSN": "ASSN", "ASSOC": "ASSN", "PC": "PC",
+}
+# Designators that name the same kind of entity (rolls abbreviate them inconsistently)
+DESIGNATOR_CLASSES = {
+    "INC": 1, "CORP": 1, "CO": 1, "LLC": 2, "PLLC": 2, "LP": 3, "LTD": 3, "LLP": 3, "PARTNERSHIP": 3,
+    "TRUST": 4, "ESTATE": 5, "ASSN": 6, "PC": 7,
+}
+DROPPED_WORDS = {"THE", "ETAL", "ETUX", "ETVIR"}
+# "ET AL", "ET UX", "ET VIR" written as two words
+DROPPED_AFTER_ET = {"AL", "UX", "VIR"}
+# Tokens too common to block on
+BLOCK_STOPWORDS = {"AND", "OF", "FAMILY", "LIVING", "REVOCABLE", "IRREVOCABLE"}
+SUFFIX_CODES = {suffix: code for code, suffix in enumerate(sorted(NAME_SUFFIXES), start=1)}
+
+_owner = PropertyOwner.__table__.c
+_pending = PropertyOwner.__table__.alias("pending_owner")
+_ZIP5 = func.coalesce(func.substr(_owner.mailing_zip, 1, 5), "")
+_REMOVED = re.compile(r"[.']")
+_NOT_NAME = re.compile(r"[^A-Z0-9]+")
+
+_RESOLVE = (
+    update(PropertyOwner.__table__)
+    .where(_owner.id == bindparam("owner_id"))
+    .values(resolved_owner_id=bindparam("resolved"), resolved_at=func.now())
+)
+
+
+def normalize_owner_name(text: Optional[str]) -> str:
+    """Normalized form of an owner name (or name fragment) used for matching and search."""
+    return _normalize_owner_name(text or "")
+
+
+# First and last names recur across owners, so normalized names are cached
+@functools.lru_cache(maxsize=65536)
+def _normalize_owner_name(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().upper()
+    tokens = _NOT_NAME.sub(" ", _REMOVED.sub("", text.replace("&", " AND "))).split()
+    words = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if len(token) == 1:
+            # Spaced-out designators: "L L C"
+            end = i
+            while end < len(tokens) and len(tokens[end]) == 1:
+                end += 1
+            joined = "".join(tokens[i:end])
+            if end - i > 1 and joined in DESIGNATORS:
+                words.append(DESIGNATORS[joined])
+                i = end
+                continue
+        if token == "ET" and i + 1 < len(tokens) and tokens[i + 1] in DROPPED_AFTER_ET:
+            i += 2
+            continue
+        if token not in DROPPED_WORDS:
+            words.append(DESIGNATORS.get(token, token))
+        i += 1
+    return " ".join(words)
+
+
+def _fixed_width(names: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Names as a (n, NAME_WIDTH) byte matrix (truncated, zero padded) and their lengths."""
+    blob = b"".join(name[:NAME_WIDTH].ljust(NAME_WIDTH, b"\0") for name in names)
+    matrix = np.frombuffer(blob, dtype=np.uint8).reshape(len(names), NAME_WIDTH)
+    lengths = np.fromiter((min(len(name), NAME_WIDTH) for name in names), dtype=np.int64, count=len(names))
+    return matrix, lengths
+
+
+def jaro_winkler(a: np.ndarray, a_len: np.ndarray, b: np.ndarray, b_len: np.ndarray) -> np.ndarray:
+    """
+    Jaro-Winkler similarity of string pairs, vectorized over the pairs.
+
+    ``a`` and ``b`` are (pairs, width) zero-padded byte matrices; the loops
+    run over character positions only.
+    """
+    count, width = a.shape
+    window = np.maximum(np.maximum(a_len, b_len) // 2 - 1, 0)
+    max_window = max(width // 2 - 1, 0)
+    a_matched = np.zeros((count, width), dtype=bool)
+    b_matched = np.zeros((count, width), dtype=bool)
+    for i in range(width):
+        unmatched = i < a_len
+        if not unmatched.any():
+            break
+        for j in range(max(0, i - max_window), min(width, i + max_window + 1)):
+            hit = unmatched & (abs(i - j) <= window) & (j < b_len) & ~b_matched[:, j] & (a[:, i] == b[:, j])
+            b_matched[:, j] |= hit
+            a_matched[:, i] |= hit
+            unmatched &= ~hit
+    matches = a_matched.sum(axis=1)
+
+    # Transpositions: matched characters of both strings, in order
+    positions = np.arange(width)
+    a_order = np.argsort(np.where(a_matched, positions, width), axis=1, kind="stable")
+    b_order = np.argsort(np.where(b_matched, positions, width), axis=1, kind="stable")
+    out_of_order = (np.take_along_axis(a, a_order, axis=1) != np.take_along_axis(b, b_order, axis=1))
+    transpositions = (out_of_order & (positions < matches[:, None])).sum(axis=1) / 2
+
+    m = matches.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        jaro = np.where(
+            matches > 0,
+            (m / np.maximum(a_len, 1) + m / np.maximum(b_len, 1) + (m - transpositions) / np.maximum(m, 1)) / 3,
+            0.0,
+        )
+    shared = (a[:, :4] == b[:, :4]) & (positions[:4] < np.minimum(a_len, b_len)[:, None])
+    prefix = np.cumprod(shared, axis=1).sum(axis=1)
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def trigram_signatures(keys: List[bytes]) -> np.ndarray:
+    """SIGNATURE_BITS-bit sets of each key's trigrams (padded as in the address index), as uint64 words."""
+    signatures = np.zeros((len(keys), SIGNATURE_BITS // 64), dtype=np.uint64)
+    shift = 32 - (SIGNATURE_BITS.bit_length() - 1)
+    for start in range(0, len(keys), BUILD_CHUNK_ROWS):
+        padded = [b"  " + key + b" " for key in keys[start:start + BUILD_CHUNK_ROWS]]
+        codes = _codes(b"".join(padded))
+        ends = np.cumsum([len(key) for key in padded])
+        valid = np.ones(len(codes), dtype=bool)
+        valid[ends - 1] = False
+        valid[ends - 2] = False
+        positions = np.flatnonzero(valid[:-2])
+        grams = codes[positions] * RADIX * RADIX + codes[positions + 1] * RADIX + codes[positions + 2]
+        rows = start + np.searchsorted(ends, positions, side="right")
+        bits = ((grams * 2654435761) & 0xFFFFFFFF) >> shift
+        np.bitwise_or.at(signatures, (rows, bits >> 6), np.left_shift(np.uint64(1), (bits & 63).astype(np.uint64)))
+    return signatures
+
+
+# Bits set in each byte value, for NumPy 1.x which has no np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Set bits in each row of a 2-D uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=1, dtype=np.int64)
+
+
+def dice(signatures: np.ndarray, sizes: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Trigram Dice coefficient of row pairs from their signatures and signature popcounts."""
+    shared = popcount_rows(signatures[left] & signatures[right])
+    return 2 * shared / np.maximum(sizes[left] + sizes[right], 1)
+
+
+def union_find(count: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Root of every row's cluster after joining each (left, right) pair.
+
+    Each round hooks the larger root of every still-separate pair under the
+    smaller one, then compresses paths until every row points at a root, so
+    a root is always the lowest row of its cluster.
+    """
+    parent = np.arange(count)
+    while len(left):
+        a, b = parent[left], parent[right]
+        apart = a != b
+        if not apart.any():
+            break
+        left, right, a, b = left[apart], right[apart], a[apart], b[apart]
+        np.minimum.at(parent, np.maximum(a, b), np.minimum(a, b))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def candidate_pairs(blocks: np.ndarray, rows: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct (left, right) row pairs, left < right, from block memberships.
+
+    ``blocks`` and ``rows`` hold one entry per (block, row), sorted by block
+    and then name; each row pairs with the next BLOCK_WINDOW rows of its block.
+    """
+    lefts, rights = [], []
+    for distance in range(1, BLOCK_WINDOW + 1):
+        same = blocks[:-distance] == blocks[distance:]
+        if not same.any():
+            break
+        lefts.append(rows[:-distance][same])
+        rights.append(rows[distance:][same])
+    if not lefts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    left, right = np.concatenate(lefts), np.concatenate(rights)
+    low, high = np.minimum(left, right), np.maximum(left, right)
+    keep = low != high
+    pairs = np.unique(low[keep] * count + high[keep])
+    return pairs // count, pairs % count
+
+
+class OwnerFeatures:
+    """Matching features of a set of owners, one row per owner (ordered by id)."""
+
+    __slots__ = (
+        "ids", "current", "pending", "kind", "last", "last_len", "first", "first_len", "middle", "suffix",
+        "designator", "address", "signatures", "signature_sizes", "blocks", "block_rows",
+    )
+
+    def __init__(self, rows: List[Tuple]):
+        count = len(rows)
+        self.ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        self.current = np.fromiter((row[8] if row[8] is not None else -1 for row in rows), dtype=np.int64, count=count)
+        self.pending = np.fromiter((row[9] for row in rows), dtype=bool, count=count)
+        self.kind = np.zeros(count, dtype=np.int8)
+        self.middle = np.zeros(count, dtype=np.int16)
+        self.suffix = np.zeros(count, dtype=np.int16)
+        self.designator = np.zeros(count, dtype=np.int16)
+        self.address = np.zeros(count, dtype=np.int64)
+
+        last_names: List[bytes] = []
+        first_names: List[bytes] = []
+        entity_names: List[bytes] = []
+        sort_keys: List[str] = []
+        blocks: Dict[Tuple[int, str, str], int] = {}
+        block_ids: List[int] = []
+        block_rows: List[int] = []
+        for i, (_, first, last, middle, suffix, business, address, zip_prefix, _, _) in enumerate(rows):
+            if business:
+                kind = ENTITY
+                words = normalize_owner_name(business).split()
+                core = [word for word in words if word not in DESIGNATOR_CLASSES] or words
+                self.designator[i] = next((DESIGNATOR_CLASSES[w] for w in reversed(words) if w in DESIGNATOR_CLASSES), 0)
+                name = " ".join(core)
+                tokens = core
+                entity_names.append(name.encode())
+                last_names.append(b"")
+                first_names.append(b"")
+                if address:
+                    self.address[i] = hash(normalize_address(address))
+            else:
+                kind = PERSON
+                last_key, first_key = normalize_owner_name(last), normalize_owner_name(first)
+                name = f"{last_key} {first_key}"
+                tokens = last_key.split() + first_key.split()
+                entity_names.append(b"")
+                last_names.append(last_key.encode())
+                first_names.append(first_key.encode())
+                middle = (middle or "").strip().upper()
+                self.middle[i] = ord(middle[0]) if middle else 0
+                suffix = (suffix or "").strip().upper().rstrip(".")
+                self.suffix[i] = SUFFIX_CODES.get(suffix, len(SUFFIX_CODES) + 1) if suffix else 0
+            self.kind[i] = kind
+            sort_keys.append(name)
+            for token in set(tokens):
+                if len(token) > 1 and token not in BLOCK_STOPWORDS:
+                    block_ids.append(blocks.setdefault((kind, zip_prefix, token), len(blocks)))
+                    block_rows.append(i)
+
+        self.last, self.last_len = _fixed_width(last_names)
+        self.first, self.first_len = _fixed_width(first_names)
+        self.signatures = trigram_signatures(entity_names)
+        self.signature_sizes = popcount_rows(self.signatures)
+
+        # Block entries sorted by block, then by name within the block
+        name_rank = np.empty(count, dtype=np.int64)
+        name_rank[sorted(range(count), key=sort_keys.__getitem__)] = np.arange(count)
+        block_ids = np.array(block_ids, dtype=np.int64)
+        block_rows = np.array(block_rows, dtype=np.int64)
+        order = np.lexsort((name_rank[block_rows], block_ids))
+        self.blocks = block_ids[order]
+        self.block_rows = block_rows[order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def matches(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Mask of the (left, right) pairs that are the same owner."""
+        matched = np.zeros(len(left), dtype=bool)
+        person = self.kind[left] == PERSON
+
+        pl, pr = left[person], right[person]
+        last = jaro_winkler(self.last[pl], self.last_len[pl], self.last[pr], self.last_len[pr])
+        first = jaro_winkler(self.first[pl], self.first_len[pl], self.first[pr], self.first_len[pr])
+        fl, fr = self.first_len[pl], self.first_len[pr]
+        initial = ((fl == 1) | (fr == 1)) & (fl > 0) & (fr > 0) & (self.first[pl, 0] == self.first[pr, 0])
+        given = ((fl == 0) & (fr == 0)) | initial | (first >= FIRST_NAME_SIMILARITY)
+        middle = (self.middle[pl] == 0) | (self.middle[pr] == 0) | (self.middle[pl] == self.middle[pr])
+        suffix = (self.suffix[pl] == 0) | (self.suffix[pr] == 0) | (self.suffix[pl] == self.suffix[pr])
+        matched[person] = (last >= LAST_NAME_SIMILARITY) & given & middle & suffix
+
+        el, er = left[~person], right[~person]
+        similarity = dice(self.signatures, self.signature_sizes, el, er)
+        same_address = (self.address[el] != 0) & (self.address[el] == self.address[er])
+        threshold = np.where(same_address, SAME_ADDRESS_ENTITY_SIMILARITY, ENTITY_SIMILARITY)
+        designator = (
+            (self.designator[el] == 0) | (self.designator[er] == 0) | (self.designator[el] == self.designator[er])
+        )
+        matched[~person] = (similarity >= threshold) & designator
+        return matched
+
+
+async def resolve_zips(manager, low: str, high: str, zips: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Resolve the owners whose mailing zip is in ``low``..``high`` (and in ``zips`` if given).
+
+    Returns:
+        Owner ids whose resolved id or ``resolved_at`` must be written, their
+        resolved ids, and counts
+    """
+    condition = _ZIP5.in_(zips) if zips else _ZIP5.between(low, high)
+    rows: List[Tuple] = []
+    async with manager.engine.connect() as conn:
+        result = await conn.stream(
+            select(
+                _owner.id, _owner.first_name, _owner.last_name, _owner.middle_initial, _owner.suffix,
+                _owner.business_name, _owner.mailing_address, _ZIP5, _owner.resolved_owner_id,
+                _owner.resolved_at.is_(None),
+            )
+            .where(condition)
+            .order_by(_owner.id)
+        )
+        async for partition in result.partitions(LOAD_PARTITION_ROWS):
+            rows.extend(partition)
+
+    owners = OwnerFeatures(rows)
+    del rows
+    left, right = candidate_pairs(owners.blocks, owners.block_rows, len(owners))
+    matched = np.zeros(len(left), dtype=bool)
+    for start in range(0, len(left), PAIR_CHUNK):
+        matched[start:start + PAIR_CHUNK] = owners.matches(left[start:start + PAIR_CHUNK], right[start:start + PAIR_CHUNK])
+    roots = union_find(len(owners), left[matched], right[matched])
+
+    resolved = owners.ids[roots]
+    write = (resolved != owners.current) | owners.pending
+    return {
+        "owner_ids": owners.ids[write],
+        "resolved": resolved[write],
+        "owners": len(owners),
+        "pairs_scored": len(left),
+        "matches": int(matched.sum()),
+        "merged_owners": int((resolved != owners.ids).sum()),
+    }
+
+
+def _resolve_process(database_url: str, low: str, high: str, zips: Optional[List[str]]) -> Dict[str, Any]:
+    """Process-pool entry point: resolve one zip range with the worker's own engine."""
+    from services.persistence.database import DatabaseManager
+
+    async def run():
+        manager = DatabaseManager(database_url)
+        try:
+            return await resolve_zips(manager, low, high, zips)
+        finally:
+            await manager.close()
+
+    return asyncio.run(run())
+
+
+class OwnerResolver:
+    """Resolves owners by zip range in a process pool and maintains ``resolved_owner_id``."""
+
+    def __init__(self, manager, workers: Optional[int] = None, index: Optional["OwnerIndex"] = None):
+        """
+        Initialize resolver.
+
+        Args:
+            manager: DatabaseManager holding the owners
+            workers: Worker processes (defaults to ``OWNER_RESOLUTION_WORKERS``; 0 = one per CPU, 1 = in-process)
+            index: Owner name index refreshed after a run (defaults to the process-wide one)
+        """
+        if workers is None:
+            from config.settings import settings
+            workers = settings.owner_resolution_workers
+        self.manager = manager
+        self.workers = workers or os.cpu_count() or 1
+        self.index = index
+
+    async def plan(self, full: bool = False) -> List[Tuple[str, str, Optional[List[str]]]]:
+        """
+        Tasks as (first zip, last zip, zips or None): contiguous zip ranges of
+        about TASK_OWNERS owners, at least one per worker.
+
+        An incremental plan covers the zips of unresolved owners and of their
+        previous clusters, listed explicitly unless a task has more than
+        KEY_BATCH of them (the whole range is then re-resolved).
+        """
+        stmt = select(_ZIP5, func.count()).group_by(_ZIP5).order_by(_ZIP5)
+        if not full:
+            previous_clusters = select(_pending.c.resolved_owner_id).where(
+                _pending.c.resolved_at.is_(None), _pending.c.resolved_owner_id.isnot(None)
+            )
+            touched = PropertyOwner.__table__.alias("touched_owner")
+            touched_zip = func.coalesce(func.substr(touched.c.mailing_zip, 1, 5), "")
+            stmt = stmt.where(_ZIP5.in_(
+                select(touched_zip).where(or_(
+                    touched.c.resolved_at.is_(None), touched.c.resolved_owner_id.in_(previous_clusters)
+                ))
+            ))
+        async with self.manager.engine.connect() as conn:
+            counts = (await conn.execute(stmt)).all()
+        if not counts:
+            return []
+
+        total = sum(count for _, count in counts)
+        tasks = min(len(counts), max(self.workers, -(-total // TASK_OWNERS)))
+        target = total / tasks
+        plan: List[Tuple[str, str, Optional[List[str]]]] = []
+        group: List[str] = []
+        owners = 0
+        for zip_prefix, count in counts:
+            group.append(zip_prefix)
+            owners += count
+            if owners >= target * (len(plan) + 1):
+                plan.append((group[0], group[-1], None if full or len(group) > KEY_BATCH else group))
+                group = []
+        if group:
+            plan.append((group[0], group[-1], None if full or len(group) > KEY_BATCH else group))
+        return plan
+
+    async def _write(self, result: Dict[str, Any]) -> int:
+        rows = [
+            {"owner_id": owner_id, "resolved": resolved}
+            for owner_id, resolved in zip(result["owner_ids"].tolist(), result["resolved"].tolist())
+        ]
+        async with self.manager.begin_write() as conn:
+            for start in range(0, len(rows), WRITE_BATCH_ROWS):
+                await conn.execute(_RESOLVE, rows[start:start + WRITE_BATCH_ROWS])
+        return len(rows)
+
+    async def run(self, full: bool = False) -> Dict[str, Any]:
+        """Resolve the planned zip ranges, write the changed rows and refresh the owner name index."""
+        started = time.perf_counter()
+        plan = await self.plan(full)
+        totals = {"owners": 0, "pairs_scored": 0, "matches": 0, "merged_owners": 0, "written": 0}
+
+        async def collect(result: Dict[str, Any]) -> None:
+            for name in ("owners", "pairs_scored", "matches", "merged_owners"):
+                totals[name] += result[name]
+            totals["written"] += await self._write(result)
+
+        if self.workers <= 1 or len(plan) <= 1:
+            for low, high, zips in plan:
+                await collect(await resolve_zips(self.manager, low, high, zips))
+        else:
+            loop = asyncio.get_running_loop()
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(plan)), mp_context=context) as pool:
+                tasks = [
+                    loop.run_in_executor(pool, _resolve_process, self.manager.database_url, low, high, zips)
+                    for low, high, zips in plan
+                ]
+                for task in asyncio.as_completed(tasks):
+                    await collect(await task)
+        resolved = time.perf_counter()
+
+        index_stats = await OwnerIndexBuilder(self.manager, self.index).refresh()
+        stats = {
+            "full": full,
+            "tasks": len(plan),
+            **totals,
+            "index_rebuilt": index_stats["rebuilt"],
+            "resolve_seconds": round(resolved - started, 2),
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+        }
+        logger.info(f"👥 Owners resolved: {stats['merged_owners']} of {stats['owners']} merged into another spelling", **stats)
+        return stats
+
+
+class OwnerIndex(AddressIndex):
+    """Reader for the owner name index under ``index_dir`` (reloads when it is rebuilt)."""
+
+    def search(  # type: ignore[override]
+        self,
+        query: str,
+        zip_code: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Resolved owners matching a typed name, best first.
+
+        Args:
+            query: Name as typed, e.g. "acme holdings llc" or "john smith"
+            zip_code: Only owners with this mailing zip
+
+        Returns:
+            Dicts with owner_id (the resolved owner), the matched normalized
+            name, zip_code, score (1.0 for prefix matches, trigram similarity
+            below that) and match ("prefix" or "fuzzy"); one per owner, empty
+            if the index has not been built
+        """
+        index = self.load()
+        key = normalize_owner_name(query)
+        if index is None or not key:
+            return []
+        limit = max(1, min(limit, MAX_LIMIT))
+        zip_filter = zip5(zip_code) or None
+        encoded = key.encode()
+
+        candidates = [(PREFIX_SCORE, row, "prefix") for row in index.prefix_rows(encoded, zip_filter, None, limit * SEARCH_OVERFETCH).tolist()]
+        if len({int(index.ids[row]) for _, row, _ in candidates}) < limit:
+            candidates += [
+                (score, row, "fuzzy") for score, row in index.fuzzy_rows(encoded, zip_filter, None, limit * SEARCH_OVERFETCH)
+            ]
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        for score, row, match in candidates:
+            owner_id = int(index.ids[row])
+            if owner_id in seen:
+                continue
+            seen.add(owner_id)
+            zip_value = int(index.zips[row])
+            results.append({
+                "owner_id": owner_id,
+                "name": index.keys[row].decode(),
+                "zip_code": f"{zip_value:05d}" if zip_value else None,
+                "score": round(score, 3),
+                "match": match,
+            })
+            if len(results) == limit:
+                break
+        return results
+
+
+class OwnerIndexBuilder(AddressIndexBuilder):
+    """Builds the owner name index from every owner's spellings and resolved id."""
+
+    def __init__(self, manager, index: Optional[OwnerIndex] = None):
+        self.manager = manager
+        self.index = index or get_owner_index()
+
+    async def fingerprint(self, conn) -> List[Any]:
+        row = (await conn.execute(
+            select(func.count(_owner.id), func.max(_owner.updated_at), func.max(_owner.resolved_at))
+        )).one()
+        return [row[0], str(row[1]), str(row[2])]
+
+    async def _load(self, conn) -> Tuple[List[bytes], np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        result = await conn.stream(select(
+            func.coalesce(_owner.resolved_owner_id, _owner.id), _owner.first_name, _owner.last_name,
+            _owner.business_name, _owner.mailing_zip,
+        ))
+        entries = set()
+        async for partition in result.partitions(LOAD_PARTITION_ROWS):
+            for owner_id, first, last, business, mailing_zip in partition:
+                zip_code = zip5(mailing_zip)
+                if business:
+                    names = (normalize_owner_name(business),)
+                else:
+                    last, first = normalize_owner_name(last), normalize_owner_name(first)
+                    names = (f"{last} {first}".strip(), f"{first} {last}".strip())
+                for name in names:
+                    if name:
+                        entries.add((name.encode(), owner_id, zip_code))
+        entries = sorted(entries)
+        return (
+            [key for key, _, _ in entries],
+            np.array([owner_id for _, owner_id, _ in entries], dtype=np.int64),
+            np.array([zip_code for _, _, zip_code in entries], dtype=np.uint32),
+            np.zeros(len(entries), dtype=np.uint16),
+            [],
+        )
+
+    async def refresh(self, force: bool = False) -> Dict[str, Any]:
+        """Rebuild the index if the owners changed (always with ``force``)."""
+        started = time.perf_counter()
+        async with self.manager.engine.connect() as conn:
+            fingerprint = await self.fingerprint(conn)
+            current = self.index.load()
+            if not force and current is not None and current.meta.get("fingerprint") == fingerprint:
+                return {"rebuilt": False, "names": len(current), "elapsed_seconds": round(time.perf_counter() - started, 2)}
+            keys, ids, zips, counties, _ = await self._load(conn)
+
+        arrays = await asyncio.to_thread(_build_arrays, keys, ids, zips, counties)
+        await asyncio.to_thread(self._write, arrays, [], fingerprint)
+        stats = {
+            "rebuilt": True,
+            "names": len(keys),
+            "owners": len(np.unique(ids)),
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+        }
+        logger.info("👥 Owner index rebuilt", **stats)
+        return stats
+
+
+_owner_index: Optional[OwnerIndex] = None
+
+
+def get_owner_index() -> OwnerIndex:
+    """Get the process-wide owner name index reader."""
+    global _owner_index
+    if _owner_index is None:
+        from config.settings import settings
+        _owner_index = OwnerIndex(os.path.join(settings.property_index_dir, "owners"))
+    return _owner_index
+
+
+@register_import_hook
+async def queue_changed_owners(conn, batch: ImportBatch) -> None:
+    """Mark owners whose name or mailing address changed for re-resolution (new owners start unresolved)."""
+    for start in range(0, len(batch.changed_owner_ids), KEY_BATCH):
+        await conn.execute(
+            update(PropertyOwner.__table__)
+            .where(_owner.id.in_(batch.changed_owner_ids[start:start + KEY_BATCH]))
+            .values(resolved_at=None)
+        )
+
+
+@register_load_hook
+async def resolve_owners_after_import(manager, county: str, assessment_year: int, stats: Dict[str, Any]) -> None:
+    """Resolve the zips of new and changed owners and refresh the owner name index."""
+    await OwnerResolver(manager).run()
+
+
+async def _main(args: argparse.Namespace) -> int:
+    if args.command == "search":
+        started = time.perf_counter()
+        results = get_owner_index().search(args.query or "", args.zip, args.limit)
+        print(json.dumps({"results": results, "query_ms": round((time.perf_counter() - started) * 1000, 2)}, indent=2))
+        return 0 if results else 1
+
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        print(json.dumps(await OwnerResolver(manager, workers=args.workers).run(full=args.full), indent=2))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Owner entity resolution and name search")
+    parser.add_argument("command", choices=["run", "search"])
+    parser.add_argument("query", nargs="?", help="Owner name as typed (search)")
+    parser.add_argument("--full", action="store_true", help="Re-resolve every zip, not only those with changed owners")
+    parser.add_argument("--workers", type=int, help="Override OWNER_RESOLUTION_WORKERS")
+    parser.add_argument("--zip")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    args = parser.parse_args(argv)
+    if args.command == "search" and not args.query:
+        parser.error("search needs a query")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
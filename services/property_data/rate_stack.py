@@ -0,0 +1,522 @@
+"""
+Taxing-unit rate stacks compiled into per-combination rates.
+
+A Texas bill is the sum of the levies of every taxing unit a parcel lies in:
+school district, county, city and any number of special districts. Parcels
+in the same units share a stack, and a county has a few thousand distinct
+sets of units however many parcels it has. So the stack is compiled once per
+set rather than once per parcel:
+
+1. each parcel's units (``property_tax_units``) are deduped into
+   ``tax_rate_combos`` and ``properties.tax_combo_id`` points at the combo;
+2. the combined rate of each combo and tax year (the sum of its units'
+   adopted rates) is precomputed into ``tax_rate_combo_rates``;
+3. assessments are priced with one gather and multiply: the year's combo
+   rates form a sorted table, each assessment's rate is ``table[combo]``, and
+   ``tax_engine.compute_taxes`` applies it.
+
+A rate change recomputes only the combos containing the unit and re-prices
+only their parcels. Assessments marked ``is_final`` are certified and never
+re-priced. A combo missing a unit's rate for the year has a NULL rate, and its
+parcels keep their stored rate until every unit is rated.
+
+The combined rate is written to ``TaxAssessment.tax_rate`` (per $100), so
+``TaxEngine`` and ``reference_tax`` price the same bill. As there, the rate
+applies to one taxable value and is rounded once; unit-specific exemptions
+and per-unit rounding on the printed bill are outside this model.
+
+    python -m services.property_data.rate_stack load-units units.csv                      # code,name,unit_type[,county]
+    python -m services.property_data.rate_stack load-members members.csv --county Harris  # parcel_id,unit_code
+    python -m services.property_data.rate_stack compile --county Harris
+    python -m services.property_data.rate_stack set-rates rates.csv --year 2026           # unit_code,rate
+    python -m services.property_data.rate_stack price --year 2026 [--county Harris]
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import sys
+import time
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, and_, bindparam, cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.core.logging import get_logger
+from services.persistence.database import (
+    Property, TaxAssessment, TaxRateCombo, TaxRateComboRate, TaxUnit, TaxUnitRate,
+    property_tax_units, tax_rate_combo_units,
+)
+from .importer import ImportBatch, assessments_repriced, register_import_hook
+from .tax_engine import (
+    DEFAULT_RATE_BASIS, LOAD_PARTITION_ROWS, RATE_SCALE, WRITE_BATCH_ROWS,
+    _cents_to_decimal, compute_taxes, load_assessments,
+)
+
+logger = get_logger("rate_stack")
+
+COMBO_KEY_SEPARATOR = "-"
+# Values per IN (...) list
+KEY_BATCH = 1000
+
+_property = Property.__table__.c
+_assessment = TaxAssessment.__table__.c
+_unit = TaxUnit.__table__.c
+_unit_rate = TaxUnitRate.__table__.c
+_combo = TaxRateCombo.__table__.c
+_combo_rate = TaxRateComboRate.__table__.c
+_combo_unit = tax_rate_combo_units.c
+_member = property_tax_units.c
+
+_NOT_FINAL = _assessment.is_final.isnot(True)
+
+_UPDATE_PRICED = (
+    update(TaxAssessment.__table__)
+    .where(_assessment.id == bindparam("assessment_id"))
+    .values(
+        tax_rate=bindparam("combined_rate"),
+        tax_rate_type="per_100",
+        base_tax_amount=bindparam("base"),
+        final_tax_amount=bindparam("final"),
+        updated_at=func.now(),
+    )
+)
+
+_UPDATE_COMBO = (
+    update(Property.__table__)
+    .where(_property.id == bindparam("property_id"))
+    .values(tax_combo_id=bindparam("combo"))
+)
+
+
+def _rate_e6(column):
+    return cast(func.round(column * RATE_SCALE), BigInteger)
+
+
+def _rate_to_e6(rate: Any) -> int:
+    return int((Decimal(str(rate)) * RATE_SCALE).to_integral_value(ROUND_HALF_UP))
+
+
+def _chunks(values: Sequence, size: int = KEY_BATCH) -> Iterable[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _insert(conn):
+    return postgresql_insert if conn.dialect.name == "postgresql" else sqlite_insert
+
+
+async def _fetch_matrix(conn, stmt, width: int) -> np.ndarray:
+    """Integer rows of ``stmt`` as an int64 matrix."""
+    result = await conn.stream(stmt)
+    parts = []
+    async for partition in result.partitions(LOAD_PARTITION_ROWS):
+        values = itertools.chain.from_iterable(partition)
+        parts.append(np.fromiter(values, dtype=np.int64, count=len(partition) * width).reshape(-1, width))
+    return np.concatenate(parts) if parts else np.empty((0, width), dtype=np.int64)
+
+
+def combo_key(unit_ids: Iterable[int]) -> str:
+    """Canonical ``unit_key`` of a set of unit ids."""
+    return COMBO_KEY_SEPARATOR.join(str(unit_id) for unit_id in sorted(set(unit_ids)))
+
+
+def group_units(property_ids: np.ndarray, unit_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Distinct unit sets of (property, unit) pairs.
+
+    Returns (properties, combo of each property, combos): ``combos`` has one
+    row per distinct set, its unit ids ascending and zero-padded on the right.
+    """
+    if not len(property_ids):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.int64)
+    order = np.lexsort((unit_ids, property_ids))
+    properties, units = property_ids[order], unit_ids[order]
+    distinct = np.ones(len(properties), dtype=bool)
+    distinct[1:] = (properties[1:] != properties[:-1]) | (units[1:] != units[:-1])
+    properties, units = properties[distinct], units[distinct]
+
+    first = np.ones(len(properties), dtype=bool)
+    first[1:] = properties[1:] != properties[:-1]
+    starts = np.flatnonzero(first)
+    counts = np.diff(np.append(starts, len(properties)))
+    row = np.repeat(np.arange(len(starts)), counts)
+    matrix = np.zeros((len(starts), int(counts.max())), dtype=np.int64)
+    matrix[row, np.arange(len(properties)) - starts[row]] = units
+    combos, inverse = np.unique(matrix, axis=0, return_inverse=True)
+    return properties[starts], inverse.ravel(), combos
+
+
+async def _ensure_combos(conn, combos: np.ndarray) -> Tuple[np.ndarray, List[int]]:
+    """Database ids of ``combos`` rows, creating missing combos; returns (ids, new ids)."""
+    keys = [combo_key(row[row > 0].tolist()) for row in combos]
+    ids: Dict[str, int] = {}
+    for chunk in _chunks(keys):
+        ids.update((await conn.execute(select(_combo.unit_key, _combo.id).where(_combo.unit_key.in_(chunk)))).all())
+    missing = [i for i, key in enumerate(keys) if key not in ids]
+    new: List[int] = []
+    if missing:
+        insert = _insert(conn)
+        for chunk in _chunks(missing):
+            await conn.execute(insert(TaxRateCombo.__table__).on_conflict_do_nothing(), [
+                {"unit_key": keys[i], "unit_count": int((combos[i] > 0).sum())} for i in chunk
+            ])
+            created = dict((await conn.execute(
+                select(_combo.unit_key, _combo.id).where(_combo.unit_key.in_([keys[i] for i in chunk]))
+            )).all())
+            ids.update(created)
+            await conn.execute(insert(tax_rate_combo_units).on_conflict_do_nothing(), [
+                {"combo_id": created[keys[i]], "unit_id": unit_id}
+                for i in chunk for unit_id in combos[i][combos[i] > 0].tolist()
+            ])
+            new.extend(created[keys[i]] for i in chunk)
+    return np.array([ids[key] for key in keys], dtype=np.int64), new
+
+
+async def refresh_combo_rates(conn, tax_year: int, combo_ids: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Recompute combined rates for a tax year (all combos, or ``combo_ids``).
+
+    Returns the combos whose rate changed.
+    """
+    rated = tax_rate_combo_units.join(TaxRateCombo.__table__, _combo.id == _combo_unit.combo_id).outerjoin(
+        TaxUnitRate.__table__, and_(_unit_rate.unit_id == _combo_unit.unit_id, _unit_rate.tax_year == tax_year)
+    )
+    stmt = (
+        select(_combo_unit.combo_id, _combo.unit_count, func.count(_unit_rate.id), func.sum(_rate_e6(_unit_rate.rate)))
+        .select_from(rated)
+        .group_by(_combo_unit.combo_id, _combo.unit_count)
+    )
+    previous = select(_combo_rate.combo_id, _rate_e6(_combo_rate.effective_rate)).where(_combo_rate.tax_year == tax_year)
+    selections = [(stmt, previous)] if combo_ids is None else [
+        (stmt.where(_combo_unit.combo_id.in_(chunk)), previous.where(_combo_rate.combo_id.in_(chunk)))
+        for chunk in _chunks(list(combo_ids))
+    ]
+
+    insert = _insert(conn)
+    changed: List[int] = []
+    for rates, stored in selections:
+        stored = dict((await conn.execute(stored)).all())
+        rows = []
+        for combo_id, unit_count, rated_units, total in await conn.execute(rates):
+            # A combo is priced only once every unit has adopted a rate
+            effective = int(total) if rated_units == unit_count else None
+            if combo_id not in stored or stored[combo_id] != effective:
+                changed.append(combo_id)
+                rows.append({
+                    "combo_id": combo_id, "tax_year": tax_year, "rated_units": rated_units,
+                    "effective_rate": None if effective is None else Decimal(effective).scaleb(-6),
+                })
+        for batch in _chunks(rows, WRITE_BATCH_ROWS):
+            stmt = insert(TaxRateComboRate.__table__)
+            await conn.execute(stmt.on_conflict_do_update(
+                index_elements=["combo_id", "tax_year"],
+                set_={"effective_rate": stmt.excluded.effective_rate, "rated_units": stmt.excluded.rated_units,
+                      "computed_at": func.now()},
+            ), batch)
+    return changed
+
+
+async def price_assessments(conn, tax_year: int, *conditions, notify: bool = True) -> Dict[str, int]:
+    """
+    Price a year's non-final assessments matching ``conditions`` from their combo rates.
+
+    Conditions may filter on ``properties`` columns. Rows whose rate or taxes
+    change are written; rows without a combo or a complete combo rate are left
+    alone. With ``notify``, the re-price hooks then run for the written rows
+    (imports clear it: their own hooks follow).
+    """
+    table = await _fetch_matrix(conn, (
+        select(_combo_rate.combo_id, _rate_e6(_combo_rate.effective_rate))
+        .where(_combo_rate.tax_year == tax_year, _combo_rate.effective_rate.isnot(None))
+        .order_by(_combo_rate.combo_id)
+    ), 2)
+    if not len(table):
+        return {"assessments": 0, "priced": 0, "updated": 0}
+    conditions = (_assessment.assessment_year == tax_year, _NOT_FINAL, _property.tax_combo_id.isnot(None), *conditions)
+    arrays = await load_assessments(conn, *conditions, by_county=True)
+    combos = (await _fetch_matrix(conn, (
+        select(_property.tax_combo_id)
+        .select_from(TaxAssessment.__table__.join(Property.__table__, _property.id == _assessment.property_id))
+        .where(*conditions).order_by(_assessment.id)
+    ), 1))[:, 0]
+
+    # The gather: each row's rate from its combo's entry in the sorted table
+    position = np.minimum(np.searchsorted(table[:, 0], combos), len(table) - 1)
+    known = table[position, 0] == combos
+    stored_rate, stored_basis = arrays.rate.copy(), arrays.basis.copy()
+    arrays.rate[known] = table[position[known], 1]
+    arrays.basis[known] = DEFAULT_RATE_BASIS
+    base, final = compute_taxes(arrays)
+
+    changed = np.flatnonzero(known & (
+        (arrays.rate != stored_rate) | (arrays.basis != stored_basis) | (base != arrays.base) | (final != arrays.final)
+    ))
+    ids, rates = arrays.ids[changed].tolist(), arrays.rate[changed].tolist()
+    base, final = base[changed].tolist(), final[changed].tolist()
+    for start in range(0, len(ids), WRITE_BATCH_ROWS):
+        await conn.execute(_UPDATE_PRICED, [
+            {
+                "assessment_id": ids[i],
+                "combined_rate": Decimal(rates[i]).scaleb(-6),
+                "base": _cents_to_decimal(base[i]),
+                "final": _cents_to_decimal(final[i]),
+            }
+            for i in range(start, min(start + WRITE_BATCH_ROWS, len(ids)))
+        ])
+    if notify:
+        await assessments_repriced(conn, ids)
+    return {"assessments": len(arrays), "priced": int(known.sum()), "updated": len(ids)}
+
+
+async def compile_county(conn, county: str) -> Dict[str, Any]:
+    """
+    Point every parcel of a county at the combo of its units, creating combos
+    as needed, and re-price the non-final assessments of reassigned parcels.
+    """
+    pairs = await _fetch_matrix(conn, (
+        select(_member.property_id, _member.unit_id)
+        .select_from(property_tax_units.join(Property.__table__, _property.id == _member.property_id))
+        .where(_property.county == county)
+    ), 2)
+    members, combo_of_member, combos = group_units(pairs[:, 0], pairs[:, 1])
+    combo_ids, new_combos = await _ensure_combos(conn, combos)
+
+    current = await _fetch_matrix(conn, (
+        select(_property.id, func.coalesce(_property.tax_combo_id, 0))
+        .where(_property.county == county).order_by(_property.id)
+    ), 2)
+    wanted = np.zeros(len(current), dtype=np.int64)  # 0: no units, no combo
+    wanted[np.searchsorted(current[:, 0], members)] = combo_ids[combo_of_member]
+    reassigned = np.flatnonzero(wanted != current[:, 1])
+    property_ids, combos_wanted = current[reassigned, 0].tolist(), wanted[reassigned].tolist()
+    for start in range(0, len(property_ids), WRITE_BATCH_ROWS):
+        await conn.execute(_UPDATE_COMBO, [
+            {"property_id": property_ids[i], "combo": combos_wanted[i] or None}
+            for i in range(start, min(start + WRITE_BATCH_ROWS, len(property_ids)))
+        ])
+
+    updated = 0
+    if property_ids:
+        # Small reassignments re-price by id; large ones scan the county (only changed rows are written)
+        scope = (_assessment.property_id.in_(property_ids) if len(property_ids) <= KEY_BATCH
+                 else _property.county == county)
+        years = (await conn.execute(
+            select(_assessment.assessment_year).distinct()
+            .select_from(TaxAssessment.__table__.join(Property.__table__, _property.id == _assessment.property_id))
+            .where(scope, _NOT_FINAL)
+        )).scalars().all()
+        for year in years:
+            if new_combos:
+                await refresh_combo_rates(conn, year, new_combos)
+            updated += (await price_assessments(conn, year, scope))["updated"]
+
+    return {
+        "county": county,
+        "parcels_with_units": len(members),
+        "combos": len(combos),
+        "new_combos": len(new_combos),
+        "reassigned": len(property_ids),
+        "assessments_updated": updated,
+    }
+
+
+class RateStack:
+    """Taxing units, their parcels and rates, compiled into per-combination rates."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def _unit_ids(self, conn, codes: Iterable[str]) -> Dict[str, int]:
+        codes = sorted(set(codes))
+        ids: Dict[str, int] = {}
+        for chunk in _chunks(codes):
+            ids.update((await conn.execute(select(_unit.code, _unit.id).where(_unit.code.in_(chunk)))).all())
+        unknown = [code for code in codes if code not in ids]
+        if unknown:
+            raise ValueError(f"Unknown tax units: {', '.join(unknown[:20])}")
+        return ids
+
+    async def load_units(self, units: Sequence[Dict[str, Any]]) -> int:
+        """Create or update taxing units by ``code``; returns the count."""
+        async with self.manager.begin_write() as conn:
+            insert = _insert(conn)
+            for batch in _chunks(list(units), WRITE_BATCH_ROWS):
+                stmt = insert(TaxUnit.__table__)
+                await conn.execute(stmt.on_conflict_do_update(
+                    index_elements=["code"],
+                    set_={"name": stmt.excluded.name, "unit_type": stmt.excluded.unit_type,
+                          "county": stmt.excluded.county, "updated_at": func.now()},
+                ), [
+                    {"code": unit["code"], "name": unit["name"], "unit_type": unit["unit_type"],
+                     "county": unit.get("county") or None, "is_active": True}
+                    for unit in batch
+                ])
+        logger.info(f"🏛️ Loaded {len(units)} tax units")
+        return len(units)
+
+    async def assign_units(self, county: str, members: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Replace the units of the listed parcels (parcel_id -> unit codes) and recompile the county."""
+        started = time.perf_counter()
+        async with self.manager.begin_write() as conn:
+            unit_ids = await self._unit_ids(conn, itertools.chain.from_iterable(members.values()))
+            parcels: Dict[str, int] = {}
+            for chunk in _chunks(list(members)):
+                parcels.update((await conn.execute(
+                    select(_property.parcel_id, _property.id)
+                    .where(_property.parcel_id.in_(chunk), _property.county == county)
+                )).all())
+            property_ids = list(parcels.values())
+            for chunk in _chunks(property_ids):
+                await conn.execute(delete(property_tax_units).where(_member.property_id.in_(chunk)))
+            rows = [
+                {"property_id": parcels[parcel_id], "unit_id": unit_ids[code]}
+                for parcel_id, codes in members.items() if parcel_id in parcels
+                for code in set(codes)
+            ]
+            for batch in _chunks(rows, WRITE_BATCH_ROWS):
+                await conn.execute(property_tax_units.insert(), batch)
+            stats = await compile_county(conn, county)
+
+        stats.update(unknown_parcels=len(members) - len(parcels), elapsed_seconds=round(time.perf_counter() - started, 3))
+        logger.info(f"🏛️ Assigned tax units to {len(parcels)} parcels in {county}", **stats)
+        return stats
+
+    async def compile(self, county: str) -> Dict[str, Any]:
+        """Recompile a county's combos from its parcels' units."""
+        started = time.perf_counter()
+        async with self.manager.begin_write() as conn:
+            stats = await compile_county(conn, county)
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"🏛️ Compiled {stats['combos']} rate combos for {county}", **stats)
+        return stats
+
+    async def set_rates(self, tax_year: int, rates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adopt unit rates (code -> rate per $100) for a tax year and re-price
+        the parcels of the combos whose combined rate changed.
+        """
+        started = time.perf_counter()
+        async with self.manager.begin_write() as conn:
+            unit_ids = await self._unit_ids(conn, rates)
+            wanted = {unit_ids[code]: _rate_to_e6(rate) for code, rate in rates.items()}
+            stored: Dict[int, int] = {}
+            for chunk in _chunks(list(wanted)):
+                stored.update((await conn.execute(
+                    select(_unit_rate.unit_id, _rate_e6(_unit_rate.rate))
+                    .where(_unit_rate.tax_year == tax_year, _unit_rate.unit_id.in_(chunk))
+                )).all())
+            changed_units = [unit_id for unit_id, rate in wanted.items() if stored.get(unit_id) != rate]
+
+            insert = _insert(conn)
+            for batch in _chunks(changed_units, WRITE_BATCH_ROWS):
+                stmt = insert(TaxUnitRate.__table__)
+                await conn.execute(stmt.on_conflict_do_update(
+                    index_elements=["unit_id", "tax_year"],
+                    set_={"rate": stmt.excluded.rate, "updated_at": func.now()},
+                ), [
+                    {"unit_id": unit_id, "tax_year": tax_year, "rate": Decimal(wanted[unit_id]).scaleb(-6)}
+                    for unit_id in batch
+                ])
+
+            affected: set = set()
+            for chunk in _chunks(changed_units):
+                affected.update((await conn.execute(
+                    select(_combo_unit.combo_id).where(_combo_unit.unit_id.in_(chunk))
+                )).scalars())
+            repriced = await refresh_combo_rates(conn, tax_year, sorted(affected)) if affected else []
+            totals: Dict[str, int] = defaultdict(int)
+            for chunk in _chunks(repriced):
+                for key, value in (await price_assessments(conn, tax_year, _property.tax_combo_id.in_(chunk))).items():
+                    totals[key] += value
+
+        stats = {
+            "tax_year": tax_year,
+            "units": len(wanted),
+            "changed_units": len(changed_units),
+            "affected_combos": len(affected),
+            "repriced_combos": len(repriced),
+            "assessments_updated": totals["updated"],
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"🏛️ Set {len(changed_units)} unit rates for {tax_year}", **stats)
+        return stats
+
+    async def price(self, tax_year: int, county: Optional[str] = None) -> Dict[str, Any]:
+        """Refresh every combo rate of a year and re-price its assessments (a county's, or all)."""
+        started = time.perf_counter()
+        async with self.manager.begin_write() as conn:
+            repriced = await refresh_combo_rates(conn, tax_year)
+            conditions = (_property.county == county,) if county else ()
+            stats = await price_assessments(conn, tax_year, *conditions)
+
+        stats.update(
+            tax_year=tax_year, county=county, repriced_combos=len(repriced),
+            elapsed_seconds=round(time.perf_counter() - started, 3),
+        )
+        logger.info(f"🏛️ Priced {stats['priced']} assessments from rate combos", **stats)
+        return stats
+
+
+@register_import_hook
+async def price_imported_stacks(conn, batch: ImportBatch) -> None:
+    """Re-price new and revalued assessments of parcels with a combo in the importing chunk's transaction."""
+    property_ids = list(batch.assessment_changes)
+    for chunk in _chunks(property_ids):
+        await price_assessments(conn, batch.assessment_year, _assessment.property_id.in_(chunk), notify=False)
+
+
+def _read_csv(path: str) -> List[Dict[str, str]]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return [{key.strip().lower(): (value or "").strip() for key, value in row.items()} for row in csv.DictReader(f)]
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        stack = RateStack(manager)
+        if args.command == "load-units":
+            result: Any = {"units": await stack.load_units(_read_csv(args.file))}
+        elif args.command == "load-members":
+            members: Dict[str, List[str]] = defaultdict(list)
+            for row in _read_csv(args.file):
+                members[row["parcel_id"]].append(row["unit_code"])
+            result = await stack.assign_units(args.county, members)
+        elif args.command == "compile":
+            result = await stack.compile(args.county)
+        elif args.command == "set-rates":
+            result = await stack.set_rates(args.year, {row["unit_code"]: row["rate"] for row in _read_csv(args.file)})
+        else:
+            result = await stack.price(args.year, args.county)
+        print(json.dumps(result, indent=2))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Taxing-unit rate stacks")
+    parser.add_argument("command", choices=["load-units", "load-members", "compile", "set-rates", "price"])
+    parser.add_argument("file", nargs="?", help="CSV input (load-units, load-members, set-rates)")
+    parser.add_argument("--county")
+    parser.add_argument("--year", type=int)
+    args = parser.parse_args(argv)
+    if args.command in ("load-units", "load-members", "set-rates") and not args.file:
+        parser.error(f"{args.command} needs a CSV file")
+    if args.command in ("load-members", "compile") and not args.county:
+        parser.error(f"{args.command} needs --county")
+    if args.command in ("set-rates", "price") and not args.year:
+        parser.error(f"{args.command} needs --year")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+"""
+Assessment ratio study: uniformity statistics per county, subdivision and property type.
+
+The ratio of a parcel is ``total_assessed_value / market_value`` of its
+assessment for the year (parcels without a positive market value are left
+out). For every group the study reports:
+
+- median ratio: the level of assessment;
+- COD (coefficient of dispersion): the average absolute deviation from the
+  median, as a percent of the median. Lower is more uniform;
+- PRD (price-related differential): mean ratio over the value-weighted mean
+  ratio. Above 1 means cheaper parcels are assessed at a higher ratio than
+  expensive ones (regressivity);
+- a bootstrap confidence interval for each of the three.
+
+Groups are the county, the county by property type, the county by
+subdivision, and the county by subdivision and property type. Groups below
+``MIN_GROUP_SIZE`` parcels are not reported, except the county itself.
+
+Statistics are computed one county at a time over NumPy arrays sorted by
+(group, ratio). Group medians are read at fixed positions of the sorted
+array. The bootstrap is a Poisson bootstrap: each replicate weighs every
+parcel by a Poisson(1) count, so a replicate's group median is where the
+running count crosses half the group's total. Its deviation sum for the COD
+comes from prefix sums on either side, with no re-sorting. One replicate's
+counts are shared by all four group levels. Replicates are seeded per county
+and year, so a county's numbers do not depend on which run computed them.
+
+Results are cached in ``ratio_study_summary``. The roll importer deletes a
+county's rows as it imports changed parcels or assessments (an import hook).
+``RatioStudy.summary`` recomputes a county-year on the next read that misses.
+
+    python -m services.property_data.ratio_study run --year 2026 [--county Harris]
+    python -m services.property_data.ratio_study show --county Harris --year 2026 [--subdivision "OAK HILLS"] [--type residential]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, and_, cast, delete, func, insert, select
+
+from src.core.logging import get_logger
+from services.persistence.database import Property, PropertyType, RatioStudySummary, TaxAssessment
+from .importer import ImportBatch, register_import_hook
+
+logger = get_logger("ratio_study")
+
+MIN_GROUP_SIZE = 5
+CONFIDENCE = 0.95
+LOAD_PARTITION_ROWS = 100_000
+
+# (by subdivision, by property type) for each reported group level
+LEVELS = ((False, False), (False, True), (True, False), (True, True))
+STATISTICS = ("median_ratio", "cod", "prd")
+
+_property = Property.__table__.c
+_assessment = TaxAssessment.__table__.c
+_summary = RatioStudySummary.__table__.c
+
+_GROUP_ORDER = (_property.county, _property.subdivision, _property.property_type)
+
+
+def _poisson_table(bits: int = 16) -> np.ndarray:
+    """Poisson(1) inverse CDF at the midpoints of 2**bits equal steps (probabilities exact to 2**-bits)."""
+    steps = 1 << bits
+    cdf, term, k = [], math.exp(-1), 0
+    total = 0.0
+    while total < 1 - 0.5 / steps:
+        total += term
+        cdf.append(total)
+        k += 1
+        term /= k
+    return np.searchsorted(np.array(cdf), (np.arange(steps) + 0.5) / steps).astype(np.uint8)
+
+
+# Poisson(1) counts by table lookup: several times faster than Generator.poisson
+_POISSON_COUNTS = _poisson_table()
+
+
+def _poisson_counts(rng: np.random.Generator, size: int) -> np.ndarray:
+    return _POISSON_COUNTS[rng.integers(0, len(_POISSON_COUNTS), size, dtype=np.uint16)]
+
+
+def _ratio_conditions(assessment_year: int, county: Optional[str]) -> List:
+    conditions = [
+        _assessment.assessment_year == assessment_year,
+        _assessment.market_value > 0,
+        _assessment.total_assessed_value >= 0,
+        _property.is_active.is_(True),
+    ]
+    if county is not None:
+        conditions.append(_property.county == county)
+    return conditions
+
+
+async def load_ratios(conn, assessment_year: int, county: Optional[str] = None) -> Tuple[List[tuple], np.ndarray]:
+    """
+    The year's (combination, assessed, market) rows and the combinations.
+
+    A combination is a distinct (county, subdivision, property_type); rows
+    carry its position in the returned list, so they load as one float
+    matrix.
+    """
+    source = TaxAssessment.__table__.join(Property.__table__, _property.id == _assessment.property_id)
+    conditions = _ratio_conditions(assessment_year, county)
+    combos = (await conn.execute(
+        select(*_GROUP_ORDER).select_from(source).where(*conditions).distinct().order_by(*_GROUP_ORDER)
+    )).all()
+
+    result = await conn.stream(
+        select(
+            cast(func.dense_rank().over(order_by=_GROUP_ORDER) - 1, Float),
+            cast(_assessment.total_assessed_value, Float),
+            cast(_assessment.market_value, Float),
+        )
+        .select_from(source)
+        .where(*conditions)
+    )
+    parts = []
+    async for partition in result.partitions(LOAD_PARTITION_ROWS):
+        values = itertools.chain.from_iterable(partition)
+        parts.append(np.fromiter(values, dtype=np.float64, count=len(partition) * 3).reshape(-1, 3))
+    matrix = np.concatenate(parts) if parts else np.empty((0, 3))
+    return [tuple(combo) for combo in combos], matrix
+
+
+class _Level:
+    """One group level of a county: rows sorted by (group, ratio) and the point statistics."""
+
+    __slots__ = (
+        "keys", "order", "ratio", "assessed", "market", "starts", "ends", "parcels", "point",
+        "_running", "_running_ratio", "_product",
+    )
+
+    def __init__(self, keys: List[Tuple[str, str]], group: np.ndarray, ratio: np.ndarray,
+                 assessed: np.ndarray, market: np.ndarray):
+        rows = np.flatnonzero(group >= 0)
+        self.order = rows[np.lexsort((ratio[rows], group[rows]))]
+        group = group[self.order]
+        self.ratio = ratio[self.order]
+        self.assessed = assessed[self.order]
+        self.market = market[self.order]
+        present = np.unique(group)
+        self.keys = [keys[i] for i in present.tolist()]
+        self.starts = np.searchsorted(group, present, side="left")
+        self.ends = np.searchsorted(group, present, side="right")
+        self.parcels = self.ends - self.starts
+        self.point = self._point_statistics()
+        # Prefix-sum buffers reused by every replicate (index 0 stays 0)
+        self._running = np.zeros(len(self.order) + 1, dtype=np.int64)
+        self._running_ratio = np.zeros(len(self.order) + 1)
+        self._product = np.empty(len(self.order))
+
+    def _point_statistics(self) -> Dict[str, np.ndarray]:
+        if not len(self.starts):
+            return {name: np.empty(0) for name in ("median_ratio", "cod", "prd", "mean_ratio", "weighted_mean_ratio")}
+        r, n = self.ratio, self.parcels
+        median = (r[self.starts + (n - 1) // 2] + r[self.starts + n // 2]) / 2
+        deviation = np.add.reduceat(np.abs(r - np.repeat(median, n)), self.starts)
+        mean = np.add.reduceat(r, self.starts) / n
+        weighted = np.add.reduceat(self.assessed, self.starts) / np.add.reduceat(self.market, self.starts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "median_ratio": median,
+                "cod": 100 * deviation / n / median,
+                "prd": mean / weighted,
+                "mean_ratio": mean,
+                "weighted_mean_ratio": weighted,
+            }
+
+    def replicate(self, counts: np.ndarray) -> np.ndarray:
+        """(median, COD, PRD) of every group under one replicate's per-row counts; 3 x groups."""
+        if not len(self.starts):
+            return np.empty((3, 0))
+        c = counts[self.order]
+        r, starts, ends, product = self.ratio, self.starts, self.ends, self._product
+        running, running_ratio = self._running, self._running_ratio
+        np.cumsum(c, out=running[1:])
+        np.multiply(c, r, out=product)
+        np.cumsum(product, out=running_ratio[1:])
+        total = running[ends] - running[starts]
+
+        # The median is the row where the running count first reaches half the group's total
+        target = running[starts] + (total + 1) // 2
+        at = np.clip(np.searchsorted(running, target, side="left") - 1, starts, ends - 1)
+        median = r[at]
+        below, below_sum = running[at + 1] - running[starts], running_ratio[at + 1] - running_ratio[starts]
+        above, above_sum = running[ends] - running[at + 1], running_ratio[ends] - running_ratio[at + 1]
+        deviation = median * below - below_sum + above_sum - median * above
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = (running_ratio[ends] - running_ratio[starts]) / total
+            weighted_assessed = np.add.reduceat(np.multiply(c, self.assessed, out=product), starts)
+            weighted = weighted_assessed / np.add.reduceat(np.multiply(c, self.market, out=product), starts)
+            result = np.vstack((median, 100 * deviation / total / median, mean / weighted))
+        result[:, total == 0] = np.nan
+        return result
+
+
+def _level_keys(combos: List[tuple], by_subdivision: bool, by_type: bool) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+    """Group keys of a level and each combination's group (-1: no subdivision at a subdivision level)."""
+    keys: Dict[Tuple[str, str], int] = {}
+    group = np.empty(len(combos), dtype=np.int64)
+    for i, (_, subdivision, property_type) in enumerate(combos):
+        subdivision = (subdivision or "").strip()
+        if by_subdivision and not subdivision:
+            group[i] = -1
+            continue
+        key = (
+            subdivision if by_subdivision else "",
+            property_type.value if by_type and property_type is not None else "",
+        )
+        group[i] = keys.setdefault(key, len(keys))
+    return list(keys), group
+
+
+def study_county(county: str, assessment_year: int, combos: List[tuple], rows: np.ndarray,
+                 samples: int) -> List[Dict[str, Any]]:
+    """Summary rows of one county from its combinations and (combination, assessed, market) rows."""
+    combo = rows[:, 0].astype(np.int64)
+    assessed, market = rows[:, 1], rows[:, 2]
+    ratio = assessed / market
+
+    levels = []
+    for by_subdivision, by_type in LEVELS:
+        keys, combo_group = _level_keys(combos, by_subdivision, by_type)
+        levels.append(_Level(keys, combo_group[combo], ratio, assessed, market))
+
+    # Poisson bootstrap, the same replicate counts across levels
+    rng = np.random.default_rng([assessment_year, zlib.crc32(county.encode())])
+    replicates = [np.empty((samples, 3, len(level.starts))) for level in levels]
+    for b in range(samples):
+        counts = _poisson_counts(rng, len(ratio))
+        for level, out in zip(levels, replicates):
+            out[b] = level.replicate(counts)
+
+    tail = 100 * (1 - CONFIDENCE) / 2
+    summaries = []
+    for depth, (level, reps) in enumerate(zip(levels, replicates)):
+        low, high = _percentiles(reps, tail, 100 - tail)
+        for g, (subdivision, property_type) in enumerate(level.keys):
+            parcels = int(level.parcels[g])
+            reported = parcels >= MIN_GROUP_SIZE
+            if not reported and depth > 0:
+                continue  # the county row is kept, with no statistics
+            row = {
+                "county": county,
+                "assessment_year": assessment_year,
+                "subdivision": subdivision,
+                "property_type": property_type,
+                "parcels": parcels,
+                "bootstrap_samples": samples,
+            }
+            for name in ("mean_ratio", "weighted_mean_ratio"):
+                row[name] = _float(level.point[name][g]) if reported else None
+            for s, name in enumerate(STATISTICS):
+                row[name] = _float(level.point[name][g]) if reported else None
+                row[f"{name}_ci_low"] = _float(low[s, g]) if reported else None
+                row[f"{name}_ci_high"] = _float(high[s, g]) if reported else None
+            summaries.append(row)
+    return summaries
+
+
+def _percentiles(replicates: np.ndarray, *percents: float) -> List[np.ndarray]:
+    """Percentiles over the replicate axis (0), ignoring NaN replicates, by one sort."""
+    ordered = np.sort(replicates, axis=0)  # NaN sorts last
+    valid = (~np.isnan(ordered)).sum(axis=0)
+    result = []
+    for percent in percents:
+        position = percent / 100 * np.maximum(valid - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, np.maximum(valid - 1, 0))
+        low_value = np.take_along_axis(ordered, lower[None], axis=0)[0] if len(ordered) else np.full(valid.shape, np.nan)
+        high_value = np.take_along_axis(ordered, upper[None], axis=0)[0] if len(ordered) else low_value
+        value = low_value + (position - lower) * (high_value - low_value)
+        value[valid == 0] = np.nan
+        result.append(value)
+    return result
+
+
+def _float(value: float) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value), 6)
+
+
+def _county_row(county: str, assessment_year: int, samples: int) -> Dict[str, Any]:
+    """County-level row of a county-year with no usable ratios, so reads still hit the cache."""
+    row = {
+        "county": county, "assessment_year": assessment_year, "subdivision": "", "property_type": "",
+        "parcels": 0, "bootstrap_samples": samples, "mean_ratio": None, "weighted_mean_ratio": None,
+    }
+    for name in STATISTICS:
+        row[name] = row[f"{name}_ci_low"] = row[f"{name}_ci_high"] = None
+    return row
+
+
+class RatioStudy:
+    """Computes ratio-study statistics and serves them from ``ratio_study_summary``."""
+
+    def __init__(self, manager, samples: Optional[int] = None):
+        """
+        Initialize study.
+
+        Args:
+            manager: DatabaseManager holding the roll and the summary table
+            samples: Bootstrap replicates (defaults to ``RATIO_STUDY_BOOTSTRAP_SAMPLES``)
+        """
+        if samples is None:
+            from config.settings import settings
+            samples = settings.ratio_study_bootstrap_samples
+        self.manager = manager
+        self.samples = samples
+
+    async def run(self, assessment_year: int, county: Optional[str] = None) -> Dict[str, Any]:
+        """Recompute a year (every county, or one) and replace its cached rows."""
+        started = time.perf_counter()
+        async with self.manager.begin_write() as conn:
+            combos, matrix = await load_ratios(conn, assessment_year, county)
+            loaded = time.perf_counter()
+
+            rows = matrix[np.argsort(matrix[:, 0], kind="stable")]
+            combo = rows[:, 0].astype(np.int64)
+            summaries = []
+            for name, members in itertools.groupby(range(len(combos)), key=lambda i: combos[i][0]):
+                members = list(members)
+                first, last = np.searchsorted(combo, [members[0], members[-1] + 1])
+                county_rows = rows[first:last].copy()
+                county_rows[:, 0] -= members[0]
+                summaries.extend(study_county(name, assessment_year, combos[members[0]:members[-1] + 1],
+                                              county_rows, self.samples))
+            if county is not None and not summaries:
+                summaries.append(_county_row(county, assessment_year, self.samples))
+            computed = time.perf_counter()
+
+            stale = _summary.assessment_year == assessment_year
+            if county is not None:
+                stale = and_(stale, _summary.county == county)
+            await conn.execute(delete(RatioStudySummary.__table__).where(stale))
+            if summaries:
+                await conn.execute(insert(RatioStudySummary.__table__), summaries)
+
+        stats = {
+            "assessment_year": assessment_year,
+            "county": county,
+            "parcels": len(matrix),
+            "groups": len(summaries),
+            "load_seconds": round(loaded - started, 3),
+            "compute_seconds": round(computed - loaded, 3),
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"📐 Ratio study computed for {county or 'all counties'} {assessment_year}", **stats)
+        return stats
+
+    async def summary(self, county: str, assessment_year: int, subdivision: Optional[str] = None,
+                      property_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cached statistics of one group (county-wide when subdivision and type are omitted).
+
+        A county-year without cached rows is computed first. Returns None for a
+        group with fewer than ``MIN_GROUP_SIZE`` parcels.
+        """
+        key = (
+            _summary.county == county,
+            _summary.assessment_year == assessment_year,
+            _summary.subdivision == (subdivision or "").strip(),
+            _summary.property_type == (PropertyType(property_type).value if property_type else ""),
+        )
+        for attempt in range(2):
+            async with self.manager.engine.connect() as conn:
+                row = (await conn.execute(select(RatioStudySummary.__table__).where(*key))).mappings().first()
+                if row is not None:
+                    return {name: value for name, value in row.items() if name != "id"}
+                cached = await conn.scalar(select(func.count()).where(
+                    _summary.county == county, _summary.assessment_year == assessment_year,
+                ))
+            if cached or attempt:
+                return None
+            await self.run(assessment_year, county)
+        return None
+
+
+@register_import_hook
+async def invalidate_ratio_study(conn, batch: ImportBatch) -> None:
+    """Drop the county's cached statistics when an import changes its parcels or assessments."""
+    if batch.assessment_changes or batch.new_property_ids or batch.changed_property_ids:
+        # Parcel attributes (subdivision, type) group every year, so all of the county's years go
+        await conn.execute(delete(RatioStudySummary.__table__).where(_summary.county == batch.county))
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from services.persistence.database import get_database_manager
+
+    manager = await get_database_manager()
+    try:
+        study = RatioStudy(manager, samples=args.samples)
+        if args.command == "show":
+            if not args.county:
+                print("show needs --county")
+                return 2
+            row = await study.summary(args.county, args.year, args.subdivision, args.type)
+            print(json.dumps(row, indent=2, default=str))
+            return 0 if row is not None else 1
+        print(json.dumps(await study.run(args.year, args.county), indent=2))
+        return 0
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Assessment ratio study statistics")
+    parser.add_argument("command", choices=["run", "show"])
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--county", help="One county (run: default all)")
+    parser.add_argument("--subdivision", help="Group (show)")
+    parser.add_argument("--type", choices=[kind.value for kind in PropertyType], help="Property type (show)")
+    parser.add_argument("--samples", type=int, help="Override RATIO_STUDY_BOOTSTRAP_SAMPLES")
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,28 +8,52 @@ import string
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, select, update
 import structlog
 import redis.asyncio as aioredis
 
+from services.persistence.database import save_changes, discard_changes, after_commit
+from services.persistence.query_metrics import instrument_repository
+from services.persistence.replicas import replica_read
 from .models import SupportTicket, TicketMessage, TicketStatus, TicketPriority, TicketCategory, AgentSession
 
 logger = structlog.get_logger()
 
+# Hot-path lookup built once (see services.persistence.statements)
+TICKET_BY_TICKET_ID = (
+    select(SupportTicket)
+    .where(SupportTicket.ticket_id == bindparam("ticket_id"))
+)
 
+
+@instrument_repository
 class TicketService:
     """Service for managing support tickets."""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379/0"):
-        """Initialize ticket service."""
+    def __init__(self, redis_url: Optional[str] = None):
+        """
+        Initialize ticket service.
+        
+        Args:
+            redis_url: Dedicated Redis URL; when omitted the shared connection
+                manager pool is used
+        """
         self.redis_url = redis_url
         self.logger = logger.bind(component="ticket_service")
         self.redis_client = None
+        from services.persistence.redis_keys import get_key_schema
+        self.keys = get_key_schema()
+        # Until the v1 -> v2 key migration has finished, misses fall back to legacy keys
+        self.legacy_reads = True
     
     async def initialize(self):
         """Initialize Redis connection."""
         try:
-            self.redis_client = await aioredis.from_url(self.redis_url, decode_responses=True)
+            if self.redis_url:
+                self.redis_client = await aioredis.from_url(self.redis_url, decode_responses=True)
+            else:
+                from services.persistence.redis_manager import get_redis_manager
+                self.redis_client = get_redis_manager().get_async_client()
             await self.redis_client.ping()
             self.logger.info("Redis connection established for ticket service")
         except Exception as e:
@@ -110,23 +134,25 @@ class TicketService:
             )
             
             session.add(ticket)
-            await session.commit()
-            await session.refresh(ticket)
+            await save_changes(session, ticket)
             
             # Store ticket status in Redis for quick access
             if self.redis_client:
-                await self.redis_client.setex(
-                    f"ticket_status:{instagram_id}",
-                    86400,  # 24 hours TTL
-                    json.dumps({
-                        "ticket_id": ticket_id,
-                        "status": TicketStatus.OPEN.value,
-                        "created_at": datetime.now().isoformat()
-                    })
-                )
+                async def cache_ticket_status():
+                    await self.redis_client.setex(
+                        self.keys.ticket_status(instagram_id),
+                        86400,  # 24 hours TTL
+                        json.dumps({
+                            "ticket_id": ticket_id,
+                            "status": TicketStatus.OPEN.value,
+                            "created_at": datetime.now().isoformat()
+                        })
+                    )
+                    
+                    # Add to active tickets set
+                    await self.redis_client.sadd(self.keys.active_tickets(), ticket_id)
                 
-                # Add to active tickets set
-                await self.redis_client.sadd("active_tickets", ticket_id)
+                await after_commit(session, cache_ticket_status)
             
             self.logger.info(
                 f"Ticket created successfully",
@@ -139,7 +165,7 @@ class TicketService:
             
         except Exception as e:
             self.logger.error(f"Failed to create ticket: {e}")
-            await session.rollback()
+            await discard_changes(session)
             raise
     
     def _determine_category(self, subject: str, description: str) -> TicketCategory:
@@ -195,13 +221,13 @@ class TicketService:
         else:
             return TicketPriority.MEDIUM
     
+    @replica_read
     async def get_ticket(self, session: AsyncSession, ticket_id: str) -> Optional[SupportTicket]:
         """Get ticket by ID."""
-        result = await session.execute(
-            select(SupportTicket).where(SupportTicket.ticket_id == ticket_id)
-        )
+        result = await session.execute(TICKET_BY_TICKET_ID, {"ticket_id": ticket_id})
         return result.scalar_one_or_none()
     
+    @replica_read
     async def get_customer_tickets(
         self,
         session: AsyncSession,
@@ -240,31 +266,35 @@ class TicketService:
                 ticket.resolved_at = datetime.utcnow()
                 ticket.resolution_notes = resolution_notes
                 ticket.resolved_by = resolved_by
-                
-                # Remove from active tickets
-                if self.redis_client:
-                    await self.redis_client.srem("active_tickets", ticket_id)
             
-            await session.commit()
+            await save_changes(session)
             
             # Update Redis cache
             if self.redis_client:
-                await self.redis_client.setex(
-                    f"ticket_status:{ticket.instagram_id}",
-                    86400,
-                    json.dumps({
-                        "ticket_id": ticket_id,
-                        "status": status.value,
-                        "updated_at": datetime.now().isoformat()
-                    })
-                )
+                instagram_id = ticket.instagram_id
+                
+                async def cache_ticket_status():
+                    if status == TicketStatus.RESOLVED:
+                        # Remove from active tickets
+                        await self.redis_client.srem(self.keys.active_tickets(), ticket_id)
+                    await self.redis_client.setex(
+                        self.keys.ticket_status(instagram_id),
+                        86400,
+                        json.dumps({
+                            "ticket_id": ticket_id,
+                            "status": status.value,
+                            "updated_at": datetime.now().isoformat()
+                        })
+                    )
+                
+                await after_commit(session, cache_ticket_status)
             
             self.logger.info(f"Ticket status updated", ticket_id=ticket_id, status=status.value)
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to update ticket status: {e}")
-            await session.rollback()
+            await discard_changes(session)
             return False
     
     async def add_message(
@@ -293,26 +323,27 @@ class TicketService:
             )
             
             session.add(message)
-            await session.commit()
-            await session.refresh(message)
+            await save_changes(session, message)
             
             # Broadcast message via Redis for real-time updates
             if self.redis_client:
-                await self.redis_client.publish(
-                    f"ticket_messages:{ticket_id}",
-                    json.dumps({
-                        "sender_type": sender_type,
-                        "sender_name": sender_name,
-                        "message_text": message_text,
-                        "created_at": message.created_at.isoformat()
-                    })
-                )
+                payload = json.dumps({
+                    "sender_type": sender_type,
+                    "sender_name": sender_name,
+                    "message_text": message_text,
+                    "created_at": message.created_at.isoformat() if message.created_at else datetime.utcnow().isoformat()
+                })
+                
+                async def broadcast_message():
+                    await self.redis_client.publish(f"ticket_messages:{ticket_id}", payload)
+                
+                await after_commit(session, broadcast_message)
             
             return message
             
         except Exception as e:
             self.logger.error(f"Failed to add message: {e}")
-            await session.rollback()
+            await discard_changes(session)
             return None
     
     async def assign_agent(
@@ -333,23 +364,29 @@ class TicketService:
             ticket.assigned_at = datetime.utcnow()
             ticket.status = TicketStatus.IN_PROGRESS
             
-            await session.commit()
+            await save_changes(session)
             
             self.logger.info(f"Agent assigned to ticket", ticket_id=ticket_id, agent_name=agent_name)
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to assign agent: {e}")
-            await session.rollback()
+            await discard_changes(session)
             return False
     
+    def mark_legacy_migrated(self) -> None:
+        """Stop consulting v1 keys once the key migration has completed."""
+        self.legacy_reads = False
+    
     async def check_active_ticket(self, instagram_id: str) -> Optional[Dict[str, Any]]:
         """Check if customer has an active ticket."""
         if not self.redis_client:
             return None
         
         try:
-            ticket_data = await self.redis_client.get(f"ticket_status:{instagram_id}")
+            ticket_data = await self.redis_client.get(self.keys.ticket_status(instagram_id))
+            if ticket_data is None and self.legacy_reads:
+                ticket_data = await self.redis_client.get(self.keys.legacy_ticket_status(instagram_id))
             if ticket_data:
                 data = json.loads(ticket_data)
                 if data["status"] in [TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value]:
@@ -359,6 +396,7 @@ class TicketService:
             self.logger.error(f"Failed to check active ticket: {e}")
             return None
     
+    @replica_read
     async def get_ticket_messages(
         self,
         session: AsyncSession,
@@ -390,8 +428,7 @@ async def get_ticket_service() -> TicketService:
     global ticket_service
     
     if ticket_service is None:
-        from config.settings import settings
-        ticket_service = TicketService(redis_url=settings.redis_url)
+        ticket_service = TicketService()
         await ticket_service.initialize()
     
     return ticket_service
\ No newline at end of file
@@ -36,6 +36,8 @@ setup(
     entry_points={
         "console_scripts": [
             "century-proptax-ai=src.main:main",
+            "century-proptax-db=services.persistence.schema:main",
+            "century-proptax-import=services.property_data.importer:main",
         ],
     },
 )
\ No newline at end of file
@@ -273,7 +273,8 @@ async def health_check():
         health_status["checks"]["database"] = {
             "status": "healthy" if db_health else "unhealthy",
             "response_time_ms": round(db_check_duration * 1000, 2),
-            "connection": "ok" if db_health else "failed"
+            "connection": "ok" if db_health else "failed",
+            "pool": db_manager.get_pool_stats()
         }
         
         if not db_health:
@@ -319,14 +320,19 @@ async def health_check():
         redis_healthy = conv_store.health_check()
         redis_check_duration = (datetime.now() - redis_check_start).total_seconds()
         
-        if not redis_healthy:
-            raise Exception("Redis health check failed")
-        
         health_status["checks"]["redis"] = {
-            "status": "healthy",
+            "status": "healthy" if redis_healthy else "unhealthy",
             "response_time_ms": round(redis_check_duration * 1000, 2),
-            "connection": "ok"
+            "connection": "ok" if redis_healthy else "failed",
+            "near_cache": conv_store.get_near_cache_stats(),
+            "degradation": conv_store.get_degradation_status()
         }
+        
+        from services.persistence.redis_manager import get_redis_manager
+        health_status["checks"]["redis"]["pools"] = get_redis_manager().get_pool_stats()
+        
+        if not redis_healthy:
+            health_status["status"] = "degraded"
     except Exception as redis_error:
         health_status["checks"]["redis"] = {
             "status": "unhealthy",
@@ -422,6 +428,39 @@ async def get_stats():
     return modern_integrated_webhook_handler.get_handler_stats()
 
 
+@router.get(
+    "/admin/db/slow-queries",
+    response_model=Dict[str, Any],
+    summary="Slowest Database Statements",
+    description="""Top-N statement fingerprints by database time.
+
+    Every statement is timed by engine event hooks and attributed to the
+    repository method that issued it. Literals and bound parameters are
+    never included.
+
+    **Ordering (`order_by`):** `total_ms` (default), `max_ms`, `avg_ms`, `count`
+
+    **Security Note:**
+    This is an administrative endpoint and should be protected
+    in production environments.
+    """
+)
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200, description="Number of fingerprints to return"),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|avg_ms|count)$", description="Sort key")
+):
+    """Get the slowest statement fingerprints (admin endpoint)."""
+    from services.persistence.query_metrics import get_query_metrics
+    
+    metrics = get_query_metrics()
+    return {
+        "summary": metrics.get_stats(),
+        "order_by": order_by,
+        "statements": metrics.top(limit=limit, order_by=order_by),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @router.post(
     "/force-process-batch/{user_id}",
     response_model=Dict[str, Any],
@@ -14,9 +14,10 @@ from src.core.logging import get_logger
 
 logger = get_logger("whatsapp_webhooks")
 
-# In-memory cache for processed message IDs (prevents duplicate processing)
+# In-memory cache for processed message IDs (fallback when Redis is unavailable)
 processed_messages = set()
 MAX_PROCESSED_CACHE = 1000  # Prevent memory growth
+PROCESSED_MESSAGE_TTL = 86400  # WhatsApp retries well within a day
 
 router = APIRouter(prefix="/whatsapp", tags=["WhatsApp"])
 
@@ -93,20 +94,10 @@ async def whatsapp_webhook_handler(request: Request):
             message_id = message_data.get("id")
 
             # Check for duplicate messages
-            if message_id and message_id in processed_messages:
+            if message_id and await _is_duplicate_message(message_id):
                 logger.info(f"Duplicate WhatsApp message ignored: {message_id}")
                 return {"status": "received"}
 
-            # Add to processed cache
-            if message_id:
-                processed_messages.add(message_id)
-                # Prevent memory growth
-                if len(processed_messages) > MAX_PROCESSED_CACHE:
-                    # Remove oldest half of messages
-                    old_messages = list(processed_messages)[:MAX_PROCESSED_CACHE // 2]
-                    processed_messages.difference_update(old_messages)
-                    logger.debug("Cleaned processed messages cache")
-
             # Process message in background to return 200 OK immediately
             import asyncio
             asyncio.create_task(_handle_whatsapp_message_safe(message_data, handler))
@@ -131,6 +122,37 @@ async def whatsapp_webhook_handler(request: Request):
         return {"status": "received"}
 
 
+async def _is_duplicate_message(message_id: str) -> bool:
+    """
+    Record a message ID and report whether it was already seen.
+
+    Uses the shared Redis pool so duplicates are caught across workers,
+    falling back to the per-process set if Redis is unavailable.
+    """
+    try:
+        from services.persistence.redis_keys import get_key_schema
+        from services.persistence.redis_manager import get_redis_manager
+        redis_client = get_redis_manager().get_async_client()
+        first_seen = await redis_client.set(
+            get_key_schema().processed_message(message_id), "1", nx=True, ex=PROCESSED_MESSAGE_TTL
+        )
+        return not first_seen
+    except Exception as e:
+        logger.debug(f"Redis dedup unavailable, using in-memory cache: {e}")
+
+    if message_id in processed_messages:
+        return True
+
+    processed_messages.add(message_id)
+    # Prevent memory growth
+    if len(processed_messages) > MAX_PROCESSED_CACHE:
+        # Remove oldest half of messages
+        old_messages = list(processed_messages)[:MAX_PROCESSED_CACHE // 2]
+        processed_messages.difference_update(old_messages)
+        logger.debug("Cleaned processed messages cache")
+    return False
+
+
 async def _handle_whatsapp_message_safe(message_data: Dict[str, Any], message_handler) -> None:
     """Handle WhatsApp message safely in background task."""
     try:
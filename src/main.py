@@ -13,6 +13,7 @@ and processing, with comprehensive API documentation available at /docs.
 """
 
 import os
+import asyncio
 import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -155,6 +156,22 @@ try:
 except ImportError as e:
     logger.warning(f"⚠️ Ticket management routes not loaded: {e}")
 
+# Include conversation history routes (agent dashboards)
+try:
+    from app.routes.conversation_routes import router as conversation_router
+    app.include_router(conversation_router)
+    logger.info("✅ Conversation history API loaded")
+except ImportError as e:
+    logger.warning(f"⚠️ Conversation history routes not loaded: {e}")
+
+# Include property data routes (comps for appeal evidence)
+try:
+    from app.routes.property_routes import router as property_router
+    app.include_router(property_router)
+    logger.info("✅ Property data API loaded")
+except ImportError as e:
+    logger.warning(f"⚠️ Property data routes not loaded: {e}")
+
 # Report management and monitoring dashboards removed - Microsoft Forms flow is streamlined
 # Complex reporting and monitoring not needed for simple registration process
 logger.info("✅ Streamlined API - complex reporting and monitoring removed for Microsoft Forms focus")
@@ -177,15 +194,84 @@ async def startup_event():
     logger.info(f"📞 WhatsApp Phone: {os.getenv('WA_PHONE_NUMBER_ID')}")
     logger.info(f"🔐 VERIFY_TOKEN: {'✅ Configured' if os.getenv('WA_VERIFY_TOKEN') else '❌ Missing'}")
     
-    # Initialize database tables (including ticket tables)
+    # Shared Redis connection pools
+    try:
+        from services.persistence.redis_manager import init_redis_manager
+        redis_manager = await init_redis_manager()
+        
+        # Move v1 conversation/ticket keys to the hash-tagged v2 layout in the background
+        from services.persistence.redis_keys import RedisKeyMigrator, get_key_schema
+        from services.persistence.redis_conversation_store import get_conversation_store
+        from services.ticket_management.ticket_service import get_ticket_service
+        migrator = RedisKeyMigrator(redis_manager.get_sync_client(), get_key_schema())
+        
+        async def _migrate_keys():
+            await migrator.run_until_complete()
+            get_conversation_store().mark_legacy_migrated()
+            (await get_ticket_service()).mark_legacy_migrated()
+        
+        app.state.key_migration_task = asyncio.create_task(_migrate_keys())
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize Redis connection manager: {e}")
+    
+    # Verify the database schema version (one query; migrations run out of band)
+    from config.settings import settings
     try:
         from services.persistence.database import get_database_manager
+        from services.persistence.schema import verify_schema, apply_migrations
         db_manager = await get_database_manager()
-        await db_manager.create_tables()
-        logger.info("✅ Database tables initialized")
+        if settings.db_auto_migrate:
+            await apply_migrations(db_manager.engine)
+        schema_status = await verify_schema(db_manager.engine)
+        logger.info(f"✅ Database schema at revision {schema_status['current']}")
     except Exception as e:
         logger.error(f"❌ Failed to initialize database: {e}")
     
+    # Memory-map the address search index (built by services.property_data.address_index)
+    try:
+        from services.property_data.address_index import get_address_index
+        address_index = get_address_index().load()
+        if address_index is not None:
+            logger.info(f"🔎 Address index loaded: {len(address_index)} parcels")
+        else:
+            logger.warning("⚠️ Address index not built - run: python -m services.property_data.address_index refresh")
+    except Exception as e:
+        logger.error(f"❌ Failed to load address index: {e}")
+    
+    # Memory-map the owner name index (built by services.property_data.owner_resolution)
+    try:
+        from services.property_data.owner_resolution import get_owner_index
+        owner_index = get_owner_index().load()
+        if owner_index is not None:
+            logger.info(f"👥 Owner index loaded: {len(owner_index)} owner names")
+        else:
+            logger.warning("⚠️ Owner index not built - run: python -m services.property_data.owner_resolution run --full")
+    except Exception as e:
+        logger.error(f"❌ Failed to load owner index: {e}")
+    
+    # Background bulk writer for conversation history
+    if settings.message_writer_enabled:
+        from services.persistence.message_writer import get_message_writer
+        get_message_writer().start()
+    
+    # Upcoming MessageHistory partitions (PostgreSQL; idempotent, a no-op on SQLite).
+    # Months without a partition fill the default one and can no longer be split off.
+    try:
+        from services.persistence.message_archive import get_retention_job
+        retention_job = await get_retention_job()
+        created = await retention_job.ensure_partitions()
+        if created:
+            logger.info(f"🗂️ Created message_history partitions: {', '.join(created)}")
+    except Exception as e:
+        logger.error(f"❌ Failed to create message_history partitions: {e}")
+        retention_job = None
+    
+    # In-process MessageHistory retention (otherwise run from cron)
+    if settings.message_archive_interval_hours > 0 and retention_job is not None:
+        app.state.retention_task = asyncio.create_task(
+            retention_job.run_forever(settings.message_archive_interval_hours * 3600)
+        )
+    
     # Payment system status
     razorpay_configured = bool(os.getenv('RAZORPAY_KEY_ID') and os.getenv('RAZORPAY_KEY_SECRET'))
     logger.info(f"💳 Razorpay: {'✅ Configured' if razorpay_configured else '🧪 Mock Mode'}")
@@ -209,6 +295,39 @@ async def startup_event():
             logger.info("💡 Update BASE_URL environment variable to change payment domain")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Application shutdown."""
+    logger.info("🛑 Shutting down Intelligent Business Assistant")
+    
+    # Stop background tasks before closing the connections they use
+    for name in ("key_migration_task", "retention_task"):
+        task = getattr(app.state, name, None)
+        if task is None or task.done():
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Background task {name} failed: {e}")
+    
+    try:
+        from services.persistence.message_writer import close_message_writer
+        await close_message_writer()
+    except Exception as e:
+        logger.error(f"❌ Failed to flush buffered messages: {e}")
+    
+    try:
+        from services.persistence.redis_conversation_store import reset_conversation_store
+        from services.persistence.redis_manager import close_redis_manager
+        reset_conversation_store()
+        await close_redis_manager()
+    except Exception as e:
+        logger.error(f"❌ Failed to close Redis connections: {e}")
+
+
 @app.get(
     "/",
     summary="API Information",